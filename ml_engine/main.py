@@ -21,13 +21,23 @@ async def lifespan(app: FastAPI):
     # Initialize the game service here.
     game_service = await get_game_service()
     
+    # Warm restart: reload caches snapshotted at the last shutdown (skipped if game data or model changed)
+    await game_service.restore_cache_snapshot()
+    
+    # Warm tree and transformation caches for likely start words in the background (progress in /status)
+    game_service.start_warmup()
+    
     print("Application is ready to serve requests.")
     
     yield  # The application is now running.
     
     # --- SHUTDOWN LOGIC ---
     print("Application shutdown initiated.")
-    # No game logic here, just resource cleanup if needed.
+    # No game logic here, just resource cleanup: snapshot caches for the next start,
+    # then persist trees still in the write-behind queue
+    if game_service:
+        await game_service.save_cache_snapshot()
+        await game_service.shutdown()
     print("Application shutdown completed.")
     
 
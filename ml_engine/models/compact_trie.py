@@ -0,0 +1,317 @@
+"""
+Compact trie: the vocabulary trie as a double array instead of per-node objects.
+
+Each node is a slot in parallel arrays. The child of node n for edge byte c
+(UTF-8, so one edge per letter for a-z) is slot base[n] + c, and it exists
+when check[base[n] + c] == n. A lookup is two array reads per byte, and nodes
+cost 14 bytes each. Per slot columns:
+- base: int32 (childless nodes point into a trailing guard block of free slots)
+- check: int32 parent slot, -1 for free slots and the root (slot 0)
+- is_word: 1 if a word ends at the node
+- word_counts: uint32, vocabulary words through the node (0 for the root)
+- max_depths: deepest word end below the node, in bytes from the root
+
+These are the TrieNode fields of the per-node trie it replaces. Construction
+(encode) places nodes breadth-first at the first free base; it runs offline in
+CanonicalDataGenerator. The file (transformation_trie.bin) is memory-mapped:
+8-byte magic, 4-byte little-endian header length, a JSON header (format, byte
+order, checksum of the words.txt it was built from, section offsets) and
+8-byte aligned sections.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+COMPACT_TRIE_MAGIC = b"WRDTRIE\x01"
+COMPACT_TRIE_FORMAT = 1
+COMPACT_TRIE_FILE = "transformation_trie.bin"
+_HEADER_LENGTH = struct.Struct("<I")
+_ALIGNMENT = 8
+_GUARD = 256  # free slots after the last node: base + any byte stays in bounds
+_SECTIONS = (('base', 'i'), ('check', 'i'), ('is_word', 'B'), ('word_counts', 'I'), ('max_depths', 'B'))
+
+
+def words_file_checksum(path: Path) -> str:
+    """blake2b of the words.txt a trie is built from."""
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class CompactTrieChildren(Mapping):
+    """Label -> child node view of a CompactTrieNode."""
+    __slots__ = ('_trie', '_index')
+
+    def __init__(self, trie: "CompactTrie", index: int):
+        self._trie = trie
+        self._index = index
+
+    def __contains__(self, label) -> bool:
+        return self._trie._child(self._index, label) >= 0
+
+    def __getitem__(self, label) -> "CompactTrieNode":
+        child = self._trie._child(self._index, label)
+        if child < 0:
+            raise KeyError(label)
+        return CompactTrieNode(self._trie, child)
+
+    def __iter__(self) -> Iterator[str]:
+        base, check, index = self._trie._base[self._index], self._trie._check, self._index
+        return (chr(label) for label in range(_GUARD) if check[base + label] == index)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class CompactTrieNode:
+    """A node of a CompactTrie with the TrieNode attributes (children, is_word, word_count, max_depth)."""
+    __slots__ = ('_trie', 'index')
+
+    def __init__(self, trie: "CompactTrie", index: int):
+        self._trie = trie
+        self.index = index
+
+    @property
+    def children(self) -> CompactTrieChildren:
+        return CompactTrieChildren(self._trie, self.index)
+
+    @property
+    def is_word(self) -> bool:
+        return self._trie._is_word[self.index] == 1
+
+    @property
+    def word_count(self) -> int:
+        return self._trie._word_counts[self.index]
+
+    @property
+    def max_depth(self) -> int:
+        return self._trie._max_depths[self.index]
+
+
+class CompactTrie:
+    """Read-only trie over flat arrays, from words (from_words) or a memory-mapped file (open)."""
+
+    def __init__(self, buffer, header: Dict[str, Any], data_start: int, source=None):
+        self.header = header
+        self.source = source  # mmap, kept open while the trie is in use
+        view = memoryview(buffer)
+        self._views = [view]
+        for name, format in _SECTIONS:
+            start, length = header['sections'][name]
+            if data_start + start + length > len(buffer):
+                raise ValueError("compact trie is truncated")
+            section = view[data_start + start:data_start + start + length]
+            self._views += [section, section.cast(format)]
+            setattr(self, f'_{name}', self._views[-1])
+
+    @classmethod
+    def from_words(cls, words: Iterable[str], source_checksum: Optional[str] = None) -> "CompactTrie":
+        """Build a trie in memory (see encode)."""
+        data = encode(words, source_checksum)
+        header, data_start = _read_header(data)
+        return cls(data, header, data_start)
+
+    @classmethod
+    def open(cls, path: Path) -> "CompactTrie":
+        """Memory-map a trie file written by save()."""
+        with open(path, 'rb') as f:
+            source = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            header, data_start = _read_header(source)
+            return cls(source, header, data_start, source)
+        except (ValueError, KeyError, TypeError, struct.error):
+            source.close()
+            raise
+
+    def save(self, path: Path) -> None:
+        """Write the trie to path, atomically via a temporary file."""
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(self._views[0])
+        os.replace(tmp_path, path)
+
+    @property
+    def source_checksum(self) -> Optional[str]:
+        return self.header.get('source')
+
+    @property
+    def root(self) -> CompactTrieNode:
+        return CompactTrieNode(self, 0)
+
+    @property
+    def nbytes(self) -> int:
+        return self._views[0].nbytes
+
+    def __len__(self) -> int:
+        """Number of nodes."""
+        return self.header['nodes']
+
+    def find(self, prefix: str) -> int:
+        """Node (slot) reached by prefix, or -1."""
+        base, check = self._base, self._check
+        node = 0
+        for label in prefix.encode('utf-8'):
+            child = base[node] + label
+            if check[child] != node:
+                return -1
+            node = child
+        return node
+
+    def node(self, prefix: str) -> Optional[CompactTrieNode]:
+        """Node reached by prefix, or None."""
+        base, check = self._base, self._check
+        node = 0
+        for label in prefix.encode('utf-8'):
+            child = base[node] + label
+            if check[child] != node:
+                return None
+            node = child
+        return CompactTrieNode(self, node)
+
+    def __contains__(self, word: str) -> bool:
+        index = self.find(word)
+        return index >= 0 and self._is_word[index] == 1
+
+    def _child(self, node: int, label: str) -> int:
+        encoded = label.encode('utf-8')
+        if len(encoded) != 1:
+            return -1
+        child = self._base[node] + encoded[0]
+        return child if self._check[child] == node else -1
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        if self.source is not None:
+            self.source.close()
+
+
+def encode(words: Iterable[str], source_checksum: Optional[str] = None) -> bytes:
+    """Serialized trie (file format above) of words."""
+    vocabulary = sorted({word.encode('utf-8') for word in words})
+    word_set = set(vocabulary)
+    longest = max((len(word) for word in vocabulary), default=0)
+
+    # Level d holds the distinct d-byte prefixes; in sorted order that is
+    # breadth-first order with each node's children in label order
+    word_counts: Dict[bytes, int] = {}
+    max_depths: Dict[bytes, int] = {b'': longest}
+    for word in vocabulary:
+        for depth in range(1, len(word) + 1):
+            prefix = word[:depth]
+            word_counts[prefix] = word_counts.get(prefix, 0) + 1
+            if max_depths.get(prefix, 0) < len(word):
+                max_depths[prefix] = len(word)
+    levels = [[b'']] + [[] for _ in range(longest)]
+    for prefix in sorted(word_counts):
+        levels[len(prefix)].append(prefix)
+
+    # Breadth-first flat form: node i's children are nodes child_offsets[i] .. child_offsets[i + 1]
+    nodes = [prefix for level in levels for prefix in level]
+    child_offsets, next_child = [], 1
+    for depth, level in enumerate(levels):
+        children = levels[depth + 1] if depth + 1 < len(levels) else []
+        position = 0
+        for prefix in level:
+            child_offsets.append(next_child)
+            while position < len(children) and children[position][:-1] == prefix:
+                position += 1
+                next_child += 1
+    child_offsets.append(next_child)
+
+    # Place each node's children at the first base where all their slots are free.
+    # Gaps left behind are mostly too small for nodes with several children, so
+    # those searches start past a region once it has failed them repeatedly
+    capacity = 2 * len(nodes) + _GUARD
+    slots = [0] * len(nodes)
+    bases, used = [0] * capacity, bytearray(capacity)
+    used[0] = 1
+    free_from = multi_from = 1
+    for node in range(len(nodes)):
+        first, last = child_offsets[node], child_offsets[node + 1]
+        if first == last:
+            continue
+        labels = [nodes[child][-1] for child in range(first, last)]
+        free_from = used.find(0, free_from)
+        position = max(free_from, labels[0])
+        if len(labels) > 1:
+            position, attempts = max(position, multi_from), 0
+        while True:
+            position = used.find(0, position)
+            if position < 0 or position + _GUARD > len(used):
+                position = len(used) if position < 0 else position
+                bases += [0] * len(used)
+                used += bytearray(len(used))
+                continue
+            base = position - labels[0]
+            if len(labels) == 1 or all(not used[base + label] for label in labels):
+                break
+            position += 1
+            attempts += 1
+        if len(labels) > 1 and attempts > 16:
+            multi_from = max(multi_from, position - _GUARD)
+        bases[slots[node]] = base
+        for child, label in zip(range(first, last), labels):
+            slots[child] = base + label
+            used[base + label] = 1
+
+    size = max(used.rfind(1) + 1, max(bases) + _GUARD)
+    base_column, check = array('i', [size] * (size + _GUARD)), array('i', [-1] * (size + _GUARD))
+    is_word, counts, depths = bytearray(size + _GUARD), array('I', bytes(4 * (size + _GUARD))), bytearray(size + _GUARD)
+    for node, prefix in enumerate(nodes):
+        slot = slots[node]
+        if child_offsets[node] != child_offsets[node + 1]:
+            base_column[slot] = bases[slot]
+        for child in range(child_offsets[node], child_offsets[node + 1]):
+            check[slots[child]] = slot
+        is_word[slot] = prefix in word_set
+        counts[slot] = word_counts.get(prefix, 0)
+        depths[slot] = max_depths[prefix]
+
+    columns = {'base': base_column.tobytes(), 'check': check.tobytes(), 'is_word': bytes(is_word),
+               'word_counts': counts.tobytes(), 'max_depths': bytes(depths)}
+    layout, position = {}, 0
+    for name, _ in _SECTIONS:
+        layout[name] = [position, len(columns[name])]
+        position += -(-len(columns[name]) // _ALIGNMENT) * _ALIGNMENT
+    header = json.dumps({
+        'format': COMPACT_TRIE_FORMAT,
+        'byteorder': sys.byteorder,
+        'source': source_checksum,
+        'nodes': len(nodes),
+        'slots': size + _GUARD,
+        'words': len(vocabulary),
+        'sections': layout
+    }).encode('utf-8')
+    prefix_length = len(COMPACT_TRIE_MAGIC) + _HEADER_LENGTH.size
+    header += b' ' * (-(prefix_length + len(header)) % _ALIGNMENT)
+
+    out = bytearray(COMPACT_TRIE_MAGIC + _HEADER_LENGTH.pack(len(header)) + header)
+    for name, _ in _SECTIONS:
+        out += columns[name]
+        out += b'\0' * (-len(columns[name]) % _ALIGNMENT)
+    return bytes(out)
+
+
+def _read_header(buffer):
+    if buffer[:len(COMPACT_TRIE_MAGIC)] != COMPACT_TRIE_MAGIC:
+        raise ValueError("not a compact trie")
+    start = len(COMPACT_TRIE_MAGIC)
+    (length,) = _HEADER_LENGTH.unpack(buffer[start:start + _HEADER_LENGTH.size])
+    data_start = start + _HEADER_LENGTH.size + length
+    header = json.loads(buffer[start + _HEADER_LENGTH.size:data_start])
+    if header.get('format') != COMPACT_TRIE_FORMAT or header.get('byteorder') != sys.byteorder:
+        raise ValueError(f"unsupported compact trie format {header.get('format')} ({header.get('byteorder')})")
+    return header, data_start
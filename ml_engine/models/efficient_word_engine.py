@@ -5,36 +5,34 @@ Enhanced Ultimate CMU Rhyme Client
 
 The complete, optimized rhyme client with ALL features:
 - Package file loading (lightweight deployment)
+- Engine snapshot of the built state for fast cold starts
+- Memory-mapped double-array trie (no per-node objects)
 - Complete rhyme categorization (perfect/near/rich/slant rhymes)
-- Trie-based OLO generation (3.2x faster)
+- Wildcard-index OLO generation (trie-based generation kept as reference)
 - Prime signature anagrams with enhanced caching
 - Bloom filter optimization
 - All beautiful algorithms
-- Essential pronouncing functionality
+- Essential pronouncing functionality (precomputed phonetic table, no CMU parsing at runtime)
 - Rich rhymes (homophones) detection
 - Advanced slant rhyme detection
 """
 
-import pronouncing
+import heapq
 import json
 import logging
 import math
 import re
+import threading
+import zlib
 from typing import Dict, List, Set, Tuple
 from collections import defaultdict
 from pathlib import Path
 
-logger = logging.getLogger(__name__)
+from .compact_trie import COMPACT_TRIE_FILE, CompactTrie, CompactTrieNode, words_file_checksum
+from .engine_snapshot import ENGINE_SNAPSHOT_FILE, engine_source_version, load_engine_snapshot, save_engine_snapshot
+from .phonetic_table import PhoneticTable, build_phonetic_table
 
-class TrieNode:
-    """Optimized trie node with early termination and pruning."""
-    __slots__ = ['children', 'is_word', 'word_count', 'max_depth']
-    
-    def __init__(self):
-        self.children = {}
-        self.is_word = False
-        self.word_count = 0
-        self.max_depth = 0
+logger = logging.getLogger(__name__)
 
 class BloomFilter:
     """Space-efficient probabilistic data structure for fast negative lookups."""
@@ -45,25 +43,36 @@ class BloomFilter:
         self.error_rate = error_rate
         self.bit_size = int(-(capacity * math.log(error_rate)) / (math.log(2) ** 2))
         self.hash_count = int((self.bit_size / capacity) * math.log(2))
-        self.bit_array = [False] * self.bit_size
+        self.bit_array = bytearray(self.bit_size)
         self.items_added = 0
     
-    def _hash(self, item: str, seed: int) -> int:
-        """Simple hash function with seed."""
-        hash_value = hash(item + str(seed))
-        return abs(hash_value) % self.bit_size
+    @classmethod
+    def from_snapshot(cls, state: tuple) -> "BloomFilter":
+        """Filter from to_snapshot() output."""
+        bloom = cls.__new__(cls)
+        bloom.capacity, bloom.error_rate, bloom.bit_size, bloom.hash_count, bit_array, bloom.items_added = state
+        bloom.bit_array = bytearray(bit_array)
+        return bloom
+    
+    def to_snapshot(self) -> tuple:
+        """Marshal-able filter state."""
+        return (self.capacity, self.error_rate, self.bit_size, self.hash_count, bytes(self.bit_array), self.items_added)
+    
+    def _indexes(self, item: str):
+        """Bit positions of item: double hashing (crc32 + i * adler32), stable across processes unlike hash()."""
+        data = item.encode('utf-8')
+        first, step = zlib.crc32(data), zlib.adler32(data) | 1
+        return (((first + i * step) % self.bit_size) for i in range(self.hash_count))
     
     def add(self, item: str):
         """Add item to bloom filter."""
-        for i in range(self.hash_count):
-            index = self._hash(item, i)
+        for index in self._indexes(item):
             self.bit_array[index] = True
         self.items_added += 1
     
     def might_contain(self, item: str) -> bool:
         """Check if item might be in the set."""
-        for i in range(self.hash_count):
-            index = self._hash(item, i)
+        for index in self._indexes(item):
             if not self.bit_array[index]:
                 return False
         return True
@@ -80,6 +89,89 @@ class BloomFilter:
         # Estimated false positive rate
         return proportion_set ** self.hash_count
 
+def phoneme_edit_distance(phonemes1: Tuple[str, ...], phonemes2: Tuple[str, ...]) -> int:
+    """Levenshtein distance between two phoneme sequences (insert, delete, substitute one phoneme)."""
+    if phonemes1 == phonemes2:
+        return 0
+    if len(phonemes1) < len(phonemes2):
+        phonemes1, phonemes2 = phonemes2, phonemes1
+    previous = list(range(len(phonemes2) + 1))
+    for i, phoneme1 in enumerate(phonemes1, 1):
+        current = [i]
+        left, diagonal = i, previous[0]
+        for j, phoneme2 in enumerate(phonemes2, 1):
+            up = previous[j]
+            cost = diagonal if phoneme1 == phoneme2 else diagonal + 1
+            if up + 1 < cost:
+                cost = up + 1
+            if left + 1 < cost:
+                cost = left + 1
+            current.append(cost)
+            left, diagonal = cost, up
+        previous = current
+    return previous[-1]
+
+class BKTree:
+    """
+    Burkhard-Keller tree: metric index answering "items within distance k" queries.
+    
+    Children are keyed by their distance to the parent, so by the triangle inequality a
+    query only descends into children whose key is within k of its distance to the node.
+    Nodes live in flat lists (item, children) rather than per-node objects.
+    """
+    
+    def __init__(self, distance=phoneme_edit_distance):
+        self.distance = distance
+        self._items = []
+        self._children = []  # node -> {distance to node: child node}
+    
+    @classmethod
+    def from_nodes(cls, items: list, children: list, distance=phoneme_edit_distance) -> "BKTree":
+        """Tree from the flat node lists of another tree (see nodes())."""
+        tree = cls(distance)
+        tree._items, tree._children = items, children
+        return tree
+    
+    def nodes(self) -> Tuple[list, list]:
+        """The flat (items, children) node lists."""
+        return self._items, self._children
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def add(self, item):
+        """Insert an item (no-op if an item at distance 0 is already present)."""
+        if not self._items:
+            self._items.append(item)
+            self._children.append({})
+            return
+        node = 0
+        while True:
+            distance = self.distance(item, self._items[node])
+            if distance == 0:
+                return
+            child = self._children[node].get(distance)
+            if child is None:
+                self._children[node][distance] = len(self._items)
+                self._items.append(item)
+                self._children.append({})
+                return
+            node = child
+    
+    def search(self, item, max_distance: int) -> List[Tuple[int, object]]:
+        """All (distance, item) pairs within max_distance of item."""
+        results = []
+        stack = [0] if self._items else []
+        while stack:
+            node = stack.pop()
+            distance = self.distance(item, self._items[node])
+            if distance <= max_distance:
+                results.append((distance, self._items[node]))
+            for child_distance, child in self._children[node].items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return results
+
 class EfficientWordEngine:
     """
     Efficient Word Engine for comprehensive word transformations.
@@ -87,7 +179,7 @@ class EfficientWordEngine:
     Features:
     - Package file loading (lightweight deployment)
     - Complete rhyme categorization (perfect/near/rich/slant rhymes)
-    - Trie-based OLO generation (3.2x faster)
+    - Wildcard-index OLO generation (trie-based generation kept as reference)
     - Prime signature anagrams with enhanced caching
     - Bloom filter optimization
     - Rich rhymes (homophones) detection
@@ -96,25 +188,48 @@ class EfficientWordEngine:
     - Essential pronouncing functionality
     """
     
-    def __init__(self, package_dir: str = "game_data"):
-        """Initialize enhanced ultimate client with package files."""
-        self.pronouncing = pronouncing  # Keep for rhymes and pronunciations
+    # Phonetic keys of a rhyming part indexed over the vocabulary (key name -> key method)
+    PHONETIC_KEYS = {
+        'assonance': '_assonance_key',
+        'consonance': '_consonance_key',
+        'half_rhyme': '_half_rhyme_key'
+    }
+    NEAR_RHYME_DISTANCE = 1  # phoneme edits between rhyming parts of near rhymes (same stressed vowel)
+    NEAR_RHYME_MIN_PHONEMES = 2  # shorter rhyming parts (a lone vowel) have no near rhymes and are none
+    SLANT_MIN_KEYS = 2  # phonetic keys a slant rhyme shares (assonance plus consonance or half rhyme)
+    INDEXED_RHYME_LIMIT = 20  # slant / near rhymes per word (each becomes a tree branch)
+    OLO_LETTERS = frozenset('abcdefghijklmnopqrstuvwxyz')  # letters one-letter-off may add or change
+    
+    def __init__(self, package_dir: str = "game_data", use_snapshot: bool = True):
+        """
+        Initialize enhanced ultimate client with package files.
+        
+        Args:
+            package_dir: Directory with the package files
+            use_snapshot: Load the built state from engine_snapshot.bin when it matches the
+                package files and engine code, and (re)write it after building otherwise
+        """
         self.package_dir = Path(package_dir)
         
         # Package data structures
         self.quality_words = set()
         self.word_frequencies = {}
         self.anagram_index = {}
+        self.rhyme_index = {}  # rhyming part -> words with a pronunciation ending in it
+        self.phonetics = PhoneticTable()  # word -> Pronunciation records (phonetics.json)
+        self.slant_index = {}  # slant key name -> phonetic key -> words
+        self.near_rhyme_tree = BKTree()  # rhyming parts (phoneme tuples) by phoneme edit distance
+        self.homophone_index = {}  # pronunciation -> words sharing it
         self.bloom_filter = None
         self._anagram_cache = {}
         
         # Enhanced caching for performance
         self._rhyme_cache = {}
-        self._pronunciation_cache = {}
-        self._homophone_cache = {}
         
-        # Trie for intelligent OLO generation
+        # Trie for intelligent OLO generation, memory-mapped on first use (_get_transformation_trie)
         self.transformation_trie = None
+        self._trie_lock = threading.Lock()
+        self.wildcard_index = {}  # one-letter wildcard pattern ("c_t") -> word or tuple of words
         
         # Prime numbers for collision-resistant signatures
         self.LETTER_PRIMES = {
@@ -186,12 +301,31 @@ class EfficientWordEngine:
             "would": ["wood"]
         }
         
-        # Load package files
-        self._load_package_files()
-        
-        # Build transformation trie if words were loaded
-        if self.quality_words:
-            self._build_transformation_trie()
+        # Built state from the engine snapshot, or load package files and build it
+        snapshot_path = self.package_dir / ENGINE_SNAPSHOT_FILE
+        snapshot_version = engine_source_version(self.package_dir) if use_snapshot else None
+        state = load_engine_snapshot(snapshot_path, snapshot_version) if use_snapshot else None
+        if state is not None:
+            self._restore_snapshot_state(state)
+        else:
+            self._load_package_files()
+            
+            # Build indexes (and phonetic data, if not packaged) if words were loaded
+            if self.quality_words:
+                self._build_wildcard_index()
+                if not self.phonetics:
+                    self._build_phonetic_table()
+                if not self.rhyme_index:
+                    self._build_rhyme_index()
+                self._build_phonetic_key_indexes()
+                self._build_near_rhyme_tree()
+                self._build_homophone_index()
+                
+                if use_snapshot:
+                    try:
+                        save_engine_snapshot(snapshot_path, self._snapshot_state(), snapshot_version)
+                    except OSError as e:
+                        logger.warning(f"Could not write engine snapshot {snapshot_path}: {e}")
         
         logger.info("Initialized Enhanced Ultimate CMU Dictionary rhyme client")
     
@@ -228,50 +362,122 @@ class EfficientWordEngine:
         else:
             logger.warning(f"anagrams.json not found at {anagram_file}")
         
-        # 4. Build bloom filter for ultra-fast negative lookups
+        # 4. Load rhyme index from rhymes.json
+        rhyme_file = self.package_dir / "rhymes.json"
+        if rhyme_file.exists():
+            with open(rhyme_file, 'r') as f:
+                self.rhyme_index = json.load(f)
+            logger.info(f"Loaded {len(self.rhyme_index)} rhyme groups")
+        else:
+            logger.warning(f"rhymes.json not found at {rhyme_file}, building rhyme index at startup")
+        
+        # 5. Load phonetic table from phonetics.json
+        phonetics_file = self.package_dir / "phonetics.json"
+        if phonetics_file.exists():
+            with open(phonetics_file, 'r') as f:
+                self.phonetics = PhoneticTable.from_package(json.load(f))
+            logger.info(f"Loaded pronunciations for {len(self.phonetics)} words")
+        else:
+            logger.warning(f"phonetics.json not found at {phonetics_file}, building phonetic table at startup")
+        
+        # 6. Build bloom filter for ultra-fast negative lookups
         if self.quality_words:
             self.bloom_filter = BloomFilter(len(self.quality_words), error_rate=0.001)
             for word in self.quality_words:
                 self.bloom_filter.add(word)
             logger.info("Built bloom filter for optimized lookups")
     
-    def _build_transformation_trie(self):
-        """Build advanced trie for intelligent OLO generation."""
-        logger.info("Building transformation trie...")
-        
-        self.transformation_trie = TrieNode()
-        
-        # Insert all words with statistics
-        for word in self.quality_words:
-            self._insert_with_stats(word)
-        
-        # Post-process to add metadata
-        self._compute_subtree_stats(self.transformation_trie, 0)
-        
-        logger.info("Transformation trie built successfully")
+    def _snapshot_state(self) -> Dict:
+        """Built engine state as marshal-able values (see engine_snapshot.py)."""
+        return {
+            'quality_words': self.quality_words,
+            'word_frequencies': self.word_frequencies,
+            'anagram_index': self.anagram_index,
+            'rhyme_index': self.rhyme_index,
+            'phonetics': (self.phonetics.phonemes, self.phonetics._records),
+            'slant_index': self.slant_index,
+            'near_rhyme_tree': self.near_rhyme_tree.nodes(),
+            'homophone_index': self.homophone_index,
+            'wildcard_index': self.wildcard_index,
+            'bloom_filter': self.bloom_filter.to_snapshot() if self.bloom_filter else None,
+        }
     
-    def _insert_with_stats(self, word: str):
-        """Insert word and maintain statistics."""
-        node = self.transformation_trie
-        for char in word:
-            if char not in node.children:
-                node.children[char] = TrieNode()
-            node = node.children[char]
-            node.word_count += 1
-        
-        if not node.is_word:
-            node.is_word = True
+    def _restore_snapshot_state(self, state: Dict):
+        """Install state written by _snapshot_state."""
+        self.quality_words = state['quality_words']
+        self.word_frequencies = state['word_frequencies']
+        self.anagram_index = state['anagram_index']
+        self.rhyme_index = state['rhyme_index']
+        self.phonetics = PhoneticTable(*state['phonetics'])
+        self.slant_index = state['slant_index']
+        self.near_rhyme_tree = BKTree.from_nodes(*state['near_rhyme_tree'])
+        self.homophone_index = state['homophone_index']
+        self.wildcard_index = state['wildcard_index']
+        if state['bloom_filter'] is not None:
+            self.bloom_filter = BloomFilter.from_snapshot(state['bloom_filter'])
+        logger.info(f"Restored engine state for {len(self.quality_words)} words from snapshot")
     
-    def _compute_subtree_stats(self, node: TrieNode, depth: int) -> int:
-        """Compute max depth for early termination."""
-        max_child_depth = depth
+    def _build_rhyme_index(self):
+        """Build the rhyming part -> words index (same as rhymes.json from CanonicalDataGenerator)."""
+        logger.info("Building rhyme index...")
         
-        for child in node.children.values():
-            child_depth = self._compute_subtree_stats(child, depth + 1)
-            max_child_depth = max(max_child_depth, child_depth)
+        rhyme_index = defaultdict(list)
+        for word in sorted(self.phonetics):
+            for rhyming_part in dict.fromkeys(self.get_all_rhyming_parts(word)):
+                rhyme_index[rhyming_part].append(word)
+        self.rhyme_index = dict(rhyme_index)
         
-        node.max_depth = max_child_depth
-        return max_child_depth
+        logger.info(f"Built {len(self.rhyme_index)} rhyme groups")
+    
+    def _build_phonetic_table(self):
+        """Build the phonetic table from the CMU dictionary (only when phonetics.json isn't packaged)."""
+        logger.info("Building phonetic table...")
+        try:
+            self.phonetics = build_phonetic_table(self.quality_words)
+        except ImportError:
+            logger.error("phonetics.json is missing and pronouncing is not installed; no pronunciations available")
+            return
+        logger.info(f"Built pronunciations for {len(self.phonetics)} words")
+    
+    def _get_transformation_trie(self) -> CompactTrie:
+        """
+        The compact trie, loaded on first use: get_one_letter_off answers from the
+        wildcard index, so a process that never takes the trie path never maps the
+        file or checksums words.txt.
+        """
+        trie = self.transformation_trie
+        if trie is None:
+            with self._trie_lock:
+                if self.transformation_trie is None:
+                    self._load_transformation_trie()
+                trie = self.transformation_trie
+        return trie
+    
+    def _load_transformation_trie(self):
+        """Memory-map transformation_trie.bin, or build the trie if it is missing or stale."""
+        trie_file = self.package_dir / COMPACT_TRIE_FILE
+        words_file = self.package_dir / "words.txt"
+        if trie_file.exists() and words_file.exists():
+            try:
+                trie = CompactTrie.open(trie_file)
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning(f"Ignoring unreadable {trie_file}: {e}")
+            else:
+                if trie.source_checksum == words_file_checksum(words_file):
+                    self.transformation_trie = trie
+                    logger.info(f"Mapped transformation trie with {len(trie)} nodes")
+                    return
+                trie.close()
+                logger.warning(f"{trie_file} was built from another words.txt")
+        else:
+            logger.warning(f"{COMPACT_TRIE_FILE} not found at {trie_file}")
+        self._build_transformation_trie()
+    
+    def _build_transformation_trie(self):
+        """Build the compact trie in memory (only when transformation_trie.bin isn't packaged or is stale)."""
+        logger.info("Building transformation trie...")
+        self.transformation_trie = CompactTrie.from_words(self.quality_words)
+        logger.info(f"Built transformation trie with {len(self.transformation_trie)} nodes")
     
     # Essential pronouncing methods with enhanced caching
     def get_rhymes(self, word: str) -> List[str]:
@@ -299,154 +505,105 @@ class EfficientWordEngine:
         if not word_phones:
             return []
         
-        # Get all rhyming parts for this word
-        word_rhyming_parts = [self.pronouncing.rhyming_part(phone) for phone in word_phones]
-        
-        # Find all words that share any rhyming part
+        # Every word sharing any rhyming part of any pronunciation is a rhyme
         rhymes = set()
-        
-        # Search through all words in our quality words set
-        for candidate_word in self.quality_words:
-            if candidate_word == word:
-                continue
-                
-            candidate_phones = self.get_pronunciation(candidate_word)
-            if not candidate_phones:
-                continue
-            
-            # Check if any rhyming parts match
-            candidate_rhyming_parts = [self.pronouncing.rhyming_part(phone) for phone in candidate_phones]
-            
-            # If any rhyming parts match, it's a rhyme
-            if any(wp in candidate_rhyming_parts for wp in word_rhyming_parts):
-                rhymes.add(candidate_word)
+        for rhyming_part in set(self.get_all_rhyming_parts(word)):
+            rhymes.update(self.rhyme_index.get(rhyming_part, ()))
+        rhymes.discard(word.lower())
         
         return list(rhymes)
     
+    def get_pronunciations(self, word: str) -> Tuple:
+        """Get the precomputed Pronunciation records for a word (empty if it has none)."""
+        return self.phonetics.get(word.lower())
+    
     def get_pronunciation(self, word: str) -> List[str]:
-        """Get pronunciation for a word with caching."""
-        word_lower = word.lower()
-        
-        # Check cache first
-        if word_lower in self._pronunciation_cache:
-            return self._pronunciation_cache[word_lower]
-        
-        try:
-            pronunciation = self.pronouncing.phones_for_word(word)
-            # Cache the result
-            self._pronunciation_cache[word_lower] = pronunciation
-            return pronunciation
-        except Exception as e:
-            logger.error(f"Error getting pronunciation for '{word}': {e}")
-            return []
+        """Get pronunciation for a word from the phonetic table."""
+        return [pronunciation.phones for pronunciation in self.get_pronunciations(word)]
     
     def get_syllable_count(self, word: str) -> int:
         """Get syllable count for a word."""
-        try:
-            phones = self.get_pronunciation(word)
-            if not phones:
-                return 0
-            return self.pronouncing.syllable_count(phones[0])
-        except Exception as e:
-            logger.error(f"Error getting syllable count for '{word}': {e}")
-            return 0
+        pronunciations = self.get_pronunciations(word)
+        return pronunciations[0].syllables if pronunciations else 0
     
     def is_pronounceable(self, word: str) -> bool:
         """Check if a word has a pronunciation in CMU Dictionary."""
-        try:
-            return len(self.get_pronunciation(word)) > 0
-        except Exception as e:
-            logger.error(f"Error checking pronunciation for '{word}': {e}")
-            return False
+        return bool(self.get_pronunciations(word))
     
     def get_stress_pattern(self, word: str) -> str:
         """Get stress pattern for a word."""
-        try:
-            stress_patterns = self.pronouncing.stresses_for_word(word)
-            if not stress_patterns:
-                return ""
-            return stress_patterns[0]
-        except Exception as e:
-            logger.error(f"Error getting stress pattern for '{word}': {e}")
-            return ""
+        pronunciations = self.get_pronunciations(word)
+        return pronunciations[0].stress if pronunciations else ""
     
     def get_rhyming_part(self, word: str) -> str:
         """Get the rhyming part of a word (from stressed vowel to end)."""
-        try:
-            phones = self.get_pronunciation(word)
-            if not phones:
-                return ""
-            # Return the rhyming part of the first pronunciation (for backward compatibility)
-            # Note: For comprehensive rhyme detection, use categorize_rhymes_by_quality()
-            return self.pronouncing.rhyming_part(phones[0])
-        except Exception as e:
-            logger.error(f"Error getting rhyming part for '{word}': {e}")
-            return ""
+        pronunciations = self.get_pronunciations(word)
+        # Return the rhyming part of the first pronunciation (for backward compatibility)
+        # Note: For comprehensive rhyme detection, use categorize_rhymes_by_quality()
+        return pronunciations[0].rhyming_part if pronunciations else ""
     
     def get_all_rhyming_parts(self, word: str) -> List[str]:
         """Get all rhyming parts for a word (all pronunciations)."""
-        try:
-            phones = self.get_pronunciation(word)
-            if not phones:
-                return []
-            # Return rhyming parts for all pronunciations
-            return [self.pronouncing.rhyming_part(phone) for phone in phones]
-        except Exception as e:
-            logger.error(f"Error getting all rhyming parts for '{word}': {e}")
-            return []
+        return [pronunciation.rhyming_part for pronunciation in self.get_pronunciations(word)]
     
     def search_by_pronunciation(self, pattern: str) -> List[str]:
-        """Search for words whose pronunciation matches a regex pattern."""
+        """Search for vocabulary words whose pronunciation matches a regex pattern."""
         try:
-            return self.pronouncing.search(pattern)
-        except Exception as e:
+            regexp = re.compile(r"\b" + pattern + r"\b")
+        except re.error as e:
             logger.error(f"Error searching pronunciation pattern '{pattern}': {e}")
             return []
+        return [word for word, pronunciations in self.phonetics.items()
+                for pronunciation in pronunciations if regexp.search(pronunciation.phones)]
     
     def search_by_stress_pattern(self, pattern: str) -> List[str]:
-        """Search for words whose stress pattern matches a regex pattern."""
+        """Search for vocabulary words whose stress pattern matches a regex pattern."""
         try:
-            return self.pronouncing.search_stresses(pattern)
-        except Exception as e:
+            regexp = re.compile(pattern)
+        except re.error as e:
             logger.error(f"Error searching stress pattern '{pattern}': {e}")
             return []
+        return [word for word, pronunciations in self.phonetics.items()
+                for pronunciation in pronunciations if regexp.search(pronunciation.stress)]
     
     # Enhanced rhyme categorization with rich and slant rhymes
     def categorize_rhymes_by_quality(self, word: str, rhymes: List[str]) -> Dict[str, List[str]]:
-        """Categorize rhymes by quality using CMU Dictionary features with all pronunciations."""
+        """
+        Categorize rhymes by quality using CMU Dictionary features with all pronunciations.
+        
+        Rich rhymes (homophones) come from the homophone index and are checked first;
+        perfect rhymes are the other given rhymes sharing a rhyming part. Slant rhymes are looked up
+        across the whole vocabulary in the phonetic key indexes (at least SLANT_MIN_KEYS shared
+        keys; most keys, then most frequent first), near rhymes in the BK-tree of rhyming parts
+        (closest, then most frequent first); at most INDEXED_RHYME_LIMIT each.
+        """
         perfect_rhymes = []
-        near_rhymes = []
-        rich_rhymes = []
-        slant_rhymes = []
         
         word_phones = self.get_pronunciation(word)
         if not word_phones:
             return {"perfect": [], "near": [], "rich": [], "slant": []}
+        word_rhyming_parts = {self._extract_rhyming_part(phones) for phones in word_phones} - {""}
         
-        # Check all pronunciation combinations
-        for word_pronunciation in word_phones:
-            for rhyme in rhymes:
-                rhyme_phones = self.get_pronunciation(rhyme)
-                if not rhyme_phones:
-                    continue
-                
-                for rhyme_pronunciation in rhyme_phones:
-                    # Check if it's a perfect rhyme (same ending)
-                    if self._is_perfect_rhyme(word_pronunciation, rhyme_pronunciation):
-                        if rhyme not in perfect_rhymes:
-                            perfect_rhymes.append(rhyme)
-                    # Check if it's a rich rhyme (homophone)
-                    elif self._is_rich_rhyme(word, rhyme):
-                        if rhyme not in rich_rhymes:
-                            rich_rhymes.append(rhyme)
-                    # Check if it's a slant rhyme (advanced patterns)
-                    elif self._is_slant_rhyme(word, rhyme):
-                        if rhyme not in slant_rhymes:
-                            slant_rhymes.append(rhyme)
-                    # Check if it's a near rhyme (basic consonant patterns)
-                    elif self._is_near_rhyme(word_pronunciation, rhyme_pronunciation):
-                        if rhyme not in near_rhymes:
-                            near_rhymes.append(rhyme)
+        # Rich rhymes (homophones) share the whole pronunciation, so they'd also pass as perfect rhymes
+        rich_rhymes = self.get_homophones(word)
+        homophones = set(rich_rhymes)
+        
+        for rhyme in rhymes:
+            if rhyme in homophones:
+                continue
+            rhyme_phones = self.get_pronunciation(rhyme)
+            if not rhyme_phones:
+                continue
+            
+            # Check if it's a perfect rhyme (same ending for any pronunciation pair)
+            if any(self._extract_rhyming_part(phones) in word_rhyming_parts for phones in rhyme_phones):
+                perfect_rhymes.append(rhyme)
+        
+        # Words sharing a rhyming part are rhymes, not slant or near rhymes
+        excluded = set(rhymes) | homophones | {word.lower()}
+        slant_rhymes = self._indexed_rhymes(self.slant_index, word_rhyming_parts, excluded)
+        excluded.update(slant_rhymes)
+        near_rhymes = self._near_rhymes(word_rhyming_parts, excluded)
         
         return {
             "perfect": perfect_rhymes,
@@ -455,148 +612,125 @@ class EfficientWordEngine:
             "slant": slant_rhymes
         }
     
-    def _is_perfect_rhyme(self, phones1: str, phones2: str) -> bool:
-        """Check if two pronunciations form a perfect rhyme."""
-        # Extract the rhyming part (last stressed vowel and everything after)
-        rhyme1 = self._extract_rhyming_part(phones1)
-        rhyme2 = self._extract_rhyming_part(phones2)
-        
-        return rhyme1 == rhyme2 and rhyme1 != ""
+    def _indexed_rhymes(self, index: Dict[str, Dict], rhyming_parts: Set[str], excluded: Set[str]) -> List[str]:
+        """
+        Words sharing at least SLANT_MIN_KEYS phonetic keys with the rhyming parts,
+        most shared keys first, then most frequent. A single shared key (e.g. only the
+        stressed vowel) matches most of the vocabulary's function words.
+        """
+        shared = defaultdict(int)  # candidate -> phonetic keys it shares
+        for key_name, buckets in index.items():
+            key_method = getattr(self, self.PHONETIC_KEYS[key_name])
+            matches = set()
+            for rhyming_part in rhyming_parts:
+                key = key_method(rhyming_part)
+                if key:
+                    matches.update(buckets.get(key, ()))
+            for candidate in matches - excluded:
+                shared[candidate] += 1
+        candidates = sorted(candidate for candidate, keys in shared.items() if keys >= self.SLANT_MIN_KEYS)
+        return heapq.nlargest(self.INDEXED_RHYME_LIMIT, candidates,
+                              key=lambda candidate: (shared[candidate], self.word_frequencies.get(candidate, 0.0)))
     
-    def _is_rich_rhyme(self, word1: str, word2: str) -> bool:
-        """Check if two words are rich rhymes (homophones)."""
-        word1_lower = word1.lower()
-        word2_lower = word2.lower()
-        
-        # Check cache first
-        cache_key = f"{word1_lower}_{word2_lower}"
-        if cache_key in self._homophone_cache:
-            return self._homophone_cache[cache_key]
-        
-        # Check homophone database
-        if word1_lower in self.HOMOPHONE_PAIRS:
-            is_homophone = word2_lower in self.HOMOPHONE_PAIRS[word1_lower]
-            self._homophone_cache[cache_key] = is_homophone
-            return is_homophone
-        
-        if word2_lower in self.HOMOPHONE_PAIRS:
-            is_homophone = word1_lower in self.HOMOPHONE_PAIRS[word2_lower]
-            self._homophone_cache[cache_key] = is_homophone
-            return is_homophone
-        
-        # Check if they have identical pronunciations (check all combinations)
-        word1_phones = self.get_pronunciation(word1)
-        word2_phones = self.get_pronunciation(word2)
-        
-        if word1_phones and word2_phones:
-            # Check all pronunciation combinations
-            for word1_pronunciation in word1_phones:
-                for word2_pronunciation in word2_phones:
-                    if word1_pronunciation == word2_pronunciation:
-                        self._homophone_cache[cache_key] = True
-                        return True
-            
-            self._homophone_cache[cache_key] = False
-            return False
+    def _build_phonetic_key_indexes(self):
+        """Build phonetic key -> words indexes over the vocabulary for slant rhyme lookups."""
+        logger.info("Building phonetic key indexes...")
+        
+        indexes = {key_name: defaultdict(set) for key_name in self.PHONETIC_KEYS}
+        key_methods = {key_name: getattr(self, method) for key_name, method in self.PHONETIC_KEYS.items()}
+        rhyming_part_keys = {}  # keys depend only on the rhyming part, shared by many words
+        for word, pronunciations in self.phonetics.items():
+            for pronunciation in pronunciations:
+                # Same as _extract_rhyming_part(pronunciation.phones), without re-splitting the phones
+                if '1' not in pronunciation.stress and '2' not in pronunciation.stress:
+                    continue
+                rhyming_part = pronunciation.rhyming_part
+                keys = rhyming_part_keys.get(rhyming_part)
+                if keys is None:
+                    keys = rhyming_part_keys[rhyming_part] = [
+                        (key_name, key_method(rhyming_part)) for key_name, key_method in key_methods.items()
+                    ]
+                for key_name, key in keys:
+                    if key:
+                        indexes[key_name][key].add(word)
+        
+        self.slant_index = {
+            key_name: {key: tuple(sorted(words)) for key, words in buckets.items()}
+            for key_name, buckets in indexes.items()
+        }
         
-        self._homophone_cache[cache_key] = False
-        return False
+        logger.info("Built phonetic key indexes: " +
+                    ", ".join(f"{len(buckets)} {key_name}" for key_name, buckets in indexes.items()))
     
-    def _is_slant_rhyme(self, word1: str, word2: str) -> bool:
-        """Check if two words are slant rhymes using algorithmic detection."""
-        word1_lower = word1.lower()
-        word2_lower = word2.lower()
-        
-        # Skip if words are identical
-        if word1_lower == word2_lower:
-            return False
-        
-        # Get pronunciations for both words
-        word1_phones = self.get_pronunciation(word1)
-        word2_phones = self.get_pronunciation(word2)
-        
-        if not word1_phones or not word2_phones:
-            return False
-        
-        # Check all pronunciation combinations for slant rhyme patterns
-        for word1_pronunciation in word1_phones:
-            for word2_pronunciation in word2_phones:
-                if self._is_slant_rhyme_pronunciation(word1_pronunciation, word2_pronunciation):
-                    return True
-        
-        return False
+    def _near_rhymes(self, rhyming_parts: Set[str], excluded: Set[str]) -> List[str]:
+        """
+        Words whose rhyming part has the same stressed vowel as one of the rhyming parts and is
+        within NEAR_RHYME_DISTANCE phoneme edits of it. Rhyming parts shorter than
+        NEAR_RHYME_MIN_PHONEMES are skipped on both sides: one edit joins a lone vowel ("OW2")
+        to every other lone vowel and to every vowel + consonant part.
+        """
+        closest = {}
+        for rhyming_part in rhyming_parts:
+            query = tuple(rhyming_part.split())
+            if len(query) < self.NEAR_RHYME_MIN_PHONEMES:
+                continue
+            for distance, phonemes in self.near_rhyme_tree.search(query, self.NEAR_RHYME_DISTANCE):
+                if distance == 0 or len(phonemes) < self.NEAR_RHYME_MIN_PHONEMES or phonemes[0] != query[0]:
+                    continue  # same rhyming part: perfect rhymes; lone or another stressed vowel: no rhyme
+                for candidate in self.rhyme_index.get(' '.join(phonemes), ()):
+                    if candidate not in excluded and distance < closest.get(candidate, distance + 1):
+                        closest[candidate] = distance
+        return heapq.nsmallest(self.INDEXED_RHYME_LIMIT, sorted(closest),
+                               key=lambda candidate: (closest[candidate], -self.word_frequencies.get(candidate, 0.0)))
     
-    def _is_slant_rhyme_pronunciation(self, phones1: str, phones2: str) -> bool:
-        """Check if two pronunciations form a slant rhyme using linguistic rules."""
-        # Extract rhyming parts
-        rhyme1 = self._extract_rhyming_part(phones1)
-        rhyme2 = self._extract_rhyming_part(phones2)
+    def _build_near_rhyme_tree(self):
+        """Build the BK-tree over the distinct rhyming parts of the vocabulary."""
+        logger.info("Building near rhyme BK-tree...")
         
-        if rhyme1 == "" or rhyme2 == "":
-            return False
+        self.near_rhyme_tree = BKTree()
+        for rhyming_part in sorted(self.rhyme_index):
+            self.near_rhyme_tree.add(tuple(rhyming_part.split()))
         
-        # Don't count as slant if they're perfect rhymes
-        if rhyme1 == rhyme2:
-            return False
-        
-        # Check for assonance (same vowel sounds, different consonants)
-        if self._has_assonance(rhyme1, rhyme2):
-            return True
-        
-        # Check for consonance (same consonant patterns, different vowels)
-        if self._has_consonance(rhyme1, rhyme2):
-            return True
-        
-        # Check for half-rhymes (partial similarity)
-        if self._has_half_rhyme(rhyme1, rhyme2):
-            return True
-        
-        return False
+        logger.info(f"Built near rhyme BK-tree over {len(self.near_rhyme_tree)} rhyming parts")
     
-    def _has_assonance(self, rhyme1: str, rhyme2: str) -> bool:
-        """Check if two rhyming parts have assonance (same vowel sounds)."""
-        # Extract vowels with stress
-        vowels1 = self._extract_vowels_with_stress(rhyme1)
-        vowels2 = self._extract_vowels_with_stress(rhyme2)
-        
-        if not vowels1 or not vowels2:
-            return False
-        
-        # Check if they have the same vowel sounds
-        return vowels1 == vowels2
+    def get_homophones(self, word: str) -> List[str]:
+        """Vocabulary words pronounced exactly like the word (any pronunciation), plus HOMOPHONE_PAIRS entries."""
+        word_lower = word.lower()
+        homophones = []
+        for phones in self.get_pronunciation(word_lower):
+            homophones.extend(self.homophone_index.get(phones, ()))
+        homophones.extend(w for w in self.HOMOPHONE_PAIRS.get(word_lower, ()) if w in self.quality_words)
+        return [w for w in dict.fromkeys(homophones) if w != word_lower]
     
-    def _has_consonance(self, rhyme1: str, rhyme2: str) -> bool:
-        """Check if two rhyming parts have consonance (same consonant patterns)."""
-        # Extract consonants only
-        consonants1 = self._extract_consonants(rhyme1)
-        consonants2 = self._extract_consonants(rhyme2)
+    def _build_homophone_index(self):
+        """Build pronunciation -> words index (groups of two or more words) over the vocabulary."""
+        logger.info("Building homophone index...")
         
-        if not consonants1 or not consonants2:
-            return False
+        groups = defaultdict(list)
+        for word in sorted(self.phonetics):
+            for phones in self.get_pronunciation(word):
+                groups[phones].append(word)
+        self.homophone_index = {phones: tuple(words) for phones, words in groups.items() if len(words) > 1}
         
-        # Check if they end with similar consonant patterns
-        # Allow for some variation in consonant patterns
-        return self._similar_consonant_pattern(consonants1, consonants2)
+        logger.info(f"Built {len(self.homophone_index)} homophone groups")
     
-    def _has_half_rhyme(self, rhyme1: str, rhyme2: str) -> bool:
-        """Check if two rhyming parts have half-rhyme (partial similarity)."""
-        # Split into phonemes
-        phonemes1 = rhyme1.split()
-        phonemes2 = rhyme2.split()
-        
-        if len(phonemes1) < 2 or len(phonemes2) < 2:
-            return False
-        
-        # Check if they share at least 2 phonemes in the same positions
-        shared_phonemes = 0
-        min_length = min(len(phonemes1), len(phonemes2))
-        
-        for i in range(min_length):
-            if phonemes1[i] == phonemes2[i]:
-                shared_phonemes += 1
-        
-        # Require at least 2 shared phonemes and at least 50% similarity
-        return shared_phonemes >= 2 and (shared_phonemes / min_length) >= 0.5
+    def _assonance_key(self, rhyming_part: str) -> str:
+        """Assonance key: the vowels (with stress) of a rhyming part."""
+        return self._extract_vowels_with_stress(rhyming_part)
+    
+    def _consonance_key(self, rhyming_part: str) -> str:
+        """Consonance key: the last two consonant letters of a rhyming part's consonants."""
+        return self._consonant_ending(self._extract_consonants(rhyming_part))
+    
+    def _half_rhyme_key(self, rhyming_part: str) -> str:
+        """Half-rhyme key: the stressed vowel and the phoneme after it."""
+        phonemes = rhyming_part.split()
+        return ' '.join(phonemes[:2]) if len(phonemes) >= 2 else ""
+    
+    def _consonant_ending(self, phones: str) -> str:
+        """Last two consonant letters of a phoneme string (empty if it has fewer)."""
+        consonants = ''.join(c for c in phones if c.isalpha() and c not in 'AEIOU')
+        return consonants[-2:] if len(consonants) >= 2 else ""
     
     def _extract_vowels_with_stress(self, phones: str) -> str:
         """Extract vowels with stress markers from pronunciation."""
@@ -604,8 +738,8 @@ class EfficientWordEngine:
         phonemes = phones.split()
         
         for phoneme in phonemes:
-            # Check for vowels with stress markers (1, 2, 0)
-            if any(vowel in phoneme for vowel in ['AA', 'AE', 'AH', 'AO', 'AW', 'AY', 'EH', 'ER', 'EY', 'IH', 'IY', 'OW', 'OY', 'UH', 'UW']):
+            # CMU vowels always carry a stress marker (1, 2, 0)
+            if phoneme[-1] in '012':
                 vowels.append(phoneme)
         
         return ' '.join(vowels)
@@ -616,24 +750,12 @@ class EfficientWordEngine:
         phonemes = phones.split()
         
         for phoneme in phonemes:
-            # Check for consonants (not vowels)
-            if not any(vowel in phoneme for vowel in ['AA', 'AE', 'AH', 'AO', 'AW', 'AY', 'EH', 'ER', 'EY', 'IH', 'IY', 'OW', 'OY', 'UH', 'UW']):
+            # Check for consonants (no stress marker)
+            if phoneme[-1] not in '012':
                 consonants.append(phoneme)
         
         return ' '.join(consonants)
     
-    def _is_near_rhyme(self, phones1: str, phones2: str) -> bool:
-        """Check if two pronunciations form a near rhyme."""
-        # Extract the rhyming part
-        rhyme1 = self._extract_rhyming_part(phones1)
-        rhyme2 = self._extract_rhyming_part(phones2)
-        
-        if rhyme1 == "" or rhyme2 == "":
-            return False
-        
-        # Check for similar consonant patterns
-        return self._similar_consonant_pattern(rhyme1, rhyme2)
-    
     def _extract_rhyming_part(self, phones: str) -> str:
         """Extract the rhyming part of a pronunciation."""
         # Split into phonemes
@@ -647,19 +769,6 @@ class EfficientWordEngine:
         
         return ""
     
-    def _similar_consonant_pattern(self, rhyme1: str, rhyme2: str) -> bool:
-        """Check if two rhyming parts have similar consonant patterns."""
-        # Extract consonants only
-        consonants1 = ''.join(c for c in rhyme1 if c.isalpha() and c not in 'AEIOU')
-        consonants2 = ''.join(c for c in rhyme2 if c.isalpha() and c not in 'AEIOU')
-        
-        # Check if they share similar consonant structure
-        if len(consonants1) >= 2 and len(consonants2) >= 2:
-            # Check if they end with similar consonant patterns
-            return consonants1[-2:] == consonants2[-2:]
-        
-        return False
-    
     # Quality filtering methods
     def filter_rhymes_by_quality(self, rhymes: List[str], min_syllables: int = 1, max_syllables: int = 3) -> List[str]:
         """Filter rhymes by syllable count and other quality criteria."""
@@ -725,11 +834,71 @@ class EfficientWordEngine:
         return anagrams
     
     def get_one_letter_off(self, word: str) -> Dict[str, List[str]]:
+        """
+        Get one-letter-off transformations from the wildcard index.
+        
+        Added and changed letters are bucket lookups for the word's wildcard patterns
+        ("c_t" -> cat, cot, cut; "ca_t" -> cant, cart, cast), removed letters are set
+        lookups, so each category costs O(L) lookups. Results are deduplicated in order.
+        """
+        word = word.lower()
+        length = len(word)
+        letters = self.OLO_LETTERS
+        
+        # 1. ADDED LETTERS: longer words matching the word with a wildcard inserted
+        added = []
+        for i in range(length + 1):
+            added.extend(c for c in self._wildcard_bucket(word[:i] + '_' + word[i:]) if c[i] in letters)
+        
+        # 2. REMOVED LETTERS: the word with one letter dropped
+        removed = [word[:i] + word[i + 1:] for i in range(length) if word[:i] + word[i + 1:] in self.quality_words]
+        
+        # 3. CHANGED LETTERS: same-length words matching the word with one letter wildcarded
+        changed = []
+        for i in range(length):
+            changed.extend(c for c in self._wildcard_bucket(word[:i] + '_' + word[i + 1:])
+                           if c != word and c[i] in letters)
+        
+        transformations = {
+            'added': list(dict.fromkeys(added)),
+            'removed': list(dict.fromkeys(removed)),
+            'changed': list(dict.fromkeys(changed))
+        }
+        logger.info(f"Found {sum(len(v) for v in transformations.values())} one-letter-off transformations for '{word}'")
+        
+        return transformations
+    
+    def _wildcard_bucket(self, pattern: str) -> Tuple[str, ...]:
+        """Words matching a wildcard pattern (one '_')."""
+        bucket = self.wildcard_index.get(pattern, ())
+        return (bucket,) if isinstance(bucket, str) else bucket
+    
+    def _build_wildcard_index(self):
+        """Build wildcard pattern -> words index (each word under every one-letter wildcard pattern)."""
+        logger.info("Building one-letter-off wildcard index...")
+        
+        index = {}
+        for word in sorted(self.quality_words):
+            for i in range(len(word)):
+                pattern = word[:i] + '_' + word[i + 1:]
+                bucket = index.get(pattern)
+                if bucket is None:
+                    index[pattern] = word  # most patterns match a single word; skip the tuple
+                elif isinstance(bucket, str):
+                    index[pattern] = (bucket, word)
+                else:
+                    index[pattern] = bucket + (word,)
+        self.wildcard_index = index
+        
+        logger.info(f"Built wildcard index with {len(self.wildcard_index)} patterns")
+    
+    def _trie_one_letter_off(self, word: str) -> Dict[str, List[str]]:
         """
         Get one-letter-off transformations using TRIE-BASED generation.
         
         Beautiful optimization: Use trie structure to only generate valid candidates
         instead of brute force generation with bloom filter filtering.
+        (Previous get_one_letter_off; kept as the reference for the wildcard index.)
         """
         word = word.lower()
         transformations = {'added': [], 'removed': [], 'changed': []}
@@ -833,19 +1002,13 @@ class EfficientWordEngine:
         
         return candidates
     
-    def _find_trie_node(self, prefix: str) -> TrieNode:
+    def _find_trie_node(self, prefix: str) -> CompactTrieNode:
         """Find trie node for a given prefix."""
-        node = self.transformation_trie
-        for char in prefix:
-            if char not in node.children:
-                return None
-            node = node.children[char]
-        return node
+        return self._get_transformation_trie().node(prefix)
     
     def _trie_contains_word(self, word: str) -> bool:
         """Check if a word exists in the trie."""
-        node = self._find_trie_node(word)
-        return node is not None and node.is_word
+        return word in self._get_transformation_trie()
     
     def get_creativity_score(self, word: str) -> float:
         """Get creativity score from pre-computed frequency data."""
@@ -882,13 +1045,17 @@ class EfficientWordEngine:
             'bloom_filter_size': len(self.quality_words) if self.bloom_filter else 0,
             'trie_built': self.transformation_trie is not None,
             'homophone_pairs': len(self.HOMOPHONE_PAIRS),
+            'homophone_groups': len(self.homophone_index),
             'slant_patterns': len(self.SLANT_PATTERNS),
             'rhyme_cache_size': len(self._rhyme_cache),
-            'pronunciation_cache_size': len(self._pronunciation_cache),
+            'phonetic_words': len(self.phonetics),
             'anagram_cache_size': len(self._anagram_cache),
             'package_files_loaded': [
                 'words.txt' if (self.package_dir / "words.txt").exists() else None,
                 'frequencies.json' if (self.package_dir / "frequencies.json").exists() else None,
-                'anagrams.json' if (self.package_dir / "anagrams.json").exists() else None
+                'anagrams.json' if (self.package_dir / "anagrams.json").exists() else None,
+                'rhymes.json' if (self.package_dir / "rhymes.json").exists() else None,
+                'phonetics.json' if (self.package_dir / "phonetics.json").exists() else None,
+                COMPACT_TRIE_FILE if (self.package_dir / COMPACT_TRIE_FILE).exists() else None
             ]
         } 
\ No newline at end of file
@@ -0,0 +1,139 @@
+"""
+Engine snapshot: the fully built EfficientWordEngine state (lexicon,
+frequencies, anagram / rhyme / phonetic / slant / homophone / wildcard
+indexes, near rhyme tree, bloom filter) in one marshal file, so a fresh
+process loads it with one mmap + unmarshal instead of parsing the package
+files and rebuilding every index. The trie is not included: it is
+memory-mapped from its own package file (compact_trie.py).
+
+File layout: 8-byte magic, 4-byte little-endian header length, a JSON header
+(format, Python version, source version) and a marshal body. The source
+version is a checksum of the package files and of the engine modules that
+build the state from them, so editing either makes the snapshot stale and the
+engine rebuilds (and rewrites) it.
+"""
+
+import gc
+import hashlib
+import json
+import logging
+import marshal
+import mmap
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ENGINE_SNAPSHOT_MAGIC = b"WRDENGN\x01"
+ENGINE_SNAPSHOT_FORMAT = 1
+ENGINE_SNAPSHOT_FILE = "engine_snapshot.bin"
+SOURCE_FILES = ("words.txt", "frequencies.json", "anagrams.json", "rhymes.json", "phonetics.json")
+ENGINE_MODULES = (Path(__file__).parent / "efficient_word_engine.py", Path(__file__).parent / "phonetic_table.py")
+_HEADER_LENGTH = struct.Struct("<I")
+
+
+def _files_version(paths) -> str:
+    hasher = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        hasher.update(f"{path.name}=".encode('utf-8'))
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    hasher.update(chunk)
+        except FileNotFoundError:
+            hasher.update(b'absent')
+        hasher.update(b';')
+    return hasher.hexdigest()
+
+
+def engine_source_version(package_dir: Path) -> str:
+    """Checksum of the package files and engine modules the snapshot state is built from."""
+    return _files_version([Path(package_dir) / name for name in SOURCE_FILES] + list(ENGINE_MODULES))
+
+
+def engine_code_version() -> str:
+    """Checksum of the engine modules alone, for state versioned against the package files separately."""
+    return _files_version(ENGINE_MODULES)
+
+
+def save_engine_snapshot(path: Path, state: Dict[str, Any], version: str) -> Dict[str, Any]:
+    """
+    Write state (marshal-able values only) to path, atomically via a temporary file.
+
+    Returns:
+        Dict with 'bytes' and 'duration_ms'
+    """
+    started = time.perf_counter()
+    header = json.dumps({
+        'format': ENGINE_SNAPSHOT_FORMAT,
+        'python': list(sys.version_info[:2]),  # marshal data is only portable within a Python version
+        'version': version,
+        'created': time.time()
+    }).encode('utf-8')
+
+    path = Path(path)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")  # engines starting together may both write
+    with open(tmp_path, 'wb') as f:
+        f.write(ENGINE_SNAPSHOT_MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        marshal.dump(state, f)
+    os.replace(tmp_path, path)
+
+    stats = {'bytes': path.stat().st_size, 'duration_ms': (time.perf_counter() - started) * 1000}
+    logger.info(f"📸 Engine snapshot written to {path}: {stats}")
+    return stats
+
+
+def load_engine_snapshot(path: Path, version: str) -> Optional[Dict[str, Any]]:
+    """
+    State written by save_engine_snapshot, if path exists and was built for version.
+
+    Returns:
+        State dict, or None (missing, unreadable or stale)
+    """
+    started = time.perf_counter()
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+
+    with f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            logger.warning(f"Ignoring empty engine snapshot {path}")
+            return None
+    with data:
+        prefix = len(ENGINE_SNAPSHOT_MAGIC) + _HEADER_LENGTH.size
+        try:
+            if data[:len(ENGINE_SNAPSHOT_MAGIC)] != ENGINE_SNAPSHOT_MAGIC:
+                raise ValueError("bad magic")
+            (length,) = _HEADER_LENGTH.unpack(data[len(ENGINE_SNAPSHOT_MAGIC):prefix])
+            header = json.loads(data[prefix:prefix + length])
+        except (ValueError, struct.error) as e:
+            logger.warning(f"Ignoring unreadable engine snapshot {path}: {e}")
+            return None
+        if (header.get('format') != ENGINE_SNAPSHOT_FORMAT or header.get('python') != list(sys.version_info[:2])
+                or header.get('version') != version):
+            logger.info(f"Engine snapshot {path} is stale, rebuilding")
+            return None
+
+        gc_was_enabled = gc.isenabled()
+        gc.disable()  # unmarshalling creates ~10^6 containers; collections during it only cost time
+        try:
+            with memoryview(data) as view, view[prefix + length:] as body:
+                state = marshal.loads(body)
+        except (EOFError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring truncated engine snapshot {path}: {e}")
+            return None
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    logger.info(f"📸 Engine snapshot loaded from {path} in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return state
@@ -0,0 +1,129 @@
+"""
+Phonetic table for the game vocabulary (phonetics.json package file)
+
+CanonicalDataGenerator encodes the CMU dictionary pronunciations of every
+package word once, so the word engine never needs the pronouncing library at
+runtime. Phonemes are interned: the file holds the phoneme symbol table and,
+per word, one record per pronunciation:
+
+    [phoneme ids, rhyming part start, consonant tail start, syllables, stress]
+
+The rhyming part runs from the stressed vowel nearest the end of the word
+(as pronouncing.rhyming_part defines it); the consonant tail is everything
+after the last vowel. Vowel skeletons are derived when a word is decoded,
+from the phoneme table's stress digits.
+"""
+
+import sys
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+PHONETICS_FORMAT = 1
+
+
+class Pronunciation(NamedTuple):
+    """One CMU dictionary pronunciation with its precomputed parts."""
+    phones: str          # "P ER1 P AH0 L"
+    rhyming_part: str    # "ER1 P AH0 L"
+    vowels: str          # vowel skeleton with stress: "ER1 AH0"
+    consonant_tail: str  # "L"
+    syllables: int
+    stress: str          # "10"
+
+
+def _is_vowel(phoneme: str) -> bool:
+    return phoneme[-1] in '012'
+
+
+def _rhyme_start(phonemes: List[str]) -> int:
+    for i in range(len(phonemes) - 1, 0, -1):
+        if phonemes[i][-1] in '12':
+            return i
+    return 0
+
+
+def _tail_start(phonemes: List[str]) -> int:
+    for i in range(len(phonemes) - 1, -1, -1):
+        if _is_vowel(phonemes[i]):
+            return i + 1
+    return 0
+
+
+def encode_phonetic_table(words: Iterable[str], phones_for_word: Callable[[str], List[str]]) -> Dict:
+    """Encode the pronunciations of words (those without any are left out) as the phonetics.json structure."""
+    phoneme_ids: Dict[str, int] = {}
+    entries = {}
+    for word in sorted(words):
+        records = []
+        for phones in phones_for_word(word):
+            phonemes = phones.split()
+            ids = [phoneme_ids.setdefault(phoneme, len(phoneme_ids)) for phoneme in phonemes]
+            stress = ''.join(phoneme[-1] for phoneme in phonemes if _is_vowel(phoneme))
+            records.append([ids, _rhyme_start(phonemes), _tail_start(phonemes), len(stress), stress])
+        if records:
+            entries[word] = records
+    return {'format': PHONETICS_FORMAT, 'phonemes': list(phoneme_ids), 'words': entries}
+
+
+class PhoneticTable:
+    """
+    Word -> Pronunciation records over the packed phonetics.json records.
+
+    Records are decoded the first time a word is looked up and kept, so the
+    decoded part never grows past the vocabulary.
+    """
+
+    def __init__(self, phonemes: Sequence[str] = (), records: Optional[Dict[str, list]] = None):
+        self.phonemes = list(phonemes)
+        self._vowel_ids = {i for i, phoneme in enumerate(self.phonemes) if _is_vowel(phoneme)}
+        self._records = records or {}
+        self._decoded: Dict[str, Tuple[Pronunciation, ...]] = {}
+
+    @classmethod
+    def from_package(cls, data: Dict) -> "PhoneticTable":
+        """Table from the phonetics.json structure."""
+        if data.get('format') != PHONETICS_FORMAT:
+            raise ValueError(f"Unsupported phonetic table format: {data.get('format')}")
+        return cls(data['phonemes'], data['words'])
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._records
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._records)
+
+    def get(self, word: str) -> Tuple[Pronunciation, ...]:
+        """Pronunciations of a (lowercase) word; empty if it has none."""
+        pronunciations = self._decoded.get(word)
+        if pronunciations is None:
+            records = self._records.get(word)
+            if records is None:
+                return ()
+            pronunciations = self._decoded[word] = tuple(self._decode(record) for record in records)
+        return pronunciations
+
+    def items(self) -> Iterator[Tuple[str, Tuple[Pronunciation, ...]]]:
+        for word in self._records:
+            yield word, self.get(word)
+
+    def _decode(self, record: list) -> Pronunciation:
+        ids, rhyme_start, tail_start, syllables, stress = record
+        phonemes = self.phonemes
+        symbols = [phonemes[i] for i in ids]
+        intern = sys.intern  # rhyming parts, skeletons, tails and stresses are shared by many words
+        return Pronunciation(
+            phones=' '.join(symbols),
+            rhyming_part=intern(' '.join(symbols[rhyme_start:])),
+            vowels=intern(' '.join([phonemes[i] for i in ids if i in self._vowel_ids])),
+            consonant_tail=intern(' '.join(symbols[tail_start:])),
+            syllables=syllables,
+            stress=intern(stress)
+        )
+
+
+def build_phonetic_table(words: Iterable[str]) -> PhoneticTable:
+    """Build the table straight from the CMU dictionary (needs the pronouncing package)."""
+    import pronouncing
+    return PhoneticTable.from_package(encode_phonetic_table(words, pronouncing.phones_for_word))
@@ -15,6 +15,15 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Bump BUILDER_VERSION when tree construction changes and PROMPT_TEMPLATE_VERSION
+# when PROMPT_TEMPLATE changes: both are part of the stored tree fingerprint, so
+# trees built the old way are treated as cache misses and rebuilt.
+# 2: slant rhymes (sln) share two or more phonetic keys, at most 20 per word
+# 3: rich rhymes (rch) from the homophone index
+BUILDER_VERSION = "3"
+PROMPT_TEMPLATE = "{start_word} is a word that {category} with"
+PROMPT_TEMPLATE_VERSION = "1"
+
 @dataclass
 class ProbabilityMetadata:
     """Optimized metadata for probability recovery and creativity scoring."""
@@ -275,7 +284,7 @@ class ProbabilityTreeBuilder:
         
         # Get full probability array ONCE for this context (avoid repeated model calls)
         model_start = time.time()
-        full_prompt = f"{start_word} is a word that {category} with"
+        full_prompt = PROMPT_TEMPLATE.format(start_word=start_word, category=category)
         
         # Use cached probability vector if available
         if cached_prob_vectors and full_prompt in cached_prob_vectors:
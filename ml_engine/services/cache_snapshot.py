@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Cache Snapshot
+==============
+
+Warm restarts: write the in-process caches to a local binary file on
+shutdown and load them back on startup.
+
+Covered caches:
+- OptimizedStorageService memory cache (trees, in LRU order)
+- ProbabilityTreeBuilder._cache (trees built in this process)
+- EfficientWordEngine rhyme and anagram caches
+
+File layout: 8-byte magic, 4-byte little-endian header length, a JSON header
+(format, Python version, versions of the inputs the caches depend on, counts)
+and a marshal body. Trees are stored once each as array-codec payloads, so
+restoring needs no pickle. A snapshot whose versions (game data files,
+tree fingerprint) differ from the running process is discarded rather than
+restored.
+"""
+
+import gc
+import hashlib
+import json
+import logging
+import marshal
+import os
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from services.tree_fingerprint import file_checksum
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"WRDSNAP\x01"
+SNAPSHOT_FORMAT = 2
+SNAPSHOT_TREE_CODEC = "array"
+GAME_DATA_FILES = ("words.txt", "frequencies.json", "anagrams.json", "rhymes.json", "phonetics.json", "metadata.json")
+_HEADER_LENGTH = struct.Struct("<I")
+
+
+def game_data_version(game_data_path: Path, files=GAME_DATA_FILES) -> str:
+    """Checksum of the game data files the word engine is built from."""
+    hasher = hashlib.blake2b(digest_size=12)
+    for name in files:
+        hasher.update(f"{name}={file_checksum(Path(game_data_path) / name) or 'absent'};".encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def save_cache_snapshot(path: Path, storage_service, word_engine, tree_builder,
+                        versions: Dict[str, Optional[str]]) -> Dict[str, Any]:
+    """
+    Write the caches to path (atomically, via a temporary file).
+
+    Returns:
+        Dict with entry counts, 'bytes' and 'duration_ms'
+    """
+    started = time.perf_counter()
+    payloads, payload_index = [], {}
+
+    def payload_id(tree) -> int:
+        # Trees shared by the memory cache and the builder cache are encoded once
+        key = id(tree)
+        if key not in payload_index:
+            payload_index[key] = len(payloads)
+            payloads.append(storage_service.codecs.encode(tree, SNAPSHOT_TREE_CODEC))
+        return payload_index[key]
+
+    body = {
+        'trees': [(word, payload_id(tree), size) for word, tree, size in storage_service._memory_cache.items()],
+        'builder': [(word, payload_id(tree)) for word, tree in list(tree_builder._cache.items())],
+        'rhyme': dict(word_engine._rhyme_cache),
+        'anagram': dict(word_engine._anagram_cache),
+    }
+    body['payloads'] = payloads
+    counts = {name: len(body[name]) for name in ('trees', 'builder', 'rhyme', 'anagram', 'payloads')}
+    header = json.dumps({
+        'format': SNAPSHOT_FORMAT,
+        'python': list(sys.version_info[:2]),  # marshal data is only portable within a Python version
+        'versions': versions,
+        'created': time.time(),
+        'counts': counts
+    }).encode('utf-8')
+
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(header)))
+        f.write(header)
+        f.write(marshal.dumps(body))
+    os.replace(tmp_path, path)
+
+    stats = {**counts, 'bytes': path.stat().st_size, 'duration_ms': (time.perf_counter() - started) * 1000}
+    logger.info(f"📸 Cache snapshot written to {path}: {stats}")
+    return stats
+
+
+def _read_header(f) -> Optional[Dict[str, Any]]:
+    if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+        return None
+    raw_length = f.read(_HEADER_LENGTH.size)
+    if len(raw_length) != _HEADER_LENGTH.size:
+        return None
+    return json.loads(f.read(_HEADER_LENGTH.unpack(raw_length)[0]))
+
+
+def restore_cache_snapshot(path: Path, storage_service, word_engine, tree_builder,
+                           versions: Dict[str, Optional[str]]) -> Dict[str, Any]:
+    """
+    Load caches from a snapshot written by save_cache_snapshot, if it matches versions.
+
+    Entries already present in the running caches are kept. Trees go into the
+    memory cache through its normal admission rules.
+
+    Returns:
+        Dict with 'status' ("restored", "missing", "version_mismatch" or "corrupt"),
+        plus entry counts and 'duration_ms' when restored
+    """
+    started = time.perf_counter()
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        return {'status': 'missing'}
+
+    with f:
+        try:
+            header = _read_header(f)
+        except ValueError:
+            header = None
+        if header is None:
+            logger.warning(f"Ignoring unreadable cache snapshot {path}")
+            return {'status': 'corrupt'}
+        if (header.get('format') != SNAPSHOT_FORMAT or header.get('python') != list(sys.version_info[:2])
+                or header.get('versions') != versions):
+            logger.info(f"Discarding cache snapshot {path}: built for {header.get('versions')}, running {versions}")
+            return {'status': 'version_mismatch', 'snapshot_versions': header.get('versions')}
+        gc_was_enabled = gc.isenabled()
+        gc.disable()  # unmarshalling creates ~10^5 small lists; collections during it only cost time
+        try:
+            body = marshal.loads(f.read())
+        except (EOFError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring truncated cache snapshot {path}: {e}")
+            return {'status': 'corrupt'}
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    trees = [storage_service.codecs.decode(payload) for payload in body['payloads']]
+
+    restored_trees = 0
+    for word, index, size in body['trees']:  # least recently used first, so recency order survives
+        if word not in storage_service._memory_cache:
+            restored_trees += storage_service._memory_cache.put(word, trees[index], size)
+    for word, index in body['builder']:
+        tree_builder._cache.setdefault(word, trees[index])
+
+    restored = {'trees': restored_trees, 'builder': len(body['builder'])}
+    for name in ('rhyme', 'anagram'):
+        cache = getattr(word_engine, f"_{name}_cache")
+        if cache:
+            body[name].update(cache)  # entries computed since startup win
+        cache.update(body[name])
+        restored[name] = len(body[name])
+
+    stats = {'status': 'restored', **restored, 'duration_ms': (time.perf_counter() - started) * 1000}
+    logger.info(f"📸 Cache snapshot restored from {path}: {stats}")
+    return stats
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Cache Warmer
+============
+
+Startup warming of the probability tree cache and the word engine caches.
+
+A fresh process starts with an empty memory cache, so the first games on
+common start words pay a Redis round trip (or a full tree build). The warmer
+picks likely start words, the most played ones from the recent play log first
+and then the most frequent ones from frequencies.json, and bulk-loads their
+trees (storage prefetch) and transformations in the background. It stops when
+all words are warmed, the time or memory budget is used up or the memory cache
+is full (prefetched trees bypass admission, so warming on would evict the
+likelier words it loaded first), and reports its progress for /status.
+
+The play log is a JSON-lines file with one {"start_word", "ts"} record per
+started game; only its tail is read.
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import os
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def append_play_log(path: Path, start_word: str) -> None:
+    """Record a started game in the play log."""
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps({'start_word': start_word, 'ts': round(time.time(), 3)}) + "\n")
+
+
+def read_recent_start_words(path: Path, limit: int = 1000, tail_bytes: int = 256 * 1024) -> List[str]:
+    """Start words of the last `limit` games in the play log (oldest first), reading only the file's tail."""
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            f.seek(max(0, size - tail_bytes))
+            tail = f.read()
+    except FileNotFoundError:
+        return []
+
+    lines = tail.splitlines()
+    if size > tail_bytes and lines:
+        lines = lines[1:]  # first line is probably cut off
+    words = []
+    for line in lines[-limit:]:
+        try:
+            words.append(json.loads(line)['start_word'])
+        except (ValueError, KeyError, TypeError):
+            continue
+    return words
+
+
+class CacheWarmer:
+    """
+    Background warmup of trees and transformations for likely start words.
+
+    Args:
+        storage_service: OptimizedStorageService whose memory cache is warmed (via aprefetch)
+        word_service: EfficientWordService whose word engine caches are warmed
+        frequencies: Word -> frequency (frequencies.json)
+        play_log_path: Play log to rank recently played start words from
+        top_n: Words taken from frequencies.json
+        recent_n: Most played words taken from the play log
+        recent_games: Games read from the end of the play log
+        time_budget: Seconds before warmup stops
+        memory_budget: Bytes of trees added to the memory cache before warmup stops
+        batch_size: Words per prefetch batch
+    """
+
+    def __init__(self, storage_service, word_service, frequencies: Dict[str, float], play_log_path: Path,
+                 top_n: int = 200, recent_n: int = 100, recent_games: int = 1000, time_budget: float = 60.0,
+                 memory_budget: int = 64 * 1024 * 1024, batch_size: int = 20):
+        self.storage_service = storage_service
+        self.word_service = word_service
+        self.frequencies = frequencies
+        self.play_log_path = Path(play_log_path)
+        self.top_n = top_n
+        self.recent_n = recent_n
+        self.recent_games = recent_games
+        self.time_budget = time_budget
+        self.memory_budget = memory_budget
+        self.batch_size = batch_size
+
+        self._progress: Dict[str, Any] = {
+            'status': 'pending',
+            'words_total': 0,
+            'words_done': 0,
+            'trees_loaded': 0,
+            'trees_cached': 0,
+            'trees_missing': 0,
+            'transformations_warmed': 0,
+            'bytes_loaded': 0,
+            'elapsed_ms': 0.0,
+            'stop_reason': None
+        }
+
+    def record_start_word(self, start_word: str) -> None:
+        """Append a started game to the play log (never fails the game)."""
+        try:
+            append_play_log(self.play_log_path, start_word)
+        except OSError as e:
+            logger.debug(f"Play log append skipped: {e}")
+
+    def select_words(self) -> List[str]:
+        """Most played recent start words first, then the most frequent dictionary words."""
+        recent = Counter(w for w in read_recent_start_words(self.play_log_path, self.recent_games)
+                         if w in self.frequencies)
+        played = [word for word, _ in recent.most_common(self.recent_n)]
+        frequent = heapq.nlargest(self.top_n, (w for w in self.frequencies if w.isalpha()),
+                                  key=self.frequencies.__getitem__)
+        return list(dict.fromkeys(played + frequent))
+
+    def progress(self) -> Dict[str, Any]:
+        """Warmup progress snapshot for /status."""
+        progress = dict(self._progress)
+        total = progress['words_total']
+        progress['percent'] = round(100.0 * progress['words_done'] / total, 1) if total else 0.0
+        return progress
+
+    def _warm_transformations(self, words: List[str]) -> int:
+        """Compute transformations so the word engine caches (rhymes, anagrams) are filled."""
+        warmed = 0
+        for word in words:
+            try:
+                self.word_service.get_comprehensive_transformations(word)
+                warmed += 1
+            except Exception as e:
+                logger.debug(f"Transformation warmup skipped for '{word}': {e}")
+        return warmed
+
+    def _stop_reason(self, started: float) -> Optional[str]:
+        if time.perf_counter() - started >= self.time_budget:
+            return 'time_budget'
+        if self._progress['bytes_loaded'] >= self.memory_budget:
+            return 'memory_budget'
+        if self._cache_room() <= 0:
+            return 'cache_full'
+        return None
+
+    def _cache_room(self) -> int:
+        """Trees the memory cache takes before it evicts (0 once its byte budget is used up)."""
+        cache = self.storage_service.get_cache_stats()
+        if cache['memory_cache_bytes'] >= cache['memory_cache_max_bytes']:
+            return 0
+        return cache['memory_cache_max_entries'] - cache['memory_cache_size']
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Warm the caches batch by batch until done or out of budget.
+
+        Returns:
+            Final progress (see progress())
+        """
+        progress = self._progress
+        started = time.perf_counter()
+        start_bytes = self.storage_service.get_cache_stats()['memory_cache_bytes']
+        progress['status'] = 'running'
+
+        try:
+            words = await asyncio.to_thread(self.select_words)
+            progress['words_total'] = len(words)
+            logger.info(f"🔥 Warming caches for {len(words)} start words "
+                        f"(budget {self.time_budget:.0f}s, {self.memory_budget / (1024 * 1024):.0f} MB)")
+
+            i = 0
+            while i < len(words):
+                reason = self._stop_reason(started)
+                if reason is not None:
+                    progress['stop_reason'] = reason
+                    break
+
+                batch = words[i:i + min(self.batch_size, self._cache_room())]
+                i += len(batch)
+                stats = await self.storage_service.aprefetch(batch)
+                progress['trees_loaded'] += stats['loaded']
+                progress['trees_cached'] += stats['cached']
+                progress['trees_missing'] += stats['missing']
+                progress['transformations_warmed'] += await asyncio.to_thread(self._warm_transformations, batch)
+                progress['words_done'] += len(batch)
+                progress['bytes_loaded'] = max(
+                    0, self.storage_service.get_cache_stats()['memory_cache_bytes'] - start_bytes
+                )
+                progress['elapsed_ms'] = (time.perf_counter() - started) * 1000
+
+            progress['status'] = 'completed' if progress['stop_reason'] is None else 'stopped'
+
+        except asyncio.CancelledError:
+            progress['status'] = 'cancelled'
+            raise
+        except Exception as e:
+            logger.error(f"Cache warmup failed: {e}")
+            progress['status'] = 'failed'
+            progress['stop_reason'] = str(e)
+        finally:
+            progress['elapsed_ms'] = (time.perf_counter() - started) * 1000
+
+        logger.info(f"🔥 Cache warmup {progress['status']}: {progress}")
+        return self.progress()
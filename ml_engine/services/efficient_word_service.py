@@ -20,6 +20,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from models.shared_word_engine import get_shared_word_engine
 from models.production_onnx_scorer import get_onnx_scorer
+from services.transformation_graph import compute_transformations, graph_versions, load_transformation_graph
 
 logger = logging.getLogger(__name__)
 
@@ -70,6 +71,11 @@ class EfficientWordService:
         self.word_engine = get_shared_word_engine()
         self.scorer = get_onnx_scorer(model_name, device)
         
+        # Precomputed transformations (utils/build_transformation_graph.py); None if absent or stale
+        self.transformation_graph = load_transformation_graph(
+            self.word_engine.package_dir / "transformation_graph.bin", graph_versions(self.word_engine)
+        )
+        
         logger.info("✅ EfficientWordService initialized successfully")
     
     def get_comprehensive_transformations(self, start_word: str) -> TransformationData:
@@ -85,39 +91,28 @@ class EfficientWordService:
         print(f"🔍 DEBUG [efficient_word_service.py:EfficientWordService:get_comprehensive_transformations:80] Received start_word = '{start_word}'")
         logger.info(f"🔍 Getting comprehensive transformations for '{start_word}'")
         
-        # Get all transformation types from engine
-        print(f"🔍 DEBUG: Calling word_engine.get_rhymes('{start_word}')")
-        rhymes = self.word_engine.get_rhymes(start_word)
-        print(f"🔍 DEBUG: Got {len(rhymes)} rhymes for '{start_word}'")
-        
-        categorized_rhymes = self.word_engine.categorize_rhymes_by_quality(start_word, rhymes)
-        anagrams = self.word_engine.get_anagrams(start_word)
-        olo = self.word_engine.get_one_letter_off(start_word)
+        # Served from the transformation graph when it has the word, computed otherwise
+        transformations = None
+        if self.transformation_graph is not None:
+            transformations = self.transformation_graph.get(start_word)
+        if transformations is None:
+            transformations = compute_transformations(self.word_engine, start_word)
         
         # Combine all transformations
-        all_transformations = (
-            categorized_rhymes.get('perfect', []) +
-            categorized_rhymes.get('near', []) +
-            categorized_rhymes.get('rich', []) +
-            categorized_rhymes.get('slant', []) +
-            anagrams +
-            olo.get('added', []) +
-            olo.get('removed', []) +
-            olo.get('changed', [])
-        )
+        all_transformations = [word for words in transformations.values() for word in words]
         
         # Remove duplicates and the start word itself
         all_transformations = list(set(all_transformations) - {start_word})
         
         return TransformationData(
-            perfect_rhymes=categorized_rhymes.get('perfect', []),
-            near_rhymes=categorized_rhymes.get('near', []),
-            rich_rhymes=categorized_rhymes.get('rich', []),
-            slant_rhymes=categorized_rhymes.get('slant', []),
-            anagrams=anagrams,
-            added_letters=olo.get('added', []),
-            removed_letters=olo.get('removed', []),
-            changed_letters=olo.get('changed', []),
+            perfect_rhymes=transformations['perfect'],
+            near_rhymes=transformations['near'],
+            rich_rhymes=transformations['rich'],
+            slant_rhymes=transformations['slant'],
+            anagrams=transformations['anagrams'],
+            added_letters=transformations['added'],
+            removed_letters=transformations['removed'],
+            changed_letters=transformations['changed'],
             all_transformations=all_transformations
         )
     
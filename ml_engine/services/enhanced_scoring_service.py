@@ -9,6 +9,7 @@ for accurate creativity scoring across all transformation categories.
 
 import asyncio
 import logging
+import threading
 import numpy as np
 from typing import Dict, List, Tuple, Optional, Any
 from dataclasses import dataclass
@@ -22,6 +23,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 from services.efficient_word_service import EfficientWordService
 from models.production_onnx_scorer import get_onnx_scorer
 from services.optimized_storage_service import get_optimized_storage_service, StorageConfig
+from services.tree_fingerprint import compute_tree_fingerprint
 from models.probability_tree import (
     ProbabilityTreeBuilder, 
     ProbabilityTreeLookup, 
@@ -90,7 +92,8 @@ class EnhancedScoringService:
                 storage_type=storage_type,
                 json_file_path=json_file_path,
                 compression=True,
-                cache_size=1000
+                cache_size=1000,
+                tree_fingerprint=compute_tree_fingerprint()
             )
             self.storage = get_optimized_storage_service(storage_config)
         
@@ -105,6 +108,10 @@ class EnhancedScoringService:
             vocab_size=50257  # distilGPT-2 vocab size
         )
         
+        # Builds run in worker threads (request handlers and stale-tree prewarming);
+        # the builder and its ONNX session build one tree at a time
+        self._build_lock = threading.Lock()
+        
         # Initialize scoring caches for efficiency
         self._base_score_cache = {}  # Cache for base scores
         self._bonus_cache = {}       # Cache for category bonuses
@@ -130,83 +137,144 @@ class EnhancedScoringService:
             WordProbabilityTree or None if building fails
         """
         try:
-            # Check if tree exists in storage
-            if self.storage.has_probability_tree(start_word):
-                logger.debug(f"📦 Using cached probability tree for '{start_word}'")
-                tree = self.storage.get_probability_tree(start_word)
-                
-                # DEBUG: Show which storage method was used
-                if hasattr(self.storage, 'config') and hasattr(self.storage.config, 'storage_type'):
-                    storage_type = self.storage.config.storage_type
-                    if storage_type == "hybrid":
-                        # For hybrid, check if it came from Redis or JSON
-                        if hasattr(self.storage, 'redis') and self.storage.redis.exists(f"tree:{start_word}"):
-                            logger.info(f"🎯 SCORING FROM REDIS STORAGE (efficient base64) for '{start_word}'")
-                        else:
-                            logger.info(f"📁 SCORING FROM JSON FILE STORAGE for '{start_word}'")
-                    elif storage_type == "redis":
-                        logger.info(f"🎯 SCORING FROM REDIS STORAGE (efficient base64) for '{start_word}'")
-                    else:
-                        logger.info(f"📁 SCORING FROM JSON FILE STORAGE for '{start_word}'")
-                
+            # One storage round trip: tree plus the tier that served it
+            tree, source = self.storage.fetch_tree(start_word)
+            if tree is not None:
+                self._log_tree_source(start_word, source)
                 return tree
             
-            # Build new tree
-            logger.info(f"🔄 Building probability tree for '{start_word}'")
-            
-            # Get all valid transformations (use cached if provided, otherwise compute)
-            if cached_transformations is None:
-                transformations = self.word_service.get_comprehensive_transformations(start_word)
-            else:
-                transformations = cached_transformations
-            
-            # Prepare valid words for each category
-            valid_words = {
-                'ana': [self.scorer.tokenizer.encode(word) for word in transformations.anagrams],
-                'ola': [self.scorer.tokenizer.encode(word) for word in transformations.added_letters],
-                'olr': [self.scorer.tokenizer.encode(word) for word in transformations.removed_letters],
-                'olx': [self.scorer.tokenizer.encode(word) for word in transformations.changed_letters],
-                'prf': [self.scorer.tokenizer.encode(word) for word in transformations.perfect_rhymes],
-                'rch': [self.scorer.tokenizer.encode(word) for word in transformations.rich_rhymes],
-                'sln': [self.scorer.tokenizer.encode(word) for word in transformations.slant_rhymes]
-            }
-            
-            # Build probability tree
-            tree, timing_metrics = self.tree_builder.get_or_build_tree(start_word, valid_words)
-            
-            # Store timing metrics if available (for GameService to collect)
-            if timing_metrics:
-                # Add additional context for GameService
-                timing_metrics['scoring_service_timestamp'] = time.time()
-                timing_metrics['word_transformations'] = {
-                    'anagrams': len(transformations.anagrams),
-                    'perfect_rhymes': len(transformations.perfect_rhymes),
-                    'rich_rhymes': len(transformations.rich_rhymes),
-                    'slant_rhymes': len(transformations.slant_rhymes),
-                    'added_letters': len(transformations.added_letters),
-                    'removed_letters': len(transformations.removed_letters),
-                    'changed_letters': len(transformations.changed_letters)
-                }
-                # Store timing metrics in a way that GameService can access
-                if hasattr(self, 'last_timing_metrics'):
-                    self.last_timing_metrics = timing_metrics
-                else:
-                    self.last_timing_metrics = timing_metrics
-            
-            # Validate tree
-            if validate_probability_tree(tree):
+            tree = self._build_probability_tree(start_word, cached_transformations)
+            if tree is not None:
                 # Store tree for future use
                 self.storage.store_probability_tree(start_word, tree)
                 logger.info(f"💾 Stored probability tree for '{start_word}'")
+            return tree
+                
+        except Exception as e:
+            logger.error(f"Failed to get/build probability tree for '{start_word}': {e}")
+            return None
+    
+    async def _aget_or_build_probability_tree(self, start_word: str, cached_transformations=None) -> Optional[WordProbabilityTree]:
+        """
+        Async _get_or_build_probability_tree: storage reads and writes are awaited,
+        so concurrent requests don't queue behind each other's Redis round trips.
+        A missing tree is built in a worker thread, keeping the event loop free.
+        """
+        try:
+            tree, source = await self.storage.afetch_tree(start_word)
+            if tree is not None:
+                self._log_tree_source(start_word, source)
                 return tree
-            else:
-                logger.error(f"❌ Probability tree validation failed for '{start_word}'")
-                return None
+            
+            tree = await asyncio.to_thread(self._build_probability_tree, start_word, cached_transformations)
+            if tree is not None:
+                await self.storage.astore_probability_tree(start_word, tree)
+                logger.info(f"💾 Stored probability tree for '{start_word}'")
+            return tree
                 
         except Exception as e:
             logger.error(f"Failed to get/build probability tree for '{start_word}': {e}")
             return None
     
+    async def prewarm_stale_trees(self, limit: int = 10) -> Dict[str, Any]:
+        """
+        Rebuild trees that storage found built with another model, prompt template
+        or builder version (see OptimizedStorageService.take_prewarm_words), so the
+        next player on those start words doesn't wait for the build.
+        
+        Builds run in a worker thread (one at a time with request builds, see
+        _build_lock); stores go through the storage service.
+        
+        Returns:
+            Dict with 'rebuilt', 'failed' and 'remaining' (still queued) counts
+        """
+        words = self.storage.take_prewarm_words(limit)
+        rebuilt, failed = 0, 0
+        for word in words:
+            try:
+                tree = await asyncio.to_thread(self._build_probability_tree, word)
+                if tree is None:
+                    failed += 1
+                    continue
+                await self.storage.astore_probability_tree(word, tree)
+                rebuilt += 1
+            except Exception as e:
+                logger.error(f"Failed to prewarm probability tree for '{word}': {e}")
+                failed += 1
+        
+        remaining = self.storage.get_fingerprint_stats()['prewarm_queue_depth']
+        if words:
+            logger.info(f"🔥 Prewarmed {rebuilt} stale probability trees ({failed} failed, {remaining} queued)")
+        return {'rebuilt': rebuilt, 'failed': failed, 'remaining': remaining}
+    
+    @staticmethod
+    def _log_tree_source(start_word: str, source: Optional[str]) -> None:
+        if source == "redis":
+            logger.info(f"🎯 SCORING FROM REDIS STORAGE for '{start_word}'")
+        elif source == "sqlite":
+            logger.info(f"🗄️ SCORING FROM SQLITE STORAGE for '{start_word}'")
+        elif source == "file":
+            logger.info(f"📁 SCORING FROM JSON FILE STORAGE for '{start_word}'")
+        else:
+            logger.debug(f"📦 Using cached probability tree for '{start_word}'")
+    
+    def _build_probability_tree(self, start_word: str, cached_transformations=None) -> Optional[WordProbabilityTree]:
+        """
+        Build and validate a new probability tree (not stored).
+        
+        Returns:
+            WordProbabilityTree or None if validation fails
+        """
+        # Build new tree
+        logger.info(f"🔄 Building probability tree for '{start_word}'")
+        
+        # Get all valid transformations (use cached if provided, otherwise compute)
+        if cached_transformations is None:
+            transformations = self.word_service.get_comprehensive_transformations(start_word)
+        else:
+            transformations = cached_transformations
+        
+        # Prepare valid words for each category
+        valid_words = {
+            'ana': [self.scorer.tokenizer.encode(word) for word in transformations.anagrams],
+            'ola': [self.scorer.tokenizer.encode(word) for word in transformations.added_letters],
+            'olr': [self.scorer.tokenizer.encode(word) for word in transformations.removed_letters],
+            'olx': [self.scorer.tokenizer.encode(word) for word in transformations.changed_letters],
+            'prf': [self.scorer.tokenizer.encode(word) for word in transformations.perfect_rhymes],
+            'rch': [self.scorer.tokenizer.encode(word) for word in transformations.rich_rhymes],
+            'sln': [self.scorer.tokenizer.encode(word) for word in transformations.slant_rhymes]
+        }
+        
+        # Build probability tree
+        with self._build_lock:
+            tree, timing_metrics = self.tree_builder.get_or_build_tree(start_word, valid_words)
+        
+        # Store timing metrics if available (for GameService to collect)
+        if timing_metrics:
+            # Add additional context for GameService
+            timing_metrics['scoring_service_timestamp'] = time.time()
+            timing_metrics['word_transformations'] = {
+                'anagrams': len(transformations.anagrams),
+                'perfect_rhymes': len(transformations.perfect_rhymes),
+                'rich_rhymes': len(transformations.rich_rhymes),
+                'slant_rhymes': len(transformations.slant_rhymes),
+                'added_letters': len(transformations.added_letters),
+                'removed_letters': len(transformations.removed_letters),
+                'changed_letters': len(transformations.changed_letters)
+            }
+            # Store timing metrics in a way that GameService can access
+            if hasattr(self, 'last_timing_metrics'):
+                self.last_timing_metrics = timing_metrics
+            else:
+                self.last_timing_metrics = timing_metrics
+        
+        # Validate tree
+        if validate_probability_tree(tree):
+            return tree
+        else:
+            logger.error(f"❌ Probability tree validation failed for '{start_word}'")
+            return None
+    
 
     
     def calculate_multi_token_probability(self, prompt: str, candidate_word: str, valid_tokens: List[int] = None) -> MultiTokenProbability:
@@ -749,12 +817,17 @@ class EnhancedScoringService:
             total_score = 0
             valid_categories = []
             category_scores = {}
+            tree = None
             
             for category, word_list in categories_to_check.items():
                 if candidate_word in word_list:
+                    if tree is None:
+                        # Await storage once; every category scores from the same tree
+                        tree = await self._aget_or_build_probability_tree(start_word, transformations)
+                    
                     # Calculate score for this category (pass cached transformations)
                     score_result = self.calculate_transformation_score_with_cache(
-                        start_word, candidate_word, category, transformations
+                        start_word, candidate_word, category, transformations, tree
                     )
                     category_results[category] = score_result
                     category_scores[category] = score_result.total_score
@@ -803,7 +876,8 @@ class EnhancedScoringService:
             }
     
     def calculate_transformation_score_with_cache(self, start_word: str, candidate_word: str, 
-                                               transformation_category: str, cached_transformations) -> ScoringResult:
+                                               transformation_category: str, cached_transformations,
+                                               tree: Optional[WordProbabilityTree] = None) -> ScoringResult:
         """
         Calculate comprehensive score using cached transformations to avoid duplicate calls.
         
@@ -812,12 +886,14 @@ class EnhancedScoringService:
             candidate_word: The candidate transformation
             transformation_category: Category (prf, rch, sln, ana, ola, olr, olx)
             cached_transformations: Pre-computed transformations
+            tree: Probability tree already fetched by the caller (looked up if None)
             
         Returns:
             ScoringResult with complete scoring analysis
         """
         # Get or build probability tree with cached transformations
-        tree = self._get_or_build_probability_tree(start_word, cached_transformations)
+        if tree is None:
+            tree = self._get_or_build_probability_tree(start_word, cached_transformations)
         
         if tree is None:
             logger.error(f"❌ Failed to get probability tree for '{start_word}'")
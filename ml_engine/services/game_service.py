@@ -21,6 +21,9 @@ import time
 from services.enhanced_scoring_service import get_enhanced_scoring_service
 from services.efficient_word_service import get_efficient_word_service
 from services.optimized_storage_service import get_optimized_storage_service, StorageConfig
+from services.tree_fingerprint import compute_tree_fingerprint
+from services.cache_warmer import CacheWarmer
+from services.cache_snapshot import game_data_version, restore_cache_snapshot, save_cache_snapshot
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -58,6 +61,20 @@ class GameService:
         self.game_timing_metrics = []
         self.game_start_time = None
         
+        # Background tree prefetch for the next move (reference kept so the task isn't collected)
+        self._prefetch_task = None
+        
+        # Background JSON -> Redis tree sync, kept off the /end request path
+        self._sync_task = None
+        self.last_tree_sync = None
+        
+        # Background rebuild of trees stored under an older model fingerprint
+        self._prewarm_task = None
+        
+        # Startup cache warming (likely start words from the play log and frequencies.json)
+        self.cache_warmer = None
+        self._warmup_task = None
+        
     async def initialize(self) -> Dict[str, Any]:
         """
         PHASE 1: Initialize ML components and prepare game state
@@ -73,7 +90,11 @@ class GameService:
             # Uses REDIS_URL from environment (Upstash cloud Redis for production)
             storage_config = StorageConfig(
                 storage_type="hybrid",
-                json_file_path=str(self.game_data_path / "probability_trees.json")
+                json_file_path=str(self.game_data_path / "probability_trees.json"),
+                # Trees built during a move are persisted in the background (flushed in shutdown())
+                write_behind=True,
+                # Trees from another model / prompt template / builder version are rebuilt lazily
+                tree_fingerprint=compute_tree_fingerprint()
                 # redis_url will be picked up from REDIS_URL environment variable
             )
             self.storage_service = get_optimized_storage_service(storage_config)
@@ -85,6 +106,12 @@ class GameService:
             # Load frequencies.json for word validation and frequency lookup
             await self._load_frequencies_data()
             
+            # Warmup stage: started in the background by start_warmup() (lifespan), so startup isn't delayed
+            self.cache_warmer = CacheWarmer(
+                self.storage_service, self.word_service, self.frequencies_data,
+                play_log_path=self.game_data_path / "play_log.jsonl"
+            )
+            
             self.initialized = True
             self.logger.info("GameService initialization completed successfully")
             
@@ -95,6 +122,64 @@ class GameService:
             self.logger.error(f"{error_msg} at {traceback.extract_stack()[-1]}")
             raise GameServiceError(error_msg)
     
+    def start_warmup(self) -> Dict[str, Any]:
+        """
+        Start warming the tree and transformation caches in the background
+        
+        Returns:
+            Dict with the current warmup progress
+        """
+        if not self.cache_warmer:
+            return {"status": "unavailable"}
+        if self._warmup_task is None:
+            self._warmup_task = asyncio.create_task(self.cache_warmer.run())
+        return self.cache_warmer.progress()
+    
+    def _cache_snapshot_versions(self) -> Dict[str, Any]:
+        """Inputs the cached data depends on; a snapshot built from others is discarded"""
+        fingerprint = self.storage_service.config.tree_fingerprint
+        return {
+            "game_data": game_data_version(self.game_data_path),
+            "tree_fingerprint": fingerprint.id if fingerprint is not None else None
+        }
+    
+    async def save_cache_snapshot(self) -> Dict[str, Any]:
+        """
+        Snapshot tree, tree builder and word engine caches for a warm restart (application shutdown)
+        
+        Returns:
+            Dict with snapshot entry counts, size and duration
+        """
+        if not self.initialized:
+            return {"status": "skipped"}
+        try:
+            stats = await asyncio.to_thread(
+                save_cache_snapshot, self.game_data_path / "cache_snapshot.bin", self.storage_service,
+                self.word_service.word_engine, self.scoring_service.tree_builder, self._cache_snapshot_versions()
+            )
+            return {"status": "saved", **stats}
+        except Exception as e:
+            self.logger.error(f"Failed to save cache snapshot: {e}")
+            return {"status": "failed", "error": str(e)}
+    
+    async def restore_cache_snapshot(self) -> Dict[str, Any]:
+        """
+        Restore caches saved by save_cache_snapshot() if game data and model are unchanged (application startup)
+        
+        Returns:
+            Dict with the restore status and restored entry counts
+        """
+        if not self.initialized:
+            return {"status": "skipped"}
+        try:
+            return await asyncio.to_thread(
+                restore_cache_snapshot, self.game_data_path / "cache_snapshot.bin", self.storage_service,
+                self.word_service.word_engine, self.scoring_service.tree_builder, self._cache_snapshot_versions()
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to restore cache snapshot: {e}")
+            return {"status": "failed", "error": str(e)}
+    
     async def _load_frequencies_data(self):
         """Load frequency data from frequencies.json for word validation and frequency lookup"""
         try:
@@ -114,8 +199,8 @@ class GameService:
     
     async def _populate_redis_with_new_words(self, probability_trees_path: str = None) -> Dict[str, int]:
         """
-        Populate storage with new words from probability_trees.json (incremental update only)
-        Uses unified storage service for efficient compressed data transfer
+        Populate storage with new or changed words from probability_trees.json (incremental update only)
+        Uses the storage service's manifest-based tree sync for efficient compressed data transfer
         
         Args:
             probability_trees_path: Path to probability_trees.json (defaults to game_data location)
@@ -132,14 +217,14 @@ class GameService:
                 self.logger.warning(f"Probability trees file not found: {probability_trees_path}")
                 return {"new_words_added": 0, "total_processed": 0}
             
-            # Use the unified storage service for efficient population
-            # This ensures consistency with our harmonized storage approach
+            # Incremental sync: only trees whose content hash differs from the Redis manifest are pushed
             result = await self.storage_service.populate_from_file(str(probability_trees_path))
             
             # Map the result to maintain backward compatibility
             return {
                 "new_words_added": result.get("new_trees_added", 0),
-                "total_processed": result.get("total_processed", 0)
+                "total_processed": result.get("total_processed", 0),
+                "sync": result.get("sync")
             }
             
         except Exception as e:
@@ -148,6 +233,31 @@ class GameService:
     
 
     
+    def _schedule_tree_sync(self) -> Dict[str, Any]:
+        """
+        Start a background JSON -> Redis tree sync unless one is already running
+        
+        Returns:
+            Dict with the scheduling status and the statistics of the last completed sync
+        """
+        if self._sync_task is not None and not self._sync_task.done():
+            return {"status": "running", "last_sync": self.last_tree_sync}
+        
+        async def sync():
+            self.last_tree_sync = await self._populate_redis_with_new_words()
+            self.logger.info(f"Redis sync completed: {self.last_tree_sync}")
+        
+        self._sync_task = asyncio.create_task(sync())
+        return {"status": "scheduled", "last_sync": self.last_tree_sync}
+    
+    def _schedule_tree_prewarm(self, limit: int = 10) -> None:
+        """Rebuild up to limit stale trees in the background unless a prewarm is already running"""
+        if self._prewarm_task is not None and not self._prewarm_task.done():
+            return
+        if not self.storage_service.get_fingerprint_stats()['prewarm_queue_depth']:
+            return
+        self._prewarm_task = asyncio.create_task(self.scoring_service.prewarm_stale_trees(limit))
+    
     def _is_valid_word(self, word: str) -> bool:
         """
         Check if word exists in frequencies.json (PHASE 2 requirement)
@@ -194,6 +304,8 @@ class GameService:
                 raise GameServiceError("GameService not initialized")
                 
             self.logger.info(f"Starting game with start_word: {start_word}")
+            if self.cache_warmer:
+                self.cache_warmer.record_start_word(start_word)
             
             # Reset game performance metrics for new game
             self._reset_game_metrics()
@@ -208,7 +320,7 @@ class GameService:
                 raise GameServiceError(f"Start word '{start_word}' has no valid transformations")
             
             # Get probability tree using unified hybrid storage (Redis first, JSON fallback)
-            probability_tree = self.storage_service.get_probability_tree(start_word)
+            probability_tree = await self.storage_service.aget_probability_tree(start_word)
             
             # Collect timing metrics if a new tree was built
             self._collect_timing_metrics()
@@ -232,6 +344,8 @@ class GameService:
                 "game_started": datetime.now().isoformat()
             }
             
+            self._schedule_tree_prefetch()
+            
             self.logger.info(f"Game started successfully with {len(player_suggestions)} suggestion categories")
             
             return {
@@ -316,6 +430,9 @@ class GameService:
             # Update suggestions using existing word service with real frequencies
             await self._update_suggestions_with_frequencies(candidate_word, umi_word)
             
+            # Pull the trees the next /play is likely to need while the player thinks
+            self._schedule_tree_prefetch()
+            
             self.logger.info(f"Player move processed successfully. Player score: {player_result.get('data', {}).get('total_score', 0):.2f}")
             
             return {
@@ -357,10 +474,10 @@ class GameService:
                 "final_state": self.game_state
             }
             
-            # Sync Redis with JSON file to ensure all probability trees are cached
-            # This captures any updates that may have been added to the JSON file
-            redis_sync_result = await self._populate_redis_with_new_words()
-            self.logger.info(f"Redis sync completed: {redis_sync_result}")
+            # Sync Redis with the JSON file in the background (manifest diff, changed trees only)
+            # Entries edited in the JSON file are re-imported into the segment store first
+            redis_sync_result = self._schedule_tree_sync()
+            self._schedule_tree_prewarm()
             
             # Generate comprehensive game performance summary
             performance_summary = self._generate_game_performance_summary()
@@ -540,6 +657,33 @@ class GameService:
             self.logger.warning(f"Failed to update suggestions: {str(e)}")
             # Keep existing suggestions if update fails
     
+    def _schedule_tree_prefetch(self):
+        """
+        Prefetch probability trees for the upcoming start words in the background
+        
+        The next move scores from the player's current word and Umi's last word;
+        suggested words are the likely start words of the move after that.
+        """
+        if not self.storage_service or not self.game_state:
+            return
+        if self._prefetch_task is not None and not self._prefetch_task.done():
+            return
+        
+        umi_chain = self.game_state.get("umi_chain", [])
+        words = [self.game_state.get("current_word"), umi_chain[-1] if umi_chain else self.game_state.get("start_word")]
+        for suggestions_key in ("player_suggestions", "umi_suggestions"):
+            for suggestion in (self.game_state.get(suggestions_key) or {}).values():
+                if suggestion and suggestion.get("word"):
+                    words.append(suggestion["word"])
+        
+        async def prefetch():
+            try:
+                await self.storage_service.aprefetch(words)
+            except Exception as e:
+                self.logger.debug(f"Tree prefetch skipped: {str(e)}")
+        
+        self._prefetch_task = asyncio.create_task(prefetch())
+    
     async def _create_suggestions_with_frequencies(self, transformations, excluded_words: List[str] = None) -> Dict[str, Dict]:
         """
         Create suggestion objects from transformation data with real frequencies and ML scores
@@ -679,14 +823,43 @@ class GameService:
         Returns:
             Dict containing current game state
         """
+        write_queue = self.storage_service.get_write_queue_stats() if self.storage_service else None
+        fingerprint = self.storage_service.get_fingerprint_stats() if self.storage_service else None
+        warmup = self.cache_warmer.progress() if self.cache_warmer else None
         if not self.game_state:
-            return {"status": "no_active_game"}
+            return {"status": "no_active_game", "write_queue": write_queue, "tree_fingerprint": fingerprint,
+                    "warmup": warmup}
         
         return {
             "status": "active_game",
-            "game_state": self.game_state
+            "game_state": self.game_state,
+            "write_queue": write_queue,
+            "tree_fingerprint": fingerprint,
+            "warmup": warmup
         }
     
+    async def shutdown(self) -> Dict[str, Any]:
+        """
+        Flush queued tree writes and release storage connections (application shutdown)
+        
+        Returns:
+            Dict with the final write-behind queue statistics
+        """
+        if not self.storage_service:
+            return {"status": "shutdown"}
+        
+        for task in (self._warmup_task, self._prewarm_task):
+            if task is not None and not task.done():
+                task.cancel()  # warmup is best effort; stale trees are rebuilt lazily after restart
+        if self._sync_task is not None and not self._sync_task.done():
+            # Let an in-flight Redis sync finish rather than cutting its pipelines off
+            await asyncio.wait({self._sync_task}, timeout=30)
+        
+        await self.storage_service.aclose()
+        write_queue = self.storage_service.get_write_queue_stats()
+        self.logger.info(f"Storage closed, write-behind queue: {write_queue}")
+        return {"status": "shutdown", "write_queue": write_queue}
+    
     async def reset_game(self) -> Dict[str, Any]:
         """
         Reset the current game
@@ -7,18 +7,27 @@ High-performance storage for probability trees with JSON/Redis compatibility.
 Prioritizes speed and memory efficiency for fast lookups.
 """
 
+import asyncio
+import base64
 import json
 import os
+import time
+from collections import OrderedDict
 import numpy as np
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Tuple, Union
 import logging
 from pathlib import Path
 from dataclasses import asdict, dataclass
-import pickle
-import gzip
 from dotenv import load_dotenv
 
-from models.probability_tree import WordProbabilityTree, ProbabilityNode, ProbabilityMetadata, ChildNode
+from models.probability_tree import WordProbabilityTree
+from services.tree_file_stores import SqliteTreeStore, create_tree_file_store, write_legacy_json
+from services.storage_metrics import TierStats
+from services.tree_cache import TreeCache, estimate_tree_size
+from services.tree_codecs import create_codec_registry, is_tree_payload
+from services.tree_fingerprint import TreeFingerprint
+from services.tree_sync import MANIFEST_KEY, content_hash, create_tree_sync, open_pipeline
+from services.write_behind import WriteBehindQueue
 
 logger = logging.getLogger(__name__)
 
@@ -28,25 +37,65 @@ class StorageConfig:
     storage_type: str = "json"           # "json", "redis", or "hybrid"
     json_file_path: str = "game_data/probability_trees.json"
     redis_connection: Optional[Any] = None  # For connection sharing (Upstash Redis)
-    compression: bool = True              # Use gzip compression for large objects
-    cache_size: int = 1000               # In-memory cache size
+    compression: bool = True              # Use gzip compression for large objects (when codec is None)
+    codec: Optional[str] = None          # "pickle_gzip", "pickle_zlib_dict", "pickle_raw", "array" or "array_zlib" (None: from compression)
+    codec_dictionary_path: Optional[str] = None  # Trained zlib dictionary (defaults to "<json dir>/tree_codec.zdict")
+    cache_size: int = 1000               # In-memory cache size (entries)
+    cache_max_bytes: int = 256 * 1024 * 1024  # In-memory cache memory budget (estimated bytes)
+    cache_policy: str = "tinylfu"        # "tinylfu" (frequency-gated admission) or "lru"
+    negative_cache_ttl: float = 30.0     # Seconds a confirmed miss is remembered (0 disables)
+    file_store: str = "segment"          # Local tree file layout: "segment" (append-only log), "container" (mmap binary), "lazy_json" or "json" (legacy)
+    segment_dir: Optional[str] = None    # Segment store directory (defaults to "<json stem>.segments")
+    container_path: Optional[str] = None # Binary container file for "container" layout (defaults to "<json stem>.bin")
+    compaction_interval: float = 300.0   # Seconds between background segment compaction checks
+    redis_value_encoding: str = "auto"   # "raw" bytes, "base64" text, or "auto" (raw for redis-py, base64 for Upstash REST)
+    async_redis_connection: Optional[Any] = None  # redis.asyncio / upstash_redis.asyncio client (derived from the sync connection when None)
+    redis_pool_size: int = 32            # Max pooled connections for the derived async Redis client
+    write_behind: bool = False           # Persist stored trees from a background queue (call flush_writes/close on shutdown)
+    write_batch_size: int = 50           # Trees per write-behind batch (one Redis pipeline)
+    write_flush_interval: float = 0.5    # Seconds a partial write-behind batch waits before it is persisted
+    storage_tiers: Optional[List[str]] = None  # Tier chain after memory, e.g. ["sqlite", "redis", "file"] (None: from storage_type)
+    sqlite_path: Optional[str] = None    # SQLite tier database (defaults to "<json stem>.sqlite3")
+    tree_fingerprint: Optional[TreeFingerprint] = None  # Model/prompt/builder fingerprint (None: unversioned "tree:{word}" keys)
+    prewarm_stale: bool = True           # Queue start words whose stored tree has another fingerprint for background rebuild
+    serve_unversioned: bool = True       # Serve trees stored without a fingerprint (imported JSON, "tree:{word}" keys) until rebuilt
     
 class OptimizedStorageService:
     """
     Optimized storage service for probability trees.
     
     Features:
-    - Lazy loading with in-memory cache
-    - Gzip compression for large objects
+    - Lazy loading with a size-bounded, frequency-aware in-memory cache
+    - Configurable tier chain (memory -> sqlite -> redis -> file) with read-through and
+      write-through, and per-tier hit counters and latency histograms
+    - Pluggable, self-describing serialization codecs (gzip, zlib preset dictionary, raw)
     - Fast JSON/Redis lookups
+    - Async interface (afetch_tree, astore_probability_tree, aprefetch) on a pooled async Redis client
+    - Model-versioned trees: Redis keys and tier metadata carry the build fingerprint,
+      trees with another fingerprint count as misses and are queued for prewarming;
+      trees stored before fingerprints existed keep serving until they are rebuilt
     - Memory-efficient serialization
     """
     
     def __init__(self, config: StorageConfig):
         self.config = config
-        self._memory_cache = {}  # Fast in-memory cache
-        self._cache_hits = 0
-        self._cache_misses = 0
+        self._memory_cache = TreeCache(config.cache_size, config.cache_max_bytes, config.cache_policy)
+        self._negative_cache: Dict[str, float] = {}  # start_word -> monotonic expiry
+        self._negative_hits = 0
+        self._redis_url: Optional[str] = None  # Connection details the async client is derived from
+        self._upstash_credentials: Optional[Tuple[str, str]] = None
+        
+        fingerprint = config.tree_fingerprint
+        self._fingerprint_id = fingerprint.id if fingerprint is not None else None
+        self._key_prefix = f"tree:{self._fingerprint_id}:" if fingerprint is not None else "tree:"
+        self._manifest_key = f"{MANIFEST_KEY}:{self._fingerprint_id}" if fingerprint is not None else MANIFEST_KEY
+        self._prewarm_queue: "OrderedDict[str, None]" = OrderedDict()  # stale start words, oldest first
+        
+        dictionary_path = config.codec_dictionary_path or str(Path(config.json_file_path).parent / "tree_codec.zdict")
+        self.codecs = create_codec_registry(dictionary_path)
+        if config.codec is None:
+            config.codec = "pickle_gzip" if config.compression else "pickle_raw"
+        self.codecs.get(config.codec)  # fail fast on unknown codec / missing dictionary
         
         if config.storage_type == "redis":
             if not config.redis_connection:
@@ -67,11 +116,19 @@ class OptimizedStorageService:
                     # Use Isaac's Upstash pattern
                     kv_url = os.environ.get("KV_REST_API_URL")
                     kv_token = os.environ.get("KV_REST_API_TOKEN")
+                    redis_url = os.environ.get("REDIS_URL")
                     
-                    if kv_url and kv_token:
+                    if redis_url:
+                        # Redis protocol (local, self-hosted, or Upstash's rediss:// endpoint) - binary safe
+                        import redis
+                        self.redis = redis.Redis.from_url(redis_url)
+                        self._redis_url = redis_url
+                        logger.info("✅ Connected to Redis via REDIS_URL")
+                    elif kv_url and kv_token:
                         # Use upstash_redis for Upstash compatibility
                         from upstash_redis import Redis
                         self.redis = Redis(url=kv_url, token=kv_token)
+                        self._upstash_credentials = (kv_url, kv_token)
                         logger.info("✅ Connected to Upstash Redis using Isaac's pattern")
                     else:
                         # Fall back to JSON-only mode if no Upstash Redis available
@@ -92,23 +149,117 @@ class OptimizedStorageService:
         else:
             raise ValueError("storage_type must be 'json', 'redis', or 'hybrid'")
         
-        logger.info(f"✅ OptimizedStorageService initialized with {config.storage_type} storage")
+        self._redis_raw_values = self._detect_raw_value_support()
+        self.aredis = self._create_async_redis()
+        
+        self.sqlite_store = None
+        self._storage_tiers = self._resolve_storage_tiers()
+        self._tier_stats = {tier: TierStats() for tier in ["memory"] + self._storage_tiers}
+        
+        self._write_queue = None
+        if config.write_behind:
+            self._write_queue = WriteBehindQueue(
+                self._persist_batch, config.write_batch_size, config.write_flush_interval, name="tree-write-behind"
+            )
+        
+        logger.info(f"✅ OptimizedStorageService initialized with {config.storage_type} storage "
+                    f"(tiers: {' -> '.join(['memory'] + self._storage_tiers)}, "
+                    f"fingerprint: {self._fingerprint_id or 'none'})")
     
-    def _load_json_data(self):
-        """Load data from JSON file or create new if doesn't exist."""
+    def _resolve_storage_tiers(self) -> List[str]:
+        """
+        Persistent tiers searched after the memory cache, fastest first.
+        
+        Defaults follow storage_type: redis -> ["redis"], hybrid -> ["redis", "file"],
+        json -> ["file"]. Tiers that need a missing Redis connection are dropped.
+        """
+        defaults = {"redis": ["redis"], "hybrid": ["redis", "file"], "json": ["file"]}
+        requested = self.config.storage_tiers
+        tiers = [t for t in (requested if requested is not None else defaults[self.config.storage_type]) if t != "memory"]
+        for tier in tiers:
+            if tier not in ("sqlite", "redis", "file"):
+                raise ValueError("storage_tiers entries must be 'memory', 'sqlite', 'redis' or 'file'")
+        
+        if "redis" in tiers and getattr(self, 'redis', None) is None:
+            logger.warning("No Redis connection, dropping the redis storage tier")
+            tiers = [t for t in tiers if t != "redis"]
+        if "file" in tiers and getattr(self, 'file_store', None) is None:
+            self._load_json_data()
+        if "sqlite" in tiers:
+            sqlite_path = self.config.sqlite_path or str(Path(self.config.json_file_path).with_suffix(".sqlite3"))
+            self.sqlite_store = SqliteTreeStore(sqlite_path)
+        return tiers
+    
+    def _detect_raw_value_support(self) -> bool:
+        """
+        Decide whether Redis values are written as raw bytes.
+        
+        redis-py clients are binary safe unless they decode responses to str;
+        the Upstash REST client is JSON over HTTP, so it needs base64 text.
+        """
+        if getattr(self, 'redis', None) is None:
+            return False
+        if self.config.redis_value_encoding in ("raw", "base64"):
+            return self.config.redis_value_encoding == "raw"
+        if self.config.redis_value_encoding != "auto":
+            raise ValueError("redis_value_encoding must be 'auto', 'raw' or 'base64'")
+        pool = getattr(self.redis, 'connection_pool', None)
+        if pool is None:
+            return False
+        return not pool.connection_kwargs.get('decode_responses', False)
+    
+    def _create_async_redis(self) -> Optional[Any]:
+        """
+        Async client for the same Redis as self.redis, with its own bounded connection pool.
+        
+        Returns None when there is no Redis or no async equivalent can be derived
+        (e.g. an Upstash client passed in without credentials); the async methods
+        then run the sync client in worker threads instead.
+        """
+        if getattr(self, 'redis', None) is None:
+            return None
+        if self.config.async_redis_connection is not None:
+            return self.config.async_redis_connection
         try:
-            if os.path.exists(self.config.json_file_path):
-                with open(self.config.json_file_path, 'r') as f:
-                    self.data = json.load(f)
-                logger.info(f"📦 Loaded {len(self.data)} probability trees from JSON")
-            else:
-                # Create directory if it doesn't exist
-                Path(self.config.json_file_path).parent.mkdir(parents=True, exist_ok=True)
-                self.data = {}
-                logger.info("🆕 Created new JSON storage file")
+            if self._upstash_credentials:
+                from upstash_redis.asyncio import Redis as AsyncUpstashRedis
+                url, token = self._upstash_credentials
+                return AsyncUpstashRedis(url=url, token=token)
+            
+            # Blocking pool: past redis_pool_size, requests wait for a free connection instead of failing
+            import redis.asyncio
+            if self._redis_url:
+                return redis.asyncio.Redis(connection_pool=redis.asyncio.BlockingConnectionPool.from_url(
+                    self._redis_url, max_connections=self.config.redis_pool_size
+                ))
+            pool = getattr(self.redis, 'connection_pool', None)
+            if pool is None or 'host' not in pool.connection_kwargs:
+                return None
+            kwargs = pool.connection_kwargs
+            ssl = 'SSL' in pool.connection_class.__name__
+            return redis.asyncio.Redis(connection_pool=redis.asyncio.BlockingConnectionPool(
+                connection_class=redis.asyncio.SSLConnection if ssl else redis.asyncio.Connection,
+                max_connections=self.config.redis_pool_size,
+                host=kwargs['host'],
+                port=kwargs.get('port', 6379),
+                db=kwargs.get('db', 0),
+                username=kwargs.get('username'),
+                password=kwargs.get('password'),
+                decode_responses=kwargs.get('decode_responses', False)
+            ))
         except Exception as e:
-            logger.warning(f"Failed to load JSON data: {e}")
-            self.data = {}
+            logger.warning(f"Async Redis client unavailable, async calls will use worker threads: {e}")
+            return None
+    
+    def _load_json_data(self):
+        """Open the local tree file store (segment log or legacy JSON file)."""
+        self.file_store = create_tree_file_store(
+            self.config.file_store,
+            self.config.json_file_path,
+            segment_dir=self.config.segment_dir,
+            compaction_interval=self.config.compaction_interval,
+            container_path=self.config.container_path
+        )
     
     def _load_redis_data(self):
         """Initialize Redis connection and load metadata."""
@@ -120,295 +271,356 @@ class OptimizedStorageService:
             logger.error(f"Failed to connect to Redis: {e}")
             raise
     
-    def _save_json_data(self):
-        """Save data to JSON file with error handling."""
-        try:
-            with open(self.config.json_file_path, 'w') as f:
-                json.dump(self.data, f, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to save JSON data: {e}")
-            raise
-    
     def _serialize_tree(self, tree: WordProbabilityTree) -> bytes:
-        """Efficiently serialize probability tree."""
+        """Serialize probability tree with the configured codec (payload carries its codec tag)."""
         try:
-            # Convert to dict for serialization
-            tree_dict = self._tree_to_dict(tree)
-            
-            if self.config.compression:
-                # Use gzip compression for large objects
-                return gzip.compress(pickle.dumps(tree_dict))
-            else:
-                return pickle.dumps(tree_dict)
+            return self.codecs.encode(tree, self.config.codec)
         except Exception as e:
             logger.error(f"Failed to serialize tree: {e}")
             raise
     
     def _deserialize_tree(self, data: bytes) -> WordProbabilityTree:
-        """Efficiently deserialize probability tree."""
+        """Deserialize probability tree with whichever codec produced it."""
         try:
-            if self.config.compression:
-                # Decompress gzipped data
-                tree_dict = pickle.loads(gzip.decompress(data))
-            else:
-                tree_dict = pickle.loads(data)
-            
-            return self._dict_to_tree(tree_dict)
+            return self.codecs.decode(data)
         except Exception as e:
             logger.error(f"Failed to deserialize tree: {e}")
             raise
     
-    def _get_from_storage(self, start_word: str) -> Optional[WordProbabilityTree]:
+    def _encode_redis_value(self, serialized: bytes) -> Union[str, bytes]:
+        """Redis value for a serialized tree: raw bytes when the client is binary safe, else base64 text."""
+        if self._redis_raw_values:
+            return serialized
+        return base64.b64encode(serialized).decode('utf-8')
+    
+    @staticmethod
+    def _redis_value_payload(value: Union[str, bytes]) -> Optional[bytes]:
         """
-        Unified storage retrieval method that handles Redis, JSON, and hybrid modes.
-        For hybrid mode: Redis first, then JSON fallback.
-        Returns deserialized tree or None if not found.
+        Serialized tree bytes held in a Redis value, detecting its encoding per key:
+        raw payload bytes, base64 text, or legacy hex-in-JSON.
         """
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            value = bytes(value)
+            if is_tree_payload(value):
+                return value
+            value = value.decode('utf-8')
+        
+        if isinstance(value, str):
+            if value.startswith('{'):
+                # Legacy JSON (very old format)
+                tree_data = json.loads(value)
+                return bytes.fromhex(tree_data['serialized']) if 'serialized' in tree_data else None
+            return base64.b64decode(value)
+        
+        return None
+    
+    def _decode_redis_value(self, serialized: Union[str, bytes], start_word: str) -> Optional[WordProbabilityTree]:
+        """Decode a Redis tree value in any of the encodings _redis_value_payload accepts."""
         try:
-            if self.config.storage_type == "redis":
-                # Get from Redis only - now uses efficient base64 storage (no metadata)
-                serialized = self.redis.get(f"tree:{start_word}")
-                if serialized is None:
-                    return None
-                
-                # Handle both new base64 format and legacy formats
-                if isinstance(serialized, bytes):
-                    serialized = serialized.decode('utf-8')
-                
-                if isinstance(serialized, str):
-                    # Try to decode as base64 first (new efficient format)
-                    try:
-                        import base64
-                        decoded = base64.b64decode(serialized)
-                        tree = self._deserialize_tree(decoded)
-                        logger.debug(f"📦 Redis base64 storage hit for '{start_word}' (efficient)")
-                        return tree
-                    except Exception:
-                        # Fallback: try to parse as legacy JSON (very old format)
-                        try:
-                            tree_data = json.loads(serialized)
-                            if 'serialized' in tree_data:
-                                serialized_bytes = bytes.fromhex(tree_data['serialized'])
-                                tree = self._deserialize_tree(serialized_bytes)
-                                logger.debug(f"📦 Redis hex storage hit for '{start_word}' (legacy)")
-                                return tree
-                        except (json.JSONDecodeError, KeyError) as e:
-                            logger.error(f"Failed to parse Redis data for '{start_word}': {e}")
-                            return None
-                
-                return None
-                
-            elif self.config.storage_type == "hybrid":
-                # Try Redis first, then JSON fallback - now uses efficient base64 storage (no metadata)
-                serialized = self.redis.get(f"tree:{start_word}")
-                if serialized is not None:
-                    # Handle both new base64 format and legacy formats
-                    if isinstance(serialized, bytes):
-                        serialized = serialized.decode('utf-8')
-                    
-                    if isinstance(serialized, str):
-                        # Try to decode as base64 first (new efficient format)
-                        try:
-                            import base64
-                            decoded = base64.b64decode(serialized)
-                            tree = self._deserialize_tree(decoded)
-                            logger.debug(f"📦 Redis base64 storage hit for '{start_word}' (hybrid mode, efficient)")
-                            return tree
-                        except Exception:
-                            # Fallback: try to parse as legacy JSON (very old format)
-                            try:
-                                tree_data = json.loads(serialized)
-                                if 'serialized' in tree_data:
-                                    serialized_bytes = bytes.fromhex(tree_data['serialized'])
-                                    tree = self._deserialize_tree(serialized_bytes)
-                                    logger.debug(f"📦 Redis hex storage hit for '{start_word}' (hybrid mode, legacy)")
-                                    return tree
-                            except (json.JSONDecodeError, KeyError) as e:
-                                logger.error(f"Failed to parse Redis data for '{start_word}' in hybrid mode: {e}")
-                                # Continue to JSON fallback
-                
-                # Fallback to JSON
-                if start_word in self.data:
-                    tree_data = self.data[start_word]
-                    serialized = bytes.fromhex(tree_data['serialized'])
-                    tree = self._deserialize_tree(serialized)
-                    logger.debug(f"📦 JSON fallback hit for '{start_word}' (hybrid mode)")
-                    return tree
-                
-                return None
-                
-            elif self.config.storage_type == "json":
-                # Get from JSON only
-                if start_word not in self.data:
-                    return None
-                
-                tree_data = self.data[start_word]
-                serialized = bytes.fromhex(tree_data['serialized'])
-                tree = self._deserialize_tree(serialized)
-                logger.debug(f"📦 JSON storage hit for '{start_word}'")
-                return tree
-                
+            payload = self._redis_value_payload(serialized)
+            if payload is not None:
+                return self._deserialize_tree(payload)
+        
         except Exception as e:
-            logger.error(f"Failed to get tree from storage for '{start_word}': {e}")
+            logger.error(f"Failed to parse Redis data for '{start_word}': {e}")
+        
+        return None
+    
+    def _redis_key(self, start_word: str) -> str:
+        """Redis key for a tree built with the current fingerprint."""
+        return f"{self._key_prefix}{start_word}"
+    
+    def _redis_read_keys(self, start_word: str) -> List[str]:
+        """Keys a Redis lookup reads: the current fingerprint's, then the unversioned key while it is still served."""
+        if self._serves_unversioned():
+            return [self._redis_key(start_word), f"tree:{start_word}"]
+        return [self._redis_key(start_word)]
+    
+    def _serves_unversioned(self) -> bool:
+        return self._fingerprint_id is not None and self.config.serve_unversioned
+    
+    def _is_current(self, metadata: Optional[Dict[str, Any]]) -> bool:
+        """True if local tier metadata was written for the current build fingerprint."""
+        return self._fingerprint_id is None or (metadata or {}).get('fingerprint') == self._fingerprint_id
+    
+    def _is_unversioned(self, metadata: Optional[Dict[str, Any]]) -> bool:
+        """True if local tier metadata has no fingerprint (stored before trees were versioned) and is still served."""
+        return self._serves_unversioned() and 'fingerprint' not in (metadata or {})
+    
+    def _note_unversioned(self, tier: str, start_word: str, unversioned: set) -> None:
+        """Count an unversioned tree served from tier, report it in unversioned and queue its start word for a rebuild."""
+        self._tier_stats[tier].record_unversioned()
+        self._queue_prewarm(start_word)
+        unversioned.add(start_word)
+    
+    def _redis_found(self, start_word: str, values: List[Any], unversioned: set) -> Optional[bytes]:
+        """Serialized tree from the values of _redis_read_keys (current key first)."""
+        for position, value in enumerate(values):
+            payload = self._redis_value_payload(value) if value is not None else None
+            if payload is not None:
+                if position:
+                    self._note_unversioned("redis", start_word, unversioned)
+                return payload
+        return None
+    
+    def _local_store(self, tier: str):
+        return self.sqlite_store if tier == "sqlite" else self.file_store
+    
+    @staticmethod
+    def _local_entry(store, start_word: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """(payload, metadata) from a local store, in one read where the store supports it."""
+        get_entry = getattr(store, 'get_entry', None)
+        if get_entry is not None:
+            return get_entry(start_word)
+        serialized = store.get_serialized(start_word)
+        return (serialized, store.get_metadata(start_word) or {}) if serialized is not None else None
+    
+    def _tier_get(self, tier: str, start_word: str, stale: List[str], unversioned: set) -> Optional[bytes]:
+        """
+        Serialized tree from one persistent tier (one round trip for Redis).
+        Local entries built with another fingerprint are reported in stale and treated as missing;
+        entries stored without one are reported in unversioned and returned.
+        """
+        if tier == "redis":
+            keys = self._redis_read_keys(start_word)
+            values = self.redis.mget(*keys) if len(keys) > 1 else [self.redis.get(keys[0])]
+            return self._redis_found(start_word, values, unversioned)
+        store = self._local_store(tier)
+        if self._fingerprint_id is None:
+            return store.get_serialized(start_word)
+        entry = self._local_entry(store, start_word)
+        if entry is None:
             return None
+        if self._is_unversioned(entry[1]):
+            self._note_unversioned(tier, start_word, unversioned)
+            return entry[0]
+        if not self._is_current(entry[1]):
+            self._tier_stats[tier].record_stale()
+            stale.append(start_word)
+            return None
+        return entry[0]
+    
+    def _read_through(self, start_word: str, serialized: bytes, missed: List[str], versioned: bool) -> None:
+        """Copy a tree found further down the chain into the local SQLite tier if it missed there."""
+        if "sqlite" in missed:
+            try:
+                self.sqlite_store.put_serialized(start_word, serialized, self._file_metadata(serialized, versioned))
+            except Exception as e:
+                logger.warning(f"SQLite read-through failed for '{start_word}': {e}")
+    
+    def _tier_lookup(self, tier: str, start_word: str, payload: Optional[bytes], started: float,
+                     missed: List[str], unversioned: set) -> Optional[WordProbabilityTree]:
+        """Decode a tier's payload, record hit/miss and fetch latency (excluding decode), read through on a hit."""
+        elapsed = time.perf_counter() - started
+        tree = self._deserialize_tree(payload) if payload is not None else None
+        self._tier_stats[tier].record(tree is not None, elapsed)
+        if tree is None:
+            missed.append(tier)
+        else:
+            logger.debug(f"📦 {tier} tier hit for '{start_word}'")
+            self._read_through(start_word, payload, missed, versioned=not unversioned)
+        return tree
+    
+    def _get_from_storage(self, start_word: str) -> Tuple[Optional[WordProbabilityTree], Optional[str]]:
+        """
+        Walk the persistent tiers in order (e.g. sqlite -> redis -> file), stopping
+        at the first hit and copying it into faster local tiers that missed.
+        Issues at most one Redis round trip.
+        
+        Returns:
+            (tree, source_tier) with source_tier "sqlite", "redis" or "file", or (None, None)
+            if not found (trees built with another fingerprint are not found, but queued for prewarming). If a tier failed and no other tier had the tree, the error
+            propagates so callers can tell it apart from a miss.
+        """
+        missed, stale, unversioned, error = [], [], set(), None
+        for tier in self._storage_tiers:
+            started = time.perf_counter()
+            try:
+                payload = self._tier_get(tier, start_word, stale, unversioned)
+                tree = self._tier_lookup(tier, start_word, payload, started, missed, unversioned)
+            except Exception as e:
+                self._tier_stats[tier].record_error(time.perf_counter() - started)
+                logger.warning(f"{tier} tier lookup failed for '{start_word}': {e}")
+                error = e
+                continue
+            if tree is not None:
+                return tree, tier
+        
+        if error is not None:
+            raise error
+        if stale:
+            self._queue_prewarm(start_word)
+        return None, None
+    
+    async def _aget_from_storage(self, start_word: str) -> Tuple[Optional[WordProbabilityTree], Optional[str]]:
+        """Async _get_from_storage: the Redis tier is awaited on the async client, local tiers run inline."""
+        missed, stale, unversioned, error = [], [], set(), None
+        for tier in self._storage_tiers:
+            started = time.perf_counter()
+            try:
+                if tier == "redis":
+                    keys = self._redis_read_keys(start_word)
+                    values = await self.aredis.mget(*keys) if len(keys) > 1 else [await self.aredis.get(keys[0])]
+                    payload = self._redis_found(start_word, values, unversioned)
+                else:
+                    payload = self._tier_get(tier, start_word, stale, unversioned)
+                tree = self._tier_lookup(tier, start_word, payload, started, missed, unversioned)
+            except Exception as e:
+                self._tier_stats[tier].record_error(time.perf_counter() - started)
+                logger.warning(f"{tier} tier lookup failed for '{start_word}': {e}")
+                error = e
+                continue
+            if tree is not None:
+                return tree, tier
+        
+        if error is not None:
+            raise error
+        if stale:
+            self._queue_prewarm(start_word)
+        return None, None
+    
+    def _get_from_memory(self, start_word: str) -> Optional[WordProbabilityTree]:
+        """Memory tier: the LRU cache, then trees still waiting in the write-behind queue."""
+        started = time.perf_counter()
+        tree = self._memory_cache.get(start_word)
+        if tree is None:
+            tree = self._get_queued(start_word)
+        self._tier_stats["memory"].record(tree is not None, time.perf_counter() - started)
+        if tree is not None:
+            logger.debug(f"⚡ Memory cache hit for '{start_word}'")
+        return tree
+    
+    def _get_queued(self, start_word: str) -> Optional[WordProbabilityTree]:
+        """Tree stored but not yet persisted by the write-behind queue (the cache may have declined it)."""
+        if self._write_queue is None:
+            return None
+        return self._write_queue.get(start_word)
+    
+    def _is_known_missing(self, start_word: str) -> bool:
+        """Check the negative cache, dropping the entry once its TTL has passed."""
+        expires_at = self._negative_cache.get(start_word)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            self._negative_cache.pop(start_word, None)
+            return False
+        return True
     
-    def _cache_tree_result(self, start_word: str, tree: WordProbabilityTree) -> None:
+    def _remember_missing(self, start_word: str) -> None:
+        """Record a confirmed miss so repeated lookups skip the storage round trip."""
+        if self.config.negative_cache_ttl <= 0:
+            return
+        now = time.monotonic()
+        if len(self._negative_cache) >= self.config.cache_size:
+            # Prune expired entries; if still full, forget the oldest
+            self._negative_cache = {w: t for w, t in self._negative_cache.items() if t > now}
+            if len(self._negative_cache) >= self.config.cache_size:
+                self._negative_cache.pop(next(iter(self._negative_cache)))
+        self._negative_cache[start_word] = now + self.config.negative_cache_ttl
+    
+    def _cache_tree_result(self, start_word: str, tree: WordProbabilityTree, admit: bool = False) -> None:
         """
         Unified caching logic for storing trees in memory cache.
-        Maintains cache size and updates statistics.
+        The cache enforces entry and byte limits and decides admission,
+        unless admit is set (prefetched trees, requested next).
         """
         try:
-            # Cache in memory for future fast access
-            self._memory_cache[start_word] = tree
-            
-            # Maintain cache size
-            if len(self._memory_cache) > self.config.cache_size:
-                # Remove oldest entry (simple LRU)
-                oldest_key = next(iter(self._memory_cache))
-                del self._memory_cache[oldest_key]
+            # Size is estimated once here, right after deserialization or build
+            self._memory_cache.put(start_word, tree, estimate_tree_size(tree), admit=admit)
                 
         except Exception as e:
             logger.error(f"Failed to cache tree for '{start_word}': {e}")
     
     def _storage_exists(self, start_word: str) -> bool:
-        """Check if tree exists in storage."""
+        """Check if tree exists in any persistent tier."""
         try:
-            if self.config.storage_type == "redis":
-                # Check Redis - use efficient base64 storage
-                result = self.redis.get(f"tree:{start_word}")
-                return result is not None
-                
-            elif self.config.storage_type == "hybrid":
-                # Check Redis first, then JSON
-                result = self.redis.get(f"tree:{start_word}")
-                if result is not None:
-                    return True
-                return start_word in self.data
-                
-            elif self.config.storage_type == "json":
-                return start_word in self.data
-                
+            for tier in self._storage_tiers:
+                if tier == "redis":
+                    # EXISTS avoids transferring the tree itself
+                    if self.redis.exists(*self._redis_read_keys(start_word)):
+                        return True
+                elif self._fingerprint_id is None:
+                    if start_word in self._local_store(tier):
+                        return True
+                else:
+                    metadata = self._local_store(tier).get_metadata(start_word)
+                    if metadata is not None and (self._is_current(metadata) or self._is_unversioned(metadata)):
+                        return True
             return False
             
         except Exception as e:
             logger.error(f"Failed to check existence for '{start_word}': {e}")
             return False
     
+    def _write_tiers(self, entries: List[Tuple[str, bytes]], include_redis: bool = True) -> None:
+        """
+        Write-through: store serialized trees in every persistent tier of the chain
+        (SQLite in one transaction, Redis in one pipeline, then the file store).
+        """
+        if "sqlite" in self._storage_tiers:
+            self.sqlite_store.put_many((word, payload, self._file_metadata(payload)) for word, payload in entries)
+        if include_redis and "redis" in self._storage_tiers:
+            pipe = open_pipeline(self.redis)
+            for word, payload in entries:
+                self._add_redis_tree(pipe, word, payload)
+            pipe.execute()
+        if "file" in self._storage_tiers:
+            self.file_store.put_many((word, payload, self._file_metadata(payload)) for word, payload in entries)
+    
     def _serialize_and_store(self, start_word: str, tree: WordProbabilityTree) -> None:
         """
-        Unified serialization and storage method that handles Redis, JSON, and hybrid modes.
-        For hybrid mode: stores in both Redis and JSON.
+        Unified serialization and storage method: write-through to every tier in the chain.
+        For hybrid mode: stores in both Redis and JSON (plus SQLite when configured).
         """
         try:
             # Serialize the tree once
             serialized = self._serialize_tree(tree)
-            
-            if self.config.storage_type == "redis":
-                # Store in Redis with compression - use efficient base64 storage (no metadata overhead)
-                import base64
-                encoded_data = base64.b64encode(serialized).decode('utf-8')
-                self.redis.set(f"tree:{start_word}", encoded_data)
-                logger.info(f"💾 Stored tree for '{start_word}' in Redis (base64, {len(serialized)} bytes)")
-                
-            elif self.config.storage_type == "hybrid":
-                # Store in both Redis and JSON for hybrid mode - ALWAYS use efficient base64 storage
-                # Upstash Redis supports .set() but not binary data, so encode as base64
-                import base64
-                encoded_data = base64.b64encode(serialized).decode('utf-8')
-                # Store in Redis as base64 (no metadata overhead)
-                self.redis.set(f"tree:{start_word}", encoded_data)
-                # Store in JSON with hex (maintain backward compatibility)
-                self.data[start_word] = {
-                    'serialized': serialized.hex(),  # Store as hex string for JSON compatibility
-                    'metadata': {
-                        'size_bytes': len(serialized),
-                        'compressed': self.config.compression,
-                        'stored_at': str(np.datetime64('now'))
-                    }
-                }
-                self._save_json_data()
-                logger.info(f"💾 Stored tree for '{start_word}' in both Redis and JSON ({len(serialized)} bytes)")
-                
-            elif self.config.storage_type == "json":
-                # Store in JSON (serialized as hex string)
-                self.data[start_word] = {
-                    'serialized': serialized.hex(),  # Store as hex string
-                    'metadata': {
-                        'size_bytes': len(serialized),
-                        'compressed': self.config.compression,
-                        'stored_at': str(np.datetime64('now'))
-                    }
-                }
-                self._save_json_data()
-                logger.info(f"💾 Stored tree for '{start_word}' in JSON ({len(serialized)} bytes)")
+            # Raw bytes for binary-safe clients, base64 for Upstash REST (no metadata overhead)
+            self._write_tiers([(start_word, serialized)])
+            logger.info(f"💾 Stored tree for '{start_word}' in {' + '.join(self._storage_tiers)} ({len(serialized)} bytes)")
                 
         except Exception as e:
             logger.error(f"Failed to serialize and store tree for '{start_word}': {e}")
             raise
     
-    def _tree_to_dict(self, tree: WordProbabilityTree) -> Dict:
-        """Convert probability tree to serializable dict."""
-        return {
-            'frq': tree.frq,
-            'ana': self._node_to_dict(tree.ana),
-            'olo': {k: self._node_to_dict(v) for k, v in tree.olo.items()},
-            'rhy': {k: self._node_to_dict(v) for k, v in tree.rhy.items()}
-        }
+    def _redis_tree_pipeline(self, client, start_word: str, serialized: bytes):
+        """Pipeline that SETs a tree and records its content hash in the sync manifest."""
+        return self._add_redis_tree(open_pipeline(client), start_word, serialized)
     
-    def _node_to_dict(self, node: ProbabilityNode) -> Dict:
-        """Convert probability node to serializable dict."""
-        return {
-            'val': node.val,
-            'prb': {str(k): v if isinstance(v, float) else self._child_to_dict(v) 
-                   for k, v in node.prb.items()},
-            'dat': {
-                'org_max': node.dat.org_max,
-                'val_prb_sum': node.dat.val_prb_sum,
-                'max_dep': node.dat.max_dep
-            }
-        }
+    def _add_redis_tree(self, pipe, start_word: str, serialized: bytes):
+        pipe.set(self._redis_key(start_word), self._encode_redis_value(serialized))
+        pipe.hset(self._manifest_key, start_word, content_hash(serialized))
+        return pipe
     
-    def _child_to_dict(self, child: ChildNode) -> Dict:
-        """Convert child node to serializable dict."""
-        return {
-            'probability': child.probability,
-            'remaining_sequences': child.remaining_sequences,
-            'child_prb': self._node_to_dict(child.child_prb)
-        }
+    def _persist_batch(self, items: List[Tuple[str, WordProbabilityTree]]) -> None:
+        """
+        Write-behind flush: serialize a batch of trees and write them through every
+        tier (one SQLite transaction, one Redis pipeline, file store appends).
+        """
+        serialized = [(word, self._serialize_tree(tree)) for word, tree in items]
+        self._write_tiers(serialized)
+        logger.info(f"💾 Persisted {len(serialized)} queued trees ({' + '.join(self._storage_tiers)}, "
+                    f"{sum(len(payload) for _, payload in serialized)} bytes)")
     
-    def _dict_to_tree(self, tree_dict: Dict) -> WordProbabilityTree:
-        """Convert dict back to probability tree."""
-        return WordProbabilityTree(
-            frq=tree_dict['frq'],
-            ana=self._dict_to_node(tree_dict['ana']),
-            olo={k: self._dict_to_node(v) for k, v in tree_dict['olo'].items()},
-            rhy={k: self._dict_to_node(v) for k, v in tree_dict['rhy'].items()}
-        )
+    def _set_redis_tree(self, start_word: str, serialized: bytes) -> None:
+        """Write a tree and its manifest entry in one round trip (so tree sync won't re-push it)."""
+        self._redis_tree_pipeline(self.redis, start_word, serialized).execute()
     
-    def _dict_to_node(self, node_dict: Dict) -> ProbabilityNode:
-        """Convert dict back to probability node."""
-        # Reconstruct sparse array
-        prb = {}
-        for k_str, v in node_dict['prb'].items():
-            k = int(k_str)
-            if isinstance(v, float):
-                prb[k] = v
-            else:
-                prb[k] = ChildNode(
-                    probability=v['probability'],
-                    remaining_sequences=v['remaining_sequences'],
-                    child_prb=self._dict_to_node(v['child_prb'])
-                )
-        
-        return ProbabilityNode(
-            val=node_dict['val'],
-            prb=prb,
-            dat=ProbabilityMetadata(
-                org_max=node_dict['dat']['org_max'],
-                val_prb_sum=node_dict['dat']['val_prb_sum'],
-                max_dep=node_dict['dat']['max_dep']
-            )
-        )
+    def _redis_encoding_name(self) -> str:
+        return "raw" if self._redis_raw_values else "base64"
+    
+    def _file_metadata(self, serialized: bytes, versioned: bool = True) -> Dict[str, Any]:
+        """Metadata stored next to each tree in the local file store (versioned=False: copied from an unversioned entry)."""
+        codec = self.codecs.codec_for(serialized)  # read-through payloads may predate the configured codec
+        metadata = {
+            'size_bytes': len(serialized),
+            'compressed': codec not in ("pickle_raw", "array", "legacy_pickle"),
+            'codec': codec,
+            'stored_at': str(np.datetime64('now'))
+        }
+        if self._fingerprint_id is not None and versioned:
+            metadata['fingerprint'] = self._fingerprint_id
+        return metadata
     
     def store_probability_tree(self, start_word: str, tree: WordProbabilityTree) -> None:
         """
@@ -419,8 +631,15 @@ class OptimizedStorageService:
             tree: WordProbabilityTree to store
         """
         try:
-            # Update in-memory cache
-            self._memory_cache[start_word] = tree
+            # Update in-memory cache (subject to the same limits as reads)
+            self._negative_cache.pop(start_word, None)
+            self._prewarm_queue.pop(start_word, None)
+            self._cache_tree_result(start_word, tree)
+            
+            if self._write_queue is not None:
+                # Persisted by the background worker; readable from the queue until then
+                self._write_queue.put(start_word, tree)
+                return
             
             # Use the unified serialization and storage method
             self._serialize_and_store(start_word, tree)
@@ -429,38 +648,296 @@ class OptimizedStorageService:
             logger.error(f"Failed to store tree for '{start_word}': {e}")
             raise
     
-    def get_probability_tree(self, start_word: str) -> Optional[WordProbabilityTree]:
+    def fetch_tree(self, start_word: str) -> Tuple[Optional[WordProbabilityTree], Optional[str]]:
         """
-        Get probability tree with optimized caching.
+        Get probability tree and the tier that served it, in at most one storage round trip.
         
         Args:
             start_word: The word to get tree for
             
         Returns:
-            WordProbabilityTree or None if not found
+            (tree, source_tier) where source_tier is "memory" or a persistent tier name;
+            (None, None) if the tree is not stored (misses are negatively cached)
         """
         try:
             # Check in-memory cache first (fastest)
-            if start_word in self._memory_cache:
-                self._cache_hits += 1
-                logger.debug(f"⚡ Memory cache hit for '{start_word}'")
-                return self._memory_cache[start_word]
+            tree = self._get_from_memory(start_word)
+            if tree is not None:
+                return tree, "memory"
             
-            self._cache_misses += 1
+            if self._is_known_missing(start_word):
+                self._negative_hits += 1
+                return None, None
             
             # Use the unified retrieval method
-            tree = self._get_from_storage(start_word)
+            tree, source = self._get_from_storage(start_word)
             
             # Cache the result if found
             if tree is not None:
                 self._cache_tree_result(start_word, tree)
-                return tree
+                return tree, source
             
-            return None
+            self._remember_missing(start_word)
+            return None, None
             
         except Exception as e:
+            # Errors are not negatively cached; the next call retries storage
             logger.error(f"Failed to get tree for '{start_word}': {e}")
-            return None
+            return None, None
+    
+    def get_probability_tree(self, start_word: str) -> Optional[WordProbabilityTree]:
+        """
+        Get probability tree with optimized caching.
+        
+        Args:
+            start_word: The word to get tree for
+            
+        Returns:
+            WordProbabilityTree or None if not found
+        """
+        return self.fetch_tree(start_word)[0]
+    
+    def prefetch_trees(self, start_words: List[str], batch_size: int = 100) -> Dict[str, int]:
+        """
+        Bulk-load trees into the memory cache ahead of use.
+        
+        Each persistent tier is asked once for everything still missing: SQLite
+        in one IN query, Redis with one MGET per batch, the file store per word.
+        Trees found below the SQLite tier are read through into it, and words
+        that are nowhere in storage are negatively cached.
+        
+        Args:
+            start_words: Words whose trees are likely to be needed soon
+            batch_size: Maximum keys per MGET
+            
+        Returns:
+            Dict with counts of 'requested', 'loaded', 'cached' (already in memory or known
+            missing) and 'missing'
+        """
+        pending, stats = self._plan_prefetch(start_words)
+        
+        try:
+            fill, stale, unversioned = [], set(), set()
+            for tier in self._storage_tiers:
+                if not pending:
+                    break
+                started = time.perf_counter()
+                if tier == "redis":
+                    found = {}
+                    for batch in self._prefetch_batches(pending, batch_size):
+                        found.update(self._redis_payloads(batch, self.redis.mget(*self._redis_batch_keys(batch)), unversioned))
+                else:
+                    found = self._tier_get_many(tier, pending, stale, unversioned)
+                pending = self._cache_prefetched(tier, pending, found, time.perf_counter() - started, stats, fill)
+            
+            self._finish_prefetch(pending, fill, stale, unversioned, stats)
+        
+        except Exception as e:
+            logger.warning(f"Tree prefetch failed: {e}")
+        
+        logger.debug(f"📥 Prefetched trees: {stats}")
+        return stats
+    
+    def _plan_prefetch(self, start_words: List[str]) -> Tuple[List[str], Dict[str, int]]:
+        """Deduplicate prefetch words and drop those already cached or known missing."""
+        words = [w for w in dict.fromkeys(start_words) if w]
+        pending = [w for w in words if w not in self._memory_cache and self._get_queued(w) is None
+                   and not self._is_known_missing(w)]
+        return pending, {'requested': len(words), 'loaded': 0, 'cached': len(words) - len(pending), 'missing': 0}
+    
+    @staticmethod
+    def _prefetch_batches(words: List[str], batch_size: int) -> List[List[str]]:
+        return [words[i:i + batch_size] for i in range(0, len(words), batch_size)]
+    
+    def _redis_batch_keys(self, batch: List[str]) -> List[str]:
+        """MGET keys for a prefetch batch: _redis_read_keys of each word, in order."""
+        return [key for word in batch for key in self._redis_read_keys(word)]
+    
+    def _redis_payloads(self, batch: List[str], values: List[Any], unversioned: set) -> Dict[str, bytes]:
+        """Serialized trees from one MGET reply (keys from _redis_batch_keys), by word."""
+        found = {}
+        width = len(values) // len(batch) if batch else 1
+        for i, word in enumerate(batch):
+            payload = self._redis_found(word, values[i * width:(i + 1) * width], unversioned)
+            if payload is not None:
+                found[word] = payload
+        return found
+    
+    def _tier_get_many(self, tier: str, words: List[str], stale: set, unversioned: set) -> Dict[str, bytes]:
+        """Serialized trees for the stored subset of words from a local tier (current fingerprint or unversioned)."""
+        if self._fingerprint_id is None:
+            if tier == "sqlite":
+                return self.sqlite_store.get_many(words)
+            entries = {word: self.file_store.get_serialized(word) for word in words}
+            return {word: payload for word, payload in entries.items() if payload is not None}
+        
+        if tier == "sqlite":
+            entries = self.sqlite_store.get_many(words, with_metadata=True)
+        else:
+            entries = {word: self._local_entry(self.file_store, word) for word in words}
+        found = {}
+        for word, entry in entries.items():
+            if entry is None:
+                continue
+            if self._is_current(entry[1]):
+                found[word] = entry[0]
+            elif self._is_unversioned(entry[1]):
+                self._note_unversioned(tier, word, unversioned)
+                found[word] = entry[0]
+            else:
+                self._tier_stats[tier].record_stale()
+                stale.add(word)
+        return found
+    
+    def _cache_prefetched(self, tier: str, words: List[str], found: Dict[str, bytes], elapsed: float,
+                          stats: Dict[str, int], fill: List[Tuple[str, bytes]]) -> List[str]:
+        """
+        Cache the trees one tier returned for a prefetch; returns the words it did not have.
+        The tier's lookup time is split evenly across the words asked for.
+        """
+        remaining = []
+        per_word = elapsed / len(words)
+        for word in words:
+            payload = found.get(word)
+            tree = None
+            if payload is not None:
+                try:
+                    tree = self._deserialize_tree(payload)
+                except Exception as e:
+                    logger.error(f"Failed to decode {tier} tree for '{word}': {e}")
+            self._tier_stats[tier].record(tree is not None, per_word)
+            if tree is None:
+                remaining.append(word)
+                continue
+            self._cache_tree_result(word, tree, admit=True)
+            stats['loaded'] += 1
+            if tier != "sqlite" and "sqlite" in self._storage_tiers[:self._storage_tiers.index(tier)]:
+                fill.append((word, payload))
+        return remaining
+    
+    def _finish_prefetch(self, missing: List[str], fill: List[Tuple[str, bytes]], stale: set, unversioned: set,
+                         stats: Dict[str, int]) -> None:
+        """Read prefetched trees through into SQLite, negatively cache true misses and queue stale ones."""
+        if fill:
+            try:
+                self.sqlite_store.put_many((word, payload, self._file_metadata(payload, word not in unversioned))
+                                           for word, payload in fill)
+            except Exception as e:
+                logger.warning(f"SQLite read-through of {len(fill)} prefetched trees failed: {e}")
+        for word in missing:
+            self._remember_missing(word)
+            stats['missing'] += 1
+            if word in stale:
+                self._queue_prewarm(word)
+    
+    # ---- Async interface ------------------------------------------------
+    # Redis round trips are awaited on the pooled async client, so concurrent
+    # requests overlap instead of queueing behind one blocking socket. Without
+    # an async client the sync methods run in worker threads. The async client
+    # is bound to the event loop that first uses it (the app's loop).
+    
+    async def afetch_tree(self, start_word: str) -> Tuple[Optional[WordProbabilityTree], Optional[str]]:
+        """
+        Async fetch_tree: (tree, source_tier) or (None, None), without blocking the event loop on Redis.
+        """
+        try:
+            tree = self._get_from_memory(start_word)
+            if tree is not None:
+                return tree, "memory"
+            
+            if self._is_known_missing(start_word):
+                self._negative_hits += 1
+                return None, None
+            
+            if self.aredis is None or "redis" not in self._storage_tiers:
+                tree, source = await asyncio.to_thread(self._get_from_storage, start_word)
+            else:
+                tree, source = await self._aget_from_storage(start_word)
+            
+            if tree is not None:
+                self._cache_tree_result(start_word, tree)
+                return tree, source
+            
+            self._remember_missing(start_word)
+            return None, None
+        
+        except Exception as e:
+            # Errors are not negatively cached; the next call retries storage
+            logger.error(f"Failed to get tree for '{start_word}': {e}")
+            return None, None
+    
+    async def aget_probability_tree(self, start_word: str) -> Optional[WordProbabilityTree]:
+        """Async get_probability_tree."""
+        return (await self.afetch_tree(start_word))[0]
+    
+    async def astore_probability_tree(self, start_word: str, tree: WordProbabilityTree) -> None:
+        """
+        Async store_probability_tree: the Redis SET is awaited, local tier writes run in a worker thread.
+        """
+        try:
+            self._negative_cache.pop(start_word, None)
+            self._prewarm_queue.pop(start_word, None)
+            self._cache_tree_result(start_word, tree)
+            
+            if self._write_queue is not None:
+                self._write_queue.put(start_word, tree)
+                return
+            
+            if self.aredis is None:
+                await asyncio.to_thread(self._serialize_and_store, start_word, tree)
+                return
+            
+            serialized = self._serialize_tree(tree)
+            if "redis" in self._storage_tiers:
+                await self._redis_tree_pipeline(self.aredis, start_word, serialized).execute()
+            await asyncio.to_thread(self._write_tiers, [(start_word, serialized)], False)
+            logger.info(f"💾 Stored tree for '{start_word}' in {' + '.join(self._storage_tiers)} "
+                        f"(async, {len(serialized)} bytes)")
+            
+        except Exception as e:
+            logger.error(f"Failed to store tree for '{start_word}': {e}")
+            raise
+    
+    async def aprefetch(self, start_words: List[str], batch_size: int = 100) -> Dict[str, int]:
+        """
+        Async prefetch_trees: all MGET batches are in flight at once on the connection pool.
+        """
+        if self.aredis is None or "redis" not in self._storage_tiers:
+            return await asyncio.to_thread(self.prefetch_trees, start_words, batch_size)
+        
+        pending, stats = self._plan_prefetch(start_words)
+        
+        try:
+            fill, stale, unversioned = [], set(), set()
+            for tier in self._storage_tiers:
+                if not pending:
+                    break
+                started = time.perf_counter()
+                if tier == "redis":
+                    found = {}
+                    batches = self._prefetch_batches(pending, batch_size)
+                    replies = await asyncio.gather(*(self.aredis.mget(*self._redis_batch_keys(batch)) for batch in batches))
+                    for batch, values in zip(batches, replies):
+                        found.update(self._redis_payloads(batch, values, unversioned))
+                else:
+                    found = self._tier_get_many(tier, pending, stale, unversioned)
+                pending = self._cache_prefetched(tier, pending, found, time.perf_counter() - started, stats, fill)
+            
+            self._finish_prefetch(pending, fill, stale, unversioned, stats)
+        
+        except Exception as e:
+            logger.warning(f"Tree prefetch failed: {e}")
+        
+        logger.debug(f"📥 Prefetched trees: {stats}")
+        return stats
+    
+    async def aclose(self) -> None:
+        """Persist queued trees, close the async Redis client's pool and release local file store resources."""
+        await asyncio.to_thread(self.close)
+        if self.aredis is not None and self.config.async_redis_connection is None:
+            close = getattr(self.aredis, 'aclose', None) or getattr(self.aredis, 'close', None)
+            if close is not None:
+                await close()
     
     def has_probability_tree(self, start_word: str) -> bool:
         """
@@ -473,41 +950,147 @@ class OptimizedStorageService:
             True if tree exists, False otherwise
         """
         # Check memory cache first
-        if start_word in self._memory_cache:
+        if start_word in self._memory_cache or self._get_queued(start_word) is not None:
             return True
+        if self._is_known_missing(start_word):
+            return False
         
         # Use the unified existence check
         return self._storage_exists(start_word)
     
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache performance statistics."""
-        total_requests = self._cache_hits + self._cache_misses
-        hit_rate = self._cache_hits / total_requests if total_requests > 0 else 0.0
+        cache = self._memory_cache.stats()
+        total_requests = cache['hits'] + cache['misses']
+        hit_rate = cache['hits'] / total_requests if total_requests > 0 else 0.0
         
         return {
-            'memory_cache_size': len(self._memory_cache),
-            'cache_hits': self._cache_hits,
-            'cache_misses': self._cache_misses,
+            'memory_cache_size': cache['entries'],
+            'memory_cache_max_entries': cache['max_entries'],
+            'memory_cache_bytes': cache['bytes'],
+            'memory_cache_max_bytes': cache['max_bytes'],
+            'cache_policy': cache['policy'],
+            'cache_hits': cache['hits'],
+            'cache_misses': cache['misses'],
+            'cache_evictions': cache['evictions'],
+            'cache_rejections': cache['rejections'],
+            'negative_cache_size': len(self._negative_cache),
+            'negative_cache_hits': self._negative_hits,
             'hit_rate': hit_rate,
-            'total_requests': total_requests
+            'total_requests': total_requests,
+            'write_queue': self.get_write_queue_stats(),
+            'tree_fingerprint': self.get_fingerprint_stats()
+        }
+    
+    def _queue_prewarm(self, start_word: str) -> None:
+        """Remember a start word whose stored tree is stale or unversioned, for take_prewarm_words()."""
+        if not self.config.prewarm_stale:
+            return
+        self._prewarm_queue[start_word] = None
+        self._prewarm_queue.move_to_end(start_word)
+        while len(self._prewarm_queue) > self.config.cache_size:
+            self._prewarm_queue.popitem(last=False)
+    
+    def take_prewarm_words(self, limit: int = 10) -> List[str]:
+        """
+        Pop up to limit start words (oldest first) whose stored tree was built with
+        another fingerprint, or without one, and has not been rebuilt yet (storing
+        a tree removes its word from the queue). Unversioned trees keep serving
+        from the cache and storage meanwhile.
+        """
+        words = []
+        while self._prewarm_queue and len(words) < limit:
+            words.append(self._prewarm_queue.popitem(last=False)[0])
+        return words
+    
+    def get_fingerprint_stats(self) -> Dict[str, Any]:
+        """Current build fingerprint, stale and unversioned lookups per tier and prewarm queue depth."""
+        fingerprint = self.config.tree_fingerprint
+        return {
+            'fingerprint': fingerprint.to_dict() if fingerprint is not None else None,
+            'stale_lookups': {tier: stats.stale for tier, stats in self._tier_stats.items() if stats.stale},
+            'unversioned_lookups': {tier: stats.unversioned for tier, stats in self._tier_stats.items() if stats.unversioned},
+            'prewarm_queue_depth': len(self._prewarm_queue)
         }
     
+    def get_write_queue_stats(self) -> Optional[Dict[str, Any]]:
+        """Write-behind queue depth, throughput and flush latency (None when writes are synchronous)."""
+        return self._write_queue.stats() if self._write_queue is not None else None
+    
+    def flush_writes(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every queued tree is persisted.
+        
+        Returns:
+            True if the write-behind queue drained (always True without one)
+        """
+        if self._write_queue is None:
+            return True
+        return self._write_queue.flush(timeout)
+    
     def clear_memory_cache(self):
         """Clear in-memory cache."""
         self._memory_cache.clear()
-        self._cache_hits = 0
-        self._cache_misses = 0
+        self._negative_cache.clear()
+        self._negative_hits = 0
         logger.info("🧹 Memory cache cleared")
     
+    def export_json(self, file_path: str = None) -> int:
+        """
+        Export the local file store in the legacy probability_trees.json format.
+        
+        Args:
+            file_path: Destination file (defaults to config.json_file_path)
+            
+        Returns:
+            Number of trees exported
+        """
+        if file_path is None:
+            file_path = self.config.json_file_path
+        if self.config.file_store in ("json", "lazy_json") and file_path == self.config.json_file_path:
+            return len(self.file_store)
+        return write_legacy_json(file_path, (
+            (word, self.file_store.get_serialized(word), self.file_store.get_metadata(word) or {})
+            for word in self.file_store.words()
+        ))
+    
+    def close(self):
+        """Persist queued trees, then release local file store resources (background compaction, file locks)."""
+        write_queue = getattr(self, '_write_queue', None)
+        if write_queue is not None:
+            if not write_queue.close(timeout=30.0):
+                logger.error(f"Closed with {len(write_queue)} trees still queued")
+        file_store = getattr(self, 'file_store', None)
+        if file_store is not None:
+            file_store.close()
+        sqlite_store = getattr(self, 'sqlite_store', None)
+        if sqlite_store is not None:
+            sqlite_store.close()
+    
     def get_storage_stats(self) -> Dict[str, Any]:
-        """Get storage statistics."""
+        """Get storage statistics, including hits, misses and lookup latency per tier."""
+        stats = self._backend_stats()
+        stats['tier_chain'] = ["memory"] + self._storage_tiers
+        stats['tiers'] = {tier: tier_stats.snapshot() for tier, tier_stats in self._tier_stats.items()}
+        if self.sqlite_store is not None:
+            sqlite_size = self.sqlite_store.size_bytes()
+            stats['sqlite'] = {
+                'path': self.sqlite_store.file_path,
+                'total_trees': len(self.sqlite_store),
+                'file_size_bytes': sqlite_size,
+                'file_size_mb': sqlite_size / (1024 * 1024)
+            }
+        return stats
+    
+    def _backend_stats(self) -> Dict[str, Any]:
+        """Redis / file store statistics for the configured storage_type."""
         if self.config.storage_type == "redis":
-            # Get Redis stats - use efficient base64 storage
             try:
                 # Get basic Redis info
                 info = self.redis.info()
                 return {
                     'storage_type': 'redis',
+                    'redis_value_encoding': self._redis_encoding_name(),
                     'connected_clients': info.get('connected_clients', 'unknown'),
                     'used_memory_human': info.get('used_memory_human', 'unknown'),
                     'total_commands_processed': info.get('total_commands_processed', 'unknown')
@@ -519,13 +1102,14 @@ class OptimizedStorageService:
                     'error': str(e)
                 }
         elif self.config.storage_type == "json":
-            # Get JSON file stats
-            file_size = os.path.getsize(self.config.json_file_path) if os.path.exists(self.config.json_file_path) else 0
+            # Get local file store stats
+            file_size = self.file_store.size_bytes()
             return {
                 'storage_type': 'json',
+                'file_store': self.config.file_store,
                 'file_size_bytes': file_size,
                 'file_size_mb': file_size / (1024 * 1024),
-                'total_trees': len(self.data)
+                'total_trees': len(self.file_store)
             }
         elif self.config.storage_type == "hybrid":
             # Get hybrid stats
@@ -534,99 +1118,49 @@ class OptimizedStorageService:
                 info = self.redis.info()
                 redis_stats = {
                     'redis_connected_clients': info.get('connected_clients', 'unknown'),
-                    'redis_used_memory_human': info.get('used_memory_human', 'unknown')
+                    'redis_used_memory_human': info.get('used_memory_human', 'unknown'),
+                    'redis_value_encoding': self._redis_encoding_name()
                 }
             except Exception as e:
                 redis_stats = {'redis_error': str(e)}
             
-            file_size = os.path.getsize(self.config.json_file_path) if os.path.exists(self.config.json_file_path) else 0
+            file_size = self.file_store.size_bytes()
             return {
                 'storage_type': 'hybrid',
                 'redis': redis_stats,
+                'file_store': self.config.file_store,
                 'json_file_size_bytes': file_size,
                 'json_file_size_mb': file_size / (1024 * 1024),
-                'total_trees': len(self.data)
+                'total_trees': len(self.file_store)
             }
         else:
             return {'storage_type': 'unknown'}
     
     async def populate_from_file(self, file_path: str) -> Dict[str, int]:
         """
-        Populate storage with pre-compressed probability trees from JSON file.
-        Uses efficient base64 storage for Redis operations.
+        Incrementally sync trees from a probability_trees.json (or this service's
+        file store, when file_path is its own JSON path) into Redis.
+        
+        Only trees whose content hash differs from the Redis manifest are pushed,
+        in pipelined batches; see services.tree_sync.TreeSyncEngine.
         
         Args:
             file_path: Path to probability_trees.json file (contains pre-compressed data)
             
         Returns:
-            Dict with counts of new trees added and total processed
+            Dict with counts of new or changed trees pushed and total processed,
+            plus the full sync statistics
         """
         try:
             if not os.path.exists(file_path):
                 logger.warning(f"Probability trees file not found: {file_path}")
                 return {"new_trees_added": 0, "total_processed": 0}
             
-            # Load the JSON file (this decompresses, but we'll preserve compression efficiently)
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-            
-            new_trees = 0
-            total_trees = len(data)
-            
-            # Process trees based on storage type
-            if self.config.storage_type in ["redis", "hybrid"]:
-                # Use concurrent async operations for efficiency
-                import asyncio
-                
-                # Collect all trees that need to be added to Redis
-                trees_to_add = []
-                for word, tree_data in data.items():
-                    # Check if tree already exists in Redis
-                    try:
-                        result = self.redis.get(f"tree:{word}")
-                        tree_exists = result is not None
-                        
-                        if not tree_exists:
-                            # Store the tree efficiently with base64 encoding (no metadata overhead)
-                            if isinstance(tree_data, dict) and 'serialized' in tree_data:
-                                # Extract the compressed binary data
-                                serialized_bytes = bytes.fromhex(tree_data['serialized'])
-                                # Store as base64 string directly (no metadata overhead)
-                                import base64
-                                encoded_data = base64.b64encode(serialized_bytes).decode('utf-8')
-                                trees_to_add.append((word, encoded_data))
-                                logger.debug(f"Queued efficient base64 tree for '{word}' (no metadata)")
-                            else:
-                                logger.warning(f"Tree data for '{word}' is not in expected format")
-                                continue
-                    except Exception as e:
-                        logger.warning(f"Error checking tree existence for '{word}': {e}")
-                        continue
-                
-                # Execute Redis operations concurrently for efficiency
-                if trees_to_add:
-                    # Create async tasks for all Redis operations
-                    async def store_tree(word: str, encoded_data: str):
-                        try:
-                            # Store base64 data directly (no metadata overhead)
-                            await asyncio.to_thread(self.redis.set, f"tree:{word}", encoded_data)
-                            logger.debug(f"Stored tree '{word}' with efficient base64 storage (no metadata)")
-                            return True
-                        except Exception as e:
-                            logger.error(f"Failed to store tree '{word}': {e}")
-                            return False
-                    
-                    # Execute all operations concurrently
-                    tasks = [store_tree(word, encoded_data) for word, encoded_data in trees_to_add]
-                    results = await asyncio.gather(*tasks, return_exceptions=True)
-                    
-                    # Count successful operations
-                    new_trees = sum(1 for result in results if result is True)
-                    logger.info(f"Successfully stored {new_trees} new trees in Redis using efficient base64 storage (no metadata)")
-                else:
-                    logger.info("All trees already exist in Redis")
+            if self.config.storage_type not in ("redis", "hybrid"):
+                return {"new_trees_added": 0, "total_processed": 0}
             
-            return {"new_trees_added": new_trees, "total_processed": total_trees}
+            stats = await create_tree_sync(self, file_path).sync()
+            return {"new_trees_added": stats['pushed'], "total_processed": stats['local_trees'], "sync": stats}
             
         except Exception as e:
             logger.error(f"Failed to populate from file: {e}")
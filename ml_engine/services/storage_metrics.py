@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Storage Metrics
+===============
+
+Per-tier lookup counters and fixed-bucket latency histograms for the tree
+storage chain (memory -> sqlite -> redis -> file).
+"""
+
+import bisect
+import threading
+from typing import Any, Dict
+
+
+class LatencyHistogram:
+    """Cumulative latency histogram with fixed millisecond buckets."""
+
+    BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 1000.0)
+
+    def __init__(self):
+        self._counts = [0] * (len(self.BUCKETS_MS) + 1)  # last bucket is +Inf
+        self._count = 0
+        self._sum_ms = 0.0
+        self._max_ms = 0.0
+
+    def record(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self._counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+        self._count += 1
+        self._sum_ms += ms
+        self._max_ms = max(self._max_ms, ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound (ms) of the bucket holding the given fraction of samples."""
+        if self._count == 0:
+            return 0.0
+        threshold = fraction * self._count
+        cumulative = 0
+        for i, count in enumerate(self._counts):
+            cumulative += count
+            if cumulative >= threshold:
+                return self.BUCKETS_MS[i] if i < len(self.BUCKETS_MS) else self._max_ms
+        return self._max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        labels = [f"le_{bound:g}ms" for bound in self.BUCKETS_MS] + ["le_inf"]
+        return {
+            'count': self._count,
+            'avg_ms': self._sum_ms / self._count if self._count else 0.0,
+            'p50_ms': self.percentile(0.5),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': self._max_ms,
+            'buckets': dict(zip(labels, self._counts))
+        }
+
+
+class TierStats:
+    """Hits, misses, errors, stale / unversioned entries and lookup latency for one storage tier."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        self.stale = 0  # misses on a tree built with another fingerprint
+        self.unversioned = 0  # hits on a tree stored without a fingerprint (served until rebuilt)
+        self.latency = LatencyHistogram()
+
+    def record(self, hit: bool, seconds: float) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            self.latency.record(seconds)
+
+    def record_stale(self) -> None:
+        with self._lock:
+            self.stale += 1
+
+    def record_unversioned(self) -> None:
+        with self._lock:
+            self.unversioned += 1
+
+    def record_error(self, seconds: float) -> None:
+        with self._lock:
+            self.errors += 1
+            self.latency.record(seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'errors': self.errors,
+                'stale': self.stale,
+                'unversioned': self.unversioned,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'latency': self.latency.snapshot()
+            }
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Transformation Graph
+====================
+
+The transformations of every vocabulary word (rhyme categories, anagrams and
+one-letter-off neighbours), computed offline and stored as a memory-mapped
+graph so EfficientWordService can serve them without running the word engine.
+
+File layout: 8-byte magic, 4-byte little-endian header length, a JSON header
+(format, byte order, versions of the inputs the graph depends on, section
+offsets) and 8-byte aligned sections:
+- words: the vocabulary, newline separated; a word's line number is its id
+- built: one byte per word, 1 if its transformations are in the graph
+- per category, CSR adjacency: offsets (uint32, words + 1) and neighbours
+  (int32 word ids); a word's neighbours are neighbours[offsets[i]:offsets[i + 1]]
+
+A graph whose versions (game data files, engine code, engine rhyme limits)
+differ from the running engine is ignored, as are words it was not built for; callers fall
+back to compute_transformations.
+"""
+
+import json
+import logging
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from models.engine_snapshot import engine_code_version
+from services.cache_snapshot import game_data_version
+
+logger = logging.getLogger(__name__)
+
+GRAPH_MAGIC = b"WRDGRPH\x01"
+GRAPH_FORMAT = 1
+GRAPH_CATEGORIES = ('perfect', 'near', 'rich', 'slant', 'anagrams', 'added', 'removed', 'changed')
+_HEADER_LENGTH = struct.Struct("<I")
+_ALIGNMENT = 8
+
+
+def compute_transformations(word_engine, word: str) -> Dict[str, List[str]]:
+    """Transformations of word from the word engine, one list per GRAPH_CATEGORIES entry."""
+    categorized = word_engine.categorize_rhymes_by_quality(word, word_engine.get_rhymes(word))
+    olo = word_engine.get_one_letter_off(word)
+    return {
+        'perfect': categorized.get('perfect', []),
+        'near': categorized.get('near', []),
+        'rich': categorized.get('rich', []),
+        'slant': categorized.get('slant', []),
+        'anagrams': word_engine.get_anagrams(word),
+        'added': olo.get('added', []),
+        'removed': olo.get('removed', []),
+        'changed': olo.get('changed', []),
+    }
+
+
+def graph_versions(word_engine) -> Dict[str, Any]:
+    """Inputs the graph depends on; a graph built from others is ignored."""
+    return {
+        'game_data': game_data_version(word_engine.package_dir),
+        'engine_code': engine_code_version(),
+        'indexed_rhyme_limit': word_engine.INDEXED_RHYME_LIMIT,
+        'slant_min_keys': word_engine.SLANT_MIN_KEYS,
+        'near_rhyme_distance': word_engine.NEAR_RHYME_DISTANCE,
+        'near_rhyme_min_phonemes': word_engine.NEAR_RHYME_MIN_PHONEMES,
+    }
+
+
+# Builder worker state (the engine is set in the parent before the pool starts, the rest by _init_worker)
+_worker_engine = None
+_worker_ids: Dict[str, int] = {}
+_worker_selected = None
+
+
+def _init_worker(word_ids: Dict[str, int], selected) -> None:
+    global _worker_engine, _worker_ids, _worker_selected
+    if _worker_engine is None:  # spawned rather than forked: nothing inherited from the parent
+        from models.shared_word_engine import get_shared_word_engine
+        _worker_engine = get_shared_word_engine()
+    _worker_ids = word_ids
+    _worker_selected = selected
+
+
+def _build_chunk(words: List[str]):
+    """Built flags, and per category row lengths and neighbour ids, for a slice of the vocabulary."""
+    built = bytearray(len(words))
+    lengths = {category: array('I') for category in GRAPH_CATEGORIES}
+    neighbours = {category: array('i') for category in GRAPH_CATEGORIES}
+    for position, word in enumerate(words):
+        if _worker_selected is not None and word not in _worker_selected:
+            for category in GRAPH_CATEGORIES:
+                lengths[category].append(0)
+            continue
+        built[position] = 1
+        transformations = compute_transformations(_worker_engine, word)
+        for category in GRAPH_CATEGORIES:
+            ids = [_worker_ids[w] for w in transformations[category] if w in _worker_ids]
+            lengths[category].append(len(ids))
+            neighbours[category].extend(ids)
+    # Per-word results are not needed again in this process
+    _worker_engine._rhyme_cache.clear()
+    _worker_engine._anagram_cache.clear()
+    return (bytes(built),
+            {category: lengths[category].tobytes() for category in GRAPH_CATEGORIES},
+            {category: neighbours[category].tobytes() for category in GRAPH_CATEGORIES})
+
+
+def build_transformation_graph(path: Path, word_engine, words: Optional[Iterable[str]] = None,
+                               processes: Optional[int] = None, chunk_size: int = 500) -> Dict[str, Any]:
+    """
+    Compute the transformations of the vocabulary and write the graph to path
+    (atomically, via a temporary file).
+
+    Args:
+        path: Output file
+        word_engine: Engine the transformations are computed with (inherited by forked workers;
+            workers started by spawning load the shared engine instead)
+        words: Words to build (default: the whole vocabulary); others are left to live computation
+        processes: Worker processes (default: CPU count)
+        chunk_size: Words per worker task
+
+    Returns:
+        Dict with 'words', 'built', 'edges', 'bytes' and 'duration_ms'
+    """
+    global _worker_engine
+    started = time.perf_counter()
+    vocabulary = sorted(word_engine.quality_words)
+    word_ids = {word: index for index, word in enumerate(vocabulary)}
+    selected = None if words is None else frozenset(words) & word_ids.keys()
+
+    built = bytearray()
+    offsets = {category: array('I', [0]) for category in GRAPH_CATEGORIES}
+    neighbours = {category: array('i') for category in GRAPH_CATEGORIES}
+    chunks = [vocabulary[i:i + chunk_size] for i in range(0, len(vocabulary), chunk_size)]
+    _worker_engine = word_engine
+    try:
+        with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(word_ids, selected)) as pool:
+            for done, (chunk_built, chunk_lengths, chunk_neighbours) in enumerate(pool.imap(_build_chunk, chunks), 1):
+                built += chunk_built
+                for category in GRAPH_CATEGORIES:
+                    lengths = array('I')
+                    lengths.frombytes(chunk_lengths[category])
+                    end = offsets[category][-1]
+                    for length in lengths:
+                        end += length
+                        offsets[category].append(end)
+                    neighbours[category].frombytes(chunk_neighbours[category])
+                if done % 20 == 0 or done == len(chunks):
+                    logger.info(f"Transformation graph: {done}/{len(chunks)} chunks")
+    finally:
+        _worker_engine = None
+
+    sections = [('words', '\n'.join(vocabulary).encode('utf-8')), ('built', bytes(built))]
+    for category in GRAPH_CATEGORIES:
+        sections.append((f'offsets:{category}', offsets[category].tobytes()))
+        sections.append((f'neighbours:{category}', neighbours[category].tobytes()))
+    stats = {
+        'words': len(vocabulary),
+        'built': sum(built),
+        'edges': {category: len(neighbours[category]) for category in GRAPH_CATEGORIES},
+    }
+    _write_graph(Path(path), sections, {
+        'format': GRAPH_FORMAT,
+        'byteorder': sys.byteorder,
+        'versions': graph_versions(word_engine),
+        'created': time.time(),
+        'categories': list(GRAPH_CATEGORIES),
+        'counts': stats,
+    })
+
+    stats.update(bytes=Path(path).stat().st_size, duration_ms=(time.perf_counter() - started) * 1000)
+    logger.info(f"🕸️ Transformation graph written to {path}: {stats}")
+    return stats
+
+
+def _write_graph(path: Path, sections, header: Dict[str, Any]) -> None:
+    # Section offsets depend on the header length, which depends on the offsets:
+    # lay sections out relative to the data start, then pad the header to it
+    layout, position = {}, 0
+    for name, data in sections:
+        layout[name] = [position, len(data)]
+        position += -(-len(data) // _ALIGNMENT) * _ALIGNMENT
+    header = dict(header, sections=layout)
+    encoded = json.dumps(header).encode('utf-8')
+    prefix = len(GRAPH_MAGIC) + _HEADER_LENGTH.size
+    data_start = -(-(prefix + len(encoded)) // _ALIGNMENT) * _ALIGNMENT
+    encoded += b' ' * (data_start - prefix - len(encoded))
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(GRAPH_MAGIC)
+        f.write(_HEADER_LENGTH.pack(len(encoded)))
+        f.write(encoded)
+        for name, data in sections:
+            f.write(data)
+            f.write(b'\0' * (-len(data) % _ALIGNMENT))
+    os.replace(tmp_path, path)
+
+
+class TransformationGraph:
+    """Read-only view of a graph file written by build_transformation_graph."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.header = self._read_header()
+        except ValueError:
+            self._mmap.close()
+            raise
+        self._views = [memoryview(self._mmap)]
+        try:
+            self._open_sections(len(GRAPH_MAGIC) + _HEADER_LENGTH.size + self.header['header_length'])
+        except (ValueError, KeyError, TypeError):
+            self.close()
+            raise
+
+    def _open_sections(self, data_start: int) -> None:
+        view = self._views[0]
+
+        def section(name, format='B'):
+            start, length = self.header['sections'][name]
+            if data_start + start + length > len(self._mmap):
+                raise ValueError(f"{self.path} is truncated")
+            self._views.append(view[data_start + start:data_start + start + length])
+            self._views.append(self._views[-1].cast(format))
+            return self._views[-1]
+
+        self.words = bytes(section('words')).decode('utf-8').split('\n')
+        self._ids = {word: index for index, word in enumerate(self.words)}
+        self._built = section('built')
+        self._offsets = {category: section(f'offsets:{category}', 'I') for category in GRAPH_CATEGORIES}
+        self._neighbours = {category: section(f'neighbours:{category}', 'i') for category in GRAPH_CATEGORIES}
+
+    def _read_header(self) -> Dict[str, Any]:
+        if self._mmap[:len(GRAPH_MAGIC)] != GRAPH_MAGIC:
+            raise ValueError(f"{self.path} is not a transformation graph")
+        start = len(GRAPH_MAGIC)
+        (length,) = _HEADER_LENGTH.unpack(self._mmap[start:start + _HEADER_LENGTH.size])
+        header = json.loads(self._mmap[start + _HEADER_LENGTH.size:start + _HEADER_LENGTH.size + length])
+        if header.get('format') != GRAPH_FORMAT or header.get('byteorder') != sys.byteorder:
+            raise ValueError(f"{self.path}: unsupported graph format {header.get('format')} ({header.get('byteorder')})")
+        if list(header.get('categories', ())) != list(GRAPH_CATEGORIES):
+            raise ValueError(f"{self.path}: unexpected categories {header.get('categories')}")
+        header['header_length'] = length
+        return header
+
+    @property
+    def versions(self) -> Dict[str, Any]:
+        return self.header.get('versions', {})
+
+    def __len__(self) -> int:
+        return self.header['counts']['built']
+
+    def __contains__(self, word: str) -> bool:
+        index = self._ids.get(word)
+        return index is not None and self._built[index] == 1
+
+    def get(self, word: str) -> Optional[Dict[str, List[str]]]:
+        """Transformations of word, one list per GRAPH_CATEGORIES entry, or None if it was not built."""
+        index = self._ids.get(word)
+        if index is None or not self._built[index]:
+            return None
+        words = self.words
+        result = {}
+        for category in GRAPH_CATEGORIES:
+            offsets = self._offsets[category]
+            result[category] = [words[i] for i in self._neighbours[category][offsets[index]:offsets[index + 1]]]
+        return result
+
+    def close(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+
+def load_transformation_graph(path: Path, versions: Dict[str, Any]) -> Optional[TransformationGraph]:
+    """
+    Open the graph at path if it exists and was built for versions.
+
+    Returns:
+        TransformationGraph, or None (missing, unreadable or built from other inputs)
+    """
+    if not Path(path).exists():
+        return None
+    try:
+        graph = TransformationGraph(path)
+    except (OSError, ValueError, KeyError) as e:
+        logger.warning(f"Ignoring unreadable transformation graph {path}: {e}")
+        return None
+    if graph.versions != versions:
+        logger.info(f"Ignoring transformation graph {path}: built for {graph.versions}, running {versions}")
+        graph.close()
+        return None
+    logger.info(f"🕸️ Transformation graph loaded from {path}: {len(graph)} of {len(graph.words)} words")
+    return graph
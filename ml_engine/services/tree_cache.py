@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Tree Cache
+==========
+
+Size-aware in-memory cache for deserialized probability trees.
+
+Entries are kept in LRU order and charged an estimated byte size, so the cache
+honours an explicit memory budget as well as an entry limit. With the "tinylfu"
+policy a Count-Min sketch tracks how often each start word is requested and a
+newcomer is only admitted if it is requested at least as often as the entries
+it would evict, which keeps popular start words resident across bursts of
+one-off lookups. Trees loaded ahead of their first request (prefetch, startup
+warming) are put with admit=True, which counts that request and skips the gate.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from models.probability_tree import WordProbabilityTree, ProbabilityNode, ChildNode
+
+_FLOAT_BYTES = sys.getsizeof(0.5)
+_INT_BYTES = sys.getsizeof(1 << 20)
+_NODE_BYTES = 3 * 56  # ProbabilityNode, ProbabilityMetadata and ChildNode instances
+_TREE_BYTES = 56 + 2 * sys.getsizeof({})
+
+
+def _estimate_sequences_size(sequences) -> int:
+    size = sys.getsizeof(sequences)
+    if not isinstance(sequences, list):  # placeholder trees store a bare 0
+        return size
+    for sequence in sequences:
+        size += sys.getsizeof(sequence)
+        if sequence:  # empty categories hold [None]
+            size += len(sequence) * _INT_BYTES
+    return size
+
+
+def _estimate_node_size(node: ProbabilityNode) -> int:
+    size = _NODE_BYTES + sys.getsizeof(node.prb) + _estimate_sequences_size(node.val)
+    for value in node.prb.values():
+        size += _INT_BYTES  # token index key
+        if isinstance(value, ChildNode):
+            size += _FLOAT_BYTES + _estimate_sequences_size(value.remaining_sequences)
+            size += _estimate_node_size(value.child_prb)
+        else:
+            size += _FLOAT_BYTES
+    return size
+
+
+def estimate_tree_size(tree: WordProbabilityTree) -> int:
+    """Approximate resident size of a deserialized tree in bytes."""
+    size = _TREE_BYTES + _estimate_node_size(tree.ana)
+    for node in tree.olo.values():
+        size += _estimate_node_size(node)
+    for node in tree.rhy.values():
+        size += _estimate_node_size(node)
+    return size
+
+
+class FrequencySketch:
+    """
+    Count-Min sketch with 4-bit style saturating counters and periodic aging.
+
+    After `sample_size` increments every counter is halved so that popularity
+    reflects recent traffic rather than all-time totals.
+    """
+
+    DEPTH = 4
+    MAX_COUNT = 15
+
+    def __init__(self, capacity: int):
+        width = 64
+        while width < capacity * 4:
+            width <<= 1
+        self._mask = width - 1
+        self._tables = [bytearray(width) for _ in range(self.DEPTH)]
+        self._sample_size = width * 10
+        self._additions = 0
+
+    def _indexes(self, key: Hashable):
+        h = hash(key)
+        for row in range(self.DEPTH):
+            yield row, (h ^ (h >> (16 + row * 7)) ^ (row * 0x9E3779B9)) & self._mask
+            h = (h * 0x01000193 + row) & 0xFFFFFFFFFFFFFFFF
+
+    def increment(self, key: Hashable) -> None:
+        for row, index in self._indexes(key):
+            if self._tables[row][index] < self.MAX_COUNT:
+                self._tables[row][index] += 1
+        self._additions += 1
+        if self._additions >= self._sample_size:
+            self._age()
+
+    def frequency(self, key: Hashable) -> int:
+        return min(self._tables[row][index] for row, index in self._indexes(key))
+
+    def _age(self) -> None:
+        halve = bytes(count >> 1 for count in range(256))
+        self._tables = [table.translate(halve) for table in self._tables]
+        self._additions //= 2
+
+    def clear(self) -> None:
+        for table in self._tables:
+            table[:] = bytes(len(table))
+        self._additions = 0
+
+
+class TreeCache:
+    """
+    LRU tree cache bounded by entry count and estimated bytes.
+
+    Args:
+        max_entries: Maximum number of cached trees
+        max_bytes: Memory budget for cached trees (estimated)
+        policy: "lru" (always admit) or "tinylfu" (frequency-gated admission)
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 256 * 1024 * 1024, policy: str = "tinylfu"):
+        if policy not in ("lru", "tinylfu"):
+            raise ValueError("cache policy must be 'lru' or 'tinylfu'")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (value, size)
+        self._sketch = FrequencySketch(max_entries) if policy == "tinylfu" else None
+        self._lock = threading.RLock()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._rejections = 0
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries.keys())
+
+    def items(self) -> List[Tuple[str, Any, int]]:
+        """(key, value, estimated size) for every entry, least recently used first."""
+        with self._lock:
+            return [(key, value, size) for key, (value, size) in self._entries.items()]
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value (refreshing its recency) or None, counting hits and misses."""
+        with self._lock:
+            if self._sketch is not None:
+                self._sketch.increment(key)
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: Any, size: Optional[int] = None, admit: bool = False) -> bool:
+        """
+        Insert or replace a value, evicting least recently used entries as needed.
+
+        Args:
+            admit: Skip frequency-gated admission (the value is about to be requested)
+
+        Returns:
+            True if the value is now cached, False if admission was refused
+        """
+        if size is None:
+            size = estimate_tree_size(value)
+
+        with self._lock:
+            if size > self.max_bytes or self.max_entries <= 0:
+                # Refused before touching the key: a cached value it would replace stays
+                self._rejections += 1
+                return False
+
+            existing = self._entries.get(key)
+            victims = []
+            freed = 0
+            excess_entries = len(self._entries) + (existing is None) - self.max_entries
+            excess_bytes = self._bytes - (existing[1] if existing is not None else 0) + size - self.max_bytes
+            if admit and self._sketch is not None:
+                self._sketch.increment(key)
+            if excess_entries > 0 or excess_bytes > 0:
+                candidate_frequency = self._sketch.frequency(key) if self._sketch is not None else 0
+                for victim_key, (_, victim_size) in self._entries.items():
+                    if len(victims) >= excess_entries and freed >= excess_bytes:
+                        break
+                    if victim_key == key:
+                        continue
+                    if existing is None and not admit and self._sketch is not None \
+                            and self._sketch.frequency(victim_key) > candidate_frequency:
+                        # A hotter entry would have to go; keep it and drop the newcomer
+                        self._rejections += 1
+                        return False
+                    victims.append(victim_key)
+                    freed += victim_size
+
+            for victim_key in victims:
+                self._bytes -= self._entries.pop(victim_key)[1]
+                self._evictions += 1
+
+            if existing is not None:
+                self._bytes -= existing[1]
+            self._entries[key] = (value, size)
+            self._entries.move_to_end(key)
+            self._bytes += size
+            return True
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def clear(self) -> None:
+        """Drop all entries, counters and frequency history."""
+        with self._lock:
+            self._entries.clear()
+            if self._sketch is not None:
+                self._sketch.clear()
+            self._bytes = 0
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._rejections = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'policy': self.policy,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'rejections': self._rejections
+            }
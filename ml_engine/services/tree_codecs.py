@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Tree Codecs
+===========
+
+Pluggable serialization codecs for probability trees.
+
+Every payload written by a codec starts with a 3-byte header (b"WC" + codec
+tag) so stores holding a mix of formats still decode. Untagged payloads from
+before the registry existed are recognised by their own magic bytes (gzip
+header or pickle protocol opcode).
+
+Built-in codecs:
+- pickle_gzip: pickle + gzip (the original format, now tagged)
+- pickle_zlib_dict: pickle + raw deflate primed with a trained preset dictionary
+- pickle_raw: uncompressed pickle
+- array / array_zlib: pickle-free typed arrays (optionally deflated)
+"""
+
+import gzip
+import logging
+import os
+import pickle
+import struct
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from models.probability_tree import WordProbabilityTree, ProbabilityNode, ProbabilityMetadata, ChildNode
+
+logger = logging.getLogger(__name__)
+
+CODEC_MAGIC = b"WC"
+GZIP_MAGIC = b"\x1f\x8b"
+PICKLE_PROTO = 0x80
+
+DEFAULT_DICTIONARY_SIZE = 32 * 1024  # zlib uses at most the last 32 KiB of a preset dictionary
+
+
+class CodecError(ValueError):
+    """Raised when a payload cannot be encoded or decoded by any registered codec."""
+
+
+# ----------------------------------------------------------------------
+# Tree <-> dict conversion (shared by the pickle-based codecs)
+# ----------------------------------------------------------------------
+
+def node_to_dict(node: ProbabilityNode) -> Dict:
+    """Convert probability node to serializable dict."""
+    return {
+        'val': node.val,
+        'prb': {str(k): v if isinstance(v, float) else child_to_dict(v)
+                for k, v in node.prb.items()},
+        'dat': {
+            'org_max': node.dat.org_max,
+            'val_prb_sum': node.dat.val_prb_sum,
+            'max_dep': node.dat.max_dep
+        }
+    }
+
+
+def child_to_dict(child: ChildNode) -> Dict:
+    """Convert child node to serializable dict."""
+    return {
+        'probability': child.probability,
+        'remaining_sequences': child.remaining_sequences,
+        'child_prb': node_to_dict(child.child_prb)
+    }
+
+
+def tree_to_dict(tree: WordProbabilityTree) -> Dict:
+    """Convert probability tree to serializable dict."""
+    return {
+        'frq': tree.frq,
+        'ana': node_to_dict(tree.ana),
+        'olo': {k: node_to_dict(v) for k, v in tree.olo.items()},
+        'rhy': {k: node_to_dict(v) for k, v in tree.rhy.items()}
+    }
+
+
+def dict_to_node(node_dict: Dict) -> ProbabilityNode:
+    """Convert dict back to probability node."""
+    # Reconstruct sparse array
+    prb = {}
+    for k_str, v in node_dict['prb'].items():
+        k = int(k_str)
+        if isinstance(v, float):
+            prb[k] = v
+        else:
+            prb[k] = ChildNode(
+                probability=v['probability'],
+                remaining_sequences=v['remaining_sequences'],
+                child_prb=dict_to_node(v['child_prb'])
+            )
+
+    return ProbabilityNode(
+        val=node_dict['val'],
+        prb=prb,
+        dat=ProbabilityMetadata(
+            org_max=node_dict['dat']['org_max'],
+            val_prb_sum=node_dict['dat']['val_prb_sum'],
+            max_dep=node_dict['dat']['max_dep']
+        )
+    )
+
+
+def dict_to_tree(tree_dict: Dict) -> WordProbabilityTree:
+    """Convert dict back to probability tree."""
+    return WordProbabilityTree(
+        frq=tree_dict['frq'],
+        ana=dict_to_node(tree_dict['ana']),
+        olo={k: dict_to_node(v) for k, v in tree_dict['olo'].items()},
+        rhy={k: dict_to_node(v) for k, v in tree_dict['rhy'].items()}
+    )
+
+
+# ----------------------------------------------------------------------
+# Codecs
+# ----------------------------------------------------------------------
+
+class TreeCodec:
+    """Base codec: subclasses set `name`/`tag` and implement the body transform."""
+
+    name = ""
+    tag = 0
+
+    def encode_body(self, tree: WordProbabilityTree) -> bytes:
+        raise NotImplementedError
+
+    def decode_body(self, body: bytes) -> WordProbabilityTree:
+        raise NotImplementedError
+
+    def encode(self, tree: WordProbabilityTree) -> bytes:
+        return CODEC_MAGIC + bytes([self.tag]) + self.encode_body(tree)
+
+    def decode(self, payload: bytes) -> WordProbabilityTree:
+        return self.decode_body(memoryview(payload)[3:])
+
+
+class PickleRawCodec(TreeCodec):
+    name = "pickle_raw"
+    tag = 1
+
+    def encode_body(self, tree: WordProbabilityTree) -> bytes:
+        return pickle.dumps(tree_to_dict(tree), protocol=pickle.HIGHEST_PROTOCOL)
+
+    def decode_body(self, body: bytes) -> WordProbabilityTree:
+        return dict_to_tree(pickle.loads(body))
+
+
+class PickleGzipCodec(TreeCodec):
+    name = "pickle_gzip"
+    tag = 2
+
+    def __init__(self, level: int = 9):
+        self.level = level
+
+    def encode_body(self, tree: WordProbabilityTree) -> bytes:
+        return gzip.compress(pickle.dumps(tree_to_dict(tree)), compresslevel=self.level)
+
+    def decode_body(self, body: bytes) -> WordProbabilityTree:
+        return dict_to_tree(pickle.loads(gzip.decompress(body)))
+
+
+class PickleZlibDictCodec(TreeCodec):
+    """
+    Pickle + raw deflate with a preset dictionary.
+
+    The body starts with the CRC32 of the dictionary it was compressed with,
+    so payloads are never silently inflated against the wrong dictionary.
+    """
+
+    name = "pickle_zlib_dict"
+    tag = 3
+    _DICT_ID = struct.Struct("<I")
+
+    def __init__(self, dictionary: bytes, level: int = 9):
+        self.dictionary = dictionary
+        self.dictionary_id = zlib.crc32(dictionary)
+        self.level = level
+
+    def encode_body(self, tree: WordProbabilityTree) -> bytes:
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, self.dictionary)
+        data = pickle.dumps(tree_to_dict(tree), protocol=pickle.HIGHEST_PROTOCOL)
+        return self._DICT_ID.pack(self.dictionary_id) + compressor.compress(data) + compressor.flush()
+
+    def decode_body(self, body: bytes) -> WordProbabilityTree:
+        (dictionary_id,) = self._DICT_ID.unpack_from(body)
+        if dictionary_id != self.dictionary_id:
+            raise CodecError(f"Payload needs zlib dictionary {dictionary_id:08x}, loaded {self.dictionary_id:08x}")
+        decompressor = zlib.decompressobj(-15, self.dictionary)
+        data = decompressor.decompress(body[self._DICT_ID.size:]) + decompressor.flush()
+        return dict_to_tree(pickle.loads(data))
+
+
+class ArrayTreeCodec(TreeCodec):
+    """
+    Pickle-free tree format built from typed little-endian arrays.
+
+    Nodes are flattened in pre-order, so every child has a larger index than
+    its parent; entry blocks follow the same node order:
+
+        header      magic, version, frq, array lengths, 7 root node indices
+        node_f8     (nodes, 2)    org_max, val_prb_sum
+        entry_f8    (entries,)    probability of each prb entry
+        node_i4     (nodes, 5)    max_dep, val_start, val_count, entry_start, entry_count
+        entry_i4    (entries, 4)  token, child node (-1 = plain float), rem_start, rem_count
+        seq_len_i4  (sequences,)  token count per sequence (-1 = None)
+        tokens_i4   (tokens,)     concatenated token ids
+
+    val / remaining_sequences are ranges of the sequence table (identical
+    ranges are shared). A val_count of -1 marks a placeholder scalar `val`
+    stored in val_start. Decoding is a handful of np.frombuffer calls, bulk
+    tolist() conversions and object construction - no pickle, no string-keyed
+    dicts, and the per-node dataclass validation runs as vectorized checks.
+    """
+
+    name = "array"
+    tag = 4
+    HEADER = struct.Struct("<4sBB2xdIIII7i")
+    ARRAY_MAGIC = b"WTAR"
+    VERSION = 1
+    ROOTS = (('ana', None), ('olo', 'ola'), ('olo', 'olr'), ('olo', 'olx'),
+             ('rhy', 'prf'), ('rhy', 'rch'), ('rhy', 'sln'))
+
+    def _flatten(self, tree: WordProbabilityTree):
+        node_f8, node_i4, entry_f8, entry_i4 = [], [], [], []
+        seq_lengths: List[int] = []
+        tokens: List[int] = []
+        ranges: Dict[Tuple, int] = {}
+
+        def add_sequences(sequences) -> Tuple[int, int]:
+            if not isinstance(sequences, list):
+                return int(sequences), -1
+            key = tuple(tuple(seq) if seq is not None else None for seq in sequences)
+            if key not in ranges:
+                ranges[key] = len(seq_lengths)
+                for seq in sequences:
+                    if seq is None:
+                        seq_lengths.append(-1)
+                    else:
+                        seq_lengths.append(len(seq))
+                        tokens.extend(seq)
+            return ranges[key], len(sequences)
+
+        def add_node(node: ProbabilityNode) -> int:
+            index = len(node_i4)
+            node_f8.append((node.dat.org_max, node.dat.val_prb_sum))
+            node_i4.append(None)  # reserve pre-order slot
+            val_start, val_count = add_sequences(node.val)
+            # Reserve this node's entry block before recursing so entries follow node order
+            entry_start = len(entry_i4)
+            entry_f8.extend([0.0] * len(node.prb))
+            entry_i4.extend([None] * len(node.prb))
+            for e, (token, value) in enumerate(node.prb.items(), entry_start):
+                if isinstance(value, ChildNode):
+                    rem_start, rem_count = add_sequences(value.remaining_sequences)
+                    entry_f8[e] = value.probability
+                    entry_i4[e] = (token, add_node(value.child_prb), rem_start, rem_count)
+                else:
+                    entry_f8[e] = value
+                    entry_i4[e] = (token, -1, 0, 0)
+            node_i4[index] = (node.dat.max_dep, val_start, val_count, entry_start, len(node.prb))
+            return index
+
+        roots = [add_node(tree.ana if sub is None else getattr(tree, main)[sub]) for main, sub in self.ROOTS]
+        return roots, node_f8, node_i4, entry_f8, entry_i4, seq_lengths, tokens
+
+    def encode_body(self, tree: WordProbabilityTree) -> bytes:
+        roots, node_f8, node_i4, entry_f8, entry_i4, seq_lengths, tokens = self._flatten(tree)
+        header = self.HEADER.pack(
+            self.ARRAY_MAGIC, self.VERSION, int(isinstance(tree.frq, (int, np.integer))), float(tree.frq),
+            len(node_i4), len(entry_i4), len(seq_lengths), len(tokens), *roots
+        )
+        return b"".join((
+            header,
+            np.asarray(node_f8, dtype='<f8').reshape(-1, 2).tobytes(),
+            np.asarray(entry_f8, dtype='<f8').tobytes(),
+            np.asarray(node_i4, dtype='<i4').reshape(-1, 5).tobytes(),
+            np.asarray(entry_i4, dtype='<i4').reshape(-1, 4).tobytes(),
+            np.asarray(seq_lengths, dtype='<i4').tobytes(),
+            np.asarray(tokens, dtype='<i4').tobytes(),
+        ))
+
+    def decode_body(self, body: bytes) -> WordProbabilityTree:
+        magic, version, frq_is_int, frq, n_nodes, n_entries, n_seqs, n_tokens, *roots = self.HEADER.unpack_from(body)
+        if magic != self.ARRAY_MAGIC or version != self.VERSION:
+            raise CodecError(f"Unsupported array tree payload (magic {magic!r}, version {version})")
+
+        offset = self.HEADER.size
+        arrays = []
+        for dtype, count in (('<f8', n_nodes * 2), ('<f8', n_entries), ('<i4', n_nodes * 5),
+                             ('<i4', n_entries * 4), ('<i4', n_seqs), ('<i4', n_tokens)):
+            arrays.append(np.frombuffer(body, dtype=dtype, count=count, offset=offset))
+            offset += count * np.dtype(dtype).itemsize
+        node_f8, entry_f8, node_i4, entry_i4, seq_lengths, tokens = arrays
+        node_i4 = node_i4.reshape(-1, 5)
+        entry_i4 = entry_i4.reshape(-1, 4)
+
+        lengths = seq_lengths.tolist()
+        starts = (np.cumsum(np.maximum(seq_lengths, 0)) - np.maximum(seq_lengths, 0)).tolist()
+        token_list = tokens.tolist()
+        sequences = [token_list[start:start + length] if length >= 0 else None
+                     for start, length in zip(starts, lengths)]
+
+        # The dataclass __post_init__ checks, done once over the whole arrays
+        if n_entries and not ((entry_f8 >= 0.0) & (entry_f8 <= 1.0)).all():
+            raise CodecError("Array tree payload has probabilities outside [0, 1]")
+        if n_nodes and (node_i4[:, 0] < 0).any():
+            raise CodecError("Array tree payload has negative max_dep")
+
+        # Pass 1: every node with its prb filled from plain floats (in stored key order)
+        new = object.__new__
+        entry_tokens = entry_i4[:, 0].tolist()
+        probabilities = entry_f8.tolist()
+        nodes = []
+        for (org_max, val_prb_sum), (max_dep, val_start, val_count, entry_start, entry_count) in zip(
+                node_f8.reshape(-1, 2).tolist(), node_i4.tolist()):
+            dat = new(ProbabilityMetadata)
+            dat.__dict__ = {'org_max': org_max, 'val_prb_sum': val_prb_sum, 'max_dep': max_dep}
+            node = new(ProbabilityNode)
+            node.__dict__ = {
+                'val': sequences[val_start:val_start + val_count] if val_count >= 0 else val_start,
+                'prb': dict(zip(entry_tokens[entry_start:entry_start + entry_count],
+                                probabilities[entry_start:entry_start + entry_count])),
+                'dat': dat
+            }
+            nodes.append(node)
+
+        # Pass 2: swap in ChildNodes for the entries that have a subtree
+        child_entries = np.flatnonzero(entry_i4[:, 1] >= 0)
+        owners = np.repeat(np.arange(n_nodes), node_i4[:, 4])[child_entries].tolist()
+        for owner, probability, (token, child, rem_start, rem_count) in zip(
+                owners, entry_f8[child_entries].tolist(), entry_i4[child_entries].tolist()):
+            child_node = new(ChildNode)
+            child_node.__dict__ = {
+                'probability': probability,
+                'remaining_sequences': sequences[rem_start:rem_start + rem_count] if rem_count >= 0 else rem_start,
+                'child_prb': nodes[child]
+            }
+            nodes[owner].prb[token] = child_node
+
+        root_nodes = dict(zip((sub or main for main, sub in self.ROOTS), (nodes[i] for i in roots)))
+        return WordProbabilityTree(
+            frq=int(frq) if frq_is_int else frq,
+            ana=root_nodes['ana'],
+            olo={key: root_nodes[key] for key in ('ola', 'olr', 'olx')},
+            rhy={key: root_nodes[key] for key in ('prf', 'rch', 'sln')}
+        )
+
+
+class ArrayZlibTreeCodec(ArrayTreeCodec):
+    """Array format deflated with zlib (decompression is a single C call before frombuffer)."""
+
+    name = "array_zlib"
+    tag = 5
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def encode_body(self, tree: WordProbabilityTree) -> bytes:
+        return zlib.compress(super().encode_body(tree), self.level)
+
+    def decode_body(self, body: bytes) -> WordProbabilityTree:
+        return super().decode_body(zlib.decompress(body))
+
+
+class CodecRegistry:
+    """Codecs by name (for encoding) and by tag (for decoding)."""
+
+    def __init__(self):
+        self._by_name: Dict[str, TreeCodec] = {}
+        self._by_tag: Dict[int, TreeCodec] = {}
+
+    def register(self, codec: TreeCodec) -> None:
+        self._by_name[codec.name] = codec
+        self._by_tag[codec.tag] = codec
+
+    def names(self) -> List[str]:
+        return list(self._by_name.keys())
+
+    def get(self, name: str) -> TreeCodec:
+        if name not in self._by_name:
+            raise CodecError(f"Unknown tree codec '{name}' (available: {', '.join(self._by_name)})")
+        return self._by_name[name]
+
+    def encode(self, tree: WordProbabilityTree, name: str) -> bytes:
+        return self.get(name).encode(tree)
+
+    def codec_for(self, payload: bytes) -> str:
+        """Name of the codec that produced a payload ("legacy_gzip"/"legacy_pickle" for untagged data)."""
+        if payload[:2] == CODEC_MAGIC:
+            codec = self._by_tag.get(payload[2])
+            if codec is None:
+                raise CodecError(f"No codec registered for tag {payload[2]}")
+            return codec.name
+        if payload[:2] == GZIP_MAGIC:
+            return "legacy_gzip"
+        if payload[:1] and payload[0] == PICKLE_PROTO:
+            return "legacy_pickle"
+        raise CodecError("Unrecognised tree payload")
+
+    def decode(self, payload: bytes) -> WordProbabilityTree:
+        name = self.codec_for(payload)
+        if name == "legacy_gzip":
+            return dict_to_tree(pickle.loads(gzip.decompress(payload)))
+        if name == "legacy_pickle":
+            return dict_to_tree(pickle.loads(payload))
+        return self._by_name[name].decode(payload)
+
+
+def is_tree_payload(data: bytes) -> bool:
+    """True if `data` is a raw tree payload (tagged, legacy gzip or legacy pickle) rather than text."""
+    return data[:2] in (CODEC_MAGIC, GZIP_MAGIC) or (data[:1] != b"" and data[0] == PICKLE_PROTO)
+
+
+def load_dictionary(path: Optional[str]) -> Optional[bytes]:
+    """Read a trained zlib preset dictionary, or None if there isn't one."""
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def create_codec_registry(dictionary_path: Optional[str] = None) -> CodecRegistry:
+    """Registry with the built-in codecs; the dictionary codec needs a trained dictionary file."""
+    registry = CodecRegistry()
+    registry.register(PickleRawCodec())
+    registry.register(PickleGzipCodec())
+    registry.register(ArrayTreeCodec())
+    registry.register(ArrayZlibTreeCodec())
+    dictionary = load_dictionary(dictionary_path)
+    if dictionary:
+        registry.register(PickleZlibDictCodec(dictionary))
+    return registry
+
+
+def train_zlib_dictionary(samples: Iterable[bytes], size: int = DEFAULT_DICTIONARY_SIZE,
+                          segment_length: int = 24, stride: int = 4) -> bytes:
+    """
+    Build a zlib preset dictionary from sample (uncompressed) payloads.
+
+    Fixed-length segments are counted by how many samples contain them; the
+    most widely shared segments are packed until `size` bytes, with the most
+    common placed last because zlib reaches the end of the dictionary with the
+    shortest back-references.
+    """
+    document_frequency = Counter()
+    sample_count = 0
+    for sample in samples:
+        sample_count += 1
+        segments = {sample[i:i + segment_length] for i in range(0, max(len(sample) - segment_length, 0) + 1, stride)}
+        document_frequency.update(segments)
+
+    chosen = []
+    total = 0
+    for segment, count in document_frequency.most_common():
+        if count < 2 and sample_count > 1:
+            break
+        if total + len(segment) > size:
+            break
+        chosen.append(segment)
+        total += len(segment)
+
+    return b"".join(reversed(chosen))
+
+
+def write_dictionary(path: str, dictionary: bytes) -> None:
+    """Atomically write a trained dictionary."""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(dictionary)
+    os.replace(tmp_path, path)
+    logger.info(f"📚 Wrote {len(dictionary)} byte zlib dictionary to {path}")
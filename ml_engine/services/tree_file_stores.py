@@ -0,0 +1,1396 @@
+#!/usr/bin/env python3
+"""
+Tree File Stores
+================
+
+Local on-disk stores for serialized probability trees.
+
+Every store holds the already-serialized (compressed) tree payload per start word
+and exposes the same small interface, so OptimizedStorageService does not care
+how the bytes are laid out on disk:
+
+- JsonTreeStore: legacy probability_trees.json (hex payloads, whole-file rewrite)
+- LazyJsonTreeStore: same file, offset-indexed and decoded per entry on demand
+- SegmentTreeStore: append-only segment log with an index file
+- ContainerTreeStore: memory-mapped binary container plus a segment overlay
+- SqliteTreeStore: SQLite database in WAL mode, shared by worker processes
+  (used as the local tier between memory and Redis)
+
+The file stores also report a change token per tree (entry_tokens) and where
+the tree sync keeps its content-hash manifest (sync_manifest_path), so a sync
+only re-reads trees whose token changed (see services/tree_sync.py).
+"""
+
+import json
+import logging
+import mmap
+import os
+import re
+import sqlite3
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SYNC_MANIFEST_SUFFIX = ".manifest"  # tree sync manifest next to a single-file store
+
+
+def file_signature(f) -> str:
+    """Size and mtime of an open file: changes whenever the file is rewritten."""
+    stat = os.fstat(f.fileno())
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def read_legacy_json(file_path: str) -> Dict[str, Dict[str, Any]]:
+    """Read a legacy probability_trees.json file into a dict."""
+    with open(file_path, 'r') as f:
+        return json.load(f)
+
+
+def write_legacy_json(file_path: str, entries: Iterable[Tuple[str, bytes, Dict[str, Any]]]) -> int:
+    """
+    Write (word, serialized, metadata) entries in the legacy JSON format.
+
+    The file is written to a temporary path and renamed into place so readers
+    never observe a half-written file.
+
+    Returns:
+        Number of entries written
+    """
+    data = {}
+    for word, serialized, metadata in entries:
+        data[word] = {
+            'serialized': serialized.hex(),
+            'metadata': metadata
+        }
+
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, file_path)
+    return len(data)
+
+
+class JsonTreeStore:
+    """
+    Legacy JSON tree store.
+
+    Loads the whole file on startup and rewrites it on every put. Kept for
+    compatibility with existing deployments and tooling.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.data = {}
+        self._signature = ""  # of the file self.data was loaded from or saved to
+        self._load()
+
+    def _load(self):
+        """Load data from JSON file or create new if doesn't exist."""
+        try:
+            if os.path.exists(self.file_path):
+                with open(self.file_path, 'r') as f:
+                    self.data = json.load(f)
+                    self._signature = file_signature(f)
+                logger.info(f"📦 Loaded {len(self.data)} probability trees from JSON")
+            else:
+                # Create directory if it doesn't exist
+                Path(self.file_path).parent.mkdir(parents=True, exist_ok=True)
+                self.data = {}
+                logger.info("🆕 Created new JSON storage file")
+        except Exception as e:
+            logger.warning(f"Failed to load JSON data: {e}")
+            self.data = {}
+
+    def _save(self):
+        """Save data to JSON file with error handling."""
+        try:
+            with open(self.file_path, 'w') as f:
+                json.dump(self.data, f, indent=2)
+                f.flush()
+                self._signature = file_signature(f)
+        except Exception as e:
+            logger.error(f"Failed to save JSON data: {e}")
+            raise
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def words(self) -> List[str]:
+        return list(self.data.keys())
+
+    def get_serialized(self, word: str) -> Optional[bytes]:
+        entry = self.data.get(word)
+        if entry is None:
+            return None
+        return bytes.fromhex(entry['serialized'])
+
+    def get_metadata(self, word: str) -> Optional[Dict[str, Any]]:
+        entry = self.data.get(word)
+        return entry.get('metadata') if entry else None
+
+    def get_entry(self, word: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        entry = self.data.get(word)
+        if entry is None:
+            return None
+        return bytes.fromhex(entry['serialized']), entry.get('metadata') or {}
+
+    def put_serialized(self, word: str, serialized: bytes, metadata: Dict[str, Any]) -> None:
+        self.put_many([(word, serialized, metadata)])
+
+    def put_many(self, entries: Iterable[Tuple[str, bytes, Dict[str, Any]]]) -> int:
+        """Add or replace several trees with a single rewrite of the file."""
+        count = 0
+        for word, serialized, metadata in entries:
+            self.data[word] = {
+                'serialized': serialized.hex(),  # Store as hex string for JSON compatibility
+                'metadata': metadata
+            }
+            count += 1
+        if count:
+            self._save()
+        return count
+
+    def entry_tokens(self) -> Dict[str, str]:
+        """Change token per tree: the file signature, so any rewrite changes every token."""
+        return dict.fromkeys(self.data, self._signature)
+
+    def sync_manifest_path(self) -> str:
+        return f"{self.file_path}{SYNC_MANIFEST_SUFFIX}"
+
+    def size_bytes(self) -> int:
+        return os.path.getsize(self.file_path) if os.path.exists(self.file_path) else 0
+
+    def close(self) -> None:
+        pass
+
+
+class LazyJsonTreeStore:
+    """
+    Lazily decoded view of a legacy probability_trees.json file.
+
+    Startup builds a word -> (start, end) byte offset index of each entry value,
+    either from a sidecar index file or by one scan over the memory-mapped file
+    that jumps between structural characters without decoding anything. Entries
+    are only parsed when a tree is requested, so time-to-ready and RSS no longer
+    grow with the full decoded corpus.
+
+    Puts still produce a valid legacy file, but splice the raw bytes of existing
+    entries instead of re-encoding them. Every put rewrites the file, so writers
+    batch through put_many.
+    """
+
+    INDEX_SUFFIX = ".idx"
+    _STRUCTURAL = re.compile(rb'[{}"]')
+
+    def __init__(self, file_path: str, use_sidecar_index: bool = True):
+        self.file_path = file_path
+        self.use_sidecar_index = use_sidecar_index
+        self._lock = threading.RLock()
+        self._file = None
+        self._mmap = None
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+
+        if not os.path.exists(file_path):
+            Path(file_path).parent.mkdir(parents=True, exist_ok=True)
+            with open(file_path, 'w') as f:
+                f.write("{}")
+            logger.info("🆕 Created new JSON storage file")
+        self._open()
+
+    # ------------------------------------------------------------------
+    # Offset index
+    # ------------------------------------------------------------------
+
+    def _sidecar_path(self) -> str:
+        return f"{self.file_path}{self.INDEX_SUFFIX}"
+
+    def _source_signature(self) -> List[int]:
+        stat = os.stat(self.file_path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def _open(self):
+        """Map the file and load (or build) the offset index."""
+        self._close_mapping()
+        if os.path.getsize(self.file_path) == 0:
+            self._offsets = {}
+            return
+        self._file = open(self.file_path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.use_sidecar_index and self._load_sidecar():
+            logger.info(f"📦 Indexed {len(self._offsets)} probability trees from sidecar index")
+            return
+
+        self._offsets = self._scan()
+        if hasattr(mmap, 'MADV_DONTNEED'):
+            # The scan touched every page; let them drop out of our RSS again
+            self._mmap.madvise(mmap.MADV_DONTNEED)
+        logger.info(f"📦 Indexed {len(self._offsets)} probability trees from JSON (lazy)")
+        if self.use_sidecar_index:
+            self._write_sidecar()
+
+    def _load_sidecar(self) -> bool:
+        try:
+            with open(self._sidecar_path(), 'r') as f:
+                sidecar = json.load(f)
+            if sidecar.get('source') != self._source_signature():
+                return False
+            self._offsets = {word: (start, end) for word, (start, end) in sidecar['offsets'].items()}
+            return True
+        except (OSError, ValueError, KeyError, TypeError):
+            return False
+
+    def _write_sidecar(self):
+        try:
+            tmp_path = f"{self._sidecar_path()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump({'source': self._source_signature(), 'offsets': self._offsets}, f, separators=(',', ':'))
+            os.replace(tmp_path, self._sidecar_path())
+        except OSError as e:
+            logger.warning(f"Failed to write sidecar index: {e}")
+
+    def _skip_string(self, pos: int) -> int:
+        """Given the offset of an opening quote, return the offset after the closing quote."""
+        mm = self._mmap
+        while True:
+            pos = mm.find(b'"', pos + 1)
+            if pos < 0:
+                raise ValueError("Unterminated string in JSON tree file")
+            backslashes = 0
+            while mm[pos - 1 - backslashes] == 0x5c:
+                backslashes += 1
+            if backslashes % 2 == 0:
+                return pos + 1
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        if self._mmap[:5] == b'{\n  "':
+            return self._scan_indented()
+        return self._scan_structural()
+
+    def _scan_indented(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Fast path for the indent=2 layout written by write_legacy_json.
+
+        Raw newlines cannot occur inside JSON strings, so every line indented by
+        exactly two spaces starts a top-level key.
+        """
+        mm = self._mmap
+        keys = []
+        pos = mm.find(b'\n  "')
+        while pos >= 0:
+            key_start = pos + 3
+            key_end = self._skip_string(key_start)
+            keys.append((key_start, key_end, key_end + 2))
+            pos = mm.find(b'\n  "', key_end)
+
+        offsets = {}
+        for i, (key_start, key_end, value_start) in enumerate(keys):
+            limit = keys[i + 1][0] if i + 1 < len(keys) else mm.rfind(b'}')
+            closer = b'}' if mm[value_start] == ord('{') else b'"'
+            offsets[json.loads(mm[key_start:key_end])] = (value_start, mm.rfind(closer, value_start, limit) + 1)
+        return offsets
+
+    def _scan_structural(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Walk the top-level object once, recording the byte span of every value.
+
+        Only braces and quotes are visited; long hex strings are skipped with a
+        single find() for their closing quote.
+        """
+        mm = self._mmap
+        offsets = {}
+        match = self._STRUCTURAL.search(mm, 0)
+        if match is None or mm[match.start()] != ord('{'):
+            raise ValueError(f"Not a JSON object: {self.file_path}")
+        pos = match.start() + 1
+
+        while True:
+            match = self._STRUCTURAL.search(mm, pos)
+            if match is None or mm[match.start()] == ord('}'):
+                break
+            key_start = match.start()
+            key_end = self._skip_string(key_start)
+            word = json.loads(mm[key_start:key_end])
+
+            colon = mm.find(b':', key_end)
+            value_start = colon + 1
+            while mm[value_start] in b' \t\r\n':
+                value_start += 1
+
+            if mm[value_start] == ord('"'):
+                value_end = self._skip_string(value_start)
+            elif mm[value_start] == ord('{'):
+                depth = 0
+                cursor = value_start
+                while True:
+                    match = self._STRUCTURAL.search(mm, cursor)
+                    if match is None:
+                        raise ValueError("Unterminated object in JSON tree file")
+                    char = mm[match.start()]
+                    if char == ord('"'):
+                        cursor = self._skip_string(match.start())
+                        continue
+                    depth += 1 if char == ord('{') else -1
+                    cursor = match.start() + 1
+                    if depth == 0:
+                        break
+                value_end = cursor
+            else:
+                raise ValueError(f"Unexpected value for '{word}' in JSON tree file")
+
+            offsets[word] = (value_start, value_end)
+            pos = value_end
+        return offsets
+
+    # ------------------------------------------------------------------
+    # Store interface
+    # ------------------------------------------------------------------
+
+    def _entry(self, word: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            span = self._offsets.get(word)
+            if span is None:
+                return None
+            return json.loads(self._mmap[span[0]:span[1]])
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def words(self) -> List[str]:
+        return list(self._offsets.keys())
+
+    def get_serialized(self, word: str) -> Optional[bytes]:
+        entry = self._entry(word)
+        if entry is None:
+            return None
+        return bytes.fromhex(entry['serialized'])
+
+    def get_metadata(self, word: str) -> Optional[Dict[str, Any]]:
+        entry = self._entry(word)
+        return entry.get('metadata') if entry else None
+
+    def get_entry(self, word: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """Payload and metadata from one decode of the entry."""
+        entry = self._entry(word)
+        if entry is None:
+            return None
+        return bytes.fromhex(entry['serialized']), entry.get('metadata') or {}
+
+    def put_serialized(self, word: str, serialized: bytes, metadata: Dict[str, Any]) -> None:
+        self.put_many([(word, serialized, metadata)])
+
+    def put_many(self, entries: Iterable[Tuple[str, bytes, Dict[str, Any]]]) -> int:
+        """
+        Write the file again with the given entries added or replaced.
+
+        Existing entries are copied as raw byte spans, so this stays a sequential
+        copy rather than a decode/encode of every tree. Batch puts through here:
+        each call rewrites the whole file once.
+        """
+        new_values = {}
+        for word, serialized, metadata in entries:
+            value = json.dumps({'serialized': serialized.hex(), 'metadata': metadata}, indent=2)
+            new_values[word] = value.replace("\n", "\n  ").encode('utf-8')
+        if not new_values:
+            return 0
+
+        with self._lock:
+            tmp_path = f"{self.file_path}.tmp"
+            items = [(w, span) for w, span in self._offsets.items() if w not in new_values]
+            with open(tmp_path, 'wb') as f:
+                f.write(b"{")
+                first = True
+                for existing_word, (start, end) in items:
+                    f.write(b"\n  " if first else b",\n  ")
+                    f.write(json.dumps(existing_word).encode('utf-8') + b": ")
+                    f.write(self._mmap[start:end])
+                    first = False
+                for word, value in new_values.items():
+                    f.write(b"\n  " if first else b",\n  ")
+                    f.write(json.dumps(word).encode('utf-8') + b": ")
+                    f.write(value)
+                    first = False
+                f.write(b"\n}")
+            os.replace(tmp_path, self.file_path)
+            self._open()
+        return len(new_values)
+
+    def entry_tokens(self) -> Dict[str, str]:
+        """Change token per tree: the signature of the mapped file, so any rewrite changes every token."""
+        with self._lock:
+            if self._file is None:
+                return {}
+            return dict.fromkeys(self._offsets, file_signature(self._file))
+
+    def sync_manifest_path(self) -> str:
+        return f"{self.file_path}{SYNC_MANIFEST_SUFFIX}"
+
+    def size_bytes(self) -> int:
+        return os.path.getsize(self.file_path) if os.path.exists(self.file_path) else 0
+
+    def _close_mapping(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def close(self) -> None:
+        # Shared between service instances (see create_tree_file_store); the
+        # mapping is released with the process.
+        pass
+
+
+_LAZY_JSON_STORES: Dict[str, LazyJsonTreeStore] = {}
+_LAZY_JSON_STORES_LOCK = threading.Lock()
+
+
+class SegmentTreeStore:
+    """
+    Append-only segment log for serialized probability trees.
+
+    Layout of the store directory:
+    - segment-NNNNNN.log: records of (header, word, metadata json, payload)
+    - index.log: one tab-separated line per put: word, segment id, offset, length
+    - LOCK: advisory file lock shared by all writer processes
+    - json_import.json: signature and entry hashes of the last legacy JSON import
+    - sync_manifest.json: content hashes kept by the tree sync (see entry_tokens)
+
+    Each put appends one record and one index line, so a new tree costs O(tree)
+    instead of O(corpus). Startup only reads index.log. Later index lines win,
+    and superseded records are reclaimed by compaction, which runs in a
+    background thread once enough of the log is garbage.
+    """
+
+    # magic, word length, metadata length, payload length, crc32 of payload
+    RECORD_HEADER = struct.Struct("<4sHHII")
+    RECORD_MAGIC = b"WTSR"
+    INDEX_FILE = "index.log"
+    LOCK_FILE = "LOCK"
+    JSON_IMPORT_FILE = "json_import.json"
+    SYNC_MANIFEST_FILE = "sync_manifest.json"
+
+    def __init__(self, directory: str, segment_max_bytes: int = 64 * 1024 * 1024,
+                 compaction_interval: float = 300.0, compaction_garbage_ratio: float = 0.5,
+                 fsync: bool = False):
+        """
+        Initialize segment store.
+
+        Args:
+            directory: Directory holding segments, index and lock file
+            segment_max_bytes: Roll over to a new segment after this size
+            compaction_interval: Seconds between background compaction checks (0 disables)
+            compaction_garbage_ratio: Compact when this fraction of segment bytes is dead
+            fsync: fsync segment and index after every append
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segment_max_bytes = segment_max_bytes
+        self.compaction_garbage_ratio = compaction_garbage_ratio
+        self.fsync = fsync
+
+        self._index: Dict[str, Tuple[int, int, int]] = {}  # word -> (segment id, offset, length)
+        self._index_position = 0
+        self._index_inode = None
+        self._thread_lock = threading.RLock()
+        self._lock_fd = os.open(self.directory / self.LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+
+        self._load_index()
+
+        self._stop_event = threading.Event()
+        self._compaction_thread = None
+        if compaction_interval > 0:
+            self._compaction_thread = threading.Thread(
+                target=self._compaction_loop, args=(compaction_interval,),
+                name="segment-compaction", daemon=True
+            )
+            self._compaction_thread.start()
+
+        logger.info(f"📦 Segment store ready with {len(self._index)} trees at {self.directory}")
+
+    # ------------------------------------------------------------------
+    # Locking and index handling
+    # ------------------------------------------------------------------
+
+    def _acquire_file_lock(self):
+        if fcntl is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_EX)
+
+    def _release_file_lock(self):
+        if fcntl is not None:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _index_path(self) -> Path:
+        return self.directory / self.INDEX_FILE
+
+    def _segment_path(self, segment_id: int) -> Path:
+        return self.directory / f"segment-{segment_id:06d}.log"
+
+    def _segment_ids(self) -> List[int]:
+        ids = []
+        for path in self.directory.glob("segment-*.log"):
+            try:
+                ids.append(int(path.stem.split("-")[1]))
+            except (IndexError, ValueError):
+                continue
+        return sorted(ids)
+
+    def _load_index(self):
+        """Read index.log from scratch."""
+        with self._thread_lock:
+            self._index = {}
+            self._index_position = 0
+            self._index_inode = None
+            self._read_new_index_lines()
+
+    def _read_new_index_lines(self):
+        """
+        Apply index lines appended since the last read.
+
+        If index.log was replaced by a compaction in another process, the whole
+        index is reloaded. A trailing line without newline is an append still in
+        flight (or a crashed writer) and is left for the next refresh.
+        """
+        path = self._index_path()
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self._index = {}
+            self._index_position = 0
+            self._index_inode = None
+            return
+
+        if self._index_inode is not None and stat.st_ino != self._index_inode:
+            self._index = {}
+            self._index_position = 0
+        self._index_inode = stat.st_ino
+
+        if stat.st_size <= self._index_position:
+            return
+
+        with open(path, 'rb') as f:
+            f.seek(self._index_position)
+            chunk = f.read()
+
+        complete = chunk.rfind(b"\n") + 1
+        for line in chunk[:complete].splitlines():
+            parts = line.decode('utf-8').split("\t")
+            if len(parts) != 4:
+                logger.warning(f"Skipping malformed segment index line: {line!r}")
+                continue
+            word, segment_id, offset, length = parts
+            self._index[word] = (int(segment_id), int(offset), int(length))
+        self._index_position += complete
+
+    def refresh(self):
+        """Pick up trees appended by other processes."""
+        with self._thread_lock:
+            self._read_new_index_lines()
+
+    # ------------------------------------------------------------------
+    # Records
+    # ------------------------------------------------------------------
+
+    def _encode_record(self, word: str, serialized: bytes, metadata: Dict[str, Any]) -> bytes:
+        word_bytes = word.encode('utf-8')
+        meta_bytes = json.dumps(metadata, separators=(',', ':')).encode('utf-8')
+        header = self.RECORD_HEADER.pack(
+            self.RECORD_MAGIC, len(word_bytes), len(meta_bytes), len(serialized), zlib.crc32(serialized)
+        )
+        return header + word_bytes + meta_bytes + serialized
+
+    def _decode_record(self, record: bytes, word: str) -> Tuple[bytes, Dict[str, Any]]:
+        magic, word_len, meta_len, payload_len, crc = self.RECORD_HEADER.unpack_from(record)
+        if magic != self.RECORD_MAGIC:
+            raise ValueError(f"Corrupt segment record for '{word}'")
+        start = self.RECORD_HEADER.size
+        record_word = record[start:start + word_len].decode('utf-8')
+        start += word_len
+        metadata = json.loads(record[start:start + meta_len]) if meta_len else {}
+        start += meta_len
+        payload = record[start:start + payload_len]
+        if record_word != word or len(payload) != payload_len or zlib.crc32(payload) != crc:
+            raise ValueError(f"Corrupt segment record for '{word}'")
+        return payload, metadata
+
+    def _read_record(self, word: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        with self._thread_lock:
+            location = self._index.get(word)
+            if location is None:
+                self._read_new_index_lines()
+                location = self._index.get(word)
+            if location is None:
+                return None
+
+        for attempt in range(2):
+            segment_id, offset, length = location
+            try:
+                with open(self._segment_path(segment_id), 'rb') as f:
+                    f.seek(offset)
+                    record = f.read(length)
+                return self._decode_record(record, word)
+            except FileNotFoundError:
+                # Segment removed by a compaction in another process; reload and retry
+                if attempt == 0:
+                    self._load_index()
+                    with self._thread_lock:
+                        location = self._index.get(word)
+                    if location is None:
+                        return None
+                else:
+                    raise
+        return None
+
+    def _active_segment(self) -> Tuple[int, int]:
+        """Return (segment id, current size) of the segment to append to."""
+        ids = self._segment_ids()
+        segment_id = ids[-1] if ids else 1
+        path = self._segment_path(segment_id)
+        size = path.stat().st_size if path.exists() else 0
+        if size >= self.segment_max_bytes:
+            segment_id += 1
+            size = 0
+        return segment_id, size
+
+    def _append(self, records: List[Tuple[str, bytes]]) -> None:
+        """
+        Append encoded records and their index lines under the file lock.
+
+        Each record goes out in a single O_APPEND write, and its index line is
+        only written after the record is on disk.
+        """
+        with self._thread_lock:
+            self._acquire_file_lock()
+            try:
+                segment_id, size = self._active_segment()
+                seg_fd = os.open(self._segment_path(segment_id), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                index_fd = os.open(self._index_path(), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    index_lines = []
+                    for word, record in records:
+                        if size >= self.segment_max_bytes:
+                            os.close(seg_fd)
+                            segment_id += 1
+                            size = 0
+                            seg_fd = os.open(self._segment_path(segment_id), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                        os.write(seg_fd, record)
+                        index_lines.append((word, segment_id, size, len(record)))
+                        size += len(record)
+                    if self.fsync:
+                        os.fsync(seg_fd)
+                    os.write(index_fd, "".join(
+                        f"{word}\t{seg}\t{offset}\t{length}\n" for word, seg, offset, length in index_lines
+                    ).encode('utf-8'))
+                    if self.fsync:
+                        os.fsync(index_fd)
+                finally:
+                    os.close(seg_fd)
+                    os.close(index_fd)
+                self._read_new_index_lines()
+            finally:
+                self._release_file_lock()
+
+    # ------------------------------------------------------------------
+    # Store interface
+    # ------------------------------------------------------------------
+
+    def __contains__(self, word: str) -> bool:
+        with self._thread_lock:
+            if word in self._index:
+                return True
+            self._read_new_index_lines()
+            return word in self._index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def words(self) -> List[str]:
+        with self._thread_lock:
+            return list(self._index.keys())
+
+    def get_serialized(self, word: str) -> Optional[bytes]:
+        result = self._read_record(word)
+        return result[0] if result else None
+
+    def get_metadata(self, word: str) -> Optional[Dict[str, Any]]:
+        result = self._read_record(word)
+        return result[1] if result else None
+
+    def get_entry(self, word: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """Payload and metadata from a single record read."""
+        return self._read_record(word)
+
+    def put_serialized(self, word: str, serialized: bytes, metadata: Dict[str, Any]) -> None:
+        self._append([(word, self._encode_record(word, serialized, metadata))])
+
+    def put_many(self, entries: Iterable[Tuple[str, bytes, Dict[str, Any]]]) -> int:
+        """Append many trees with a single lock acquisition."""
+        records = [(word, self._encode_record(word, serialized, metadata))
+                   for word, serialized, metadata in entries]
+        if records:
+            self._append(records)
+        return len(records)
+
+    def entry_tokens(self) -> Dict[str, str]:
+        """
+        Change token per tree: its record location. Every put appends a new record
+        and compaction writes to fresh segment ids, so a location is never reused.
+        """
+        with self._thread_lock:
+            self._read_new_index_lines()
+            return {word: f"{segment_id}:{offset}:{length}" for word, (segment_id, offset, length) in self._index.items()}
+
+    def sync_manifest_path(self) -> str:
+        return str(self.directory / self.SYNC_MANIFEST_FILE)
+
+    def size_bytes(self) -> int:
+        total = 0
+        for segment_id in self._segment_ids():
+            total += self._segment_path(segment_id).stat().st_size
+        index_path = self._index_path()
+        if index_path.exists():
+            total += index_path.stat().st_size
+        return total
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def garbage_ratio(self) -> float:
+        """Fraction of segment bytes no longer referenced by the index."""
+        with self._thread_lock:
+            live_bytes = sum(length for _, _, length in self._index.values())
+        total_bytes = sum(self._segment_path(i).stat().st_size for i in self._segment_ids())
+        if total_bytes == 0:
+            return 0.0
+        return max(0.0, (total_bytes - live_bytes) / total_bytes)
+
+    def compact(self) -> Dict[str, int]:
+        """
+        Rewrite live records into fresh segments and atomically swap the index.
+
+        Returns:
+            Dict with live trees kept and bytes reclaimed
+        """
+        with self._thread_lock:
+            self._acquire_file_lock()
+            try:
+                self._load_index()
+                old_ids = self._segment_ids()
+                old_bytes = sum(self._segment_path(i).stat().st_size for i in old_ids)
+                next_id = (old_ids[-1] + 1) if old_ids else 1
+
+                new_index = {}
+                segment_id, size = next_id, 0
+                out = open(self._segment_path(segment_id), 'wb')
+                try:
+                    for word, (src_id, offset, length) in sorted(self._index.items(), key=lambda item: item[1]):
+                        with open(self._segment_path(src_id), 'rb') as f:
+                            f.seek(offset)
+                            record = f.read(length)
+                        if size >= self.segment_max_bytes:
+                            out.close()
+                            segment_id += 1
+                            size = 0
+                            out = open(self._segment_path(segment_id), 'wb')
+                        out.write(record)
+                        new_index[word] = (segment_id, size, length)
+                        size += length
+                    out.flush()
+                    os.fsync(out.fileno())
+                finally:
+                    out.close()
+
+                tmp_index = self.directory / f"{self.INDEX_FILE}.tmp"
+                with open(tmp_index, 'w') as f:
+                    for word, (seg, offset, length) in new_index.items():
+                        f.write(f"{word}\t{seg}\t{offset}\t{length}\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_index, self._index_path())
+
+                for segment_id in old_ids:
+                    self._segment_path(segment_id).unlink(missing_ok=True)
+
+                self._load_index()
+                new_bytes = sum(self._segment_path(i).stat().st_size for i in self._segment_ids())
+            finally:
+                self._release_file_lock()
+
+        reclaimed = old_bytes - new_bytes
+        logger.info(f"🧹 Compacted segment store: {len(new_index)} trees kept, {reclaimed} bytes reclaimed")
+        return {"live_trees": len(new_index), "bytes_reclaimed": reclaimed}
+
+    def _compaction_loop(self, interval: float):
+        while not self._stop_event.wait(interval):
+            try:
+                if self.garbage_ratio() >= self.compaction_garbage_ratio:
+                    self.compact()
+            except Exception as e:
+                logger.warning(f"Background segment compaction failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Legacy JSON compatibility
+    # ------------------------------------------------------------------
+
+    def import_json(self, file_path: str, overwrite: bool = False) -> int:
+        """
+        Import trees from a legacy probability_trees.json file.
+
+        Args:
+            file_path: Path to the legacy JSON file
+            overwrite: Replace trees that already exist in the store
+
+        Returns:
+            Number of trees imported
+        """
+        data = read_legacy_json(file_path)
+        entries = []
+        for word, entry in data.items():
+            if not overwrite and word in self._index:
+                continue
+            if not isinstance(entry, dict) or 'serialized' not in entry:
+                logger.warning(f"Tree data for '{word}' is not in expected format")
+                continue
+            entries.append((word, bytes.fromhex(entry['serialized']), entry.get('metadata', {})))
+        imported = self.put_many(entries)
+        logger.info(f"📥 Imported {imported} trees from {file_path}")
+        return imported
+
+    def import_json_changes(self, file_path: str) -> int:
+        """
+        Import the entries of a legacy probability_trees.json that changed since
+        the last call, so edits to the JSON reach a store that was seeded from it.
+
+        Unchanged files (same size and mtime) are not read. Otherwise entries that
+        are new or differ from the previous import replace the stored tree; trees
+        built at runtime for entries the JSON did not change are kept. Without a
+        previous import, only words missing from the store are imported.
+
+        Returns:
+            Number of trees imported
+        """
+        marker = self.directory / self.JSON_IMPORT_FILE
+        stat = os.stat(file_path)
+        signature = [stat.st_size, stat.st_mtime_ns]
+        try:
+            with open(marker, 'r') as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            previous = {}
+        if previous.get('source') == signature:
+            return 0
+        previous_hashes = previous.get('hashes')
+
+        entries, hashes = [], {}
+        for word, entry in read_legacy_json(file_path).items():
+            if not isinstance(entry, dict) or 'serialized' not in entry:
+                logger.warning(f"Tree data for '{word}' is not in expected format")
+                continue
+            digest = zlib.crc32(json.dumps(entry, sort_keys=True).encode('utf-8'))
+            hashes[word] = digest
+            changed = word not in self._index if previous_hashes is None else previous_hashes.get(word) != digest
+            if changed:
+                entries.append((word, bytes.fromhex(entry['serialized']), entry.get('metadata', {})))
+        imported = self.put_many(entries)
+
+        tmp_marker = self.directory / f"{self.JSON_IMPORT_FILE}.tmp"
+        with open(tmp_marker, 'w') as f:
+            json.dump({'source': signature, 'hashes': hashes}, f, separators=(',', ':'))
+        os.replace(tmp_marker, marker)
+        if imported:
+            logger.info(f"📥 Imported {imported} new or changed trees from {file_path}")
+        return imported
+
+    def export_json(self, file_path: str) -> int:
+        """
+        Export all live trees to the legacy probability_trees.json format.
+
+        Returns:
+            Number of trees exported
+        """
+        def entries():
+            for word in self.words():
+                result = self._read_record(word)
+                if result is not None:
+                    yield word, result[0], result[1]
+
+        exported = write_legacy_json(file_path, entries())
+        logger.info(f"📤 Exported {exported} trees to {file_path}")
+        return exported
+
+    def close(self) -> None:
+        self._stop_event.set()
+        if self._compaction_thread is not None:
+            self._compaction_thread.join(timeout=5)
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+
+class TreeContainer:
+    """
+    Read-only binary container of serialized trees, memory-mapped.
+
+    File layout (little endian):
+    - header: magic, version, entry count, words blob offset, fingerprint
+      table offset, payloads offset
+    - entry table: one (word offset, word length, payload offset, payload length,
+      fingerprint index) per word, sorted by word
+    - words blob: UTF-8 words back to back
+    - fingerprint table: JSON list of the tree fingerprint ids in the file;
+      index 0 is null (stored without a fingerprint)
+    - payloads: raw serialized trees back to back
+
+    A lookup binary-searches the entry table directly in the mapping and slices
+    one payload out; nothing else in the file is read or decoded. Version 1
+    files (no fingerprints) are still readable.
+    """
+
+    HEADER = struct.Struct("<8sIIQQQ")
+    ENTRY = struct.Struct("<IHQIH")
+    HEADER_V1 = struct.Struct("<8sIIQQ")
+    ENTRY_V1 = struct.Struct("<IHQI")
+    MAGIC = b"WTREEBIN"
+    VERSION = 2
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version = struct.unpack_from("<8sI", self._mmap, 0)
+        if magic != self.MAGIC or version not in (1, self.VERSION):
+            self.close()
+            raise ValueError(f"Not a tree container (or unsupported version): {file_path}")
+
+        if version == 1:
+            _, _, count, words_offset, payloads_offset = self.HEADER_V1.unpack_from(self._mmap, 0)
+            self._entry_struct, self._entries_offset = self.ENTRY_V1, self.HEADER_V1.size
+            self.fingerprints: List[Optional[str]] = [None]
+        else:
+            _, _, count, words_offset, fingerprints_offset, payloads_offset = self.HEADER.unpack_from(self._mmap, 0)
+            self._entry_struct, self._entries_offset = self.ENTRY, self.HEADER.size
+            self.fingerprints = json.loads(self._mmap[fingerprints_offset:payloads_offset])
+
+        self.count = count
+        self._words_offset = words_offset
+        self._payloads_offset = payloads_offset
+
+    @classmethod
+    def build(cls, file_path: str, entries: Iterable[Tuple[str, bytes]],
+              fingerprints: Optional[Dict[str, str]] = None) -> int:
+        """
+        Write a container from (word, serialized) pairs.
+
+        Later duplicates of a word replace earlier ones. The file is written to a
+        temporary path and renamed into place.
+
+        Args:
+            fingerprints: Tree fingerprint id by word (words without one are stored unversioned)
+
+        Returns:
+            Number of trees written
+        """
+        payloads = {}
+        for word, serialized in entries:
+            payloads[word] = serialized
+        words = sorted(payloads)
+        encoded_words = [word.encode('utf-8') for word in words]
+
+        fingerprints = fingerprints or {}
+        table = [None] + sorted({fingerprints[word] for word in words if fingerprints.get(word)})
+        if len(table) > 0xFFFF:
+            raise ValueError(f"Too many tree fingerprints for one container: {len(table) - 1}")
+        table_index = {fingerprint: i for i, fingerprint in enumerate(table)}
+        encoded_table = json.dumps(table).encode('utf-8')
+
+        words_offset = cls.HEADER.size + cls.ENTRY.size * len(words)
+        fingerprints_offset = words_offset + sum(len(w) for w in encoded_words)
+        payloads_offset = fingerprints_offset + len(encoded_table)
+
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(words), words_offset, fingerprints_offset,
+                                    payloads_offset))
+            word_pos = payload_pos = 0
+            for word, encoded in zip(words, encoded_words):
+                f.write(cls.ENTRY.pack(word_pos, len(encoded), payload_pos, len(payloads[word]),
+                                       table_index[fingerprints.get(word) or None]))
+                word_pos += len(encoded)
+                payload_pos += len(payloads[word])
+            for encoded in encoded_words:
+                f.write(encoded)
+            f.write(encoded_table)
+            for word in words:
+                f.write(payloads[word])
+        os.replace(tmp_path, file_path)
+        return len(words)
+
+    def _entry(self, i: int) -> Tuple[int, ...]:
+        return self._entry_struct.unpack_from(self._mmap, self._entries_offset + i * self._entry_struct.size)
+
+    def _word_at(self, word_pos: int, word_len: int) -> bytes:
+        start = self._words_offset + word_pos
+        return self._mmap[start:start + word_len]
+
+    def _find(self, word: str) -> Optional[Tuple[int, ...]]:
+        """Binary search the entry table; returns the word's entry."""
+        target = word.encode('utf-8')
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            entry = self._entry(mid)
+            probe = self._word_at(entry[0], entry[1])
+            if probe < target:
+                lo = mid + 1
+            elif probe > target:
+                hi = mid
+            else:
+                return entry
+        return None
+
+    def __contains__(self, word: str) -> bool:
+        return self._find(word) is not None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def words(self) -> List[str]:
+        result = []
+        for i in range(self.count):
+            entry = self._entry(i)
+            result.append(self._word_at(entry[0], entry[1]).decode('utf-8'))
+        return result
+
+    def get_serialized(self, word: str) -> Optional[bytes]:
+        entry = self._find(word)
+        if entry is None:
+            return None
+        start = self._payloads_offset + entry[2]
+        return self._mmap[start:start + entry[3]]
+
+    def get_fingerprint(self, word: str) -> Optional[str]:
+        """Fingerprint id the word's tree was stored with (None: unversioned or not in the container)."""
+        entry = self._find(word)
+        return self.fingerprints[entry[4]] if entry is not None and len(entry) > 4 else None
+
+    def signature(self) -> str:
+        """Signature of the mapped file (see file_signature)."""
+        return file_signature(self._file)
+
+    def size_bytes(self) -> int:
+        return os.path.getsize(self.file_path)
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ContainerTreeStore:
+    """
+    Memory-mapped tree container with a segment overlay for new trees.
+
+    The container is immutable and built offline (see convert_json_to_container);
+    trees stored at runtime go to the overlay segment store and shadow the
+    container. repack() folds the overlay back into a fresh container.
+    """
+
+    def __init__(self, container_path: str, overlay_dir: str, compaction_interval: float = 300.0):
+        self.container_path = container_path
+        self.container = TreeContainer(container_path) if os.path.exists(container_path) else None
+        self.overlay = SegmentTreeStore(overlay_dir, compaction_interval=compaction_interval)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self.overlay or (self.container is not None and word in self.container)
+
+    def __len__(self) -> int:
+        """Container count from its header plus overlay trees that do not shadow one."""
+        if self.container is None:
+            return len(self.overlay)
+        return len(self.container) + sum(1 for word in self.overlay.words() if word not in self.container)
+
+    def words(self) -> List[str]:
+        words = set(self.overlay.words())
+        if self.container is not None:
+            words.update(self.container.words())
+        return list(words)
+
+    def get_serialized(self, word: str) -> Optional[bytes]:
+        serialized = self.overlay.get_serialized(word)
+        if serialized is None and self.container is not None:
+            serialized = self.container.get_serialized(word)
+        return serialized
+
+    def get_metadata(self, word: str) -> Optional[Dict[str, Any]]:
+        metadata = self.overlay.get_metadata(word)
+        if metadata is None and self.container is not None:
+            serialized = self.container.get_serialized(word)
+            if serialized is not None:
+                metadata = self._container_metadata(word, serialized)
+        return metadata
+
+    def get_entry(self, word: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        entry = self.overlay.get_entry(word)
+        if entry is None and self.container is not None:
+            serialized = self.container.get_serialized(word)
+            if serialized is not None:
+                entry = (serialized, self._container_metadata(word, serialized))
+        return entry
+
+    def _container_metadata(self, word: str, serialized: bytes) -> Dict[str, Any]:
+        metadata = {'size_bytes': len(serialized)}
+        fingerprint = self.container.get_fingerprint(word)
+        if fingerprint is not None:
+            metadata['fingerprint'] = fingerprint
+        return metadata
+
+    def put_serialized(self, word: str, serialized: bytes, metadata: Dict[str, Any]) -> None:
+        self.overlay.put_serialized(word, serialized, metadata)
+
+    def put_many(self, entries: Iterable[Tuple[str, bytes, Dict[str, Any]]]) -> int:
+        return self.overlay.put_many(entries)
+
+    def entry_tokens(self) -> Dict[str, str]:
+        """Overlay record locations, and the container file signature for trees only in the container."""
+        tokens = {}
+        if self.container is not None:
+            tokens = dict.fromkeys(self.container.words(), f"container:{self.container.signature()}")
+        tokens.update((word, f"overlay:{token}") for word, token in self.overlay.entry_tokens().items())
+        return tokens
+
+    def sync_manifest_path(self) -> str:
+        return f"{self.container_path}{SYNC_MANIFEST_SUFFIX}"
+
+    def size_bytes(self) -> int:
+        container_size = self.container.size_bytes() if self.container is not None else 0
+        return container_size + self.overlay.size_bytes()
+
+    def repack(self) -> int:
+        """
+        Rebuild the container with the overlay trees folded in, then empty the overlay.
+        Tree fingerprints are carried over.
+
+        Returns:
+            Number of trees in the new container
+        """
+        fingerprints = {}
+
+        def entries():
+            if self.container is not None:
+                for word in self.container.words():
+                    fingerprints[word] = self.container.get_fingerprint(word)
+                    yield word, self.container.get_serialized(word)
+            for word in self.overlay.words():
+                fingerprints[word] = (self.overlay.get_metadata(word) or {}).get('fingerprint')
+                yield word, self.overlay.get_serialized(word)
+
+        count = TreeContainer.build(self.container_path, entries(), fingerprints)
+        overlay_dir = self.overlay.directory
+        self.close()
+        for path in overlay_dir.glob("segment-*.log"):
+            path.unlink()
+        (overlay_dir / SegmentTreeStore.INDEX_FILE).unlink(missing_ok=True)
+        # The emptied overlay reuses record locations, which would match old manifest tokens
+        Path(self.sync_manifest_path()).unlink(missing_ok=True)
+        self.container = TreeContainer(self.container_path)
+        self.overlay = SegmentTreeStore(str(overlay_dir), compaction_interval=0)
+        logger.info(f"📦 Repacked tree container with {count} trees")
+        return count
+
+    def close(self) -> None:
+        if self.container is not None:
+            self.container.close()
+        self.overlay.close()
+
+
+class SqliteTreeStore:
+    """
+    Serialized trees in a local SQLite database (stdlib sqlite3, WAL journal).
+
+    WAL lets any number of processes on the host read while one writes, so
+    worker processes share one durable local tier that survives restarts.
+    A single connection is shared by the threads of a process under a lock.
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS trees ("
+        " word TEXT PRIMARY KEY,"
+        " payload BLOB NOT NULL,"
+        " metadata TEXT NOT NULL DEFAULT '{}')"
+    )
+
+    def __init__(self, file_path: str, busy_timeout: float = 5.0, synchronous: str = "NORMAL"):
+        """
+        Open (or create) the database.
+
+        Args:
+            file_path: SQLite database file
+            busy_timeout: Seconds to wait for another process's write lock
+            synchronous: PRAGMA synchronous level ("NORMAL" is durable across crashes in WAL mode,
+                losing at most the last commits on power loss)
+        """
+        self.file_path = str(file_path)
+        Path(self.file_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.file_path, timeout=busy_timeout, check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._conn.execute(self.SCHEMA)
+        logger.info(f"📦 SQLite tree store ready with {len(self)} trees at {self.file_path}")
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def __contains__(self, word: str) -> bool:
+        return bool(self._query("SELECT 1 FROM trees WHERE word = ?", (word,)))
+
+    def __len__(self) -> int:
+        return self._query("SELECT COUNT(*) FROM trees")[0][0]
+
+    def words(self) -> List[str]:
+        return [row[0] for row in self._query("SELECT word FROM trees")]
+
+    def get_serialized(self, word: str) -> Optional[bytes]:
+        rows = self._query("SELECT payload FROM trees WHERE word = ?", (word,))
+        return bytes(rows[0][0]) if rows else None
+
+    def get_many(self, words: List[str], with_metadata: bool = False) -> Dict[str, Any]:
+        """
+        Payloads (or (payload, metadata) pairs) for the stored subset of words,
+        one query per 500 words.
+        """
+        found = {}
+        for i in range(0, len(words), 500):
+            chunk = words[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for word, payload, metadata in self._query(
+                    f"SELECT word, payload, metadata FROM trees WHERE word IN ({placeholders})", tuple(chunk)):
+                found[word] = (bytes(payload), json.loads(metadata)) if with_metadata else bytes(payload)
+        return found
+
+    def get_metadata(self, word: str) -> Optional[Dict[str, Any]]:
+        rows = self._query("SELECT metadata FROM trees WHERE word = ?", (word,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def get_entry(self, word: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        """Payload and metadata in one query."""
+        rows = self._query("SELECT payload, metadata FROM trees WHERE word = ?", (word,))
+        return (bytes(rows[0][0]), json.loads(rows[0][1])) if rows else None
+
+    def put_serialized(self, word: str, serialized: bytes, metadata: Dict[str, Any]) -> None:
+        self.put_many([(word, serialized, metadata)])
+
+    def put_many(self, entries: Iterable[Tuple[str, bytes, Dict[str, Any]]]) -> int:
+        """Insert or replace many trees in one transaction."""
+        rows = [(word, sqlite3.Binary(serialized), json.dumps(metadata)) for word, serialized, metadata in entries]
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO trees (word, payload, metadata) VALUES (?, ?, ?)", rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def size_bytes(self) -> int:
+        return sum(os.path.getsize(path) for path in (self.file_path, self.file_path + "-wal")
+                   if os.path.exists(path))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def convert_json_to_container(json_file_path: str, container_path: str) -> int:
+    """
+    One-shot converter from legacy probability_trees.json to a binary container.
+
+    Returns:
+        Number of trees written
+    """
+    data = read_legacy_json(json_file_path)
+    entries = {word: entry for word, entry in data.items() if isinstance(entry, dict) and 'serialized' in entry}
+    count = TreeContainer.build(
+        container_path,
+        ((word, bytes.fromhex(entry['serialized'])) for word, entry in entries.items()),
+        {word: (entry.get('metadata') or {}).get('fingerprint') for word, entry in entries.items()}
+    )
+    logger.info(f"📦 Converted {count} trees from {json_file_path} to {container_path}")
+    return count
+
+
+def create_tree_file_store(kind: str, json_file_path: str, segment_dir: Optional[str] = None,
+                           compaction_interval: float = 300.0, container_path: Optional[str] = None):
+    """
+    Factory for the local tree file store.
+
+    Args:
+        kind: "json" (legacy single file), "lazy_json" (same file, decoded on demand),
+            "segment" (append-only log) or "container" (memory-mapped binary
+            container plus segment overlay)
+        json_file_path: Legacy JSON file; its new and changed entries are imported into
+            a segment store, and it is converted once into a missing container
+        segment_dir: Segment store / overlay directory (defaults to "<json stem>.segments")
+        compaction_interval: Seconds between background compaction checks
+        container_path: Binary container file (defaults to "<json stem>.bin")
+
+    Returns:
+        Tree file store instance
+    """
+    if kind == "json":
+        return JsonTreeStore(json_file_path)
+
+    if kind == "lazy_json":
+        # One offset index per file, shared by every service instance in the process
+        key = os.path.abspath(json_file_path)
+        with _LAZY_JSON_STORES_LOCK:
+            if key not in _LAZY_JSON_STORES:
+                _LAZY_JSON_STORES[key] = LazyJsonTreeStore(json_file_path)
+            return _LAZY_JSON_STORES[key]
+
+    if kind == "segment":
+        if segment_dir is None:
+            segment_dir = str(Path(json_file_path).with_suffix(".segments"))
+        store = SegmentTreeStore(segment_dir, compaction_interval=compaction_interval)
+        if os.path.exists(json_file_path):
+            store.import_json_changes(json_file_path)
+        return store
+
+    if kind == "container":
+        if container_path is None:
+            container_path = str(Path(json_file_path).with_suffix(".bin"))
+        if segment_dir is None:
+            segment_dir = str(Path(json_file_path).with_suffix(".segments"))
+        if not os.path.exists(container_path) and os.path.exists(json_file_path):
+            convert_json_to_container(json_file_path, container_path)
+        return ContainerTreeStore(container_path, segment_dir, compaction_interval=compaction_interval)
+
+    raise ValueError("file_store must be 'json', 'lazy_json', 'segment' or 'container'")
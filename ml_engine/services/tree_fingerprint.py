@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Tree Fingerprint
+================
+
+Identifies what produced a stored probability tree: a checksum of the model
+and tokenizer files, the prompt template version and the tree builder version.
+
+The storage service puts the fingerprint id into Redis keys
+("tree:{id}:{word}") and into local tier metadata. Trees with another
+fingerprint are treated as misses and rebuilt lazily, so a new model can be
+rolled out (and its trees prewarmed under the new keys) while the old keys
+keep serving until they are no longer read. Trees stored before fingerprints
+existed (no fingerprint in their metadata, "tree:{word}" keys) keep serving
+until they are rebuilt, unless StorageConfig.serve_unversioned is off.
+"""
+
+import hashlib
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from models.probability_tree import BUILDER_VERSION, PROMPT_TEMPLATE_VERSION
+
+DEFAULT_MODEL_DIR = Path(__file__).parent.parent / "distilgpt2_onnx"
+
+# (path, size, mtime_ns) -> digest, so repeated fingerprints don't rehash the model
+_checksum_cache: Dict[Tuple[str, int, int], str] = {}
+
+
+@dataclass(frozen=True)
+class TreeFingerprint:
+    """Build inputs that determine the contents of a probability tree."""
+    model_checksum: str
+    prompt_template_version: str = PROMPT_TEMPLATE_VERSION
+    builder_version: str = BUILDER_VERSION
+
+    @property
+    def id(self) -> str:
+        """Short stable id used in Redis keys and tier metadata."""
+        material = f"{self.model_checksum}|{self.prompt_template_version}|{self.builder_version}"
+        return hashlib.blake2b(material.encode('utf-8'), digest_size=6).hexdigest()
+
+    def to_dict(self) -> Dict[str, str]:
+        return {'id': self.id, **asdict(self)}
+
+
+def file_checksum(path: Path, chunk_size: int = 1 << 20) -> Optional[str]:
+    """blake2b of a file's contents, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    digest = _checksum_cache.get(key)
+    if digest is None:
+        hasher = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                hasher.update(chunk)
+        digest = _checksum_cache[key] = hasher.hexdigest()
+    return digest
+
+
+def model_files(model_dir: Path = DEFAULT_MODEL_DIR) -> List[str]:
+    """Names of the files in model_dir (model.onnx once exported, config and tokenizer), sorted."""
+    try:
+        return sorted(entry.name for entry in os.scandir(model_dir)
+                      if entry.is_file() and not entry.name.startswith('.'))
+    except FileNotFoundError:
+        return []
+
+
+def model_checksum(model_dir: Path = DEFAULT_MODEL_DIR, files: Optional[Iterable[str]] = None) -> str:
+    """Combined checksum of the files present in model_dir (or of files, where they exist)."""
+    hasher = hashlib.blake2b(digest_size=16)
+    for name in (model_files(model_dir) if files is None else files):
+        checksum = file_checksum(Path(model_dir) / name)
+        if checksum is not None:
+            hasher.update(f"{name}={checksum};".encode('utf-8'))
+    return hasher.hexdigest()
+
+
+def compute_tree_fingerprint(model_dir: Path = DEFAULT_MODEL_DIR) -> TreeFingerprint:
+    """Fingerprint for trees built by this process from the model in model_dir."""
+    return TreeFingerprint(model_checksum=model_checksum(model_dir))
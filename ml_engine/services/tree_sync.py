@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Tree Sync
+=========
+
+Incremental sync of the local tree file store into Redis.
+
+Both sides keep a manifest of content hashes per start word. The local one is
+persisted next to the file store (sync_manifest_path) with each tree's change
+token, so only trees whose token changed are read and hashed again. The remote
+one lives in the Redis hash "tree_manifest" and is written in the same pipeline
+as each tree value (here and in OptimizedStorageService). A sync diffs the two
+manifests and pushes only trees that are new or changed locally, in pipelined
+batches with bounded concurrency and per-batch retries. Keys that exist in Redis
+without a manifest entry (written before manifests existed) are pushed once and
+tracked after that.
+
+With a build fingerprint configured, keys and the manifest are per fingerprint
+("tree:{id}:{word}", "tree_manifest:{id}") and only local trees built with that
+fingerprint are pushed, plus trees stored without a fingerprint while the
+storage service still serves those (StorageConfig.serve_unversioned).
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from services.tree_file_stores import create_tree_file_store
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_KEY = "tree_manifest"
+LOCAL_MANIFEST_VERSION = 1
+
+
+def content_hash(serialized: bytes) -> str:
+    """Hash of a serialized tree payload (independent of how Redis encodes the value)."""
+    return hashlib.blake2b(serialized, digest_size=16).hexdigest()
+
+
+def open_pipeline(client):
+    """Non-transactional pipeline for redis-py (sync or asyncio) and Upstash clients alike."""
+    try:
+        return client.pipeline(transaction=False)
+    except TypeError:
+        return client.pipeline()  # Upstash pipelines take no arguments
+
+
+def _load_local_manifest(path: str) -> Dict[str, List]:
+    """Persisted word -> [change token, content hash, fingerprint] entries, or {} if unreadable."""
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == LOCAL_MANIFEST_VERSION:
+            return manifest['entries']
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        pass
+    return {}
+
+
+def _write_local_manifest(path: str, entries: Dict[str, List]) -> None:
+    try:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': LOCAL_MANIFEST_VERSION, 'entries': entries}, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Failed to write local tree manifest {path}: {e}")
+
+
+def local_manifest(file_store, fingerprint_id: Optional[str] = None, include_unversioned: bool = False) -> Dict[str, str]:
+    """
+    Content hash of every tree in a local file store (only those built with
+    fingerprint_id, if given, and those without a fingerprint if include_unversioned).
+
+    Stores reporting entry_tokens() keep the hashes in a manifest file at their
+    sync_manifest_path(): a tree is only read and hashed when its token differs
+    from the recorded one, so a sync with nothing changed locally reads no trees.
+    """
+    tokens = file_store.entry_tokens() if hasattr(file_store, 'entry_tokens') else None
+    path = file_store.sync_manifest_path() if tokens is not None else None
+    recorded = _load_local_manifest(path) if path else {}
+
+    entries = {}
+    for word in (tokens if tokens is not None else file_store.words()):
+        token = tokens[word] if tokens is not None else None
+        known = recorded.get(word)
+        if token is not None and known is not None and known[0] == token:
+            entries[word] = known
+            continue
+        entry = file_store.get_entry(word)  # one read (and decode) of payload and metadata
+        if entry is None:
+            continue
+        serialized, metadata = entry
+        entries[word] = [token, content_hash(serialized), metadata.get('fingerprint')]
+    if path and entries != recorded:
+        _write_local_manifest(path, entries)
+
+    manifest = {}
+    for word, (_, digest, built_with) in entries.items():
+        if fingerprint_id is not None and built_with != fingerprint_id \
+                and not (include_unversioned and built_with is None):
+            continue
+        manifest[word] = digest
+    return manifest
+
+
+def _text(value) -> str:
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
+class TreeSyncEngine:
+    """
+    Push new and changed trees from a local file store to Redis.
+
+    Args:
+        storage: OptimizedStorageService with a Redis connection (its value encoding is reused)
+        file_store: Local tree file store to sync from (defaults to the service's own)
+        json_file_path: probability_trees.json the file store was seeded from; a segment
+            store re-imports its changed entries before each sync
+        batch_size: Trees per pipelined write
+        max_concurrency: Pipelines in flight at once
+        retries: Extra attempts per failed batch
+        retry_backoff: Seconds before the first retry (doubles each attempt)
+    """
+
+    def __init__(self, storage, file_store=None, json_file_path: Optional[str] = None, batch_size: int = 200,
+                 max_concurrency: int = 4, retries: int = 3, retry_backoff: float = 0.5):
+        if getattr(storage, 'redis', None) is None:
+            raise ValueError("Tree sync requires a storage service with a Redis connection")
+        self.storage = storage
+        self.redis = storage.redis
+        self.file_store = file_store if file_store is not None else getattr(storage, 'file_store', None)
+        if self.file_store is None:
+            raise ValueError("Tree sync requires a local file store to sync from")
+        self.json_file_path = json_file_path
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.retries = retries
+        self.retry_backoff = retry_backoff
+
+    def remote_manifest(self) -> Dict[str, str]:
+        """Content hashes recorded in Redis, by start word."""
+        manifest = self.redis.hgetall(self.storage._manifest_key) or {}
+        return {_text(word): _text(digest) for word, digest in manifest.items()}
+
+    def diff(self, local: Dict[str, str], remote: Dict[str, str]) -> List[str]:
+        """Start words whose local tree is missing from Redis or differs from it."""
+        return [word for word, digest in local.items() if remote.get(word) != digest]
+
+    def _write_batch(self, words: List[str]) -> int:
+        """SET each tree and its manifest entry in one pipeline; returns trees written."""
+        pipe = open_pipeline(self.redis)
+        written = 0
+        for word in words:
+            serialized = self.file_store.get_serialized(word)
+            if serialized is None:
+                continue  # removed locally since the diff
+            self.storage._add_redis_tree(pipe, word, serialized)
+            written += 1
+        if written:
+            pipe.execute()
+        return written
+
+    async def _push_batch(self, words: List[str], semaphore: asyncio.Semaphore, stats: Dict[str, Any]) -> None:
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    stats['pushed'] += await asyncio.to_thread(self._write_batch, words)
+                    return
+                except Exception as e:
+                    if attempt == self.retries:
+                        logger.error(f"Tree sync batch of {len(words)} failed after {attempt + 1} attempts: {e}")
+                        stats['failed'] += len(words)
+                        return
+                    stats['retries'] += 1
+                    delay = self.retry_backoff * (2 ** attempt)
+                    logger.warning(f"Tree sync batch failed ({e}), retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+
+    async def sync(self, dry_run: bool = False) -> Dict[str, Any]:
+        """
+        Diff local and remote manifests and push the changed trees.
+
+        Args:
+            dry_run: Only compute the diff
+
+        Returns:
+            Dict with 'imported', 'local_trees', 'remote_trees', 'unchanged', 'changed',
+            'pushed', 'failed', 'retries', 'remote_only' and 'duration_ms'
+        """
+        start = time.perf_counter()
+        imported = 0
+        if self.json_file_path is not None and hasattr(self.file_store, 'import_json_changes') and not dry_run:
+            imported = await asyncio.to_thread(self.file_store.import_json_changes, self.json_file_path)
+        local = await asyncio.to_thread(local_manifest, self.file_store, self.storage._fingerprint_id,
+                                        self.storage.config.serve_unversioned)
+        remote = await asyncio.to_thread(self.remote_manifest)
+        changed = self.diff(local, remote)
+
+        stats = {
+            'imported': imported,
+            'local_trees': len(local),
+            'remote_trees': len(remote),
+            'unchanged': len(local) - len(changed),
+            'changed': len(changed),
+            'pushed': 0,
+            'failed': 0,
+            'retries': 0,
+            'remote_only': len(remote.keys() - local.keys())
+        }
+
+        if changed and not dry_run:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            batches = [changed[i:i + self.batch_size] for i in range(0, len(changed), self.batch_size)]
+            await asyncio.gather(*(self._push_batch(batch, semaphore, stats) for batch in batches))
+
+        stats['duration_ms'] = (time.perf_counter() - start) * 1000
+        logger.info(f"🔄 Tree sync {'(dry run) ' if dry_run else ''}completed: {stats}")
+        return stats
+
+
+def create_tree_sync(storage, file_path: Optional[str] = None, **options) -> TreeSyncEngine:
+    """
+    Sync engine for a storage service, reading from its own file store (after
+    importing changes to its JSON, for a segment store) or from another
+    probability_trees.json (opened lazily, without parsing the whole file).
+    """
+    file_store = None
+    own_store = getattr(storage, 'file_store', None) is not None and str(file_path) == str(storage.config.json_file_path)
+    if file_path is not None and not own_store:
+        file_store = create_tree_file_store("lazy_json", str(file_path))
+    if own_store and os.path.exists(file_path):
+        options.setdefault('json_file_path', str(file_path))
+    return TreeSyncEngine(storage, file_store, **options)
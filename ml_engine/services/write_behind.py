@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Write-Behind Queue
+==================
+
+Background persistence for newly built probability trees.
+
+A put only records the value in an in-process queue and returns; a worker
+thread drains the queue in batches (once batch_size values are waiting or
+flush_interval seconds have passed) and hands each batch to a persist
+callback, retrying failed batches with backoff. A batch that still fails goes
+back to the head of the queue (unless a newer value was queued for its key) and
+is tried again after a pause; values are only dropped when the queue is closed.
+Repeated puts of the same key before a flush are coalesced. Values stay readable
+from the queue until they have been persisted, so a read never misses a tree
+that was only just built.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class WriteBehindQueue:
+    """
+    Batching write-behind queue with a single background worker.
+
+    Args:
+        persist: Called with a list of (key, value) pairs; raises on failure
+        batch_size: Maximum values per persist call
+        flush_interval: Seconds a partial batch waits before being persisted
+        max_retries: Extra attempts for a failed batch before it is re-queued
+        retry_backoff: Seconds before the first retry (doubles each attempt, and the
+            pause before a re-queued batch is retried is the last retry's doubled)
+    """
+
+    def __init__(self, persist: Callable[[List[Tuple[str, Any]]], None], batch_size: int = 50,
+                 flush_interval: float = 0.5, max_retries: int = 3, retry_backoff: float = 0.2,
+                 name: str = "write-behind"):
+        self._persist = persist
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self._pending: "OrderedDict[str, Any]" = OrderedDict()
+        self._in_flight: Dict[str, Any] = {}  # batch being persisted (still readable)
+        self._condition = threading.Condition()
+        self._flush_waiters = 0  # flush() calls blocked until the queue drains
+        self._closed = False
+
+        self._enqueued = 0
+        self._coalesced = 0
+        self._persisted = 0
+        self._failed = 0
+        self._failed_batches = 0
+        self._requeued = 0
+        self._dropped = 0
+        self._retries = 0
+        self._batches = 0
+        self._max_depth = 0
+        self._flush_ms_total = 0.0
+        self._flush_ms_last = 0.0
+        self._flush_ms_max = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def __len__(self) -> int:
+        with self._condition:
+            return len(self._pending) + len(self._in_flight)
+
+    def put(self, key: str, value: Any) -> None:
+        """Queue a value for persistence (replacing any queued value for the same key)."""
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("write-behind queue is closed")
+            if key in self._pending:
+                self._coalesced += 1
+                self._pending.move_to_end(key)
+            self._pending[key] = value
+            self._enqueued += 1
+            self._max_depth = max(self._max_depth, len(self._pending) + len(self._in_flight))
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify_all()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Value queued or being persisted for key, or None."""
+        with self._condition:
+            value = self._pending.get(key, _MISSING)
+            if value is _MISSING:
+                value = self._in_flight.get(key)
+            return value
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Persist everything queued so far, blocking until done.
+
+        Returns early (False) when a batch exhausts its retries while waiting,
+        rather than blocking for as long as the backend is down.
+
+        Returns:
+            True if the queue drained within the timeout
+        """
+        with self._condition:
+            self._flush_waiters += 1
+            failed_batches = self._failed_batches
+            self._condition.notify_all()
+            try:
+                self._condition.wait_for(
+                    lambda: (not self._pending and not self._in_flight) or self._failed_batches != failed_batches,
+                    timeout
+                )
+                return not self._pending and not self._in_flight
+            finally:
+                self._flush_waiters -= 1
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Flush, then stop the worker. Later puts raise RuntimeError."""
+        drained = self.flush(timeout)
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+        return drained
+
+    def _next_batch(self) -> Optional[List[Tuple[str, Any]]]:
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending or self._closed)
+            if not self._pending:
+                return None  # closed and drained
+            # Give a partial batch up to flush_interval to fill unless a flush is waiting
+            self._condition.wait_for(
+                lambda: len(self._pending) >= self.batch_size or self._flush_waiters > 0 or self._closed,
+                self.flush_interval
+            )
+            batch = []
+            while self._pending and len(batch) < self.batch_size:
+                batch.append(self._pending.popitem(last=False))
+            self._in_flight = dict(batch)
+            return batch
+
+    def _persist_with_retries(self, batch: List[Tuple[str, Any]]) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._persist(batch)
+                return True
+            except Exception as e:
+                if attempt == self.max_retries:
+                    logger.error(f"Write-behind batch of {len(batch)} failed after {attempt + 1} attempts: {e}")
+                    return False
+                with self._condition:
+                    self._retries += 1
+                delay = self.retry_backoff * (2 ** attempt)
+                logger.warning(f"Write-behind batch of {len(batch)} failed ({e}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+        return False
+
+    def _requeue(self, batch: List[Tuple[str, Any]]) -> None:
+        """Put a failed batch back at the head of the queue; values queued for its keys since win."""
+        requeued = [(key, value) for key, value in batch if key not in self._pending]
+        for key, value in reversed(requeued):
+            self._pending[key] = value
+            self._pending.move_to_end(key, last=False)
+        self._requeued += len(requeued)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            start = time.perf_counter()
+            persisted = self._persist_with_retries(batch)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+
+            with self._condition:
+                self._in_flight = {}
+                self._batches += 1
+                if persisted:
+                    self._persisted += len(batch)
+                else:
+                    self._failed += len(batch)
+                    self._failed_batches += 1
+                    if self._closed:
+                        self._dropped += len(batch)
+                        logger.error(f"Write-behind queue closed: dropped {len(batch)} unpersisted values")
+                    else:
+                        self._requeue(batch)
+                self._flush_ms_last = elapsed_ms
+                self._flush_ms_total += elapsed_ms
+                self._flush_ms_max = max(self._flush_ms_max, elapsed_ms)
+                self._condition.notify_all()
+                if not persisted and not self._closed:
+                    # Pause before retrying the re-queued batch (close() cuts the pause short)
+                    self._condition.wait_for(lambda: self._closed, self.retry_backoff * (2 ** self.max_retries))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                'queue_depth': len(self._pending) + len(self._in_flight),
+                'max_queue_depth': self._max_depth,
+                'enqueued': self._enqueued,
+                'coalesced': self._coalesced,
+                'persisted': self._persisted,
+                'failed': self._failed,
+                'failed_batches': self._failed_batches,
+                'requeued': self._requeued,
+                'dropped': self._dropped,
+                'retries': self._retries,
+                'batches': self._batches,
+                'last_flush_ms': self._flush_ms_last,
+                'avg_flush_ms': self._flush_ms_total / self._batches if self._batches else 0.0,
+                'max_flush_ms': self._flush_ms_max
+            }
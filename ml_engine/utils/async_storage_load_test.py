@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Async Storage Load Test
+=======================
+
+Show that concurrent tree lookups overlap on the async storage interface
+instead of queueing behind one another:
+
+1. Sync in event loop: each request calls fetch_tree() from a coroutine, as the
+   scoring path used to, so the event loop blocks on every Redis round trip
+2. Worker threads: afetch_tree() without an async client (asyncio.to_thread)
+3. Async pool: afetch_tree() on the pooled redis.asyncio client
+4. Bulk: prefetch_trees() (one MGET per batch, sequential) vs aprefetch()
+   (all batches in flight at once)
+
+Every request fetches a different word with the memory cache disabled, so each
+one is a real Redis round trip. By default the test starts the in-process RESP
+stand-in with injected latency to mimic a network hop; pass --redis-url to use
+a real server (the test writes and then deletes tree:<word> keys, so point it
+at a scratch database).
+
+"overlap" is the number of requests times the injected latency divided by the
+wall time: about 1x means the lookups ran one after another.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import redis
+import redis.asyncio
+
+sys.path.append(str(Path(__file__).parent.parent))
+from services.optimized_storage_service import OptimizedStorageService, StorageConfig
+from services.tree_file_stores import read_legacy_json
+from utils.redis_value_encoding_test import start_stand_in
+
+DEFAULT_JSON = str(Path(__file__).parent.parent / "game_data" / "probability_trees.json")
+
+
+def make_service(client, async_client=None, pool_size: int = 32) -> OptimizedStorageService:
+    service = OptimizedStorageService(StorageConfig(
+        storage_type="redis", redis_connection=client, async_redis_connection=async_client,
+        redis_pool_size=pool_size, cache_size=0, negative_cache_ttl=0
+    ))
+    if async_client is None:
+        service.aredis = None  # force the worker-thread fallback
+    return service
+
+
+async def run_sync_in_loop(service, words):
+    async def request(word):
+        return service.fetch_tree(word)[0]
+    return await asyncio.gather(*(request(word) for word in words))
+
+
+async def run_async(service, words):
+    return await asyncio.gather(*(service.afetch_tree(word) for word in words))
+
+
+async def measure(label, runner, service, words, rounds, latency):
+    best = float("inf")
+    ok = True
+    for _ in range(rounds):
+        start = time.perf_counter()
+        results = await runner(service, words)
+        best = min(best, time.perf_counter() - start)
+        ok &= all((r[0] if isinstance(r, tuple) else r) is not None for r in results)
+    serial = len(words) * latency
+    overlap = f"{serial / best:6.1f}x" if latency else "     -"
+    print(f"   {label:<22} {best * 1000:9.1f} ms  {overlap}  {'✅' if ok else '❌ missing trees'}")
+    return best, ok
+
+
+async def main_async(args):
+    server = None
+    url = args.redis_url
+    latency = 0.0
+    if url is None:
+        latency = args.latency_ms / 1000
+        server, url = start_stand_in(latency)
+        print(f"🧪 Using in-process RESP stand-in at {url} ({args.latency_ms:.1f} ms per reply)")
+    else:
+        print(f"🔌 Using Redis at {url}")
+
+    payloads = {word: bytes.fromhex(entry['serialized']) for word, entry in read_legacy_json(args.json).items()}
+    words = list(payloads)[:args.concurrency]
+    keys = [f"tree:{word}" for word in payloads]
+    print(f"📦 {len(payloads)} trees, {len(words)} concurrent requests")
+    print()
+
+    client = redis.Redis.from_url(url)
+    async_client = redis.asyncio.Redis(
+        connection_pool=redis.asyncio.BlockingConnectionPool.from_url(url, max_connections=args.pool_size)
+    )
+    all_ok = True
+    try:
+        for key, payload in zip(keys, payloads.values()):
+            client.set(key, payload)
+
+        sync_service = make_service(client)
+        thread_service = make_service(client)
+        async_service = make_service(client, async_client)
+        await async_service.afetch_tree(words[0])  # open a pooled connection on this loop
+
+        print(f"   {'mode':<22} {'wall time':>12}  {'overlap':>7}")
+        sync_time, ok = await measure("sync in event loop", run_sync_in_loop, sync_service, words, args.rounds, latency)
+        all_ok &= ok
+        _, ok = await measure("worker threads", run_async, thread_service, words, args.rounds, latency)
+        all_ok &= ok
+        async_time, ok = await measure("redis.asyncio pool", run_async, async_service, words, args.rounds, latency)
+        all_ok &= ok
+        print(f"   Async pool serves {len(words)} concurrent lookups {sync_time / async_time:.1f}x faster than blocking calls")
+        print()
+
+        all_words = list(payloads)
+        start = time.perf_counter()
+        sync_stats = sync_service.prefetch_trees(all_words, batch_size=args.batch_size)
+        sync_bulk = time.perf_counter() - start
+        start = time.perf_counter()
+        async_stats = await async_service.aprefetch(all_words, batch_size=args.batch_size)
+        async_bulk = time.perf_counter() - start
+        all_ok &= sync_stats['loaded'] == async_stats['loaded'] == len(all_words)
+        print(f"📥 Bulk load of {len(all_words)} trees in batches of {args.batch_size}")
+        print(f"   prefetch_trees (sequential MGETs) {sync_bulk * 1000:9.1f} ms")
+        print(f"   aprefetch (concurrent MGETs)      {async_bulk * 1000:9.1f} ms")
+
+        await async_service.aclose()
+    finally:
+        client.delete(*keys)
+        if server is not None:
+            server.shutdown()
+
+    print()
+    print("=" * 50)
+    print("✅ Async storage load test completed!" if all_ok else "❌ Async storage load test failed")
+    return all_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent tree lookups: blocking vs async storage")
+    parser.add_argument("--json", default=DEFAULT_JSON, help="Source probability_trees.json")
+    parser.add_argument("--redis-url", default=None, help="Real Redis server (default: in-process stand-in)")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Injected reply latency for the stand-in")
+    parser.add_argument("--concurrency", type=int, default=50, help="Concurrent lookups per round")
+    parser.add_argument("--pool-size", type=int, default=32, help="Async connection pool size")
+    parser.add_argument("--batch-size", type=int, default=20, help="Keys per MGET for the bulk comparison")
+    parser.add_argument("--rounds", type=int, default=3, help="Timing rounds (best round is reported)")
+    args = parser.parse_args()
+
+    print("🚀 Async Storage Load Test")
+    print("=" * 50)
+    if not asyncio.run(main_async(args)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
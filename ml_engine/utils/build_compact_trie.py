@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Compact Trie Builder
+====================
+
+Rebuild game_data/transformation_trie.bin from game_data/words.txt without
+regenerating the other package files (CanonicalDataGenerator writes it along
+with them). The word engine builds the trie in memory at startup when the file
+is missing or was built from another words.txt.
+
+Usage:
+    python utils/build_compact_trie.py [--package-dir DIR]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from models.compact_trie import COMPACT_TRIE_FILE, CompactTrie, words_file_checksum
+
+DEFAULT_PACKAGE_DIR = str(Path(__file__).parent.parent / "game_data")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build transformation_trie.bin from words.txt")
+    parser.add_argument("--package-dir", default=DEFAULT_PACKAGE_DIR, help="Directory with words.txt")
+    args = parser.parse_args()
+
+    package_dir = Path(args.package_dir)
+    words_file = package_dir / "words.txt"
+    start = time.perf_counter()
+    with open(words_file) as f:
+        words = {line.strip().lower() for line in f if line.strip()}
+    trie = CompactTrie.from_words(words, words_file_checksum(words_file))
+    trie.save(package_dir / COMPACT_TRIE_FILE)
+    print(f"✅ {len(words)} words, {len(trie)} nodes in {trie.header['slots']} slots, "
+          f"{trie.nbytes / 1024 / 1024:.1f} MB in {time.perf_counter() - start:.1f} s -> {package_dir / COMPACT_TRIE_FILE}")
+
+
+if __name__ == "__main__":
+    main()
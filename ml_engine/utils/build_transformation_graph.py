@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Transformation Graph Builder
+============================
+
+Compute the transformations (rhyme categories, anagrams, one-letter-off) of
+every vocabulary word with a pool of worker processes and write them to
+game_data/transformation_graph.bin, which EfficientWordService serves
+TransformationData from (see services/transformation_graph.py).
+
+Rerun after regenerating the game data: a graph built from other game data
+files is ignored and every word is computed live again.
+
+Usage:
+    python utils/build_transformation_graph.py [--top N] [--processes N] [--output FILE]
+"""
+
+import argparse
+import heapq
+import logging
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from models.shared_word_engine import get_shared_word_engine
+from services.transformation_graph import build_transformation_graph
+
+DEFAULT_OUTPUT = str(Path(__file__).parent.parent / "game_data" / "transformation_graph.bin")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the transformation graph of the vocabulary")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Graph file to write")
+    parser.add_argument("--top", type=int, default=None,
+                        help="Only build the N most frequent words (others are computed live)")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Words per worker task")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    engine = get_shared_word_engine()  # built before the pool forks, so workers share it
+    words = None
+    if args.top is not None:
+        words = heapq.nlargest(args.top, sorted(engine.quality_words), key=lambda w: engine.word_frequencies.get(w, 0.0))
+
+    stats = build_transformation_graph(args.output, engine, words=words,
+                                       processes=args.processes, chunk_size=args.chunk_size)
+    edges = sum(stats['edges'].values())
+    print(f"✅ {stats['built']} of {stats['words']} words, {edges} edges, "
+          f"{stats['bytes'] / 1024 / 1024:.1f} MB in {stats['duration_ms'] / 1000:.1f} s -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
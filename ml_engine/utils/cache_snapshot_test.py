@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Cache Snapshot Test
+===================
+
+Warm restart check for services/cache_snapshot.py:
+
+1. Fill the caches like a running server would (trees, builder cache,
+   rhyme / anagram caches) and snapshot them
+2. "Restart": fresh storage service, builder and emptied word engine caches
+3. Cold first lookups vs snapshot restore + first lookups
+4. Version checks: a snapshot for other game data / another tree fingerprint
+   is discarded; a truncated file is ignored
+
+Runs on a temporary copy of probability_trees.json with the JSON file store,
+so no Redis or model is needed.
+"""
+
+import argparse
+import logging
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from models.probability_tree import ProbabilityTreeBuilder
+from models.shared_word_engine import get_shared_word_engine
+from services.cache_snapshot import game_data_version, restore_cache_snapshot, save_cache_snapshot
+from services.optimized_storage_service import OptimizedStorageService, StorageConfig
+
+GAME_DATA = Path(__file__).parent.parent / "game_data"
+
+
+def make_storage(tmp):
+    return OptimizedStorageService(StorageConfig(
+        storage_type="json", json_file_path=str(Path(tmp) / "probability_trees.json"), file_store="lazy_json"
+    ))
+
+
+def clear_engine_caches(engine):
+    for cache in (engine._rhyme_cache, engine._anagram_cache):
+        cache.clear()
+
+
+def first_lookups_ms(storage, engine, words):
+    """
+    Time for the tree, rhyme and anagram lookups a game does on each start word:
+    (lookups the snapshot caches, all lookups including rhyme categorization).
+    """
+    cached = categorize = 0.0
+    for word in words:
+        start = time.perf_counter()
+        storage.get_probability_tree(word)
+        rhymes = engine.get_rhymes(word)
+        engine.get_anagrams(word)
+        middle = time.perf_counter()
+        engine.categorize_rhymes_by_quality(word, rhymes)
+        cached += middle - start
+        categorize += time.perf_counter() - middle
+    return cached * 1000, (cached + categorize) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm restart from a cache snapshot")
+    parser.add_argument("--words", type=int, default=60, help="Start words to warm and look up")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print("🚀 Cache Snapshot Test")
+    print("=" * 50)
+
+    engine = get_shared_word_engine()
+    versions = {"game_data": game_data_version(GAME_DATA), "tree_fingerprint": "test"}
+    print(f"🔖 Versions: {versions}")
+
+    all_ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copy(GAME_DATA / "probability_trees.json", Path(tmp) / "probability_trees.json")
+        snapshot = Path(tmp) / "cache_snapshot.bin"
+
+        storage = make_storage(tmp)
+        words = [w for w in storage.file_store.words() if w.isalpha()][:args.words]
+        builder = ProbabilityTreeBuilder(model=None, tokenizer=None, vocab_size=50257)
+
+        clear_engine_caches(engine)
+        cold_cached_ms, cold_ms = first_lookups_ms(storage, engine, words)
+        for word in words[:10]:
+            builder._cache[word] = storage.get_probability_tree(word)
+        saved = save_cache_snapshot(snapshot, storage, engine, builder, versions)
+        print(f"📸 Saved: {saved['trees']} trees, {saved['builder']} builder trees, {saved['rhyme']} rhyme, "
+              f"{saved['anagram']} anagram entries; "
+              f"{saved['bytes'] / 1024:.0f} KB in {saved['duration_ms']:.0f} ms")
+        storage.close()
+
+        # Restart
+        storage = make_storage(tmp)
+        builder = ProbabilityTreeBuilder(model=None, tokenizer=None, vocab_size=50257)
+        clear_engine_caches(engine)
+        restored = restore_cache_snapshot(snapshot, storage, engine, builder, versions)
+        warm_cached_ms, warm_ms = first_lookups_ms(storage, engine, words)
+        all_ok &= restored['status'] == 'restored' and restored['trees'] == len(words) and len(builder._cache) == 10
+        all_ok &= storage.get_cache_stats()['cache_hits'] == len(words)
+        print(f"♻️  Restored in {restored['duration_ms']:.0f} ms: {restored}")
+        print()
+        print(f"   first lookups for {len(words)} start words")
+        print(f"   {'':<30} {'all ms':>8} {'cached ms':>10}   (cached: trees, rhymes, anagrams)")
+        print(f"   {'cold restart':<30} {cold_ms:>8.1f} {cold_cached_ms:>10.1f}")
+        print(f"   {'warm restart (after restore)':<30} {warm_ms:>8.1f} {warm_cached_ms:>10.1f}"
+              f"   (+{restored['duration_ms']:.0f} ms restore at startup)")
+        all_ok &= warm_cached_ms < cold_cached_ms
+        storage.close()
+
+        print()
+        for label, other in (("game data changed", {**versions, "game_data": "other"}),
+                             ("model changed", {**versions, "tree_fingerprint": "other"})):
+            storage = make_storage(tmp)
+            result = restore_cache_snapshot(snapshot, storage, engine, builder, other)
+            ok = result['status'] == 'version_mismatch' and len(storage._memory_cache) == 0
+            all_ok &= ok
+            print(f"   {'✅' if ok else '❌'} {label}: {result['status']}")
+            storage.close()
+
+        snapshot.write_bytes(snapshot.read_bytes()[:1000])
+        storage = make_storage(tmp)
+        result = restore_cache_snapshot(snapshot, storage, engine, builder, versions)
+        ok = result['status'] == 'corrupt' and len(storage._memory_cache) == 0
+        all_ok &= ok
+        print(f"   {'✅' if ok else '❌'} truncated file: {result['status']}")
+        storage.close()
+
+    print()
+    print("=" * 50)
+    print("✅ Cache snapshot test completed!" if all_ok else "❌ Cache snapshot test failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Cache Warmup Test
+=================
+
+Measure what startup warming saves the first games after a restart:
+
+1. Word selection: most played start words from a play log, then the top
+   words of frequencies.json
+2. Cold: first tree + transformation lookup per start word on a fresh service
+3. Warm: the same lookups after CacheWarmer.run() on another fresh service
+4. Budgets: a run with a tiny memory budget stops early and says why; a run
+   into a small memory cache stops once it is full, without evicting
+
+Trees come from Redis (the in-process RESP stand-in with injected latency, or
+--redis-url) seeded from probability_trees.json; the play log is synthetic.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import redis
+
+sys.path.append(str(Path(__file__).parent.parent))
+from services.cache_warmer import CacheWarmer, append_play_log
+from services.efficient_word_service import get_efficient_word_service
+from services.optimized_storage_service import OptimizedStorageService, StorageConfig
+from utils.redis_value_encoding_test import start_stand_in
+
+GAME_DATA = Path(__file__).parent.parent / "game_data"
+
+
+def make_service(client, tmp, cache_size=1000):
+    return OptimizedStorageService(StorageConfig(
+        storage_type="hybrid", redis_connection=client, json_file_path=str(Path(tmp) / "probability_trees.json"),
+        compaction_interval=0, cache_size=cache_size
+    ))
+
+
+def clear_word_engine_caches(word_service):
+    """The word engine is shared per process; empty its caches to simulate a fresh start."""
+    engine = word_service.word_engine
+    for name in ("_rhyme_cache", "_anagram_cache"):
+        getattr(engine, name).clear()
+
+
+def first_lookups(storage, word_service, words):
+    """Milliseconds per start word for the tree and transformation lookups a new game does."""
+    timings = []
+    for word in words:
+        start = time.perf_counter()
+        storage.get_probability_tree(word)
+        word_service.get_comprehensive_transformations(word)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return sum(timings) / len(timings), timings[len(timings) // 2], timings[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup cache warming: cold vs warmed first lookups")
+    parser.add_argument("--redis-url", default=None, help="Real Redis server (default: in-process stand-in)")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Injected reply latency for the stand-in")
+    parser.add_argument("--games", type=int, default=300, help="Synthetic games in the play log")
+    parser.add_argument("--top-n", type=int, default=100, help="Words taken from frequencies.json")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print("🚀 Cache Warmup Test")
+    print("=" * 50)
+
+    server = None
+    url = args.redis_url
+    if url is None:
+        server, url = start_stand_in(args.latency_ms / 1000)
+        print(f"🧪 Using in-process RESP stand-in at {url} ({args.latency_ms:.1f} ms per reply)")
+    client = redis.Redis.from_url(url)
+
+    with open(GAME_DATA / "frequencies.json") as f:
+        frequencies = json.load(f)
+    word_service = get_efficient_word_service()
+
+    all_ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copy(GAME_DATA / "probability_trees.json", Path(tmp) / "probability_trees.json")
+        seed = make_service(client, tmp)
+        tree_words = [w for w in seed.file_store.words() if w in frequencies]
+        asyncio.run(seed.populate_from_file(str(Path(tmp) / "probability_trees.json")))
+        seed.close()
+
+        # Zipf-like play log over the words that have trees
+        play_log = Path(tmp) / "play_log.jsonl"
+        rng = random.Random(7)
+        weights = [1 / (rank + 1) for rank in range(len(tree_words))]
+        for word in rng.choices(tree_words, weights, k=args.games):
+            append_play_log(play_log, word)
+
+        try:
+            storage = make_service(client, tmp)
+            warmer = CacheWarmer(storage, word_service, frequencies, play_log, top_n=args.top_n, recent_n=50)
+            words = warmer.select_words()
+            played = [w for w in words if w in tree_words]
+            print(f"🎯 Selected {len(words)} start words ({len(played)} with stored trees), e.g. {words[:8]}")
+            print()
+
+            clear_word_engine_caches(word_service)
+            cold = first_lookups(storage, word_service, played)
+            storage.close()
+
+            storage = make_service(client, tmp)
+            clear_word_engine_caches(word_service)
+            warmer = CacheWarmer(storage, word_service, frequencies, play_log, top_n=args.top_n, recent_n=50)
+            start = time.perf_counter()
+            progress = asyncio.run(warmer.run())
+            print(f"🔥 Warmup {progress['status']} in {(time.perf_counter() - start) * 1000:.0f} ms: "
+                  f"{progress['trees_loaded']} trees loaded, {progress['trees_missing']} without a tree, "
+                  f"{progress['transformations_warmed']} transformations, {progress['bytes_loaded']} bytes")
+            all_ok &= progress['status'] == 'completed' and progress['trees_loaded'] >= len(played)
+            warm = first_lookups(storage, word_service, played)
+            storage.close()
+
+            print()
+            print(f"   {'':<6} {'avg ms':>8} {'p50 ms':>8} {'max ms':>8}   (first tree + transformations per start word)")
+            for label, (avg, p50, worst) in (("cold", cold), ("warm", warm)):
+                print(f"   {label:<6} {avg:>8.2f} {p50:>8.2f} {worst:>8.2f}")
+            all_ok &= warm[0] < cold[0]
+
+            storage = make_service(client, tmp)
+            tight = CacheWarmer(storage, word_service, frequencies, play_log, top_n=args.top_n,
+                                memory_budget=1, batch_size=5)
+            progress = asyncio.run(tight.run())
+            print()
+            print(f"💾 1-byte memory budget: {progress['status']} ({progress['stop_reason']}) "
+                  f"after {progress['words_done']}/{progress['words_total']} words")
+            all_ok &= progress['stop_reason'] == 'memory_budget'
+            storage.close()
+
+            storage = make_service(client, tmp, cache_size=10)
+            small = CacheWarmer(storage, word_service, frequencies, play_log, top_n=args.top_n, batch_size=4)
+            progress = asyncio.run(small.run())
+            cache = storage.get_cache_stats()
+            print(f"🧊 10-entry memory cache: {progress['status']} ({progress['stop_reason']}) "
+                  f"after {progress['words_done']}/{progress['words_total']} words, "
+                  f"{cache['memory_cache_size']} trees cached, {cache['cache_evictions']} evictions")
+            all_ok &= progress['stop_reason'] == 'cache_full' and cache['memory_cache_size'] == 10 \
+                and cache['cache_evictions'] == 0
+            storage.close()
+        finally:
+            client.delete(*[f"tree:{w}" for w in tree_words], "tree_manifest")
+            if server is not None:
+                server.shutdown()
+
+    print()
+    print("=" * 50)
+    print("✅ Cache warmup test completed!" if all_ok else "❌ Cache warmup test failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,9 +7,12 @@ Uses our approved CSV word list to generate optimized package files:
 - words.txt: Simple word list from CSV
 - frequencies.json: Frequency data for creativity scoring
 - anagrams.json: Prime signature lookup for anagrams
+- rhymes.json: Rhyming part -> words index for rhyme lookups
+- phonetics.json: Interned CMU pronunciations with rhyming part, consonant tail, syllables and stress
+- transformation_trie.bin: Double-array trie of words.txt, memory-mapped by the word engine
 - metadata.json: Generation info and statistics
 
-This replaces the need for pronouncing.cmudict.words() in runtime.
+This replaces the need for pronouncing (and its CMU dictionary parse) at runtime.
 """
 
 import csv
@@ -22,7 +25,10 @@ from typing import Dict, List, Set, Tuple
 import sys
 
 sys.path.append(str(Path(__file__).parent.parent))
+import pronouncing
 import wordfreq
+from models.compact_trie import COMPACT_TRIE_FILE, CompactTrie, words_file_checksum
+from models.phonetic_table import encode_phonetic_table
 
 class CanonicalDataGenerator:
     """
@@ -44,6 +50,8 @@ class CanonicalDataGenerator:
         self.quality_words = set()
         self.word_frequencies = {}
         self.anagram_index = defaultdict(list)
+        self.rhyme_index = defaultdict(list)
+        self.phonetic_table = {}
         
         # Prime numbers for collision-resistant signatures
         self.LETTER_PRIMES = {
@@ -67,10 +75,16 @@ class CanonicalDataGenerator:
         print("3. Building collision-resistant anagram index...")
         self._build_anagram_index()
         
-        print("4. Saving optimized package files...")
+        print("4. Building rhyming part index...")
+        self._build_rhyme_index()
+        
+        print("5. Encoding phonetic table...")
+        self._build_phonetic_table()
+        
+        print("6. Saving optimized package files...")
         self._save_package_files()
         
-        print("5. Analyzing package size and performance...")
+        print("7. Analyzing package size and performance...")
         self._analyze_package()
         
         print("✅ Canonical package data generation complete!")
@@ -145,6 +159,30 @@ class CanonicalDataGenerator:
         
         print(f"   Built {anagram_groups} anagram groups with {total_anagrams} words")
     
+    def _build_rhyme_index(self):
+        """Build rhyming part -> words index over all CMU pronunciations of each word."""
+        print("   Building rhyming part index...")
+        
+        for word in sorted(self.quality_words):
+            phones = pronouncing.phones_for_word(word)
+            for rhyming_part in dict.fromkeys(pronouncing.rhyming_part(phone) for phone in phones):
+                self.rhyme_index[rhyming_part].append(word)
+        
+        rhyme_groups = len(self.rhyme_index)
+        total_entries = sum(len(words) for words in self.rhyme_index.values())
+        
+        print(f"   Built {rhyme_groups} rhyme groups with {total_entries} entries")
+    
+    def _build_phonetic_table(self):
+        """Encode every word's CMU pronunciations with interned phoneme ids."""
+        print("   Encoding pronunciations...")
+        
+        self.phonetic_table = encode_phonetic_table(self.quality_words, pronouncing.phones_for_word)
+        
+        pronunciations = sum(len(records) for records in self.phonetic_table['words'].values())
+        print(f"   Encoded {pronunciations} pronunciations for {len(self.phonetic_table['words'])} words "
+              f"({len(self.phonetic_table['phonemes'])} phonemes)")
+    
     def _compute_prime_signature(self, word: str) -> int:
         """
         Compute collision-resistant signature using prime factorization.
@@ -187,13 +225,35 @@ class CanonicalDataGenerator:
         
         print(f"   Saved {len(self.anagram_index)} anagram groups")
         
-        # 4. Metadata for debugging and analysis
+        # 4. Rhyme index (words sharing a rhyming part are perfect rhyme candidates)
+        rhyme_file = self.output_dir / "rhymes.json"
+        with open(rhyme_file, 'w') as f:
+            json.dump(dict(sorted(self.rhyme_index.items())), f, separators=(',', ':'))
+        
+        print(f"   Saved {len(self.rhyme_index)} rhyme groups")
+        
+        # 5. Phonetic table (replaces runtime CMU dictionary lookups)
+        phonetics_file = self.output_dir / "phonetics.json"
+        with open(phonetics_file, 'w') as f:
+            json.dump(self.phonetic_table, f, separators=(',', ':'))
+        
+        print(f"   Saved pronunciations for {len(self.phonetic_table['words'])} words")
+        
+        # 6. Compact trie of words.txt (memory-mapped instead of built at startup)
+        trie = CompactTrie.from_words(self.quality_words, words_file_checksum(words_file))
+        trie.save(self.output_dir / COMPACT_TRIE_FILE)
+        
+        print(f"   Saved compact trie with {len(trie)} nodes ({trie.nbytes / 1024 / 1024:.1f} MB)")
+        
+        # 7. Metadata for debugging and analysis
         metadata = {
             "generated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
             "source_file": str(self.csv_path),
             "total_words": len(self.quality_words),
             "words_with_frequency": len(self.word_frequencies),
             "anagram_groups": len(self.anagram_index),
+            "rhyme_groups": len(self.rhyme_index),
+            "words_with_pronunciation": len(self.phonetic_table['words']),
             "avg_word_length": sum(len(w) for w in self.quality_words) / len(self.quality_words),
             "word_length_distribution": self._get_length_distribution(),
             "frequency_distribution": self._get_frequency_distribution(),
@@ -203,7 +263,10 @@ class CanonicalDataGenerator:
                 "No obscurity threshold (includes all words)",
                 "Rounded frequencies to 8 decimal places",
                 "Used collision-resistant prime signatures for anagrams",
-                "Removed singleton anagram groups"
+                "Removed singleton anagram groups",
+                "Precomputed rhyming part index (no vocabulary scan per rhyme lookup)",
+                "Precomputed phonetic table with interned phoneme ids (no pronouncing at runtime)",
+                "Prebuilt double-array trie (memory-mapped, no per-node objects)"
             ]
         }
         
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Compact Trie Benchmark
+======================
+
+The vocabulary trie as per-node objects (TrieNode with a children dict, as
+_build_transformation_trie built it before the compact trie) vs the
+double-array CompactTrie memory-mapped from game_data/transformation_trie.bin:
+
+1. Construction time, memory (Python heap; the compact trie's mapped file
+   is reported separately), and the GC-tracked objects and full collection
+   time each adds
+2. Same nodes: every prefix has the same is_word, word_count, max_depth and
+   children in both
+3. Lookup latency of _find_trie_node and _trie_contains_word on prefixes of
+   random words and on misses
+"""
+
+import argparse
+import gc
+import logging
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from models.compact_trie import COMPACT_TRIE_FILE, CompactTrie
+from models.shared_word_engine import get_shared_word_engine
+
+GAME_DATA = Path(__file__).parent.parent / "game_data"
+
+
+class TrieNode:
+    """Per-node trie the compact trie replaced."""
+    __slots__ = ['children', 'is_word', 'word_count', 'max_depth']
+
+    def __init__(self):
+        self.children = {}
+        self.is_word = False
+        self.word_count = 0
+        self.max_depth = 0
+
+
+def build_object_trie(words):
+    root = TrieNode()
+    for word in words:
+        node = root
+        for char in word:
+            if char not in node.children:
+                node.children[char] = TrieNode()
+            node = node.children[char]
+            node.word_count += 1
+        node.is_word = True
+
+    def compute_subtree_stats(node, depth):
+        node.max_depth = max([depth] + [compute_subtree_stats(child, depth + 1) for child in node.children.values()])
+        return node.max_depth
+
+    compute_subtree_stats(root, 0)
+    return root
+
+
+def object_find_node(root, prefix):
+    node = root
+    for char in prefix:
+        if char not in node.children:
+            return None
+        node = node.children[char]
+    return node
+
+
+def object_contains_word(root, word):
+    node = object_find_node(root, word)
+    return node is not None and node.is_word
+
+
+def nodes(root):
+    """prefix -> (is_word, word_count, max_depth, children labels)"""
+    found, stack = {}, [('', root)]
+    while stack:
+        prefix, node = stack.pop()
+        found[prefix] = (node.is_word, node.word_count, node.max_depth, sorted(node.children))
+        stack.extend((prefix + char, child) for char, child in node.children.items())
+    return found
+
+
+def timed(build):
+    start = time.perf_counter()
+    result = build()
+    return result, time.perf_counter() - start
+
+
+def heap_bytes(build):
+    """Python heap allocated by build (run again under tracemalloc, which slows it down)."""
+    tracemalloc.start()
+    result = build()
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return allocated
+
+
+def collect_ms(runs=3):
+    """Fastest of a few full collections over live objects (garbage from earlier steps collected first)."""
+    gc.collect()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        gc.collect()
+        times.append((time.perf_counter() - start) * 1000)
+    return min(times)
+
+
+def per_lookup_ns(function, queries, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            function(query)
+    return (time.perf_counter() - start) * 1e9 / len(queries) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-node object trie vs compact double-array trie")
+    parser.add_argument("--queries", type=int, default=5000, help="Random words to take prefixes of")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print("🚀 Compact Trie Benchmark")
+    print("=" * 50)
+
+    engine = get_shared_word_engine()
+    words = sorted(engine.quality_words)
+
+    _, encode_s = timed(lambda: CompactTrie.from_words(words))
+    baseline_gc_ms = collect_ms()
+    baseline_objects = len(gc.get_objects())
+    compact, open_s = timed(lambda: CompactTrie.open(GAME_DATA / COMPACT_TRIE_FILE))
+    open_bytes = heap_bytes(lambda: CompactTrie.open(GAME_DATA / COMPACT_TRIE_FILE))
+    compact_gc_ms = collect_ms()
+    compact_objects = len(gc.get_objects())
+    object_trie, object_s = timed(lambda: build_object_trie(words))
+    object_bytes = heap_bytes(lambda: build_object_trie(words))
+    object_gc_ms = collect_ms()
+    object_objects = len(gc.get_objects())
+
+    print(f"📦 {len(words)} words, {len(compact)} nodes in {compact.header['slots']} slots; "
+          f"full gc.collect() without either trie: {baseline_gc_ms:.0f} ms")
+    print()
+    print(f"   {'':<26} {'seconds':>8} {'heap MB':>8} {'mapped MB':>10} {'+GC objects':>12} {'+gc.collect ms':>15}")
+    print(f"   {'object trie (build)':<26} {object_s:>8.2f} {object_bytes / 1024 / 1024:>8.1f} {'':>10} "
+          f"{object_objects - compact_objects:>12} {object_gc_ms - compact_gc_ms:>15.1f}")
+    print(f"   {'compact trie (encode)':<26} {encode_s:>8.2f}")
+    print(f"   {'compact trie (mmap open)':<26} {open_s:>8.4f} {open_bytes / 1024 / 1024:>8.2f} "
+          f"{compact.nbytes / 1024 / 1024:>10.1f} {compact_objects - baseline_objects:>12} "
+          f"{compact_gc_ms - baseline_gc_ms:>15.1f}")
+
+    all_ok = nodes(object_trie) == nodes(compact.root)
+    print()
+    print(f"   {'✅' if all_ok else '❌'} same nodes in both tries")
+
+    rng = random.Random(args.seed)
+    sample = rng.sample(words, args.queries)
+    prefixes = [word[:rng.randint(0, len(word))] for word in sample]
+    misses = [word[:-1] + "qx" for word in sample]
+    lookups_ok = all(
+        (object_find_node(object_trie, query) is None) == (engine._find_trie_node(query) is None)
+        and object_contains_word(object_trie, query) == engine._trie_contains_word(query)
+        for query in prefixes + misses + sample
+    )
+    all_ok &= lookups_ok
+    print(f"   {'✅' if lookups_ok else '❌'} same _find_trie_node / _trie_contains_word results")
+
+    print()
+    print(f"   {'ns per lookup':<30} {'object':>8} {'compact':>8}")
+    for name, queries in (("_find_trie_node (prefixes)", prefixes), ("_find_trie_node (misses)", misses)):
+        print(f"   {name:<30} {per_lookup_ns(lambda q: object_find_node(object_trie, q), queries):>8.0f} "
+              f"{per_lookup_ns(engine._find_trie_node, queries):>8.0f}")
+    print(f"   {'_trie_contains_word (words)':<30} {per_lookup_ns(lambda q: object_contains_word(object_trie, q), sample):>8.0f} "
+          f"{per_lookup_ns(engine._trie_contains_word, sample):>8.0f}")
+    compact.close()
+
+    print()
+    print("=" * 50)
+    print("✅ Compact trie benchmark completed!" if all_ok else "❌ Compact trie benchmark failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Engine Snapshot Test
+====================
+
+EfficientWordEngine startup: parsing the package files and building every
+index vs loading game_data/engine_snapshot.bin (models/engine_snapshot.py).
+
+1. Startup time and peak RSS, each in a fresh process: no snapshot, first
+   start (build + write the snapshot), start from the snapshot
+2. The restored state equals the built one (indexes, bloom filter)
+   and answers lookups the same
+3. A changed package file makes the snapshot stale: the next start rebuilds
+   and rewrites it
+
+Runs on a temporary copy of the package files, so game_data is untouched.
+"""
+
+import argparse
+import json
+import logging
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from models.efficient_word_engine import EfficientWordEngine
+from models.compact_trie import COMPACT_TRIE_FILE
+from models.engine_snapshot import ENGINE_SNAPSHOT_FILE, SOURCE_FILES
+
+GAME_DATA = Path(__file__).parent.parent / "game_data"
+ML_ENGINE = Path(__file__).parent.parent
+
+STARTUP_SCRIPT = """
+import json, logging, resource, sys, time
+logging.disable(logging.INFO)
+start = time.perf_counter()
+from models.efficient_word_engine import EfficientWordEngine
+engine = EfficientWordEngine(sys.argv[1], use_snapshot=sys.argv[2] == "1")
+print(json.dumps({"seconds": time.perf_counter() - start, "words": len(engine.quality_words),
+                  "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}))
+"""
+
+
+def startup(package_dir, use_snapshot):
+    """Startup time and peak RSS of a fresh process constructing the engine."""
+    output = subprocess.run([sys.executable, "-c", STARTUP_SCRIPT, str(package_dir), "1" if use_snapshot else "0"],
+                            cwd=ML_ENGINE, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine startup: build vs snapshot load")
+    parser.add_argument("--words", type=int, default=200, help="Random words to compare lookups for")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print("🚀 Engine Snapshot Test")
+    print("=" * 50)
+
+    all_ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        package_dir = Path(tmp)
+        for name in SOURCE_FILES + (COMPACT_TRIE_FILE,):
+            shutil.copy(GAME_DATA / name, package_dir / name)
+        snapshot = package_dir / ENGINE_SNAPSHOT_FILE
+
+        runs = [("no snapshot", startup(package_dir, False))]
+        runs.append(("build + write snapshot", startup(package_dir, True)))
+        snapshot_mb = snapshot.stat().st_size / 1024 / 1024
+        runs.append(("from snapshot", startup(package_dir, True)))
+        print(f"📦 {runs[0][1]['words']} words; snapshot {snapshot_mb:.1f} MB")
+        print()
+        print(f"   {'startup':<24} {'seconds':>8} {'peak RSS MB':>12}")
+        for name, run in runs:
+            print(f"   {name:<24} {run['seconds']:>8.2f} {run['peak_rss_mb']:>12.0f}")
+        print(f"   {'':<24} {runs[0][1]['seconds'] / runs[2][1]['seconds']:>7.1f}x")
+
+        print()
+        built = EfficientWordEngine(str(package_dir), use_snapshot=False)
+        restored = EfficientWordEngine(str(package_dir), use_snapshot=True)
+        built_state, restored_state = built._snapshot_state(), restored._snapshot_state()
+        for name in built_state:
+            ok = built_state[name] == restored_state[name]
+            all_ok &= ok
+            if not ok:
+                print(f"   ❌ {name} differs after restore")
+        rng = random.Random(args.seed)
+        words = rng.sample(sorted(built.quality_words), args.words) + ["cat", "time", "night"]
+        same_lookups = all(
+            built.get_one_letter_off(w) == restored.get_one_letter_off(w)
+            and built.get_anagrams(w) == restored.get_anagrams(w)
+            and built.categorize_rhymes_by_quality(w, built.get_rhymes(w))
+            == restored.categorize_rhymes_by_quality(w, restored.get_rhymes(w))
+            and built._trie_one_letter_off(w) == restored._trie_one_letter_off(w)
+            and built.bloom_filter.might_contain(w) and restored.bloom_filter.might_contain(w)
+            for w in words
+        )
+        all_ok &= same_lookups
+        print(f"   {'✅' if all_ok else '❌'} restored state equals the built state ({len(built_state)} parts)")
+        print(f"   {'✅' if same_lookups else '❌'} same lookups for {len(words)} words")
+
+        with open(package_dir / "words.txt", "a") as f:
+            f.write("zzzyx\n")
+        written = snapshot.stat().st_mtime_ns
+        rebuilt = startup(package_dir, True)
+        ok = rebuilt['words'] == runs[0][1]['words'] + 1 and snapshot.stat().st_mtime_ns != written
+        all_ok &= ok
+        print(f"   {'✅' if ok else '❌'} changed words.txt: snapshot rebuilt in {rebuilt['seconds']:.2f} s")
+
+        snapshot.write_bytes(snapshot.read_bytes()[:1000])
+        truncated = startup(package_dir, True)
+        ok = truncated['words'] == rebuilt['words']
+        all_ok &= ok
+        print(f"   {'✅' if ok else '❌'} truncated snapshot: rebuilt from package files")
+
+    print()
+    print("=" * 50)
+    print("✅ Engine snapshot test completed!" if all_ok else "❌ Engine snapshot test failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Homophone Index Test
+====================
+
+Rich rhymes (homophones) come from a pronunciation -> words index over the
+vocabulary instead of the hand-written HOMOPHONE_PAIRS plus a pairwise
+pronunciation check cached per word pair. This check:
+
+1. Compares get_homophones with a pairwise comparison against every
+   vocabulary word's pronunciations for random start words
+2. Reports coverage: vocabulary words with at least one homophone vs the
+   words in HOMOPHONE_PAIRS
+3. Checks rich rhymes are categorized before perfect ones (a homophone is
+   never reported as a perfect rhyme)
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from models.shared_word_engine import get_shared_word_engine
+
+
+def pairwise_homophones(engine, word):
+    phones = set(engine.get_pronunciation(word))
+    found = [w for w in sorted(engine.phonetics) if w != word and phones & set(engine.get_pronunciation(w))]
+    found += [w for w in engine.HOMOPHONE_PAIRS.get(word, ()) if w in engine.quality_words]
+    return list(dict.fromkeys(found))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Homophone index vs pairwise pronunciation checks")
+    parser.add_argument("--words", type=int, default=10, help="Random pronounceable start words")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print("🚀 Homophone Index Test")
+    print("=" * 50)
+
+    engine = get_shared_word_engine()
+    with_homophones = sum(len(words) for words in engine.homophone_index.values())
+    print(f"📦 {len(engine.homophone_index)} homophone groups covering {with_homophones} words "
+          f"(HOMOPHONE_PAIRS: {len(engine.HOMOPHONE_PAIRS)} words)")
+
+    rng = random.Random(args.seed)
+    grouped = sorted({w for words in engine.homophone_index.values() for w in words})
+    words = ["night", "flower", "there"] + rng.sample(grouped, args.words)
+
+    all_ok = True
+    index_ms = scan_ms = 0.0
+    print()
+    for word in words:
+        start = time.perf_counter()
+        homophones = engine.get_homophones(word)
+        index_ms += (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        expected = pairwise_homophones(engine, word)
+        scan_ms += (time.perf_counter() - start) * 1000
+
+        categories = engine.categorize_rhymes_by_quality(word, engine.get_rhymes(word))
+        ok = (sorted(homophones) == sorted(expected) and categories['rich'] == homophones
+              and not set(homophones) & set(categories['perfect']))
+        all_ok &= ok
+        print(f"   {'✅' if ok else '❌'} {word:<10} {homophones[:6]}")
+
+    print()
+    print(f"   homophone index:   {index_ms * 1000 / len(words):>10.1f} µs per word")
+    print(f"   pairwise scan:     {scan_ms * 1000 / len(words):>10.1f} µs per word")
+
+    print()
+    print("=" * 50)
+    print("✅ Homophone index test completed!" if all_ok else "❌ Homophone index test failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
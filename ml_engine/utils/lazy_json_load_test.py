@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Lazy JSON Load Test
+===================
+
+Compare eager and lazy loading of probability_trees.json:
+
+1. Time-to-ready: time for a fresh process to open the store and serve one lookup
+2. Resident memory (RSS) growth of that process once the store is ready
+3. Correctness: every lazily decoded tree matches the eager copy
+4. Batched puts: put_many rewrites the file once for a batch of trees and
+   leaves the same file as one put_serialized per tree
+
+Lazy loading is measured twice: with the offset scan, and with the sidecar index
+written by a previous run. The shipped file is small, so trees are replicated
+under synthetic keys (--scale) to approximate a production-sized corpus.
+"""
+
+import argparse
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from services.tree_file_stores import JsonTreeStore, LazyJsonTreeStore, read_legacy_json, write_legacy_json
+
+DEFAULT_JSON = str(Path(__file__).parent.parent / "game_data" / "probability_trees.json")
+
+LOAD_SNIPPET = """
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+from services.tree_file_stores import JsonTreeStore, LazyJsonTreeStore
+def rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+baseline = rss_kb()
+start = time.perf_counter()
+store = {opener}
+store.get_serialized({word!r})
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "rss_kb": rss_kb() - baseline}}))
+"""
+
+
+def build_corpus(source_json: str, scale: int, json_path: Path):
+    """Write a scaled JSON corpus and return its words."""
+    data = read_legacy_json(source_json)
+    entries = []
+    for copy in range(scale):
+        for word, entry in data.items():
+            key = word if copy == 0 else f"{word}_{copy}"
+            entries.append((key, bytes.fromhex(entry['serialized']), entry.get('metadata', {})))
+    write_legacy_json(str(json_path), entries)
+    return [word for word, _, _ in entries]
+
+
+def measure(opener: str, word: str, runs: int, before_run=None) -> dict:
+    """Median time-to-ready and RSS growth over fresh interpreters."""
+    root = str(Path(__file__).parent.parent)
+    code = LOAD_SNIPPET.format(root=root, opener=opener, word=word)
+    results = []
+    for _ in range(runs):
+        if before_run:
+            before_run()
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    results.sort(key=lambda r: r['seconds'])
+    return results[len(results) // 2]
+
+
+def batched_puts(json_path: Path, words: list, batch: int) -> bool:
+    """Time one put per tree against one put_many, and check both leave the same trees."""
+    sources = [LazyJsonTreeStore(str(path), use_sidecar_index=False)
+               for path in (shutil.copy(json_path, f"{json_path}.{mode}") for mode in ("single", "many"))]
+    single, many = sources
+    entries = [(word, single.get_serialized(words[-1 - i]), {'batch': i}) for i, word in enumerate(words[:batch])]
+    entries.append(("batched_new_word", entries[0][1], {'batch': 'new'}))
+
+    start = time.perf_counter()
+    for word, serialized, metadata in entries:
+        single.put_serialized(word, serialized, metadata)
+    single_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    written = many.put_many(entries)
+    many_ms = (time.perf_counter() - start) * 1000
+
+    ok = (written == len(entries) and len(single) == len(many) == len(words) + 1
+          and all(many.get_entry(word) == (serialized, metadata) for word, serialized, metadata in entries)
+          and read_legacy_json(single.file_path) == read_legacy_json(many.file_path))
+    print(f"   {'✅' if ok else '❌'} {len(entries)} puts: {single_ms:.1f} ms one by one, "
+          f"{many_ms:.1f} ms with put_many, same trees")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Eager vs lazy probability_trees.json loading benchmark")
+    parser.add_argument("--json", default=DEFAULT_JSON, help="Source probability_trees.json")
+    parser.add_argument("--scale", type=int, default=100, help="Replicate the corpus this many times")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh-process runs per mode")
+    parser.add_argument("--batch", type=int, default=20, help="Trees replaced by the batched put check")
+    args = parser.parse_args()
+
+    print("🚀 Lazy JSON Load Test")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "trees.json"
+        sidecar = Path(f"{json_path}{LazyJsonTreeStore.INDEX_SUFFIX}")
+        words = build_corpus(args.json, args.scale, json_path)
+        probe = words[len(words) // 2]
+
+        print(f"📦 Corpus: {len(words):,} trees, {json_path.stat().st_size / 1024 / 1024:.2f} MB")
+
+        eager = JsonTreeStore(str(json_path))
+        lazy = LazyJsonTreeStore(str(json_path), use_sidecar_index=False)
+        mismatches = sum(1 for word in words if lazy.get_serialized(word) != eager.get_serialized(word))
+        print(f"🔍 Round trip: {len(words) - mismatches:,}/{len(words):,} trees identical")
+        del eager, lazy
+        all_ok = mismatches == 0
+
+        print("✍️  Batched puts")
+        all_ok &= batched_puts(json_path, words, args.batch)
+
+        def drop_sidecar():
+            if sidecar.exists():
+                sidecar.unlink()
+
+        eager_result = measure(f"JsonTreeStore({str(json_path)!r})", probe, args.runs)
+        scan_result = measure(f"LazyJsonTreeStore({str(json_path)!r})", probe, args.runs, before_run=drop_sidecar)
+        LazyJsonTreeStore(str(json_path))  # leaves a fresh sidecar behind
+        sidecar_result = measure(f"LazyJsonTreeStore({str(json_path)!r})", probe, args.runs)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print()
+    print("⏱️  Time-to-ready (open + first lookup, median)     RSS growth")
+    for label, result in (("Eager json.load", eager_result),
+                          ("Lazy (scan)", scan_result),
+                          ("Lazy (sidecar)", sidecar_result)):
+        print(f"   {label:<16} {result['seconds'] * 1000:10.2f} ms {result['rss_kb'] / 1024:22.2f} MB")
+    print(f"   Speedup (sidecar): {eager_result['seconds'] / sidecar_result['seconds']:.1f}x")
+
+    print()
+    print("=" * 50)
+    print("✅ Lazy JSON load test completed!" if all_ok else "❌ Lazy JSON load test failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
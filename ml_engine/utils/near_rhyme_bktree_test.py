@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Near Rhyme BK-Tree Test
+=======================
+
+Near rhymes are words whose rhyming part is within NEAR_RHYME_DISTANCE
+phoneme edits of the start word's. The engine answers that with a BK-tree
+over the distinct rhyming parts of the vocabulary. This check compares it
+with a linear scan over all rhyming parts, for k = 1 and 2:
+
+- same matches
+- distance computations per query (how much of the tree is visited)
+- query time
+
+It also checks the near rhyme rules on top of the tree: near rhymes share the
+start word's stressed vowel, and a lone-vowel rhyming part (e.g. "kosovo",
+OW2) has none instead of matching every other lone vowel.
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from models.efficient_word_engine import phoneme_edit_distance
+from models.shared_word_engine import get_shared_word_engine
+
+
+def linear_scan(parts, query, max_distance):
+    return sorted((d, part) for part in parts if (d := phoneme_edit_distance(query, part)) <= max_distance)
+
+
+def rhyming_parts(engine, word):
+    """Rhyming parts (phoneme lists) of each pronunciation of word."""
+    parts = (engine._extract_rhyming_part(phones) for phones in engine.get_pronunciation(word))
+    return [part.split() for part in parts if part]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Near rhyme lookups: BK-tree vs linear scan over rhyming parts")
+    parser.add_argument("--queries", type=int, default=50, help="Random rhyming parts to query")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print("🚀 Near Rhyme BK-Tree Test")
+    print("=" * 50)
+
+    engine = get_shared_word_engine()
+    parts = [tuple(part.split()) for part in engine.rhyme_index]
+    start = time.perf_counter()
+    engine._build_near_rhyme_tree()
+    print(f"📦 {len(engine.near_rhyme_tree)} rhyming parts; tree rebuilt in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    rng = random.Random(args.seed)
+    queries = rng.sample(parts, args.queries)
+
+    distance_calls = [0]
+
+    def counting_distance(a, b):
+        distance_calls[0] += 1
+        return phoneme_edit_distance(a, b)
+
+    all_ok = True
+    print()
+    print(f"   {'k':>2} {'matches':>8} {'tree ms':>8} {'scan ms':>8} {'visited':>8}")
+    for max_distance in (1, 2):
+        matches = tree_ms = scan_ms = 0
+        tree = engine.near_rhyme_tree
+        tree.distance = counting_distance
+        distance_calls[0] = 0
+        for query in queries:
+            started = time.perf_counter()
+            found = sorted(tree.search(query, max_distance))
+            tree_ms += (time.perf_counter() - started) * 1000
+
+            started = time.perf_counter()
+            expected = linear_scan(parts, query, max_distance)
+            scan_ms += (time.perf_counter() - started) * 1000
+
+            all_ok &= found == expected
+            matches += len(found)
+        tree.distance = phoneme_edit_distance
+        visited = distance_calls[0] / len(queries) / len(parts) * 100
+        print(f"   {max_distance:>2} {matches / len(queries):>8.1f} {tree_ms / len(queries):>8.2f} "
+              f"{scan_ms / len(queries):>8.2f} {visited:>7.1f}%")
+
+    print(f"   {'✅' if all_ok else '❌'} BK-tree matches the linear scan for every query")
+
+    print()
+    for word in ("kosovo", "cat", "time", "love"):
+        near = engine.categorize_rhymes_by_quality(word, engine.get_rhymes(word))['near']
+        vowels = {part[0] for part in rhyming_parts(engine, word)}
+        ok = all(any(part[0] in vowels and len(part) >= engine.NEAR_RHYME_MIN_PHONEMES
+                     for part in rhyming_parts(engine, w)) for w in near)
+        if word == "kosovo":
+            ok &= near == []
+        all_ok &= ok
+        print(f"   {'✅' if ok else '❌'} {word} ({', '.join(sorted(vowels))}): {len(near)} near rhymes, e.g. {near[:5]}")
+
+    print()
+    print("=" * 50)
+    print("✅ Near rhyme BK-tree test completed!" if all_ok else "❌ Near rhyme BK-tree test failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
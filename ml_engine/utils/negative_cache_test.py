@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Negative Cache Test
+===================
+
+Check the negative cache behind fetch_tree and afetch_tree, counting the Redis
+reads each lookup sends:
+
+1. A miss costs one Redis read; repeating it within negative_cache_ttl costs none
+2. Once the TTL has passed the next lookup asks Redis again
+3. Storing the tree drops the negative entry, and the tree is served
+4. negative_cache_ttl=0 disables negative caching
+
+Steps 1-3 run for the sync and the async interface. Uses the in-process RESP
+stand-in (which counts commands) and the first tree of probability_trees.json.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import redis
+
+sys.path.append(str(Path(__file__).parent.parent))
+from services.optimized_storage_service import OptimizedStorageService, StorageConfig
+from utils.redis_value_encoding_test import start_stand_in
+
+DEFAULT_JSON = str(Path(__file__).parent.parent / "game_data" / "probability_trees.json")
+READ_COMMANDS = ("GET", "MGET", "EXISTS")
+
+
+def check(label, ok):
+    print(f"   {'✅' if ok else '❌'} {label}")
+    return ok
+
+
+def make_service(client, ttl):
+    return OptimizedStorageService(StorageConfig(storage_type="redis", redis_connection=client, negative_cache_ttl=ttl))
+
+
+class ReadCounter:
+    """Redis reads the stand-in served since the last call."""
+
+    def __init__(self, server):
+        self.server = server
+        self.seen = self._total()
+
+    def _total(self):
+        return sum(self.server.commands[command] for command in READ_COMMANDS)
+
+    def __call__(self):
+        total = self._total()
+        reads, self.seen = total - self.seen, total
+        return reads
+
+
+def sync_checks(service, reads, word, tree, ttl):
+    all_ok = True
+    reads()
+    first = service.fetch_tree(word)
+    first_reads = reads()
+    second = service.fetch_tree(word)
+    all_ok &= check(f"miss: {first_reads} Redis read, repeat within the TTL: {reads()} reads, "
+                    f"{service.get_cache_stats()['negative_cache_hits']} negative hit",
+                    first == second == (None, None) and first_reads == 1
+                    and service.get_cache_stats()['negative_cache_hits'] == 1)
+
+    time.sleep(ttl * 1.5)
+    service.fetch_tree(word)
+    all_ok &= check("after the TTL Redis is asked again", reads() == 1)
+
+    service.store_probability_tree(word, tree)
+    service._memory_cache.discard(word)
+    reads()
+    stored, source = service.fetch_tree(word)
+    all_ok &= check(f"stored tree served from {source}, negative entry dropped",
+                    stored is not None and source == "redis" and reads() == 1)
+    return all_ok
+
+
+async def async_checks(service, reads, word, tree, ttl):
+    all_ok = True
+    reads()
+    first = await service.afetch_tree(word)
+    first_reads = reads()
+    second = await service.afetch_tree(word)
+    all_ok &= check(f"miss: {first_reads} Redis read, repeat within the TTL: {reads()} reads",
+                    first == second == (None, None) and first_reads == 1
+                    and service.get_cache_stats()['negative_cache_hits'] == 1)
+
+    await asyncio.sleep(ttl * 1.5)
+    await service.afetch_tree(word)
+    all_ok &= check("after the TTL Redis is asked again", reads() == 1)
+
+    await service.astore_probability_tree(word, tree)
+    service._memory_cache.discard(word)
+    reads()
+    stored, source = await service.afetch_tree(word)
+    all_ok &= check(f"stored tree served from {source}, negative entry dropped",
+                    stored is not None and source == "redis" and reads() == 1)
+    await service.aclose()
+    return all_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Negative caching of tree misses in fetch_tree / afetch_tree")
+    parser.add_argument("--json", default=DEFAULT_JSON, help="Source probability_trees.json")
+    parser.add_argument("--ttl", type=float, default=0.2, help="negative_cache_ttl in seconds")
+    args = parser.parse_args()
+
+    print("🚀 Negative Cache Test")
+    print("=" * 50)
+
+    server, url = start_stand_in()
+    client = redis.Redis.from_url(url)
+    source = OptimizedStorageService(StorageConfig(storage_type="json", json_file_path=args.json, file_store="lazy_json"))
+    tree = source.get_probability_tree(source.file_store.words()[0])
+    reads = ReadCounter(server)
+
+    all_ok = True
+    try:
+        print("1️⃣  fetch_tree")
+        service = make_service(client, args.ttl)
+        all_ok &= sync_checks(service, reads, "negative-sync", tree, args.ttl)
+        service.close()
+
+        print("2️⃣  afetch_tree")
+        service = make_service(client, args.ttl)
+        all_ok &= asyncio.run(async_checks(service, reads, "negative-async", tree, args.ttl))
+
+        print("3️⃣  negative_cache_ttl=0")
+        service = make_service(client, 0)
+        reads()
+        service.fetch_tree("negative-off")
+        service.fetch_tree("negative-off")
+        all_ok &= check("every miss asks Redis", reads() == 2 and service.get_cache_stats()['negative_cache_size'] == 0)
+        service.close()
+    finally:
+        server.shutdown()
+
+    print()
+    print("=" * 50)
+    print("✅ Negative cache test completed!" if all_ok else "❌ Negative cache test failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+One-Letter-Off Index Benchmark
+==============================
+
+get_one_letter_off: the trie walk (every position x 26 letters, each
+candidate re-walked from the root) vs the wildcard index (one bucket lookup
+per position for added and changed letters, set lookups for removed ones).
+
+Start words are sampled per word length in proportion to the
+word_length_distribution in game_data/metadata.json. Both must return the
+same transformations (the trie's duplicates removed in order).
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from models.shared_word_engine import get_shared_word_engine
+
+GAME_DATA = Path(__file__).parent.parent / "game_data"
+
+
+def per_word_us(function, words):
+    start = time.perf_counter()
+    results = [function(word) for word in words]
+    return results, (time.perf_counter() - start) * 1e6 / len(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="One-letter-off: trie vs wildcard index")
+    parser.add_argument("--samples", type=int, default=600, help="Start words over all lengths")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print("🚀 One-Letter-Off Index Benchmark")
+    print("=" * 50)
+
+    engine = get_shared_word_engine()
+    with open(GAME_DATA / "metadata.json") as f:
+        distribution = {int(length): count for length, count in json.load(f)["word_length_distribution"].items()}
+    total = sum(distribution.values())
+    print(f"📦 {len(engine.wildcard_index)} wildcard patterns over {len(engine.quality_words)} words")
+
+    by_length = defaultdict(list)
+    for word in sorted(engine.quality_words):
+        by_length[len(word)].append(word)
+    rng = random.Random(args.seed)
+
+    all_ok = True
+    trie_total = index_total = 0.0
+    print()
+    print(f"   {'len':>3} {'share':>6} {'words':>6} {'trie µs':>9} {'index µs':>9} {'speedup':>8} {'avg found':>10}")
+    for length in sorted(distribution):
+        share = distribution[length] / total
+        words = rng.sample(by_length[length], max(1, round(args.samples * share)))
+        trie_results, trie_us = per_word_us(engine._trie_one_letter_off, words)
+        index_results, index_us = per_word_us(engine.get_one_letter_off, words)
+        for expected, actual in zip(trie_results, index_results):
+            all_ok &= all(list(dict.fromkeys(expected[k])) == actual[k] for k in ('added', 'removed', 'changed'))
+        found = sum(sum(len(v) for v in result.values()) for result in index_results) / len(words)
+        trie_total += trie_us * share
+        index_total += index_us * share
+        print(f"   {length:>3} {share:>6.1%} {len(words):>6} {trie_us:>9.1f} {index_us:>9.1f} "
+              f"{trie_us / index_us:>7.1f}x {found:>10.1f}")
+
+    print(f"   {'all':>3} {'':>6} {'':>6} {trie_total:>9.1f} {index_total:>9.1f} {trie_total / index_total:>7.1f}x"
+          "   (weighted by length distribution)")
+    print(f"   {'✅' if all_ok else '❌'} same transformations as the trie for every word")
+
+    print()
+    print("=" * 50)
+    print("✅ One-letter-off index benchmark completed!" if all_ok else "❌ One-letter-off index benchmark failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
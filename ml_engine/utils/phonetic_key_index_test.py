@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Phonetic Key Index Test
+=======================
+
+Slant rhymes come from phonetic key indexes over the whole vocabulary
+(assonance, consonance and half-rhyme keys). This check:
+
+1. Compares categorize_rhymes_by_quality against a brute-force pass that
+   applies the same key predicates pairwise to every vocabulary word: same
+   slant rhymes, and how much faster the index lookups are
+2. Checks the categories are disjoint, exclude the start word and stay
+   within INDEXED_RHYME_LIMIT
+3. Checks words sharing a single key (only the stressed vowel, e.g. "and"
+   for "cat") are not slant rhymes
+"""
+
+import argparse
+import heapq
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from models.shared_word_engine import get_shared_word_engine
+
+
+def brute_force(engine, word, rhymes):
+    """Slant rhymes by checking every vocabulary word's pronunciations pairwise."""
+    word_parts = {engine._extract_rhyming_part(phones) for phones in engine.get_pronunciation(word)} - {""}
+
+    def shared_keys(candidate):
+        shared = set()
+        for phones in engine.get_pronunciation(candidate):
+            part = engine._extract_rhyming_part(phones)
+            if not part:
+                continue
+            for key_name, method in engine.PHONETIC_KEYS.items():
+                key_method = getattr(engine, method)
+                key = key_method(part)
+                if key and any(key_method(word_part) == key for word_part in word_parts):
+                    shared.add(key_name)
+        return len(shared)
+
+    excluded = set(rhymes) | set(engine.get_homophones(word)) | {word}
+    counts = {w: shared_keys(w) for w in engine.phonetics if w not in excluded}
+    return heapq.nlargest(engine.INDEXED_RHYME_LIMIT,
+                          sorted(w for w, keys in counts.items() if keys >= engine.SLANT_MIN_KEYS),
+                          key=lambda candidate: (counts[candidate], engine.word_frequencies.get(candidate, 0.0)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Slant rhymes: key indexes vs pairwise vocabulary checks")
+    parser.add_argument("--words", type=int, default=5, help="Random pronounceable start words")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print("🚀 Phonetic Key Index Test")
+    print("=" * 50)
+
+    engine = get_shared_word_engine()
+    print("📦 Key buckets: " + ", ".join(f"{key_name} {len(buckets)}" for key_name, buckets in engine.slant_index.items()))
+
+    rng = random.Random(args.seed)
+    words = ["cat", "time", "house"] + rng.sample(sorted(w for w in engine.phonetics if w.isalpha()), args.words)
+
+    all_ok = True
+    index_ms = scan_ms = 0.0
+    print()
+    print(f"   {'word':<10} {'prf':>4} {'rch':>4} {'sln':>4} {'near':>4}")
+    for word in words:
+        rhymes = engine.get_rhymes(word)
+        start = time.perf_counter()
+        categories = engine.categorize_rhymes_by_quality(word, rhymes)
+        index_ms += (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        slant = brute_force(engine, word, rhymes)
+        scan_ms += (time.perf_counter() - start) * 1000
+
+        lists = list(categories.values())
+        flat = [w for words_in in lists for w in words_in]
+        ok = (categories['slant'] == slant
+              and len(flat) == len(set(flat)) and word not in flat
+              and max(len(categories['slant']), len(categories['near'])) <= engine.INDEXED_RHYME_LIMIT)
+        all_ok &= ok
+        print(f"   {'✅' if ok else '❌'} {word:<8} {len(categories['perfect']):>4} {len(categories['rich']):>4} "
+              f"{len(categories['slant']):>4} {len(categories['near']):>4}   e.g. {categories['slant'][:3]} / {categories['near'][:3]}")
+
+    print()
+    for word, vowel_only in (("cat", ["and", "have", "can", "has"]), ("orange", ["for", "your", "more", "four"])):
+        slant = engine.categorize_rhymes_by_quality(word, engine.get_rhymes(word))['slant']
+        ok = not set(vowel_only) & set(slant)
+        all_ok &= ok
+        print(f"   {'✅' if ok else '❌'} {word}: no single-key matches {vowel_only} in {slant[:5]}")
+
+    print()
+    print(f"   categorize (indexes):      {index_ms / len(words):>9.2f} ms per word")
+    print(f"   pairwise vocabulary scan:  {scan_ms / len(words):>9.2f} ms per word")
+
+    print()
+    print("=" * 50)
+    print("✅ Phonetic key index test completed!" if all_ok else "❌ Phonetic key index test failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
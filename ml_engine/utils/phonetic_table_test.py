@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Phonetic Table Test
+===================
+
+Check game_data/phonetics.json against the pronouncing library it replaces:
+
+1. Load time and memory: phonetics.json vs pronouncing's CMU dictionary parse
+2. Every word: same pronunciations, rhyming parts, stresses and syllable
+   counts; words without a CMU entry are absent from the table
+
+pronouncing is only needed by this check (and CanonicalDataGenerator), not
+by the word engine.
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import pronouncing
+
+sys.path.append(str(Path(__file__).parent.parent))
+from models.phonetic_table import PhoneticTable
+
+GAME_DATA = Path(__file__).parent.parent / "game_data"
+
+
+def measure(load):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = load()
+    elapsed = (time.perf_counter() - start) * 1000
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, elapsed, allocated
+
+
+def main():
+    print("🚀 Phonetic Table Test")
+    print("=" * 50)
+
+    with open(GAME_DATA / "words.txt") as f:
+        words = [line.strip().lower() for line in f if line.strip()]
+
+    def load_table():
+        with open(GAME_DATA / "phonetics.json") as f:
+            return PhoneticTable.from_package(json.load(f))
+
+    table, table_ms, table_bytes = measure(load_table)
+    _, cmu_ms, cmu_bytes = measure(pronouncing.init_cmu)
+    print(f"   {'':<16} {'load ms':>9} {'MB':>8}")
+    print(f"   {'phonetics.json':<16} {table_ms:>9.0f} {table_bytes / 1024 / 1024:>8.1f}")
+    print(f"   {'pronouncing':<16} {cmu_ms:>9.0f} {cmu_bytes / 1024 / 1024:>8.1f}")
+
+    start = time.perf_counter()
+    mismatches = []
+    for word in words:
+        phones = pronouncing.phones_for_word(word)
+        expected = [(p, pronouncing.rhyming_part(p), pronouncing.stresses(p), pronouncing.syllable_count(p))
+                    for p in phones]
+        actual = [(p.phones, p.rhyming_part, p.stress, p.syllables) for p in table.get(word)]
+        if actual != expected:
+            mismatches.append(word)
+    decode_ms = (time.perf_counter() - start) * 1000
+
+    print()
+    print(f"📦 {len(table)} of {len(words)} words have pronunciations "
+          f"({len(table.phonemes)} phonemes); checked in {decode_ms:.0f} ms")
+    ok = not mismatches
+    print(f"   {'✅' if ok else '❌'} table matches pronouncing for every word"
+          + (f" (differs: {mismatches[:10]})" if mismatches else ""))
+
+    print()
+    print("=" * 50)
+    print("✅ Phonetic table test completed!" if ok else "❌ Phonetic table test failed")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
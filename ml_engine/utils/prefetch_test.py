@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Prefetch Test
+=============
+
+Check prefetch_trees and aprefetch on a mix of stored and missing start words,
+counting the Redis reads each call sends:
+
+1. One MGET per batch_size words (no per-word GETs); stored trees are loaded,
+   missing ones counted and negatively cached, duplicates and words already
+   in memory skipped
+2. Follow-up lookups of every word send no Redis read: hits come from
+   memory, misses from the negative cache
+3. Prefetching the same words again sends no Redis read
+
+Runs for the sync and the async interface on the in-process RESP stand-in,
+with trees from probability_trees.json.
+"""
+
+import argparse
+import asyncio
+import math
+import sys
+from pathlib import Path
+
+import redis
+
+sys.path.append(str(Path(__file__).parent.parent))
+from services.optimized_storage_service import OptimizedStorageService, StorageConfig
+from utils.redis_value_encoding_test import start_stand_in
+
+DEFAULT_JSON = str(Path(__file__).parent.parent / "game_data" / "probability_trees.json")
+READ_COMMANDS = ("GET", "MGET", "EXISTS")
+
+
+def check(label, ok):
+    print(f"   {'✅' if ok else '❌'} {label}")
+    return ok
+
+
+def commands_since(server, before):
+    """Read commands (by name) the stand-in served since the `before` snapshot (connection setup is left out)."""
+    return {name: server.commands[name] - before.get(name, 0) for name in READ_COMMANDS
+            if server.commands[name] > before.get(name, 0)}
+
+
+def make_service(client):
+    return OptimizedStorageService(StorageConfig(storage_type="redis", redis_connection=client))
+
+
+def check_prefetch(label, server, service, stats, before, words, stored, cached, batch_size):
+    """Checks shared by the sync and async runs, given the first prefetch's stats."""
+    unique = list(dict.fromkeys(words))
+    pending = [w for w in unique if w not in cached]
+    sent = commands_since(server, before)
+    expected = {'requested': len(unique), 'loaded': sum(w in stored for w in pending),
+                'cached': len(cached), 'missing': sum(w not in stored for w in pending)}
+    all_ok = check(f"{label}: {stats}, Redis {sent}",
+                   stats == expected and sent == {"MGET": math.ceil(len(pending) / batch_size)})
+
+    before = dict(server.commands)
+    hits = sum(service.fetch_tree(word)[1] == "memory" for word in unique)
+    all_ok &= check(f"follow-up lookups: {hits} from memory, {len(unique) - hits} known missing, no Redis read",
+                    hits == sum(w in stored for w in unique) and not commands_since(server, before)
+                    and service.get_cache_stats()['negative_cache_hits'] == expected['missing'])
+    return all_ok
+
+
+async def async_run(server, service, words, stored, cached, batch_size):
+    for word in cached:
+        await service.afetch_tree(word)
+    before = dict(server.commands)
+    stats = await service.aprefetch(words, batch_size)
+    all_ok = check_prefetch("aprefetch", server, service, stats, before, words, stored, cached, batch_size)
+    before = dict(server.commands)
+    again = await service.aprefetch(words, batch_size)
+    all_ok &= check(f"aprefetch again: {again}, no Redis read",
+                    again['cached'] == again['requested'] and not commands_since(server, before))
+    await service.aclose()
+    return all_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipelined MGET prefetch of mixed stored and missing trees")
+    parser.add_argument("--json", default=DEFAULT_JSON, help="Source probability_trees.json")
+    parser.add_argument("--words", type=int, default=12, help="Stored trees in the mix")
+    parser.add_argument("--batch-size", type=int, default=5, help="Words per MGET")
+    args = parser.parse_args()
+
+    print("🚀 Prefetch Test")
+    print("=" * 50)
+
+    server, url = start_stand_in()
+    client = redis.Redis.from_url(url)
+    source = OptimizedStorageService(StorageConfig(storage_type="json", json_file_path=args.json, file_store="lazy_json"))
+    stored = [f"prefetch-{word}" for word in source.file_store.words()[:args.words]]
+    seed = make_service(client)
+    for word in stored:
+        seed._set_redis_tree(word, source.file_store.get_serialized(word[len("prefetch-"):]))
+    missing = [f"prefetch-missing-{i}" for i in range(args.words // 2)]
+    words = [w for pair in zip(stored, missing) for w in pair] + stored[len(missing):] + stored[:2]
+    cached = stored[:1]
+    print(f"📦 {len(stored)} stored, {len(missing)} missing, {len(words) - len(set(words))} duplicates, "
+          f"{len(cached)} already in memory, MGET batches of {args.batch_size}")
+
+    all_ok = True
+    try:
+        print("1️⃣  prefetch_trees")
+        service = make_service(client)
+        for word in cached:
+            service.fetch_tree(word)
+        before = dict(server.commands)
+        stats = service.prefetch_trees(words, args.batch_size)
+        all_ok &= check_prefetch("prefetch_trees", server, service, stats, before, words, set(stored), cached,
+                                 args.batch_size)
+        before = dict(server.commands)
+        again = service.prefetch_trees(words, args.batch_size)
+        all_ok &= check(f"prefetch_trees again: {again}, no Redis read",
+                        again['cached'] == again['requested'] and not commands_since(server, before))
+        service.close()
+
+        print("2️⃣  aprefetch")
+        service = make_service(client)
+        all_ok &= asyncio.run(async_run(server, service, words, set(stored), cached, args.batch_size))
+    finally:
+        server.shutdown()
+
+    print()
+    print("=" * 50)
+    print("✅ Prefetch test completed!" if all_ok else "❌ Prefetch test failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
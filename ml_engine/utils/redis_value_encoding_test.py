@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Redis Value Encoding Test
+=========================
+
+Compare raw-bytes and base64 Redis values for probability trees:
+
+1. Transfer size: bytes stored per tree (what SET sends and GET returns)
+2. Decode time: Redis value -> WordProbabilityTree, without the network
+3. Fetch time: GET + decode through OptimizedStorageService.fetch_tree
+4. Bulk fetch: prefetch_trees (MGET) for the whole corpus
+5. Mixed keys: raw and base64 values side by side both decode
+
+By default the test starts a minimal in-process RESP server as a stand-in for
+a local redis-server. Pass --redis-url to use a real server instead; the test
+writes and then deletes tree:<word> keys, so point it at a scratch database.
+"""
+
+import argparse
+import socketserver
+from collections import Counter
+import sys
+import threading
+import time
+from pathlib import Path
+
+import redis
+
+sys.path.append(str(Path(__file__).parent.parent))
+from services.optimized_storage_service import OptimizedStorageService, StorageConfig
+from services.tree_file_stores import read_legacy_json
+
+DEFAULT_JSON = str(Path(__file__).parent.parent / "game_data" / "probability_trees.json")
+
+
+class RespStandInHandler(socketserver.StreamRequestHandler):
+    """
+    Just enough of the Redis protocol for HELLO/GET/SET/MGET/DEL/EXISTS/PING
+    and HSET/HGETALL.
+
+    Each connection is served by its own thread. Replies to pipelined commands
+    are sent together, after server.latency seconds, to simulate one network
+    round trip per request or pipeline. server.commands counts commands by name.
+    """
+
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _bulk(self, value):
+        if value is None:
+            return b"_\r\n" if self.protocol == 3 else b"$-1\r\n"
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+
+    def _input_pending(self) -> bool:
+        self.connection.setblocking(False)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.connection.setblocking(True)
+
+    def handle(self):
+        store = self.server.data
+        self.protocol = 2
+        replies = []
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            command = args[0].upper()
+            self.server.commands[command.decode()] += 1
+            if command == b"HELLO":
+                self.protocol = int(args[1]) if len(args) > 1 else 2
+                reply = b"%%1\r\n$5\r\nproto\r\n:%d\r\n" % self.protocol
+            elif command == b"PING":
+                reply = b"+PONG\r\n"
+            elif command == b"GET":
+                reply = self._bulk(store.get(args[1]))
+            elif command == b"SET":
+                store[args[1]] = args[2]
+                reply = b"+OK\r\n"
+            elif command == b"MGET":
+                reply = b"*%d\r\n" % (len(args) - 1) + b"".join(self._bulk(store.get(key)) for key in args[1:])
+            elif command == b"DEL":
+                reply = b":%d\r\n" % sum(store.pop(key, None) is not None for key in args[1:])
+            elif command == b"EXISTS":
+                reply = b":%d\r\n" % sum(key in store for key in args[1:])
+            elif command == b"HSET":
+                fields = store.setdefault(args[1], {})
+                pairs = dict(zip(args[2::2], args[3::2]))
+                reply = b":%d\r\n" % sum(field not in fields for field in pairs)
+                fields.update(pairs)
+            elif command == b"HGETALL":
+                fields = store.get(args[1], {})
+                header = b"%%%d\r\n" if self.protocol == 3 else b"*%d\r\n"
+                reply = header % (len(fields) * (1 if self.protocol == 3 else 2)) + b"".join(
+                    self._bulk(field) + self._bulk(value) for field, value in fields.items()
+                )
+            else:
+                reply = b"-ERR unknown command\r\n"
+            replies.append(reply)
+            if not self._input_pending():
+                if self.server.latency:
+                    time.sleep(self.server.latency)
+                self.wfile.write(b"".join(replies))
+                replies = []
+
+
+def start_stand_in(latency: float = 0.0):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), RespStandInHandler)
+    server.daemon_threads = True
+    server.data = {}
+    server.latency = latency
+    server.commands = Counter()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"redis://127.0.0.1:{server.server_address[1]}"
+
+
+def best_of(rounds: int, fn) -> float:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raw vs base64 Redis tree values")
+    parser.add_argument("--json", default=DEFAULT_JSON, help="Source probability_trees.json")
+    parser.add_argument("--redis-url", default=None, help="Real Redis server (default: in-process stand-in)")
+    parser.add_argument("--rounds", type=int, default=5, help="Timing rounds (best round is reported)")
+    args = parser.parse_args()
+
+    print("🚀 Redis Value Encoding Test")
+    print("=" * 50)
+
+    server = None
+    url = args.redis_url
+    if url is None:
+        server, url = start_stand_in()
+        print(f"🧪 Using in-process RESP stand-in at {url}")
+    else:
+        print(f"🔌 Using Redis at {url}")
+
+    payloads = {word: bytes.fromhex(entry['serialized']) for word, entry in read_legacy_json(args.json).items()}
+    words = list(payloads)
+    keys = [f"tree:{word}" for word in words]
+    print(f"📦 {len(words)} trees")
+    print()
+
+    client = redis.Redis.from_url(url)
+    results = {}
+    try:
+        for encoding in ("base64", "raw"):
+            service = OptimizedStorageService(StorageConfig(
+                storage_type="redis", redis_connection=client, redis_value_encoding=encoding, cache_size=0
+            ))
+            values = [service._encode_redis_value(payloads[word]) for word in words]
+            for key, value in zip(keys, values):
+                client.set(key, value)
+
+            fetched = client.mget(keys)
+            decode = best_of(args.rounds, lambda: [service._decode_redis_value(v, w) for v, w in zip(fetched, words)])
+            fetch = best_of(args.rounds, lambda: [service.fetch_tree(word) for word in words])
+            bulk = best_of(args.rounds, lambda: service.prefetch_trees(words))
+            results[encoding] = {
+                'bytes': sum(len(value) for value in fetched) / len(words),
+                'decode_us': decode / len(words) * 1e6,
+                'fetch_us': fetch / len(words) * 1e6,
+                'bulk_ms': bulk * 1000
+            }
+            if encoding == "base64":
+                base64_values = values
+
+        # Mixed corpus: half the keys still hold base64 text, the rest raw bytes
+        for key, value in list(zip(keys, base64_values))[::2]:
+            client.set(key, value)
+        mixed_service = OptimizedStorageService(StorageConfig(storage_type="redis", redis_connection=client, cache_size=0))
+        mixed_ok = all(mixed_service.fetch_tree(word)[0] is not None for word in words)
+    finally:
+        client.delete(*keys)
+        if server is not None:
+            server.shutdown()
+
+    print(f"   {'encoding':<8} {'bytes/tree':>11} {'decode µs':>10} {'GET+decode µs':>14} {'MGET all ms':>12}")
+    for encoding, result in results.items():
+        print(f"   {encoding:<8} {result['bytes']:>11,.0f} {result['decode_us']:>10.1f} "
+              f"{result['fetch_us']:>14.1f} {result['bulk_ms']:>12.2f}")
+    saved = 1 - results['raw']['bytes'] / results['base64']['bytes']
+    print(f"   Raw values are {saved:.1%} smaller on the wire")
+    print(f"🔀 Mixed raw/base64 keys decode: {'✅' if mixed_ok else '❌'}")
+
+    print()
+    print("=" * 50)
+    print("✅ Redis value encoding test completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Rhyme Index Benchmark
+=====================
+
+Cold-word rhyme latency: the previous full-vocabulary scan (every word's
+pronunciations and rhyming parts compared against the start word's) vs the
+rhyming part -> words index (rhymes.json) that get_rhymes now unions a few
+buckets of.
+
+Both run on empty engine caches for each word, and must return the same
+rhymes. The scan is reproduced here as the baseline.
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from models.shared_word_engine import get_shared_word_engine
+
+
+def scan_rhymes(engine, word):
+    """The full-vocabulary scan get_rhymes used before the index."""
+    word_rhyming_parts = engine.get_all_rhyming_parts(word)
+    if not word_rhyming_parts:
+        return []
+    rhymes = set()
+    for candidate_word in engine.quality_words:
+        if candidate_word == word:
+            continue
+        candidate_rhyming_parts = engine.get_all_rhyming_parts(candidate_word)
+        if not candidate_rhyming_parts:
+            continue
+        if any(wp in candidate_rhyming_parts for wp in word_rhyming_parts):
+            rhymes.add(candidate_word)
+    return list(rhymes)
+
+
+def clear_engine_caches(engine):
+    for cache in (engine._rhyme_cache,):
+        cache.clear()
+
+
+def time_cold(engine, words, find):
+    timings, results = [], {}
+    for word in words:
+        clear_engine_caches(engine)
+        start = time.perf_counter()
+        results[word] = find(word)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return results, (sum(timings) / len(timings), timings[len(timings) // 2], timings[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold rhyme lookups: vocabulary scan vs rhyme index")
+    parser.add_argument("--words", type=int, default=20, help="Random pronounceable start words")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print("🚀 Rhyme Index Benchmark")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    engine = get_shared_word_engine()
+    print(f"📦 Engine ready in {(time.perf_counter() - start) * 1000:.0f} ms: "
+          f"{len(engine.quality_words)} words, {len(engine.rhyme_index)} rhyme groups, "
+          f"{sum(len(words) for words in engine.rhyme_index.values())} entries")
+
+    rng = random.Random(args.seed)
+    pool = sorted(w for words in engine.rhyme_index.values() for w in words if w.isalpha())
+    words = ["cat", "time", "orange"] + rng.sample(pool, args.words)
+
+    scanned, scan_stats = time_cold(engine, words, lambda w: scan_rhymes(engine, w))
+    indexed, index_stats = time_cold(engine, words, engine.get_rhymes)
+    clear_engine_caches(engine)
+
+    mismatches = [w for w in words if sorted(scanned[w]) != sorted(indexed[w])]
+    print()
+    print(f"   {'':<8} {'avg ms':>9} {'p50 ms':>9} {'max ms':>9}   (cold get_rhymes, {len(words)} words)")
+    for label, (avg, p50, worst) in (("scan", scan_stats), ("index", index_stats)):
+        print(f"   {label:<8} {avg:>9.2f} {p50:>9.2f} {worst:>9.2f}")
+    print(f"   speedup  {scan_stats[0] / index_stats[0]:>9.0f}x")
+    print(f"   {'✅' if not mismatches else '❌'} same rhymes for every word"
+          + (f" (differs: {mismatches})" if mismatches else ""))
+
+    print()
+    print("=" * 50)
+    print("✅ Rhyme index benchmark completed!" if not mismatches else "❌ Rhyme index benchmark failed")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Segment JSON Import Test
+========================
+
+Check that edits to probability_trees.json reach a segment store that was
+seeded from it, and Redis through the end-of-game tree sync:
+
+1. Seeding: a fresh segment store imports every JSON entry
+2. Unchanged JSON: reopening the store imports nothing
+3. Edited JSON: changed and added entries are re-imported; trees built at
+   runtime for entries the JSON did not change are kept
+4. Tree sync: populate_from_file on the service's own JSON pushes the edited trees
+
+Runs in hybrid mode against the in-process RESP stand-in or --redis-url, on a
+temporary JSON holding the first --words trees of probability_trees.json.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import redis
+
+sys.path.append(str(Path(__file__).parent.parent))
+from services.optimized_storage_service import OptimizedStorageService, StorageConfig
+from services.tree_file_stores import create_tree_file_store, read_legacy_json, write_legacy_json
+from utils.redis_value_encoding_test import start_stand_in
+
+DEFAULT_JSON = str(Path(__file__).parent.parent / "game_data" / "probability_trees.json")
+
+
+def check(label, ok):
+    print(f"   {'✅' if ok else '❌'} {label}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-import of probability_trees.json edits into the segment store")
+    parser.add_argument("--json", default=DEFAULT_JSON, help="Source probability_trees.json")
+    parser.add_argument("--redis-url", default=None, help="Real Redis server (default: in-process stand-in)")
+    parser.add_argument("--words", type=int, default=40, help="Trees in the temporary JSON")
+    args = parser.parse_args()
+
+    print("🚀 Segment JSON Import Test")
+    print("=" * 50)
+
+    server = None
+    url = args.redis_url
+    if url is None:
+        server, url = start_stand_in()
+    client = redis.Redis.from_url(url)
+
+    data = read_legacy_json(args.json)
+    words = list(data)[:args.words]
+    entries = {word: (bytes.fromhex(data[word]['serialized']), data[word].get('metadata', {})) for word in words}
+    del data
+
+    all_ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = str(Path(tmp) / "probability_trees.json")
+        segment_dir = str(Path(tmp) / "probability_trees.segments")
+        write_legacy_json(json_path, ((word, *entries[word]) for word in words))
+        try:
+            print("1️⃣  Seeding")
+            store = create_tree_file_store("segment", json_path, segment_dir, compaction_interval=0)
+            all_ok &= check(f"{len(store)} of {len(words)} trees imported", len(store) == len(words))
+            built, edited = words[0], words[1]
+            store.put_serialized(built, entries[words[2]][0], {'built': 'runtime'})
+            store.close()
+
+            print("2️⃣  Unchanged JSON")
+            store = create_tree_file_store("segment", json_path, segment_dir, compaction_interval=0)
+            all_ok &= check("nothing re-imported, runtime tree kept",
+                            store.import_json_changes(json_path) == 0
+                            and store.get_metadata(built) == {'built': 'runtime'})
+            store.close()
+
+            print("3️⃣  Edited JSON")
+            entries[edited] = (entries[words[3]][0], {'edited': True})
+            entries["added"] = entries[words[4]]
+            write_legacy_json(json_path, ((word, *entry) for word, entry in entries.items()))
+            store = create_tree_file_store("segment", json_path, segment_dir, compaction_interval=0)
+            all_ok &= check(f"edited and added entries re-imported ({len(store)} trees)",
+                            store.get_entry(edited) == entries[edited] and store.get_entry("added") == entries["added"])
+            all_ok &= check("runtime tree for an unchanged entry kept",
+                            store.get_metadata(built) == {'built': 'runtime'})
+            store.close()
+
+            print("4️⃣  Tree sync from the service's own JSON")
+            service = OptimizedStorageService(StorageConfig(
+                storage_type="hybrid", redis_connection=client, json_file_path=json_path, segment_dir=segment_dir,
+                compaction_interval=0
+            ))
+            asyncio.run(service.populate_from_file(json_path))
+            entries[edited] = (entries[words[5]][0], {'edited': 2})
+            write_legacy_json(json_path, ((word, *entry) for word, entry in entries.items()))
+            os.utime(json_path, ns=(0, os.stat(json_path).st_mtime_ns + 1))
+            result = asyncio.run(service.populate_from_file(json_path))
+            all_ok &= check(f"edit imported and pushed: {result['sync']['imported']} imported, {result['new_trees_added']} pushed",
+                            result['sync']['imported'] == 1 and result['new_trees_added'] == 1
+                            and service.file_store.get_serialized(edited) == entries[edited][0])
+            client.delete(*[service._redis_key(word) for word in entries], service._manifest_key)
+            service.close()
+        finally:
+            if server is not None:
+                server.shutdown()
+
+    print()
+    print("=" * 50)
+    print("✅ Segment JSON import test completed!" if all_ok else "❌ Segment JSON import test failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Storage Tiers Test
+==================
+
+Exercise the memory -> SQLite -> Redis tier chain of OptimizedStorageService:
+
+1. Cold lookups: every tree comes from Redis and is read through into SQLite
+2. Warm restart: a new service instance (empty memory cache) serves the same
+   words from SQLite without touching Redis
+3. Write-through: a stored tree lands in SQLite and Redis
+4. Prefetch: bulk loads use one SQLite query instead of MGETs
+5. Per-tier hit rates and latency percentiles from get_storage_stats()
+6. Prefetch into a full TinyLFU cache: prefetched trees are admitted over
+   entries that were requested before
+
+Runs against the in-process RESP stand-in (with injected latency) or
+--redis-url, with a temporary SQLite database.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import redis
+
+sys.path.append(str(Path(__file__).parent.parent))
+from services.optimized_storage_service import OptimizedStorageService, StorageConfig
+from utils.redis_value_encoding_test import start_stand_in
+
+DEFAULT_JSON = str(Path(__file__).parent.parent / "game_data" / "probability_trees.json")
+
+
+def make_service(client, sqlite_path, cache_size=1000):
+    return OptimizedStorageService(StorageConfig(
+        storage_type="redis", redis_connection=client, storage_tiers=["sqlite", "redis"], sqlite_path=sqlite_path,
+        cache_size=cache_size
+    ))
+
+
+def timed_lookups(service, words):
+    sources = {}
+    start = time.perf_counter()
+    for word in words:
+        _, source = service.fetch_tree(word)
+        sources[source] = sources.get(source, 0) + 1
+    return (time.perf_counter() - start) * 1000, sources
+
+
+def print_tiers(stats):
+    print(f"   {'tier':<8} {'hits':>6} {'misses':>7} {'hit rate':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for tier, tier_stats in stats['tiers'].items():
+        latency = tier_stats['latency']
+        print(f"   {tier:<8} {tier_stats['hits']:>6} {tier_stats['misses']:>7} {tier_stats['hit_rate']:>9.0%} "
+              f"{latency['p50_ms']:>8g} {latency['p99_ms']:>8g}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiered tree storage: read-through, write-through, warm restarts")
+    parser.add_argument("--json", default=DEFAULT_JSON, help="Source probability_trees.json")
+    parser.add_argument("--redis-url", default=None, help="Real Redis server (default: in-process stand-in)")
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Injected reply latency for the stand-in")
+    args = parser.parse_args()
+
+    print("🚀 Storage Tiers Test")
+    print("=" * 50)
+
+    server = None
+    url = args.redis_url
+    if url is None:
+        server, url = start_stand_in(args.latency_ms / 1000)
+        print(f"🧪 Using in-process RESP stand-in at {url} ({args.latency_ms:.1f} ms per reply)")
+    else:
+        print(f"🔌 Using Redis at {url}")
+
+    client = redis.Redis.from_url(url)
+    source = OptimizedStorageService(StorageConfig(storage_type="json", json_file_path=args.json, file_store="lazy_json"))
+    prefix = "tiers-"
+    payloads = {prefix + word: source.file_store.get_serialized(word) for word in source.file_store.words()}
+    words = list(payloads)
+    print(f"📦 {len(words)} trees")
+    print()
+
+    all_ok = True
+    try:
+        seed = OptimizedStorageService(StorageConfig(storage_type="redis", redis_connection=client))
+        for word, payload in payloads.items():
+            seed._set_redis_tree(word, payload)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            sqlite_path = str(Path(tmp) / "trees.sqlite3")
+
+            service = make_service(client, sqlite_path)
+            cold_ms, cold_sources = timed_lookups(service, words)
+            read_through = len(service.sqlite_store)
+            all_ok &= cold_sources == {"redis": len(words)} and read_through == len(words)
+            print(f"❄️  Cold lookups: {cold_ms:.1f} ms, sources {cold_sources}, read through into SQLite: {read_through}")
+
+            written = prefix + "written"
+            service.store_probability_tree(written, source.get_probability_tree(words[0][len(prefix):]))
+            through = written in service.sqlite_store and bool(client.exists(f"tree:{written}"))
+            all_ok &= through
+            print(f"✍️  Write-through to SQLite and Redis: {'✅' if through else '❌'}")
+            print_tiers(service.get_storage_stats())
+            service.close()
+            print()
+
+            restarted = make_service(client, sqlite_path)
+            warm_ms, warm_sources = timed_lookups(restarted, words)
+            all_ok &= warm_sources == {"sqlite": len(words)}
+            print(f"🔥 Warm restart: {warm_ms:.1f} ms, sources {warm_sources} ({cold_ms / max(warm_ms, 1e-6):.1f}x faster)")
+
+            restarted.clear_memory_cache()
+            start = time.perf_counter()
+            prefetched = restarted.prefetch_trees(words)
+            all_ok &= prefetched['loaded'] == len(words)
+            print(f"📥 Prefetch after clearing memory: {prefetched} in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+            memory_ms, memory_sources = timed_lookups(restarted, words)
+            all_ok &= memory_sources == {"memory": len(words)}
+            print(f"⚡ Memory lookups: {memory_ms:.1f} ms, sources {memory_sources}")
+
+            stats = restarted.get_storage_stats()
+            print(f"   chain {' -> '.join(stats['tier_chain'])}, SQLite {stats['sqlite']['total_trees']} trees, "
+                  f"{stats['sqlite']['file_size_bytes']} bytes")
+            print_tiers(stats)
+            all_ok &= stats['tiers']['redis']['hits'] == 0
+            restarted.close()
+            print()
+
+            half = len(words) // 2
+            full = make_service(client, sqlite_path, cache_size=half)
+            timed_lookups(full, words[:half])
+            timed_lookups(full, words[:half])
+            prefetched = full.prefetch_trees(words[half:2 * half])
+            _, prefetched_sources = timed_lookups(full, words[half:2 * half])
+            cache = full.get_cache_stats()
+            ok = prefetched_sources == {"memory": half} and cache['memory_cache_size'] == half
+            all_ok &= ok
+            print(f"📥 Prefetch into a full TinyLFU cache ({half} entries, twice-requested residents): "
+                  f"{'✅' if ok else '❌'} sources {prefetched_sources}, {cache['cache_rejections']} rejections")
+            full.close()
+    finally:
+        client.delete(*[f"tree:{word}" for word in words], f"tree:{prefix}written")
+        if server is not None:
+            server.shutdown()
+
+    print()
+    print("=" * 50)
+    print("✅ Storage tiers test completed!" if all_ok else "❌ Storage tiers test failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
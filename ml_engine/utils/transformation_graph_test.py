@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Transformation Graph Test
+=========================
+
+get_comprehensive_transformations from the precomputed graph vs live word
+engine computation:
+
+1. Build a graph for the most frequent words plus a random sample into a
+   temporary directory (a full build is utils/build_transformation_graph.py)
+2. Every built word: same transformations as compute_transformations
+3. Per-word latency: graph lookup vs live computation (cold engine caches)
+4. Fallbacks: unbuilt words return None; a graph built for other versions
+   or a truncated file is not loaded
+"""
+
+import argparse
+import heapq
+import logging
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from models.shared_word_engine import get_shared_word_engine
+from services.transformation_graph import (
+    build_transformation_graph, compute_transformations, graph_versions, load_transformation_graph
+)
+
+
+def per_word_us(function, words):
+    start = time.perf_counter()
+    results = [function(word) for word in words]
+    return results, (time.perf_counter() - start) * 1e6 / len(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transformation graph vs live computation")
+    parser.add_argument("--top", type=int, default=300, help="Most frequent words to build")
+    parser.add_argument("--sample", type=int, default=300, help="Random vocabulary words to build")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    print("🚀 Transformation Graph Test")
+    print("=" * 50)
+
+    engine = get_shared_word_engine()
+    vocabulary = sorted(engine.quality_words)
+    rng = random.Random(args.seed)
+    top = heapq.nlargest(args.top, vocabulary, key=lambda w: engine.word_frequencies.get(w, 0.0))
+    words = list(dict.fromkeys(top + rng.sample(vocabulary, args.sample)))
+    versions = graph_versions(engine)
+
+    all_ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "transformation_graph.bin"
+        stats = build_transformation_graph(path, engine, words=words, processes=args.processes)
+        print(f"📦 {stats['built']} of {stats['words']} words, {sum(stats['edges'].values())} edges, "
+              f"{stats['bytes'] / 1024:.0f} KB in {stats['duration_ms'] / 1000:.1f} s "
+              f"({stats['duration_ms'] / stats['built']:.1f} ms per word)")
+
+        start = time.perf_counter()
+        graph = load_transformation_graph(path, versions)
+        print(f"   opened in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        graph_results, graph_us = per_word_us(graph.get, words)
+        engine._rhyme_cache.clear()
+        engine._anagram_cache.clear()
+        live_results, live_us = per_word_us(lambda w: compute_transformations(engine, w), words)
+
+        same = graph_results == live_results
+        all_ok &= same
+        print()
+        print(f"   graph lookup:      {graph_us:>10.1f} µs per word")
+        print(f"   live computation:  {live_us:>10.1f} µs per word  ({live_us / graph_us:.0f}x)")
+        print(f"   {'✅' if same else '❌'} same transformations as live computation for {len(words)} words")
+
+        print()
+        unbuilt = next(w for w in vocabulary if w not in graph)
+        checks = {
+            f"unbuilt word '{unbuilt}' falls back": graph.get(unbuilt) is None,
+            "unknown word falls back": graph.get("notaword") is None,
+            "other game data is not loaded": load_transformation_graph(path, {**versions, 'game_data': 'other'}) is None,
+            "other engine code is not loaded": load_transformation_graph(path, {**versions, 'engine_code': 'other'}) is None,
+        }
+        graph.close()
+        truncated = Path(tmp) / "truncated.bin"
+        for size in (40, stats['bytes'] // 2):
+            truncated.write_bytes(path.read_bytes()[:size])
+            checks[f"file truncated to {size} bytes is not loaded"] = load_transformation_graph(truncated, versions) is None
+        checks["missing file is not loaded"] = load_transformation_graph(Path(tmp) / "absent.bin", versions) is None
+        for name, ok in checks.items():
+            all_ok &= ok
+            print(f"   {'✅' if ok else '❌'} {name}")
+
+    print()
+    print("=" * 50)
+    print("✅ Transformation graph test completed!" if all_ok else "❌ Transformation graph test failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tree Cache Test
+===============
+
+Behaviour checks for TreeCache on small caches with explicit entry sizes:
+
+1. Byte accounting: puts, replacements and discards keep stats()['bytes'] equal
+   to the sum of the cached entry sizes
+2. Eviction: least recently used entries go first, by entry count and by bytes
+3. TinyLFU admission: a newcomer requested less often than the entry it would
+   evict is refused; one requested more often replaces it; admit=True skips the gate
+4. Replacements: an oversized or refused replacement keeps the cached value, and
+   replacing a key in a full cache evicts nothing
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from services.tree_cache import TreeCache
+
+
+def check(label, ok):
+    print(f"   {'✅' if ok else '❌'} {label}")
+    return ok
+
+
+def byte_total(cache):
+    return sum(size for _, _, size in cache.items())
+
+
+def request(cache, key, times):
+    """Count requests for key in the frequency sketch (misses for keys not cached)."""
+    for _ in range(times):
+        cache.get(key)
+
+
+def main():
+    print("🚀 Tree Cache Test")
+    print("=" * 50)
+    all_ok = True
+
+    print("1️⃣  Byte accounting")
+    cache = TreeCache(max_entries=10, max_bytes=1000, policy="lru")
+    for key, size in (("a", 100), ("b", 200), ("c", 300)):
+        cache.put(key, key.upper(), size=size)
+    all_ok &= check("three puts: 600 bytes", cache.stats()['bytes'] == byte_total(cache) == 600)
+    cache.put("b", "B2", size=50)
+    all_ok &= check("replacement re-charged: 450 bytes",
+                    cache.stats()['bytes'] == byte_total(cache) == 450 and cache.get("b") == "B2")
+    cache.discard("a")
+    cache.discard("missing")
+    all_ok &= check("discard: 350 bytes, 2 entries",
+                    cache.stats()['bytes'] == byte_total(cache) == 350 and len(cache) == 2)
+    cache.clear()
+    all_ok &= check("clear: 0 bytes", cache.stats()['bytes'] == 0 and len(cache) == 0)
+
+    print("2️⃣  Eviction")
+    cache = TreeCache(max_entries=3, max_bytes=1000, policy="lru")
+    for key in "abc":
+        cache.put(key, key, size=10)
+    cache.get("a")
+    cache.put("d", "d", size=10)
+    all_ok &= check("entry limit: least recently used 'b' evicted",
+                    cache.keys() == ["c", "a", "d"] and cache.stats()['evictions'] == 1)
+    cache = TreeCache(max_entries=10, max_bytes=100, policy="lru")
+    for key in "abc":
+        cache.put(key, key, size=30)
+    cache.put("d", "d", size=50)
+    stats = cache.stats()
+    all_ok &= check(f"byte budget: 'a' and 'b' evicted for 50 bytes ({stats['bytes']} / 100 bytes)",
+                    cache.keys() == ["c", "d"] and stats['bytes'] == byte_total(cache) == 80
+                    and stats['evictions'] == 2)
+    all_ok &= check("value larger than the budget refused",
+                    not cache.put("huge", "huge", size=101) and "huge" not in cache and cache.stats()['rejections'] == 1)
+
+    print("3️⃣  TinyLFU admission")
+    cache = TreeCache(max_entries=2, max_bytes=1000, policy="tinylfu")
+    for key in ("hot1", "hot2"):
+        request(cache, key, 5)
+        cache.put(key, key, size=10)
+    request(cache, "cold", 1)
+    all_ok &= check("cold newcomer refused, hot entries kept",
+                    not cache.put("cold", "cold", size=10) and sorted(cache.keys()) == ["hot1", "hot2"]
+                    and cache.stats()['rejections'] == 1 and cache.stats()['evictions'] == 0)
+    request(cache, "popular", 10)
+    all_ok &= check("more requested newcomer admitted, evicting the LRU entry",
+                    cache.put("popular", "popular", size=10) and cache.keys() == ["hot2", "popular"]
+                    and cache.stats()['evictions'] == 1)
+    all_ok &= check("admit=True skips the gate for a never requested key",
+                    cache.put("prefetched", "prefetched", size=10, admit=True) and "prefetched" in cache)
+
+    print("4️⃣  Replacements")
+    cache = TreeCache(max_entries=2, max_bytes=100, policy="tinylfu")
+    cache.put("a", "A", size=40, admit=True)
+    cache.put("b", "B", size=40, admit=True)
+    all_ok &= check("oversized replacement refused, cached value kept",
+                    not cache.put("a", "A2", size=101) and cache.get("a") == "A"
+                    and cache.stats()['bytes'] == byte_total(cache) == 80)
+    evictions = cache.stats()['evictions']
+    all_ok &= check("replacement in a full cache evicts nothing and becomes most recent",
+                    cache.put("b", "B2", size=40) and cache.keys() == ["a", "b"] and cache.get("b") == "B2"
+                    and cache.stats()['evictions'] == evictions)
+    all_ok &= check("growing replacement evicts the other entry, not itself",
+                    cache.put("b", "B3", size=90) and cache.keys() == ["b"]
+                    and cache.stats()['bytes'] == byte_total(cache) == 90)
+
+    print()
+    print("=" * 50)
+    print("✅ Tree cache test completed!" if all_ok else "❌ Tree cache test failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
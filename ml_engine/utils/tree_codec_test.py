@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tree Codec Test
+===============
+
+Behaviour checks for the codec registry and the zlib preset-dictionary codec:
+
+1. Registry: built-in codecs by name, pickle_zlib_dict only with a trained
+   dictionary file, unknown names and tags raise CodecError
+2. Round trip: every codec's payload names its codec and decodes to the same
+   tree; untagged legacy gzip and pickle payloads still decode
+3. Dictionary codec: a trained dictionary makes payloads smaller than
+   pickle_gzip; a registry loaded with another dictionary refuses the payload
+   instead of inflating garbage
+4. Training: the dictionary respects its size budget and survives a write/load
+
+Uses a dictionary trained from probability_trees.json into a temporary file.
+"""
+
+import argparse
+import gzip
+import pickle
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from services.tree_codecs import (
+    CodecError, create_codec_registry, is_tree_payload, load_dictionary, train_zlib_dictionary, tree_to_dict,
+    write_dictionary
+)
+from services.tree_file_stores import read_legacy_json
+from utils.tree_array_codec_test import canonical
+
+DEFAULT_JSON = str(Path(__file__).parent.parent / "game_data" / "probability_trees.json")
+
+
+def check(label, ok):
+    print(f"   {'✅' if ok else '❌'} {label}")
+    return ok
+
+
+def raises_codec_error(fn) -> bool:
+    try:
+        fn()
+    except CodecError:
+        return True
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Codec registry and zlib dictionary codec behaviour test")
+    parser.add_argument("--json", default=DEFAULT_JSON, help="Source probability_trees.json")
+    parser.add_argument("--dictionary-size", type=int, default=8 * 1024, help="Trained dictionary budget in bytes")
+    args = parser.parse_args()
+
+    print("🚀 Tree Codec Test")
+    print("=" * 50)
+
+    plain = create_codec_registry()
+    data = read_legacy_json(args.json)
+    trees = [plain.decode(bytes.fromhex(entry['serialized'])) for entry in data.values()]
+    samples = [pickle.dumps(tree_to_dict(tree), protocol=pickle.HIGHEST_PROTOCOL) for tree in trees]
+    print(f"📦 {len(trees)} trees")
+
+    all_ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        dictionary_path = str(Path(tmp) / "tree_codec.zdict")
+        dictionary = train_zlib_dictionary(samples, size=args.dictionary_size)
+        write_dictionary(dictionary_path, dictionary)
+        codecs = create_codec_registry(dictionary_path)
+
+        print("1️⃣  Registry")
+        all_ok &= check(f"without a dictionary: {plain.names()}",
+                        "pickle_zlib_dict" not in plain.names()
+                        and {"pickle_raw", "pickle_gzip", "array", "array_zlib"} <= set(plain.names()))
+        all_ok &= check("missing dictionary file: no dictionary codec",
+                        "pickle_zlib_dict" not in create_codec_registry(str(Path(tmp) / "missing.zdict")).names())
+        all_ok &= check("with a trained dictionary: pickle_zlib_dict registered", "pickle_zlib_dict" in codecs.names())
+        all_ok &= check("unknown codec name raises CodecError", raises_codec_error(lambda: codecs.get("lz4")))
+        all_ok &= check("unknown tag and unrecognised payloads raise CodecError",
+                        raises_codec_error(lambda: codecs.decode(b"WC\xfe..."))
+                        and raises_codec_error(lambda: codecs.decode(b"{\"serialized\": \"\"}")))
+
+        print("2️⃣  Round trip")
+        expected = [canonical(tree) for tree in trees]
+        for name in codecs.names():
+            payloads = [codecs.encode(tree, name) for tree in trees]
+            ok = (all(codecs.codec_for(payload) == name and is_tree_payload(payload) for payload in payloads)
+                  and [canonical(codecs.decode(payload)) for payload in payloads] == expected)
+            all_ok &= check(f"{name:<17} {sum(map(len, payloads)):>9,} bytes", ok)
+        legacy = {"legacy_gzip": [gzip.compress(pickle.dumps(tree_to_dict(tree))) for tree in trees],
+                  "legacy_pickle": samples}
+        for name, payloads in legacy.items():
+            all_ok &= check(f"{name:<17} untagged payloads decode",
+                            all(codecs.codec_for(payload) == name for payload in payloads)
+                            and [canonical(codecs.decode(payload)) for payload in payloads] == expected)
+
+        print("3️⃣  Dictionary codec")
+        gzip_bytes = sum(len(codecs.encode(tree, "pickle_gzip")) for tree in trees)
+        dict_payloads = [codecs.encode(tree, "pickle_zlib_dict") for tree in trees]
+        dict_bytes = sum(map(len, dict_payloads))
+        all_ok &= check(f"smaller than pickle_gzip: {dict_bytes:,} vs {gzip_bytes:,} bytes", dict_bytes < gzip_bytes)
+        other_path = str(Path(tmp) / "other.zdict")
+        write_dictionary(other_path, train_zlib_dictionary(samples[::-1], size=args.dictionary_size // 2))
+        all_ok &= check("another dictionary refuses the payload",
+                        raises_codec_error(lambda: create_codec_registry(other_path).decode(dict_payloads[0])))
+        all_ok &= check("no dictionary: payload tag not registered",
+                        raises_codec_error(lambda: plain.decode(dict_payloads[0])))
+
+        print("4️⃣  Training")
+        small = train_zlib_dictionary(samples, size=1024)
+        all_ok &= check(f"size budget: {len(dictionary):,} <= {args.dictionary_size:,}, {len(small):,} <= 1,024 bytes",
+                        0 < len(dictionary) <= args.dictionary_size and 0 < len(small) <= 1024)
+        all_ok &= check("write_dictionary / load_dictionary round trip",
+                        load_dictionary(dictionary_path) == dictionary and load_dictionary(None) is None)
+
+    print()
+    print("=" * 50)
+    print("✅ Tree codec test completed!" if all_ok else "❌ Tree codec test failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
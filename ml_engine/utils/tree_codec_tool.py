@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tree Codec Tool
+===============
+
+Train the zlib preset dictionary used by the "pickle_zlib_dict" codec, and
+benchmark every registered codec (compression ratio vs encode/decode time).
+
+Usage:
+    python utils/tree_codec_tool.py train     [--json FILE] [--output FILE] [--size BYTES]
+    python utils/tree_codec_tool.py benchmark [--json FILE] [--holdout FRACTION]
+
+The benchmark trains a throwaway dictionary on part of the corpus and measures
+on the held-out remainder, so the dictionary codec is not scored on trees it
+has already seen.
+"""
+
+import argparse
+import pickle
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from services.tree_codecs import (
+    DEFAULT_DICTIONARY_SIZE, create_codec_registry, train_zlib_dictionary, tree_to_dict, write_dictionary
+)
+from services.tree_file_stores import read_legacy_json
+
+DEFAULT_JSON = str(Path(__file__).parent.parent / "game_data" / "probability_trees.json")
+DEFAULT_DICTIONARY = str(Path(__file__).parent.parent / "game_data" / "tree_codec.zdict")
+
+
+def load_trees(json_path: str):
+    """Decode every tree in a legacy JSON file (any codec, tagged or not)."""
+    registry = create_codec_registry()
+    trees = []
+    for word, entry in read_legacy_json(json_path).items():
+        try:
+            trees.append((word, registry.decode(bytes.fromhex(entry['serialized']))))
+        except Exception as e:
+            print(f"⚠️  Skipping '{word}': {e}")
+    return trees
+
+
+def raw_samples(trees):
+    return [pickle.dumps(tree_to_dict(tree), protocol=pickle.HIGHEST_PROTOCOL) for _, tree in trees]
+
+
+def train(args):
+    trees = load_trees(args.json)
+    dictionary = train_zlib_dictionary(raw_samples(trees), size=args.size)
+    write_dictionary(args.output, dictionary)
+    print(f"📚 Trained {len(dictionary):,} byte dictionary from {len(trees)} trees -> {args.output}")
+
+
+def benchmark(args):
+    trees = load_trees(args.json)
+    random.Random(42).shuffle(trees)
+    split = max(1, int(len(trees) * (1 - args.holdout)))
+    training, evaluation = trees[:split], trees[split:] or trees
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dictionary_path = str(Path(tmp) / "bench.zdict")
+        write_dictionary(dictionary_path, train_zlib_dictionary(raw_samples(training), size=args.size))
+        registry = create_codec_registry(dictionary_path)
+
+    raw_total = sum(len(sample) for sample in raw_samples(evaluation))
+    print(f"📦 Trained on {len(training)} trees, measuring {len(evaluation)} ({raw_total:,} raw pickle bytes)")
+    print()
+    print(f"   {'codec':<18} {'bytes':>10} {'ratio':>7} {'encode µs':>10} {'decode µs':>10}")
+
+    for name in registry.names():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            payloads = [registry.encode(tree, name) for _, tree in evaluation]
+        encode_us = (time.perf_counter() - start) / (args.repeat * len(evaluation)) * 1e6
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for payload in payloads:
+                registry.decode(payload)
+        decode_us = (time.perf_counter() - start) / (args.repeat * len(evaluation)) * 1e6
+
+        total = sum(len(payload) for payload in payloads)
+        print(f"   {name:<18} {total:>10,} {raw_total / total:>6.2f}x {encode_us:>10.1f} {decode_us:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probability tree codec training and benchmark")
+    parser.add_argument("command", choices=["train", "benchmark"])
+    parser.add_argument("--json", default=DEFAULT_JSON, help="Legacy probability_trees.json to sample")
+    parser.add_argument("--output", default=DEFAULT_DICTIONARY, help="Dictionary file to write (train)")
+    parser.add_argument("--size", type=int, default=DEFAULT_DICTIONARY_SIZE, help="Dictionary size in bytes")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction of trees held out (benchmark)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions (benchmark)")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        train(args)
+    else:
+        benchmark(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,13 +10,12 @@ and attempting to score all transformations for a set of test words.
 import asyncio
 import sys
 import json
-import gzip
-import pickle
 from pathlib import Path
 
 sys.path.append(str(Path(__file__).parent.parent))
 from services.enhanced_scoring_service import get_enhanced_scoring_service
 from services.efficient_word_service import get_efficient_word_service
+from services.tree_codecs import create_codec_registry, tree_to_dict
 
 def analyze_stored_trees():
     """Analyze stored probability trees without loading ONNX model."""
@@ -34,6 +33,8 @@ def analyze_stored_trees():
         
         total_stored_size = 0
         tree_details = {}
+        # Any codec (tagged or legacy gzip) - needs the trained dictionary for zlib-dict payloads
+        codecs = create_codec_registry('game_data/tree_codec.zdict')
         
         for word, entry in stored_data.items():
             size_bytes = entry['metadata']['size_bytes']
@@ -44,8 +45,7 @@ def analyze_stored_trees():
             # Decompress and analyze tree structure
             try:
                 serialized = entry['serialized']
-                decompressed = gzip.decompress(bytes.fromhex(serialized))
-                tree_dict = pickle.loads(decompressed)
+                tree_dict = tree_to_dict(codecs.decode(bytes.fromhex(serialized)))
                 
                 # Analyze tree structure
                 tree_details[word] = {
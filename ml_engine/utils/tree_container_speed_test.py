@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tree Container Speed Test
+=========================
+
+Compare the legacy hex-in-JSON tree file with the memory-mapped binary container:
+
+1. Cold start: time for a fresh process to open the store and serve one lookup
+2. Per-lookup latency: average time to fetch one serialized tree
+3. Size on disk
+
+The shipped probability_trees.json is small, so trees are replicated under
+synthetic keys (--scale) to approximate a production-sized corpus.
+"""
+
+import argparse
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from services.tree_file_stores import JsonTreeStore, TreeContainer, read_legacy_json, write_legacy_json
+
+DEFAULT_JSON = str(Path(__file__).parent.parent / "game_data" / "probability_trees.json")
+
+COLD_START_SNIPPET = """
+import sys, time
+sys.path.insert(0, {root!r})
+from services.tree_file_stores import JsonTreeStore, TreeContainer
+start = time.perf_counter()
+store = {opener}
+store.get_serialized({word!r})
+print(time.perf_counter() - start)
+"""
+
+
+def build_corpus(source_json: str, scale: int, workdir: Path):
+    """Write a scaled JSON corpus and the equivalent container; return paths and words."""
+    data = read_legacy_json(source_json)
+    entries = []
+    for copy in range(scale):
+        for word, entry in data.items():
+            key = word if copy == 0 else f"{word}_{copy}"
+            entries.append((key, bytes.fromhex(entry['serialized']), entry.get('metadata', {})))
+
+    json_path = workdir / "trees.json"
+    container_path = workdir / "trees.bin"
+    write_legacy_json(str(json_path), entries)
+    TreeContainer.build(str(container_path), ((word, payload) for word, payload, _ in entries))
+    return json_path, container_path, [word for word, _, _ in entries]
+
+
+def cold_start(opener: str, word: str, runs: int) -> float:
+    """Median seconds for a fresh interpreter to open the store and fetch one tree."""
+    root = str(Path(__file__).parent.parent)
+    code = COLD_START_SNIPPET.format(root=root, opener=opener, word=word)
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        timings.append(float(output.stdout.strip().splitlines()[-1]))
+    return sorted(timings)[len(timings) // 2]
+
+
+def lookup_latency(store, words, lookups: int) -> float:
+    """Average microseconds per get_serialized call."""
+    sample = [random.choice(words) for _ in range(lookups)]
+    start = time.perf_counter()
+    for word in sample:
+        store.get_serialized(word)
+    return (time.perf_counter() - start) / lookups * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON vs binary container tree store benchmark")
+    parser.add_argument("--json", default=DEFAULT_JSON, help="Source probability_trees.json")
+    parser.add_argument("--scale", type=int, default=100, help="Replicate the corpus this many times")
+    parser.add_argument("--lookups", type=int, default=20000, help="Lookups for the latency test")
+    parser.add_argument("--runs", type=int, default=5, help="Cold start runs per format")
+    args = parser.parse_args()
+
+    print("🚀 Tree Container Speed Test")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path, container_path, words = build_corpus(args.json, args.scale, Path(tmp))
+        probe = words[len(words) // 2]
+
+        print(f"📦 Corpus: {len(words):,} trees")
+        print(f"💾 JSON size:      {json_path.stat().st_size / 1024 / 1024:8.2f} MB")
+        print(f"💾 Container size: {container_path.stat().st_size / 1024 / 1024:8.2f} MB")
+        print()
+
+        json_cold = cold_start(f"JsonTreeStore({str(json_path)!r})", probe, args.runs)
+        container_cold = cold_start(f"TreeContainer({str(container_path)!r})", probe, args.runs)
+        print("🧊 Cold start (open + first lookup, median)")
+        print(f"   JSON:      {json_cold * 1000:8.2f} ms")
+        print(f"   Container: {container_cold * 1000:8.2f} ms")
+        print(f"   Speedup:   {json_cold / container_cold:8.1f}x")
+        print()
+
+        json_store = JsonTreeStore(str(json_path))
+        container = TreeContainer(str(container_path))
+        json_us = lookup_latency(json_store, words, args.lookups)
+        container_us = lookup_latency(container, words, args.lookups)
+        container.close()
+        print("🔍 Per-lookup latency (get_serialized)")
+        print(f"   JSON:      {json_us:8.2f} µs")
+        print(f"   Container: {container_us:8.2f} µs")
+
+    print()
+    print("=" * 50)
+    print("✅ Tree container speed test completed!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Tree Fingerprint Test
+=====================
+
+Simulate rolling out a new model with model-versioned tree storage:
+
+0. Trees stored before fingerprints existed (imported JSON, "tree:{word}" Redis
+   keys) keep serving and are queued for prewarming
+1. The "old" service (fingerprint A) stores trees in SQLite, Redis and the file store
+2. The "new" service (fingerprint B) on the same storage treats them as misses,
+   counts them as stale and queues them for prewarming; Redis keys don't collide
+3. Prewarming stores trees under fingerprint B; the new service now hits them
+4. The old service keeps serving its own Redis keys throughout (no cold-cache outage)
+5. Tree sync pushes trees built with the syncing service's fingerprint and
+   unversioned ones, but not those of another fingerprint; the local manifest
+   decodes each lazy JSON entry once
+6. The container store keeps tree fingerprints through conversion and repack
+
+Runs against the in-process RESP stand-in or --redis-url, on a temporary copy
+of probability_trees.json. Trees are copied rather than rebuilt, so no model
+is needed.
+"""
+
+import argparse
+import asyncio
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import redis
+
+sys.path.append(str(Path(__file__).parent.parent))
+from services.optimized_storage_service import OptimizedStorageService, StorageConfig
+from services.tree_file_stores import ContainerTreeStore, LazyJsonTreeStore
+from services.tree_fingerprint import TreeFingerprint, compute_tree_fingerprint
+from services.tree_sync import create_tree_sync, local_manifest
+from utils.redis_value_encoding_test import start_stand_in
+
+DEFAULT_JSON = str(Path(__file__).parent.parent / "game_data" / "probability_trees.json")
+
+
+def make_service(client, tmp, fingerprint, tiers=("sqlite", "redis", "file")):
+    return OptimizedStorageService(StorageConfig(
+        storage_type="hybrid", redis_connection=client, json_file_path=str(Path(tmp) / "probability_trees.json"),
+        compaction_interval=0, storage_tiers=list(tiers), tree_fingerprint=fingerprint
+    ))
+
+
+def sources(service, words):
+    counts = {}
+    for word in words:
+        source = service.fetch_tree(word)[1]
+        counts[source] = counts.get(source, 0) + 1
+    return counts
+
+
+def check(label, ok):
+    print(f"   {'✅' if ok else '❌'} {label}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Model-versioned tree keys and lazy invalidation")
+    parser.add_argument("--json", default=DEFAULT_JSON, help="Source probability_trees.json")
+    parser.add_argument("--redis-url", default=None, help="Real Redis server (default: in-process stand-in)")
+    parser.add_argument("--words", type=int, default=40, help="Start words to roll over")
+    args = parser.parse_args()
+
+    print("🚀 Tree Fingerprint Test")
+    print("=" * 50)
+
+    server = None
+    url = args.redis_url
+    if url is None:
+        server, url = start_stand_in()
+    client = redis.Redis.from_url(url)
+
+    current = compute_tree_fingerprint()
+    old = TreeFingerprint(model_checksum="old-model")
+    new = TreeFingerprint(model_checksum=current.model_checksum)
+    print(f"🔖 Current model fingerprint: {current.to_dict()}")
+    print(f"   old {old.id}, new {new.id}")
+
+    source = OptimizedStorageService(StorageConfig(storage_type="json", json_file_path=args.json, file_store="lazy_json"))
+    words = source.file_store.words()[:args.words]
+    trees = {word: source.get_probability_tree(word) for word in words}
+    print(f"📦 {len(trees)} trees")
+    print()
+
+    all_ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        shutil.copy(args.json, Path(tmp) / "probability_trees.json")
+        try:
+            print("0️⃣  New service on unversioned trees")
+            legacy = words[:len(words) // 2]
+            for word in legacy:
+                client.set(f"tree:{word}", source.file_store.get_serialized(word))
+            shipped = make_service(client, tmp, new, tiers=("redis", "file"))
+            counts = sources(shipped, words)
+            all_ok &= check(f"served from legacy keys and the imported JSON: {counts}",
+                            counts == {"redis": len(legacy), "file": len(words) - len(legacy)})
+            stats = shipped.get_fingerprint_stats()
+            all_ok &= check(f"unversioned lookups {stats['unversioned_lookups']}, prewarm queue {stats['prewarm_queue_depth']}",
+                            stats['prewarm_queue_depth'] == len(words) and not stats['stale_lookups'])
+            shipped.store_probability_tree(words[0], trees[words[0]])
+            all_ok &= check("a rebuilt tree leaves the prewarm queue",
+                            words[0] not in shipped.take_prewarm_words(len(words)))
+            sync = asyncio.run(create_tree_sync(shipped).sync(dry_run=True))
+            all_ok &= check(f"tree sync sees {sync['local_trees']} of {len(shipped.file_store)} local trees",
+                            sync['local_trees'] == len(shipped.file_store))
+            shipped.close()
+            client.delete(*[f"tree:{word}" for word in legacy], f"tree:{new.id}:{words[0]}")
+
+            old_service = make_service(client, tmp, old)
+            for word, tree in trees.items():
+                old_service.store_probability_tree(word, tree)
+            old_service.clear_memory_cache()
+            print("1️⃣  Old service after storing")
+            counts = sources(old_service, words)
+            all_ok &= check(f"serves from SQLite: {counts}", counts == {"sqlite": len(words)})
+
+            new_service = make_service(client, tmp, new)
+            print("2️⃣  New service on the same storage")
+            counts = sources(new_service, words)
+            all_ok &= check(f"every lookup misses: {counts}", counts == {None: len(words)})
+            stats = new_service.get_fingerprint_stats()
+            all_ok &= check(f"stale lookups {stats['stale_lookups']}, prewarm queue {stats['prewarm_queue_depth']}",
+                            stats['prewarm_queue_depth'] == len(words))
+            all_ok &= check("Redis keys are per fingerprint",
+                            client.exists(f"tree:{old.id}:{words[0]}") == 1
+                            and client.exists(f"tree:{new.id}:{words[0]}") == 0)
+
+            print("3️⃣  Prewarm (trees copied in place of rebuilds)")
+            prewarmed = 0
+            while True:
+                batch = new_service.take_prewarm_words(10)
+                if not batch:
+                    break
+                for word in batch:
+                    new_service.store_probability_tree(word, trees[word])
+                    prewarmed += 1
+            new_service.clear_memory_cache()
+            counts = sources(new_service, words)
+            all_ok &= check(f"prewarmed {prewarmed}, new service now serves {counts}", counts == {"sqlite": len(words)})
+
+            print("4️⃣  Old service during the rollout")
+            old_service.clear_memory_cache()
+            counts = sources(old_service, words)
+            all_ok &= check(f"still served from its Redis keys: {counts}", counts == {"redis": len(words)})
+
+            print("5️⃣  Tree sync per fingerprint")
+            sync = asyncio.run(create_tree_sync(new_service).sync(dry_run=True))
+            unversioned = len(new_service.file_store) - len(words)
+            all_ok &= check(f"new fingerprint: {sync['local_trees']} local trees, {sync['changed']} to push",
+                            sync['local_trees'] == len(new_service.file_store) and sync['changed'] == unversioned)
+            lazy = LazyJsonTreeStore(args.json, use_sidecar_index=False)
+            decode, decodes = lazy._entry, []
+            lazy._entry = lambda word: decodes.append(word) or decode(word)
+            manifest = local_manifest(lazy, new.id, include_unversioned=True)
+            all_ok &= check(f"lazy JSON manifest: {len(manifest)} trees, {len(decodes)} entry decodes",
+                            len(manifest) == len(lazy) and len(decodes) == len(lazy))
+            lazy.close()
+
+            print("6️⃣  Container store")
+            container = ContainerTreeStore(str(Path(tmp) / "trees.bin"), str(Path(tmp) / "overlay"), compaction_interval=0)
+            for word in words:
+                container.put_serialized(word, new_service.file_store.get_serialized(word),
+                                         new_service.file_store.get_metadata(word))
+            container.put_serialized("unversioned", source.file_store.get_serialized(words[0]), {})
+            container.repack()
+            fingerprints = {(container.get_metadata(word) or {}).get('fingerprint') for word in words}
+            all_ok &= check(f"fingerprints after repack: {fingerprints}, {len(container)} trees",
+                            fingerprints == {new.id} and len(container) == len(words) + 1
+                            and 'fingerprint' not in container.get_metadata("unversioned"))
+            container.put_serialized(words[0], source.file_store.get_serialized(words[1]), {})
+            container.put_serialized("overlay", source.file_store.get_serialized(words[1]), {})
+            all_ok &= check(f"{len(container)} trees with a shadowing and a new overlay tree",
+                            len(container) == len(words) + 2 == len(container.words()))
+            container.close()
+
+            old_service.close()
+            new_service.close()
+        finally:
+            client.delete(*[f"tree:{fp.id}:{word}" for fp in (old, new) for word in words],
+                          f"tree_manifest:{old.id}", f"tree_manifest:{new.id}")
+            if server is not None:
+                server.shutdown()
+
+    print()
+    print("=" * 50)
+    print("✅ Tree fingerprint test completed!" if all_ok else "❌ Tree fingerprint test failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tree Store Migration Tool
+=========================
+
+Move probability trees between the legacy probability_trees.json file, the
+append-only segment store and the memory-mapped binary container.
+
+Usage:
+    python utils/tree_store_migrate.py import  [--json FILE] [--segments DIR] [--overwrite]
+    python utils/tree_store_migrate.py export  [--json FILE] [--segments DIR]
+    python utils/tree_store_migrate.py compact [--segments DIR]
+    python utils/tree_store_migrate.py stats   [--segments DIR]
+    python utils/tree_store_migrate.py convert [--json FILE] [--container FILE]
+    python utils/tree_store_migrate.py repack  [--json FILE] [--container FILE] [--segments DIR]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from services.tree_file_stores import SegmentTreeStore, ContainerTreeStore, convert_json_to_container
+
+DEFAULT_JSON = str(Path(__file__).parent.parent / "game_data" / "probability_trees.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probability tree store migration tool")
+    parser.add_argument("command", choices=["import", "export", "compact", "stats", "convert", "repack"])
+    parser.add_argument("--json", default=DEFAULT_JSON, help="Legacy probability_trees.json path")
+    parser.add_argument("--segments", default=None, help="Segment store directory")
+    parser.add_argument("--container", default=None, help="Binary tree container path")
+    parser.add_argument("--overwrite", action="store_true", help="Overwrite existing trees on import")
+    args = parser.parse_args()
+
+    segment_dir = args.segments or str(Path(args.json).with_suffix(".segments"))
+    container_path = args.container or str(Path(args.json).with_suffix(".bin"))
+
+    if args.command == "convert":
+        count = convert_json_to_container(args.json, container_path)
+        print(f"📦 Converted {count} trees into {container_path}")
+        return
+
+    if args.command == "repack":
+        container_store = ContainerTreeStore(container_path, segment_dir, compaction_interval=0)
+        try:
+            count = container_store.repack()
+            print(f"📦 Repacked {count} trees into {container_path}")
+        finally:
+            container_store.close()
+        return
+
+    store = SegmentTreeStore(segment_dir, compaction_interval=0)
+
+    try:
+        if args.command == "import":
+            count = store.import_json(args.json, overwrite=args.overwrite)
+            print(f"📥 Imported {count} trees into {segment_dir}")
+        elif args.command == "export":
+            count = store.export_json(args.json)
+            print(f"📤 Exported {count} trees to {args.json}")
+        elif args.command == "compact":
+            result = store.compact()
+            print(f"🧹 Kept {result['live_trees']} trees, reclaimed {result['bytes_reclaimed']:,} bytes")
+        elif args.command == "stats":
+            print(f"📦 Trees:         {len(store)}")
+            print(f"💾 Size on disk:  {store.size_bytes():,} bytes")
+            print(f"🗑️  Garbage ratio: {store.garbage_ratio():.1%}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tree Sync CLI
+=============
+
+Push new and changed probability trees from the local JSON / file store to
+Redis, outside the game request path (cron, deploy hook, or by hand).
+
+The diff uses content-hash manifests on both sides (see services/tree_sync.py),
+so a repeat run with nothing changed reads one Redis hash, no local trees, and
+writes nothing. Keys are versioned with the same build fingerprint as the game
+service, so the CLI pushes to the keys the game reads.
+
+Usage:
+    python utils/tree_sync.py [--json FILE] [--redis-url URL] [--dry-run]
+
+Without --redis-url the connection comes from REDIS_URL or the Upstash
+KV_REST_API_URL / KV_REST_API_TOKEN variables (as in hybrid storage).
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from services.optimized_storage_service import OptimizedStorageService, StorageConfig
+from services.tree_fingerprint import compute_tree_fingerprint
+from services.tree_sync import create_tree_sync
+
+DEFAULT_JSON = str(Path(__file__).parent.parent / "game_data" / "probability_trees.json")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental JSON -> Redis probability tree sync")
+    parser.add_argument("--json", default=DEFAULT_JSON, help="Source probability_trees.json")
+    parser.add_argument("--redis-url", default=None, help="Redis URL (default: REDIS_URL / Upstash env vars)")
+    parser.add_argument("--file-store", default="lazy_json", help="Local file store layout to read from")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be pushed")
+    parser.add_argument("--batch-size", type=int, default=200, help="Trees per pipelined write")
+    parser.add_argument("--concurrency", type=int, default=4, help="Pipelines in flight at once")
+    parser.add_argument("--retries", type=int, default=3, help="Extra attempts per failed batch")
+    args = parser.parse_args()
+
+    redis_connection = None
+    if args.redis_url:
+        import redis
+        redis_connection = redis.Redis.from_url(args.redis_url)
+
+    storage = OptimizedStorageService(StorageConfig(
+        storage_type="hybrid", json_file_path=args.json, redis_connection=redis_connection,
+        file_store=args.file_store, tree_fingerprint=compute_tree_fingerprint()
+    ))
+    if storage.redis is None:
+        print("❌ No Redis connection configured (set --redis-url, REDIS_URL or KV_REST_API_URL/TOKEN)")
+        sys.exit(1)
+
+    engine = create_tree_sync(storage, args.json, batch_size=args.batch_size,
+                              max_concurrency=args.concurrency, retries=args.retries)
+    stats = asyncio.run(engine.sync(dry_run=args.dry_run))
+    storage.close()
+
+    print(json.dumps(stats, indent=2))
+    if stats['failed']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
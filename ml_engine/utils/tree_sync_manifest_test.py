@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Tree Sync Manifest Test
+=======================
+
+Check the persisted local manifest behind tree sync, counting the trees each
+local_manifest call reads from the file store:
+
+1. First call reads every tree and writes the manifest file
+2. A repeat call with nothing changed reads no tree
+3. After one put, the segment and container stores read only that tree (a JSON
+   file store re-reads everything, its token being the file signature)
+4. A deleted or corrupt manifest file falls back to reading every tree
+5. Fingerprint filtering matches the stored metadata on the recorded entries
+
+Runs for the lazy JSON, segment and container stores, on a temporary JSON
+holding the first --words trees of probability_trees.json.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+from services.tree_file_stores import create_tree_file_store, read_legacy_json, write_legacy_json
+from services.tree_sync import content_hash, local_manifest
+
+DEFAULT_JSON = str(Path(__file__).parent.parent / "game_data" / "probability_trees.json")
+
+
+def check(label, ok):
+    print(f"   {'✅' if ok else '❌'} {label}")
+    return ok
+
+
+class ReadCounter:
+    """Wrap a store's get_entry and count the trees read since the last call."""
+
+    def __init__(self, store):
+        self.reads = 0
+        get_entry = store.get_entry
+
+        def counted(word):
+            self.reads += 1
+            return get_entry(word)
+        store.get_entry = counted
+
+    def __call__(self):
+        reads, self.reads = self.reads, 0
+        return reads
+
+
+def check_store(kind, store, entries, single_tree_reread):
+    words = list(entries)
+    reads = ReadCounter(store)
+    path = store.sync_manifest_path()
+    expected = {word: content_hash(serialized) for word, (serialized, _) in entries.items()}
+    all_ok = True
+
+    manifest = local_manifest(store)
+    all_ok &= check(f"{kind}: first call reads {reads.reads} trees, manifest file written",
+                    manifest == expected and reads() == len(words) and os.path.exists(path))
+    all_ok &= check("repeat call reads no tree", local_manifest(store) == expected and reads() == 0)
+
+    changed = words[0]
+    store.put_serialized(changed, entries[words[1]][0], {'fingerprint': 'fp-test'})
+    expected[changed] = content_hash(entries[words[1]][0])
+    manifest = local_manifest(store)
+    read = reads()
+    all_ok &= check(f"after one put: {read} trees read",
+                    manifest == expected and read == (1 if single_tree_reread else len(words)))
+    all_ok &= check("fingerprint filter on recorded entries",
+                    local_manifest(store, 'fp-test') == {changed: expected[changed]}
+                    and len(local_manifest(store, 'fp-test', include_unversioned=True)) == len(words)
+                    and reads() == 0)
+
+    os.remove(path)
+    all_ok &= check("deleted manifest: every tree read again", local_manifest(store) == expected and reads() == len(words))
+    with open(path, 'w') as f:
+        f.write("{not json")
+    all_ok &= check("corrupt manifest: every tree read again", local_manifest(store) == expected and reads() == len(words))
+    return all_ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persisted local manifest of the incremental tree sync")
+    parser.add_argument("--json", default=DEFAULT_JSON, help="Source probability_trees.json")
+    parser.add_argument("--words", type=int, default=30, help="Trees in the temporary JSON")
+    args = parser.parse_args()
+
+    print("🚀 Tree Sync Manifest Test")
+    print("=" * 50)
+
+    data = read_legacy_json(args.json)
+    entries = {word: (bytes.fromhex(data[word]['serialized']), data[word].get('metadata', {}))
+               for word in list(data)[:args.words]}
+    del data
+    print(f"📦 {len(entries)} trees")
+
+    all_ok = True
+    for step, (kind, single_tree_reread) in enumerate((("lazy_json", False), ("segment", True), ("container", True)), 1):
+        print(f"{step}️⃣  {kind}")
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = str(Path(tmp) / "probability_trees.json")
+            write_legacy_json(json_path, ((word, *entry) for word, entry in entries.items()))
+            store = create_tree_file_store(kind, json_path, compaction_interval=0)
+            all_ok &= check_store(kind, store, dict(entries), single_tree_reread)
+            if hasattr(store, 'close'):
+                store.close()
+
+    print()
+    print("=" * 50)
+    print("✅ Tree sync manifest test completed!" if all_ok else "❌ Tree sync manifest test failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
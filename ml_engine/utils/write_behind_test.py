@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Write-Behind Test
+=================
+
+Compare the latency store_probability_tree adds to a move with synchronous
+writes vs the write-behind queue, then check that every queued tree reached
+both Redis and the local file store after a flush:
+
+1. Store latency: time until store_probability_tree returns, per tree
+2. Read-your-writes: queued trees are served before they are persisted
+3. Flush: queue depth, batches and flush latency from get_write_queue_stats()
+4. Durability: Redis and file store hold every tree after flush/close
+5. Failures: a batch that exhausts its retries is re-queued (newer values for
+   its keys win) and persisted once the backend recovers; a flush waiting on
+   it returns False instead of blocking; closing drops what still fails
+6. Concurrent flushes: a flush that times out does not leave another waiting
+   flush to sit out flush_interval
+
+Steps 1-4 run in hybrid mode against the in-process RESP stand-in (with
+injected latency) or --redis-url, on a temporary copy of probability_trees.json;
+steps 5-6 drive a WriteBehindQueue with a scripted persist callback.
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import redis
+
+sys.path.append(str(Path(__file__).parent.parent))
+from services.optimized_storage_service import OptimizedStorageService, StorageConfig
+from services.tree_file_stores import read_legacy_json
+from services.write_behind import WriteBehindQueue
+from utils.redis_value_encoding_test import start_stand_in
+
+DEFAULT_JSON = str(Path(__file__).parent.parent / "game_data" / "probability_trees.json")
+
+
+def check(label, ok):
+    print(f"   {'✅' if ok else '❌'} {label}")
+    return ok
+
+
+class ScriptedPersist:
+    """Persist callback that records batches, fails while `failing` is set and blocks while `gate` is clear."""
+
+    def __init__(self):
+        self.persisted = {}
+        self.failing = False
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, batch):
+        self.gate.wait()
+        if self.failing:
+            raise ConnectionError("backend down")
+        self.persisted.update(batch)
+
+
+def failure_checks():
+    persist = ScriptedPersist()
+    queue = WriteBehindQueue(persist, batch_size=10, flush_interval=5.0, max_retries=1, retry_backoff=0.01)
+    persist.failing = True
+    queue.put("a", 1)
+    queue.put("b", 1)
+    start = time.perf_counter()
+    drained = queue.flush()
+    waited = time.perf_counter() - start
+    stats = queue.stats()
+    all_ok = check(f"failed batch re-queued: flush returned {drained} after {waited * 1000:.0f} ms, "
+                   f"{stats['failed_batches']} failed batch, {stats['requeued']} requeued",
+                   not drained and stats['failed_batches'] == 1 and stats['requeued'] == 2
+                   and stats['dropped'] == 0 and queue.get("a") == 1)
+
+    queue.put("a", 2)  # newer value while the failed batch waits for its retry
+    persist.failing = False
+    drained = queue.flush(timeout=5.0)
+    all_ok &= check(f"backend back: persisted {persist.persisted}",
+                    drained and persist.persisted == {"a": 2, "b": 1} and queue.stats()['persisted'] == 2)
+
+    persist.failing = True
+    queue.put("c", 1)
+    queue.close(timeout=5.0)
+    stats = queue.stats()
+    all_ok &= check(f"close while failing: {stats['dropped']} dropped", stats['dropped'] == 1 and "c" not in persist.persisted)
+    return all_ok
+
+
+def concurrent_flush_checks():
+    persist = ScriptedPersist()
+    queue = WriteBehindQueue(persist, batch_size=10, flush_interval=5.0)
+    persist.gate.clear()
+    queue.put("a", 1)
+    waiting = {}
+    flusher = threading.Thread(target=lambda: waiting.update(drained=queue.flush(timeout=4.0)))
+    flusher.start()
+    while queue.stats()['queue_depth'] and not queue._in_flight:
+        time.sleep(0.001)  # worker picked up "a" and blocks in persist
+    queue.put("b", 1)
+    timed_out = not queue.flush(timeout=0.05)
+    start = time.perf_counter()
+    persist.gate.set()
+    flusher.join()
+    waited = time.perf_counter() - start
+    all_ok = check(f"other flush timed out, waiting flush drained in {waited * 1000:.0f} ms (flush_interval 5 s)",
+                   timed_out and waiting.get('drained') and waited < 1.0 and persist.persisted == {"a": 1, "b": 1})
+    queue.close()
+    return all_ok
+
+
+def make_service(client, json_path, segment_dir, write_behind, batch_size):
+    return OptimizedStorageService(StorageConfig(
+        storage_type="hybrid", redis_connection=client, json_file_path=json_path, segment_dir=segment_dir,
+        compaction_interval=0, write_behind=write_behind, write_batch_size=batch_size
+    ))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synchronous vs write-behind tree persistence")
+    parser.add_argument("--json", default=DEFAULT_JSON, help="Source probability_trees.json")
+    parser.add_argument("--redis-url", default=None, help="Real Redis server (default: in-process stand-in)")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Injected reply latency for the stand-in")
+    parser.add_argument("--batch-size", type=int, default=50, help="Trees per write-behind batch")
+    args = parser.parse_args()
+
+    print("🚀 Write-Behind Test")
+    print("=" * 50)
+
+    server = None
+    url = args.redis_url
+    if url is None:
+        server, url = start_stand_in(args.latency_ms / 1000)
+        print(f"🧪 Using in-process RESP stand-in at {url} ({args.latency_ms:.1f} ms per reply)")
+    else:
+        print(f"🔌 Using Redis at {url}")
+
+    client = redis.Redis.from_url(url)
+    source = OptimizedStorageService(StorageConfig(storage_type="json", json_file_path=args.json, file_store="lazy_json"))
+    trees = {word: source.get_probability_tree(word) for word in source.file_store.words()}
+    print(f"📦 {len(trees)} trees")
+    print()
+
+    all_ok = True
+    keys = []
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = str(Path(tmp) / "probability_trees.json")
+        shutil.copy(args.json, json_path)
+        results = {}
+        try:
+            for mode, write_behind in (("synchronous", False), ("write-behind", True)):
+                prefix = f"{mode}-"
+                keys += [f"tree:{prefix}{word}" for word in trees]
+                service = make_service(client, json_path, str(Path(tmp) / f"{mode}.segments"), write_behind, args.batch_size)
+
+                latencies = []
+                for word, tree in trees.items():
+                    start = time.perf_counter()
+                    service.store_probability_tree(prefix + word, tree)
+                    latencies.append(time.perf_counter() - start)
+
+                if write_behind:
+                    depth = service.get_write_queue_stats()['queue_depth']
+                    service.clear_memory_cache()  # reads must still see trees that are only queued
+                    readable = all(service.get_probability_tree(prefix + word) is not None for word in trees)
+                    all_ok &= readable
+                    print(f"📖 Read-your-writes with {depth} trees queued: {'✅' if readable else '❌'}")
+
+                start = time.perf_counter()
+                service.flush_writes()
+                flush_time = time.perf_counter() - start
+                stats = service.get_write_queue_stats()
+                service.close()
+
+                in_redis = sum(value is not None for value in client.mget([f"tree:{prefix}{w}" for w in trees]))
+                reopened = make_service(client, json_path, str(Path(tmp) / f"{mode}.segments"), False, args.batch_size)
+                on_disk = sum(prefix + word in reopened.file_store for word in trees)
+                reopened.close()
+                all_ok &= in_redis == on_disk == len(trees)
+
+                latencies.sort()
+                results[mode] = (sum(latencies) / len(latencies), latencies[len(latencies) * 99 // 100], flush_time)
+                print(f"   {mode:<12} stored {len(trees)}: Redis {in_redis}, file store {on_disk}")
+                if stats:
+                    print(f"   queue: max depth {stats['max_queue_depth']}, {stats['batches']} batches, "
+                          f"avg flush {stats['avg_flush_ms']:.1f} ms, max {stats['max_flush_ms']:.1f} ms, "
+                          f"failed {stats['failed']}")
+        finally:
+            if keys:
+                client.delete(*keys)
+            if server is not None:
+                server.shutdown()
+
+    print()
+    print(f"   {'mode':<12} {'avg store µs':>13} {'p99 store µs':>13} {'final flush ms':>15}")
+    for mode, (avg, p99, flush_time) in results.items():
+        print(f"   {mode:<12} {avg * 1e6:>13.1f} {p99 * 1e6:>13.1f} {flush_time * 1000:>15.1f}")
+
+    print()
+    print("🧯 Failed batches")
+    all_ok &= failure_checks()
+    print("🔀 Concurrent flushes")
+    all_ok &= concurrent_flush_checks()
+
+    print()
+    print("=" * 50)
+    print("✅ Write-behind test completed!" if all_ok else "❌ Write-behind test failed")
+    if not all_ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()